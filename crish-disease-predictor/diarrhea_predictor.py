@@ -5,7 +5,6 @@ from dotenv import load_dotenv
 import numpy as np
 import json
 from datetime import datetime, timedelta
-import joblib
 import math
 import psycopg2
 import isoweek
@@ -16,6 +15,8 @@ from disease_alert_generator import (
     get_iso_code_for_municipality, create_and_ingest_disease_forecast_alerts,
     record_disease_pipeline_run
 )
+from model_registry import get_registry, RegisteredModels
+from weather_data import load_weather_data
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +27,7 @@ class DiarrheaPredictor:
         self.predictions_dir = os.getenv('PREDICTIONS_DIR', 'predictions')
         self.weather_data_dir = os.getenv('WEATHER_DATA_DIR', 'weather_data')
         self.default_prev_cases = int(os.getenv('DEFAULT_PREV_CASES', '1'))
+        self.registry = get_registry()
         self.models = {}
         
         # Database connection parameters
@@ -38,6 +40,7 @@ class DiarrheaPredictor:
         }
         self.conn = None
         self.cursor = None
+        self.db_pool = None
         
         # Municipality to ISO code mapping
         self.municipality_iso_codes = {
@@ -58,10 +61,11 @@ class DiarrheaPredictor:
             'Viqueque': 'TL-VI'
         }
 
-    def connect_db(self):
-        """Connect to the PostgreSQL database."""
+    def connect_db(self, db_pool=None):
+        """Connect to the PostgreSQL database, borrowing the connection from db_pool when given."""
+        self.db_pool = db_pool
         try:
-            self.conn = psycopg2.connect(**self.db_params)
+            self.conn = db_pool.getconn() if db_pool else psycopg2.connect(**self.db_params)
             self.cursor = self.conn.cursor()
             print("Connected to the database successfully")
         except Exception as e:
@@ -72,61 +76,79 @@ class DiarrheaPredictor:
         """Close database connection."""
         if self.cursor:
             self.cursor.close()
-        if self.conn:
+        if self.conn and self.db_pool:
+            # Leave no transaction open on a connection going back to the pool
+            self.conn.rollback()
+            self.db_pool.putconn(self.conn)
+        elif self.conn:
             self.conn.close()
             print("Database connection closed")
 
     def get_previous_cases(self, municipality, year, week):
         """Get the most recent available diarrhea cases from the database for a municipality up to a specific week."""
-        try:
-            # Get municipality code
+        return self.get_previous_cases_batch([(municipality, year, week)]).get((municipality, year, week), 0)
+
+    def get_previous_cases_batch(self, targets):
+        """
+        Get the most recent available diarrhea cases up to each target week, for
+        many municipalities at once.
+
+        Args:
+            targets: Iterable of (municipality, year, week).
+        Returns:
+            Dict of (municipality, year, week) to cases. Targets with no data up
+            to that week, or no ISO code, are left out and count as 0 cases.
+        """
+        targets = list(dict.fromkeys(targets))
+        coded_targets = []
+        for municipality, year, week in targets:
             municipality_code = self.municipality_iso_codes.get(municipality)
             if not municipality_code:
                 print(f"Warning: No ISO code found for {municipality}")
-                return 0
-
-            # Find the latest year and week with data up to the target year/week
-            query_latest_week = """
-            SELECT year, week_number
-            FROM tlhis_diseases
-            WHERE municipality_code = %s
-            AND lower(disease) ~* '\ydiarr?hea\y'
-            AND (year < %s OR (year = %s AND week_number <= %s))
-            ORDER BY year DESC, week_number DESC
-            LIMIT 1
-            """
-            self.cursor.execute(query_latest_week, (municipality_code, year, year, week))
-            latest_week_data = self.cursor.fetchone()
-
-            if not latest_week_data:
-                # No data found up to this week, return 0
-                # print(f"No previous case data found for {municipality} up to {year}-W{week}") # Optional: for debugging
-                return 0
-
-            latest_year, latest_week = latest_week_data
-
-            # Query to get sum of cases for the identified latest week
-            query_cases = """
-            SELECT COALESCE(SUM("totalCases"), 0) as total_cases
-            FROM tlhis_diseases
-            WHERE municipality_code = %s
-            AND year = %s
-            AND week_number = %s
-            AND lower(disease) ~* '\ydiarr?hea\y'
+                continue
+            coded_targets.append((municipality, municipality_code, year, week))
+        if not coded_targets:
+            return {}
+
+        try:
+            # Weekly totals for the requested municipalities, then for every
+            # target the latest week with data up to that week, in one query
+            query = """
+            WITH weekly_cases AS (
+                SELECT municipality_code, year, week_number, COALESCE(SUM("totalCases"), 0) AS total_cases
+                FROM tlhis_diseases
+                WHERE municipality_code = ANY(%s)
+                AND lower(disease) ~* '\ydiarr?hea\y'
+                GROUP BY municipality_code, year, week_number
+            )
+            SELECT t.idx, latest.total_cases
+            FROM unnest(%s::int[], %s::text[], %s::int[], %s::int[]) AS t(idx, municipality_code, year, week_number)
+            CROSS JOIN LATERAL (
+                SELECT w.total_cases
+                FROM weekly_cases w
+                WHERE w.municipality_code = t.municipality_code
+                AND (w.year, w.week_number) <= (t.year, t.week_number)
+                ORDER BY w.year DESC, w.week_number DESC
+                LIMIT 1
+            ) latest
             """
-            
-            self.cursor.execute(query_cases, (municipality_code, latest_year, latest_week))
-            result = self.cursor.fetchone()
-            
-            # print(f"Using data from {latest_year}-W{latest_week} for target {year}-W{week} for {municipality}: {int(result[0]) if result else 0} cases") # Optional: for debugging
-            return int(result[0]) if result else 0
-            
+            self.cursor.execute(query, (
+                list({code for _, code, _, _ in coded_targets}),
+                list(range(len(coded_targets))),
+                [code for _, code, _, _ in coded_targets],
+                [int(year) for _, _, year, _ in coded_targets],
+                [int(week) for _, _, _, week in coded_targets],
+            ))
+            return {
+                (coded_targets[idx][0], coded_targets[idx][2], coded_targets[idx][3]): int(total_cases)
+                for idx, total_cases in self.cursor.fetchall()
+            }
         except Exception as e:
-            print(f"Error getting previous cases for {municipality} up to {year}-W{week}: {str(e)}")
+            print(f"Error getting previous diarrhea cases for {len(coded_targets)} municipality weeks: {str(e)}")
             # Rollback the transaction on error
             if self.conn:
                 self.conn.rollback()
-            return 0
+            return {}
 
     def get_week_info(self, date_str):
         """Get year and week number from a date string."""
@@ -145,20 +167,17 @@ class DiarrheaPredictor:
         return year, week
         
     def load_models(self, municipalities):
-        """Load joblib models for each municipality."""
+        """Find the municipalities with a model. Models are loaded lazily through the shared model registry."""
+        self.registry.register('Diarrhea', self.models_dir)
         available_municipalities = []
         for municipality in municipalities:
-            try:
-                model_path = f'{self.models_dir}/{municipality}_Diarrhea.joblib'
-                
-                if os.path.exists(model_path):
-                    self.models[municipality] = joblib.load(model_path)
-                    print(f"Loaded model for {municipality} from {model_path}")
-                    available_municipalities.append(municipality)
-                else:
-                    print(f"Skipping {municipality}: Model not found at {model_path}")
-            except Exception as e:
-                print(f"Error loading model for {municipality}: {str(e)}")
+            model_path = self.registry.model_path('Diarrhea', municipality)
+            if os.path.exists(model_path):
+                print(f"Found model for {municipality} at {model_path}")
+                available_municipalities.append(municipality)
+            else:
+                print(f"Skipping {municipality}: Model not found at {model_path}")
+        self.models = RegisteredModels(self.registry, 'Diarrhea', available_municipalities)
         return available_municipalities
 
     def prepare_input_sequence(self, municipality, weeks_data, year, week):
@@ -176,68 +195,62 @@ class DiarrheaPredictor:
         - relative_humidity_mean_lag_1 to relative_humidity_mean_lag_4 (4 features)
         - relative_humidity_min_lag_1 to relative_humidity_min_lag_4 (4 features)
         """
-        # Get previous cases for the last 4 weeks
-        diarrhea_lags = []
-        weather_data_by_lag = []
-        
-        # Process the 4 weeks in chronological order (oldest to newest)
-        # weeks_data is already in chronological order
-        for week_data in weeks_data:
-            week_year, week_num = self.get_week_info(week_data['week_start'])
-            
-            # Get diarrhea cases for this week
-            cases = self.get_previous_cases(municipality, week_year, week_num)
-            diarrhea_lags.append(cases)
-            weather_data_by_lag.append(week_data)
-        
-        # Reverse to get lag_1 as most recent (last week in the list)
-        diarrhea_lags = diarrhea_lags[::-1]
-        weather_data_by_lag = weather_data_by_lag[::-1]
-        
-        # Build the feature array
-        features = []
-        
-        # Add diarrhea lags
-        features.extend(diarrhea_lags)
-        
-        # Add weather features in the correct order
-        # t2m_max
-        for week_data in weather_data_by_lag:
-            features.append(week_data['temperature']['max'])
-        
-        # t2m_mean (using avg as mean)
-        for week_data in weather_data_by_lag:
-            features.append(week_data['temperature']['avg'])
-            
-        # t2m_min
-        for week_data in weather_data_by_lag:
-            features.append(week_data['temperature']['min'])
-            
-        # tp_max (precipitation max - assuming single value, so using same for max/mean/min)
-        for week_data in weather_data_by_lag:
-            features.append(week_data['precipitation'])
-            
-        # tp_mean
-        for week_data in weather_data_by_lag:
-            features.append(week_data['precipitation'])
-            
-        # tp_min
-        for week_data in weather_data_by_lag:
-            features.append(week_data['precipitation'])
-            
-        # relative_humidity_max
-        for week_data in weather_data_by_lag:
-            features.append(week_data['humidity']['max'])
-            
-        # relative_humidity_mean
-        for week_data in weather_data_by_lag:
-            features.append(week_data['humidity']['mean'])
-            
-        # relative_humidity_min
-        for week_data in weather_data_by_lag:
-            features.append(week_data['humidity']['min'])
-        
-        return np.array(features).reshape(1, -1)
+        week_infos = [self.get_week_info(week_data['week_start']) for week_data in weeks_data]
+        previous_cases = {
+            (municipality, week_year, week_num): self.get_previous_cases(municipality, week_year, week_num)
+            for week_year, week_num in week_infos
+        }
+        return self.prepare_input_batch({municipality: weeks_data}, previous_cases)
+
+    def prepare_input_batch(self, weeks_by_municipality, previous_cases=None):
+        """Build the 40-feature rows for many municipalities at once.
+
+        Args:
+            weeks_by_municipality: Dict of municipality to its last 4 weeks of weather
+                data, in chronological order (oldest to newest).
+            previous_cases: Optional dict of (municipality, year, week) to cases; fetched
+                for all municipalities with a single query when not given.
+        Returns:
+            Array of shape (municipalities, 40), rows in the order of weeks_by_municipality,
+            features in the order documented on prepare_input_sequence.
+        """
+        municipalities = list(weeks_by_municipality)
+        if not municipalities:
+            return np.empty((0, 40))
+        week_infos = {
+            municipality: [self.get_week_info(week_data['week_start']) for week_data in weeks]
+            for municipality, weeks in weeks_by_municipality.items()
+        }
+        if previous_cases is None:
+            previous_cases = self.get_previous_cases_batch(
+                (municipality, week_year, week_num)
+                for municipality in municipalities
+                for week_year, week_num in week_infos[municipality]
+            )
+
+        def lagged(values):
+            # (municipalities, weeks) in chronological order -> lag_1 (most recent) first
+            return np.asarray(values, dtype=float)[:, ::-1]
+
+        weeks = [weeks_by_municipality[municipality] for municipality in municipalities]
+        cases = lagged([
+            [previous_cases.get((municipality, week_year, week_num), 0) for week_year, week_num in week_infos[municipality]]
+            for municipality in municipalities
+        ])
+        precipitation = lagged([[week_data['precipitation'] for week_data in rows] for rows in weeks])
+        return np.hstack([
+            cases,
+            lagged([[week_data['temperature']['max'] for week_data in rows] for rows in weeks]),
+            lagged([[week_data['temperature']['avg'] for week_data in rows] for rows in weeks]),
+            lagged([[week_data['temperature']['min'] for week_data in rows] for rows in weeks]),
+            # tp_max/mean/min (precipitation - single value, so using same for max/mean/min)
+            precipitation,
+            precipitation,
+            precipitation,
+            lagged([[week_data['humidity']['max'] for week_data in rows] for rows in weeks]),
+            lagged([[week_data['humidity']['mean'] for week_data in rows] for rows in weeks]),
+            lagged([[week_data['humidity']['min'] for week_data in rows] for rows in weeks]),
+        ])
 
     def log_input_data(self, input_features):
         """Log the input data being used for prediction."""
@@ -339,7 +352,63 @@ class DiarrheaPredictor:
         # Make prediction using the new features
         return self.predict_diarrhea_cases(municipality, next_week_features)
 
-def main():
+    def next_week_input_batch(self, previous_features, current_predictions, forecast_weeks):
+        """Shift every feature block of previous_features by one week, vectorized.
+
+        The current prediction and the first forecast week become lag_1, previous
+        lag_1-3 become lag_2-4. Same layout as predict_next_week_cases, for many rows.
+        """
+        forecast_weeks = list(forecast_weeks)
+        newest = np.column_stack([
+            np.asarray(current_predictions, dtype=float),
+            [week_data['temperature']['max'] for week_data in forecast_weeks],
+            [week_data['temperature']['avg'] for week_data in forecast_weeks],
+            [week_data['temperature']['min'] for week_data in forecast_weeks],
+            [week_data['precipitation'] for week_data in forecast_weeks],
+            [week_data['precipitation'] for week_data in forecast_weeks],
+            [week_data['precipitation'] for week_data in forecast_weeks],
+            [week_data['humidity']['max'] for week_data in forecast_weeks],
+            [week_data['humidity']['mean'] for week_data in forecast_weeks],
+            [week_data['humidity']['min'] for week_data in forecast_weeks],
+        ])
+        blocks = np.asarray(previous_features, dtype=float).reshape(len(forecast_weeks), 10, 4)
+        return np.concatenate([newest[:, :, None], blocks[:, :, :3]], axis=2).reshape(len(forecast_weeks), 40)
+
+    def predict_batch(self, municipalities, input_features):
+        """Predict cases for many rows, one model.predict call per distinct model.
+
+        Returns a list aligned with municipalities of non-negative, rounded up case
+        counts, None where no model is available.
+        """
+        predictions = [None] * len(municipalities)
+        rows_by_model = {}
+        for row, municipality in enumerate(municipalities):
+            if municipality not in self.models:
+                print(f"No model available for {municipality}")
+                continue
+            try:
+                model = self.models[municipality]
+            except Exception as e:
+                print(f"Error loading model for {municipality}: {str(e)}")
+                continue
+            rows_by_model.setdefault(id(model), (model, []))[1].append(row)
+
+        for model, rows in rows_by_model.values():
+            # Make prediction directly (no scaling needed for new models)
+            model_predictions = np.ravel(model.predict(input_features[rows]))
+            for row, prediction in zip(rows, model_predictions):
+                # Ensure non-negative prediction and round up to nearest integer
+                predictions[row] = math.ceil(max(0, float(prediction)))
+
+        for municipality, features, predicted_cases in zip(municipalities, input_features, predictions):
+            if predicted_cases is not None:
+                print(f"\nPredicting for {municipality}")
+                self.log_input_data(features.reshape(1, -1))
+                print(f"Predicted cases: {predicted_cases}")
+        return predictions
+
+def main(weather=None, db_pool=None):
+    """Run one prediction pass. weather and db_pool are shared by the prediction worker, returns the predictions or None on failure."""
     predictor = DiarrheaPredictor()
     pipeline_name = "Diarrhea Predictor Pipeline"
     pipeline_start_time = datetime.now() # For recording run
@@ -349,29 +418,17 @@ def main():
     
     try:
         # Connect to database
-        predictor.connect_db()
+        predictor.connect_db(db_pool)
         
-        # Load weekly averages and forecast data
+        # Load weekly averages and forecast data, unless the prediction worker already did
         # Standardized date format for filenames
         current_date_filename_suffix = pipeline_start_time.strftime('%Y%m%d')
-        weekly_averages_file = f"{predictor.weather_data_dir}/all_municipalities_weekly_averages_{current_date_filename_suffix}.json"
-        forecast_file = f"{predictor.weather_data_dir}/all_municipalities_forecast_{current_date_filename_suffix}.json"
-        
-        try:
-            with open(weekly_averages_file, 'r') as f:
-                weekly_data = json.load(f)
-        except FileNotFoundError:
-            print(f"Weekly averages file not found: {weekly_averages_file}")
-            return
-            
-        try:
-            with open(forecast_file, 'r') as f:
-                forecast_data = json.load(f)
-            has_forecast = True
-            print("Forecast data loaded successfully")
-        except FileNotFoundError:
-            print(f"Forecast file not found: {forecast_file}")
-            has_forecast = False
+        if weather is None:
+            weather = load_weather_data(predictor.weather_data_dir, current_date_filename_suffix)
+            if weather is None:
+                return None
+        weekly_data, forecast_data = weather
+        has_forecast = forecast_data is not None
 
         # Initialize predictor and get available municipalities
         available_municipalities = predictor.load_models(weekly_data.keys())
@@ -383,112 +440,120 @@ def main():
         all_alerts = [] # Initialize list to store all generated alerts
         processed_municipality_names = [] # Keep track of successfully processed municipalities
 
-        # Process each municipality with available model
-        for municipality in available_municipalities:
+        max_weeks_history = int(os.getenv('MAX_WEEKS_HISTORY', '4'))
+        eligible_municipalities = [
+            municipality for municipality in available_municipalities
+            if len(weekly_data[municipality]) >= max_weeks_history  # Need minimum weeks of data
+        ]
+
+        # Prepare the 40-feature input rows for all municipalities, with one
+        # query for every lagged case count
+        input_features = predictor.prepare_input_batch(
+            {municipality: weekly_data[municipality][-4:] for municipality in eligible_municipalities}
+        )
+
+        # Make predictions for current week
+        current_predictions = predictor.predict_batch(eligible_municipalities, input_features)
+
+        # If forecast data is available, predict next week from the current predictions
+        next_week_predictions = {}
+        forecast_rows = [
+            row for row, municipality in enumerate(eligible_municipalities)
+            if has_forecast and current_predictions[row] is not None
+            and municipality in forecast_data and forecast_data[municipality]
+        ]
+        if forecast_rows:
+            next_week_features = predictor.next_week_input_batch(
+                input_features[forecast_rows],
+                [current_predictions[row] for row in forecast_rows],
+                [forecast_data[eligible_municipalities[row]][0] for row in forecast_rows]  # The first forecast week
+            )
+            forecast_municipalities = [eligible_municipalities[row] for row in forecast_rows]
+            next_week_predictions = dict(zip(
+                forecast_municipalities,
+                predictor.predict_batch(forecast_municipalities, next_week_features)
+            ))
+
+        for municipality, current_prediction in zip(eligible_municipalities, current_predictions):
             weeks = weekly_data[municipality]
-            if len(weeks) >= int(os.getenv('MAX_WEEKS_HISTORY', '4')):  # Need minimum weeks of data
-                print(f"\nProcessing {municipality}")
-                
-                # Prepare input sequence for the new model format
-                # Get the last week's info for reference
-                last_week = weeks[-1]
-                year, week = predictor.get_week_info(last_week['week_start'])
-                
-                # Prepare the 40-feature input sequence
-                input_features = predictor.prepare_input_sequence(municipality, weeks[-4:], year, week)
-
-                # Make prediction for current week
-                current_prediction = predictor.predict_diarrhea_cases(municipality, input_features)
-                
-                # Initialize next week prediction
-                next_week_prediction = None
-                
-                # Get municipality ISO code (needed for alerts)
-                # This uses the mapping within the predictor class instance
-                municipality_iso_code = get_iso_code_for_municipality(municipality, predictor.municipality_iso_codes)
-                if not municipality_iso_code:
-                    print(f"Warning: ISO code not found for {municipality}, bulletins might be missing this info.")
-
-                # If forecast data is available, predict next week
-                if has_forecast and municipality in forecast_data and forecast_data[municipality]:
-                    next_week_prediction = predictor.predict_next_week_cases(
-                        municipality, 
-                        input_features, 
-                        current_prediction, 
-                        forecast_data[municipality][0]  # Pass the first forecast week
-                    )
-                
-                if current_prediction is not None:
-                    # Calculate current prediction week range
-                    last_hist_week_end_dt = datetime.strptime(weeks[-1]['week_end'], '%Y-%m-%d')
-                    current_pred_week_start_dt = last_hist_week_end_dt + timedelta(days=1)
-                    current_pred_week_end_dt = current_pred_week_start_dt + timedelta(days=6)
-
-                    predictions[municipality] = {
-                        'current_week': {
-                            'predicted_cases': current_prediction,
-                            'prediction_date': pipeline_start_time.strftime('%Y-%m-%d'),
-                            'week_range': {
-                                'start': current_pred_week_start_dt.strftime('%Y-%m-%d'),
-                                'end': current_pred_week_end_dt.strftime('%Y-%m-%d')
-                            },
-                            'weeks_used': [
-                                {'start': weeks[-int(os.getenv('MAX_WEEKS_HISTORY', '4'))+i]['week_start'],
-                                 'end': weeks[-int(os.getenv('MAX_WEEKS_HISTORY', '4'))+i]['week_end']}
-                                for i in range(int(os.getenv('MAX_WEEKS_HISTORY', '4')))]
+            next_week_prediction = next_week_predictions.get(municipality)
+
+            # Get municipality ISO code (needed for alerts)
+            municipality_iso_code = get_iso_code_for_municipality(municipality, predictor.municipality_iso_codes)
+            if not municipality_iso_code:
+                print(f"Warning: ISO code not found for {municipality}, bulletins might be missing this info.")
+
+            if current_prediction is not None:
+                # Calculate current prediction week range
+                last_hist_week_end_dt = datetime.strptime(weeks[-1]['week_end'], '%Y-%m-%d')
+                current_pred_week_start_dt = last_hist_week_end_dt + timedelta(days=1)
+                current_pred_week_end_dt = current_pred_week_start_dt + timedelta(days=6)
+
+                predictions[municipality] = {
+                    'current_week': {
+                        'predicted_cases': current_prediction,
+                        'prediction_date': pipeline_start_time.strftime('%Y-%m-%d'),
+                        'week_range': {
+                            'start': current_pred_week_start_dt.strftime('%Y-%m-%d'),
+                            'end': current_pred_week_end_dt.strftime('%Y-%m-%d')
+                        },
+                        'weeks_used': [
+                            {'start': weeks[-max_weeks_history+i]['week_start'],
+                             'end': weeks[-max_weeks_history+i]['week_end']}
+                            for i in range(max_weeks_history)]
+                    }
+                }
+
+                # Add next week prediction if available
+                if next_week_prediction is not None:
+                    # Calculate next week's date range based on the current prediction's week
+                    next_week_start_dt = current_pred_week_end_dt + timedelta(days=1)
+                    next_week_end_dt = next_week_start_dt + timedelta(days=6)
+
+                    predictions[municipality]['next_week'] = {
+                        'predicted_cases': next_week_prediction,
+                        'prediction_date': pipeline_start_time.strftime('%Y-%m-%d'),
+                        'week_range': {
+                            'start': next_week_start_dt.strftime('%Y-%m-%d'),
+                            'end': next_week_end_dt.strftime('%Y-%m-%d')
                         }
                     }
 
-                    # Add next week prediction if available
-                    if next_week_prediction is not None:
-                        # Calculate next week's date range based on the current prediction's week
-                        next_week_start_dt = current_pred_week_end_dt + timedelta(days=1)
-                        next_week_end_dt = next_week_start_dt + timedelta(days=6)
-
-                        predictions[municipality]['next_week'] = {
-                            'predicted_cases': next_week_prediction,
-                            'prediction_date': pipeline_start_time.strftime('%Y-%m-%d'),
-                            'week_range': {
-                                'start': next_week_start_dt.strftime('%Y-%m-%d'),
-                                'end': next_week_end_dt.strftime('%Y-%m-%d')
-                            }
-                        }
+                # --- Generate Alerts ---
+                # Use a consistent forecast_date for alerts generated in this run
+                alert_forecast_date_str = pipeline_start_time.strftime('%Y-%m-%d')
+
+                # Alert for current week prediction
+                if current_prediction is not None:
+                    current_alert = generate_disease_alert(
+                        disease_type="Diarrhea",
+                        predicted_cases=int(current_prediction),
+                        municipality_name=municipality,
+                        forecast_date_str=alert_forecast_date_str, # Standardized
+                        week_start_str=predictions[municipality]['current_week']['week_range']['start'],
+                        week_end_str=predictions[municipality]['current_week']['week_range']['end'],
+                        municipality_iso_code=municipality_iso_code
+                    )
+                    if current_alert:
+                        all_alerts.append(current_alert)
+                        print(f"Generated current week alert for {municipality}: Level {current_alert['alert_level']}")
+
+                # Alert for next week prediction
+                if next_week_prediction is not None:
+                    next_week_alert = generate_disease_alert(
+                        disease_type="Diarrhea",
+                        predicted_cases=int(next_week_prediction),
+                        municipality_name=municipality,
+                        forecast_date_str=alert_forecast_date_str, # Standardized
+                        week_start_str=predictions[municipality]['next_week']['week_range']['start'],
+                        week_end_str=predictions[municipality]['next_week']['week_range']['end'],
+                        municipality_iso_code=municipality_iso_code
+                    )
+                    if next_week_alert:
+                        all_alerts.append(next_week_alert)
+                        print(f"Generated next week alert for {municipality}: Level {next_week_alert['alert_level']}")
 
-                    # --- Generate Alerts ---
-                    # Use a consistent forecast_date for alerts generated in this run
-                    alert_forecast_date_str = pipeline_start_time.strftime('%Y-%m-%d')
-
-                    # Alert for current week prediction
-                    if current_prediction is not None:
-                        current_alert = generate_disease_alert(
-                            disease_type="Diarrhea",
-                            predicted_cases=int(current_prediction),
-                            municipality_name=municipality,
-                            forecast_date_str=alert_forecast_date_str, # Standardized
-                            week_start_str=predictions[municipality]['current_week']['week_range']['start'],
-                            week_end_str=predictions[municipality]['current_week']['week_range']['end'],
-                            municipality_iso_code=municipality_iso_code
-                        )
-                        if current_alert:
-                            all_alerts.append(current_alert)
-                            print(f"Generated current week alert for {municipality}: Level {current_alert['alert_level']}")
-
-                    # Alert for next week prediction
-                    if next_week_prediction is not None:
-                        next_week_alert = generate_disease_alert(
-                            disease_type="Diarrhea",
-                            predicted_cases=int(next_week_prediction),
-                            municipality_name=municipality,
-                            forecast_date_str=alert_forecast_date_str, # Standardized
-                            week_start_str=predictions[municipality]['next_week']['week_range']['start'],
-                            week_end_str=predictions[municipality]['next_week']['week_range']['end'],
-                            municipality_iso_code=municipality_iso_code
-                        )
-                        if next_week_alert:
-                            all_alerts.append(next_week_alert)
-                            print(f"Generated next week alert for {municipality}: Level {next_week_alert['alert_level']}")
-
-                    processed_municipality_names.append(municipality) # Successfully processed this one
+                processed_municipality_names.append(municipality) # Successfully processed this one
 
         municipalities_processed_count = len(processed_municipality_names)
         alerts_generated_this_run = len(all_alerts)
@@ -549,6 +614,7 @@ def main():
             alerts_generated_count=alerts_generated_this_run,
             bulletins_created_count=bulletins_created_this_run
         )
+        return predictions
             
     except Exception as e:
         err_message = f"Error: {str(e)}"
@@ -564,6 +630,7 @@ def main():
             alerts_generated_count=alerts_generated_this_run,
             bulletins_created_count=bulletins_created_this_run
         )
+        return None
     finally:
         predictor.disconnect_db()
 
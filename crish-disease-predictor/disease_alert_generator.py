@@ -1,15 +1,19 @@
 import re
 import os
+import csv
 from datetime import datetime, timedelta
 import psycopg2
 from psycopg2.extras import execute_values
 import logging
 from pathlib import Path
 import io
+import json
+import threading
 import boto3
 import matplotlib.pyplot as plt
-import geopandas
 from dotenv import load_dotenv
+from map_renderer import render_maps
+from image_upload_pool import ImageUploadPool, S3_UPLOAD_WORKERS, TRANSFER_CONFIG
 
 # Load environment variables for S3 and other configurations
 load_dotenv()
@@ -28,15 +32,18 @@ if S3_BUCKET_NAME and S3_ENDPOINT_URL and S3_ACCESS_KEY and S3_SECRET_KEY:
         endpoint_url=S3_ENDPOINT_URL,
         aws_access_key_id=S3_ACCESS_KEY,
         aws_secret_access_key=S3_SECRET_KEY,
-        config=boto3.session.Config(s3={'addressing_style': S3_ADDRESSING_STYLE})
+        config=boto3.session.Config(s3={'addressing_style': S3_ADDRESSING_STYLE}, max_pool_connections=S3_UPLOAD_WORKERS)
     )
     logging.info(f"S3 client initialized for endpoint: {S3_ENDPOINT_URL}, bucket: {S3_BUCKET_NAME}")
 elif S3_BUCKET_NAME:
-    s3_client = boto3.client('s3')
+    s3_client = boto3.client('s3', config=boto3.session.Config(max_pool_connections=S3_UPLOAD_WORKERS))
     logging.info(f"S3 client initialized for AWS (standard, bucket: {S3_BUCKET_NAME})")
 else:
     logging.warning("S3 client not initialized. Missing S3_BUCKET or other S3 configuration variables. Image uploads will be skipped.")
 
+# pyplot keeps global figure state, so predictors running in parallel threads take turns creating bulletins
+_bulletin_lock = threading.Lock()
+
 # Disease Alert Level Color Mapping
 DISEASE_ALERT_LEVEL_COLORS = {
     'Severe': '#FF0000',          # Red
@@ -47,6 +54,9 @@ DISEASE_ALERT_LEVEL_COLORS = {
     'Missing data': '#D3D3D3'     # Light grey
 }
 
+# NULL marker for COPY ... WITH (FORMAT csv), so that an empty string stays an empty string
+COPY_NULL = r"\N"
+
 # --- Define GeoJSON path ---
 # Standard in-container path (adjust if different for this service)
 CONTAINER_GEOJSON_PATH = Path("/app/config/timorleste.geojson")
@@ -129,9 +139,10 @@ DISEASE_THRESHOLDS_DATA = {
 
 # --- Image Generation and Upload Functions (Adapted for Disease Data) ---
 
-def upload_image_to_s3(image_buffer, s3_key, bucket_name):
+def upload_image_to_s3(image_bytes, s3_key, bucket_name):
     """
-    Uploads an image buffer to S3.
+    Uploads image bytes to S3 under their content-addressed key. An existing
+    object is written again to refresh its LastModified for the orphan sweep.
     Returns the S3 key if successful, None otherwise.
     """
     if not s3_client or not bucket_name:
@@ -141,25 +152,27 @@ def upload_image_to_s3(image_buffer, s3_key, bucket_name):
         return None
 
     try:
-        s3_client.put_object(Bucket=bucket_name, Key=s3_key, Body=image_buffer, ContentType='image/png')
+        s3_client.upload_fileobj(
+            io.BytesIO(image_bytes), bucket_name, s3_key,
+            ExtraArgs={'ContentType': 'image/png'}, Config=TRANSFER_CONFIG
+        )
         logging.info(f"Successfully uploaded {s3_key} to S3 bucket {bucket_name}.")
         return s3_key
     except Exception as e:
         logging.error(f"Error uploading {s3_key} to S3 bucket {bucket_name}: {e}", exc_info=True)
         return None
 
-def generate_disease_map_image(
+def build_disease_map_job(
     disease_type, 
     predicted_cases, 
     alert_level, 
     municipality_name, 
     municipality_code, 
     week_start_str, # YYYY-MM-DD
-    geojson_path,
     all_municipalities_predictions=None # Optional: List of dicts [{municipality_code, alert_level (actual textual level)}]
 ):
     """
-    Generates a choropleth map image for disease forecast.
+    Builds the render_maps job for a choropleth map of a disease forecast.
     Colors municipalities by their alert level for the specific disease.
     Highlights the target municipality.
     Args:
@@ -168,105 +181,90 @@ def generate_disease_map_image(
                                           for all municipalities to be displayed on the map.
                                           If None, only the target municipality will be colored based on its alert_level.
     """
-    if not geojson_path:
-        logging.error("GeoJSON path not provided. Cannot generate map.")
-        return None
-    try:
-        gdf = geopandas.read_file(geojson_path)
-
-        # Create a DataFrame for merging if all_municipalities_predictions is provided
-        if all_municipalities_predictions:
-            import pandas as pd # Import pandas here as it's only used in this block
-            predictions_df = pd.DataFrame(all_municipalities_predictions)
-            # Ensure municipality_code is the correct type for merging if necessary
-            # gdf['ISO'] is typically string, ensure predictions_df['municipality_code'] is also string.
-            predictions_df['municipality_code'] = predictions_df['municipality_code'].astype(str)
-            merged_gdf = gdf.merge(predictions_df, left_on='ISO', right_on='municipality_code', how='left')
-            # Map alert levels to colors, using the text alert_level from predictions_df
-            merged_gdf['color'] = merged_gdf['alert_level'].map(lambda x: DISEASE_ALERT_LEVEL_COLORS.get(x, DISEASE_ALERT_LEVEL_COLORS['Missing data']))
-        else:
-            # If no all_municipalities_predictions, color only the target municipality
-            merged_gdf = gdf.copy()
-            merged_gdf['color'] = DISEASE_ALERT_LEVEL_COLORS['Missing data'] # Default for others
-            if municipality_code in merged_gdf['ISO'].values:
-                merged_gdf.loc[merged_gdf['ISO'] == municipality_code, 'color'] = DISEASE_ALERT_LEVEL_COLORS.get(alert_level, DISEASE_ALERT_LEVEL_COLORS['Missing data'])
-            else:
-                logging.warning(f"Municipality code {municipality_code} not found in GeoJSON for single coloring.")
-
-        fig, ax = plt.subplots(1, 1, figsize=(12, 10))
-        merged_gdf.plot(color=merged_gdf['color'], ax=ax, edgecolor='black', linewidth=0.5)
-        
-        legend_handles = []
-        if disease_type in DISEASE_THRESHOLDS_DATA:
-            rules = DISEASE_THRESHOLDS_DATA[disease_type]["threshold_rules"]
-            # Assumes rules are typically pre-sorted (e.g., Severe to None)
-            for rule in rules:
-                level = rule["alert_level"]
-                color = DISEASE_ALERT_LEVEL_COLORS.get(level)
-
-                if not color:
-                    logging.warning(f"Legend: Color not found for alert level '{level}' in DISEASE_ALERT_LEVEL_COLORS.")
-                    continue
-
-                threshold_text = ""
-                if rule.get("cases_condition") == "< 1" and rule.get("min_cases") == 0:
-                    threshold_text = "0 Case"
-                elif "min_cases" in rule:
-                    threshold_text = f">= {rule['min_cases']} cases"
-                
-                label_text = f"{level} ({threshold_text})" if threshold_text else level
-                legend_handles.append(plt.Rectangle((0,0),1,1, color=color, label=label_text))
-        else:
-            # Fallback if disease_type has no specific rules defined
-            logging.warning(f"Legend: No threshold rules found for disease_type '{disease_type}'. Generating generic legend based on available colors.")
-            for level, color_val in DISEASE_ALERT_LEVEL_COLORS.items():
-                if level != 'Missing data': # 'Missing data' handled separately below
-                     legend_handles.append(plt.Rectangle((0,0),1,1, color=color_val, label=level))
-        
-        # Add 'Missing data' to legend if relevant
-        missing_data_color = DISEASE_ALERT_LEVEL_COLORS.get('Missing data')
-        if missing_data_color and \
-           (merged_gdf['color'].eq(missing_data_color).any() or not all_municipalities_predictions):
-             legend_handles.append(
-                 plt.Rectangle((0,0),1,1, 
-                               color=missing_data_color, 
-                               label='Missing data')
-            )
-
-        ax.legend(handles=legend_handles, title=f"{disease_type} Alert Levels & Thresholds", loc="lower right")
+    missing_data_color = DISEASE_ALERT_LEVEL_COLORS['Missing data']
+    if all_municipalities_predictions:
+        # Map alert levels to colors, using the text alert_level of each prediction
+        colors = {
+            str(prediction['municipality_code']): DISEASE_ALERT_LEVEL_COLORS.get(prediction.get('alert_level'), missing_data_color)
+            for prediction in all_municipalities_predictions
+        }
+    else:
+        # If no all_municipalities_predictions, color only the target municipality
+        colors = {municipality_code: DISEASE_ALERT_LEVEL_COLORS.get(alert_level, missing_data_color)}
+
+    legend = []
+    if disease_type in DISEASE_THRESHOLDS_DATA:
+        rules = DISEASE_THRESHOLDS_DATA[disease_type]["threshold_rules"]
+        # Assumes rules are typically pre-sorted (e.g., Severe to None)
+        for rule in rules:
+            level = rule["alert_level"]
+            color = DISEASE_ALERT_LEVEL_COLORS.get(level)
+
+            if not color:
+                logging.warning(f"Legend: Color not found for alert level '{level}' in DISEASE_ALERT_LEVEL_COLORS.")
+                continue
+
+            threshold_text = ""
+            if rule.get("cases_condition") == "< 1" and rule.get("min_cases") == 0:
+                threshold_text = "0 Case"
+            elif "min_cases" in rule:
+                threshold_text = f">= {rule['min_cases']} cases"
+            
+            label_text = f"{level} ({threshold_text})" if threshold_text else level
+            legend.append((label_text, color))
+    else:
+        # Fallback if disease_type has no specific rules defined
+        logging.warning(f"Legend: No threshold rules found for disease_type '{disease_type}'. Generating generic legend based on available colors.")
+        for level, color_val in DISEASE_ALERT_LEVEL_COLORS.items():
+            if level != 'Missing data': # 'Missing data' is added by the renderer when relevant
+                 legend.append((level, color_val))
 
-        highlight_gdf = merged_gdf[merged_gdf['ISO'] == municipality_code]
-        if not highlight_gdf.empty:
-            highlight_gdf.plot(ax=ax, facecolor='none', edgecolor='blue', linewidth=2.5, linestyle='--')
+    try:
+        parsed_week_start_date = datetime.strptime(week_start_str, '%Y-%m-%d')
+        # Assuming a week, so we can format a week period string
+        week_end_dt = parsed_week_start_date + timedelta(days=6)
+        if parsed_week_start_date.year != week_end_dt.year:
+            formatted_week_period = f"{parsed_week_start_date.strftime('%d %B, %Y')} - {week_end_dt.strftime('%d %B, %Y')}"
+        elif parsed_week_start_date.month != week_end_dt.month:
+            formatted_week_period = f"{parsed_week_start_date.strftime('%d %B')} - {week_end_dt.strftime('%d %B, %Y')}"
         else:
-            logging.warning(f"Municipality code {municipality_code} not found in GeoJSON for highlighting.")
+            formatted_week_period = f"{parsed_week_start_date.strftime('%d')} - {week_end_dt.strftime('%d %B, %Y')}"
+    except ValueError:
+        formatted_week_period = f"Week starting {week_start_str}" # Fallback
+        logging.warning(f"Could not parse week_start_str {week_start_str} for title formatting.")
 
-        try:
-            parsed_week_start_date = datetime.strptime(week_start_str, '%Y-%m-%d')
-            # Assuming a week, so we can format a week period string
-            week_end_dt = parsed_week_start_date + timedelta(days=6)
-            if parsed_week_start_date.year != week_end_dt.year:
-                formatted_week_period = f"{parsed_week_start_date.strftime('%d %B, %Y')} - {week_end_dt.strftime('%d %B, %Y')}"
-            elif parsed_week_start_date.month != week_end_dt.month:
-                formatted_week_period = f"{parsed_week_start_date.strftime('%d %B')} - {week_end_dt.strftime('%d %B, %Y')}"
-            else:
-                formatted_week_period = f"{parsed_week_start_date.strftime('%d')} - {week_end_dt.strftime('%d %B, %Y')}"
-        except ValueError:
-            formatted_week_period = f"Week starting {week_start_str}" # Fallback
-            logging.warning(f"Could not parse week_start_str {week_start_str} for title formatting.")
-
-        ax.set_title(f'{disease_type} Forecast for Timor-Leste - Week of {formatted_week_period}\n{alert_level} Alert in {municipality_name} (Cases: {predicted_cases})', fontsize=15)
-        ax.set_axis_off()
-        plt.tight_layout()
+    return {
+        'colors': colors,
+        'highlight_code': municipality_code,
+        'legend': legend,
+        'legend_title': f"{disease_type} Alert Levels & Thresholds",
+        'title': f'{disease_type} Forecast for Timor-Leste - Week of {formatted_week_period}\n{alert_level} Alert in {municipality_name} (Cases: {predicted_cases})'
+    }
 
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=100)
-        plt.close(fig)
-        img_buffer.seek(0)
-        return img_buffer
-    except Exception as e:
-        logging.error(f"Error generating disease map image for {disease_type} in {municipality_name}: {e}", exc_info=True)
-        return None
+def generate_disease_map_images(list_of_alerts, all_predictions_for_map=None):
+    """
+    Renders the disease map for every alert in one batch.
+    Returns a dict of alert position in list_of_alerts to PNG bytes for the maps that rendered.
+    """
+    alert_indexes, jobs = [], []
+    for index, alert_data in enumerate(list_of_alerts):
+        if not alert_data:
+            continue
+        disease_type = alert_data["disease_type"]
+        # Prepare data for map: list of all predictions for THIS disease type
+        all_preds_for_map_type = []
+        if all_predictions_for_map and disease_type in all_predictions_for_map:
+            all_preds_for_map_type = all_predictions_for_map[disease_type]
+        alert_indexes.append(index)
+        jobs.append(build_disease_map_job(
+            disease_type, alert_data["predicted_cases"], alert_data["alert_level"],
+            alert_data["municipality_name"], alert_data["municipality_code"], alert_data["week_start"],
+            all_municipalities_predictions=all_preds_for_map_type
+        ))
+
+    logging.info(f"Rendering {len(jobs)} disease map images...")
+    images = render_maps(GEOJSON_FILE_PATH, DISEASE_ALERT_LEVEL_COLORS['Missing data'], jobs)
+    return {index: image for index, image in zip(alert_indexes, images) if image}
 
 def generate_disease_table_image(
     disease_type, 
@@ -410,7 +408,9 @@ def generate_disease_alert(
 
 def create_and_ingest_disease_forecast_alerts(list_of_alerts, db_params):
     """
-    Creates the disease_forecast_alerts table (dropping if exists) and ingests alert data.
+    Creates the disease_forecast_alerts table if needed and replaces the alerts for the
+    incoming keys in a single transaction: the batch is COPYed into a temp table, then
+    deleted and inserted with set-based statements.
     Returns a mapping of alert data to their database IDs for linking to bulletins.
     
     Returns:
@@ -423,9 +423,9 @@ def create_and_ingest_disease_forecast_alerts(list_of_alerts, db_params):
         return {}
 
     alerts_to_insert = []
-    alert_mapping = {}  # Will store (alert_data_dict, insert_index) for later ID mapping
+    alert_keys = set()  # (municipality_code, week_start, disease_type, municipality_name)
     
-    for i, alert_data in enumerate(list_of_alerts):
+    for alert_data in list_of_alerts:
         if not alert_data: # Skip if generate_disease_alert returned None
             continue
 
@@ -445,14 +445,14 @@ def create_and_ingest_disease_forecast_alerts(list_of_alerts, db_params):
         
         alerts_to_insert.append(alert_tuple)
         
-        # Create key for mapping back to alert_data
+        # Key for mapping inserted IDs back to the alert, as used by create_and_ingest_bulletins
         alert_key = (
             alert_data["municipality_code"],
             alert_data["week_start"],
             alert_data["disease_type"],
             alert_data["municipality_name"]
         )
-        alert_mapping[alert_key] = {"alert_data": alert_data, "insert_index": len(alerts_to_insert) - 1}
+        alert_keys.add(alert_key)
     
     if not alerts_to_insert:
         print("No valid alert data to insert into disease_forecast_alerts table.")
@@ -463,6 +463,7 @@ def create_and_ingest_disease_forecast_alerts(list_of_alerts, db_params):
     
     try:
         conn = psycopg2.connect(**db_params)
+        # Everything below runs in one transaction, committed at the end
         with conn.cursor() as cur:
             # 1. Create table only if it doesn't exist
             create_table_sql = """
@@ -483,99 +484,80 @@ def create_and_ingest_disease_forecast_alerts(list_of_alerts, db_params):
             cur.execute(create_table_sql)
             print("Checked/Created table disease_forecast_alerts.")
 
-            # 2. Delete existing records for the specific alerts being inserted
-            # First delete associated bulletins, then delete the alerts
-            keys_to_delete = set()
+            # 2. Stage the whole batch in a temp table with a single COPY
+            cur.execute("""
+            CREATE TEMP TABLE incoming_disease_alerts (
+                municipality_code TEXT,
+                forecast_date DATE,
+                disease_type TEXT,
+                alert_level TEXT,
+                alert_title TEXT,
+                alert_message TEXT,
+                predicted_cases INTEGER,
+                municipality_name TEXT
+            ) ON COMMIT DROP;
+            """)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
             for alert_tuple in alerts_to_insert:
-                key = (alert_tuple[0], alert_tuple[1], alert_tuple[2])
-                keys_to_delete.add(key)
-            
-            delete_count = 0
-            bulletin_delete_count = 0
-            attachment_delete_count = 0
-            if keys_to_delete:
-                # First delete bulletin_image_attachments that reference bulletins we're about to delete
-                delete_attachments_sql_base = """
-                DELETE FROM bulletin_image_attachments 
-                WHERE bulletin_id IN (
-                    SELECT b.id FROM bulletins b
-                    WHERE b.disease_forecast_alert_id IN (
-                        SELECT id FROM disease_forecast_alerts 
-                        WHERE municipality_code = %s AND forecast_date = %s AND disease_type = %s
-                    )
-                );
-                """
-                delete_attachments_sql_null_code = """
-                DELETE FROM bulletin_image_attachments 
-                WHERE bulletin_id IN (
-                    SELECT b.id FROM bulletins b
-                    WHERE b.disease_forecast_alert_id IN (
-                        SELECT id FROM disease_forecast_alerts 
-                        WHERE municipality_code IS NULL AND forecast_date = %s AND disease_type = %s
-                    )
-                );
-                """
-                
-                # Then delete bulletins that reference the alerts we're about to delete
-                delete_bulletins_sql_base = """
-                DELETE FROM bulletins 
-                WHERE disease_forecast_alert_id IN (
-                    SELECT id FROM disease_forecast_alerts 
-                    WHERE municipality_code = %s AND forecast_date = %s AND disease_type = %s
-                );
-                """
-                delete_bulletins_sql_null_code = """
-                DELETE FROM bulletins 
-                WHERE disease_forecast_alert_id IN (
-                    SELECT id FROM disease_forecast_alerts 
-                    WHERE municipality_code IS NULL AND forecast_date = %s AND disease_type = %s
-                );
-                """
-                
-                # Then delete the alerts
-                delete_sql_base = "DELETE FROM disease_forecast_alerts WHERE municipality_code = %s AND forecast_date = %s AND disease_type = %s;"
-                delete_sql_null_code = "DELETE FROM disease_forecast_alerts WHERE municipality_code IS NULL AND forecast_date = %s AND disease_type = %s;"
-                
-                for muni_code, f_date, d_type in keys_to_delete:
-                    if muni_code is None:
-                        # Delete attachments first
-                        cur.execute(delete_attachments_sql_null_code, (f_date, d_type))
-                        attachment_delete_count += cur.rowcount
-                        # Then delete bulletins
-                        cur.execute(delete_bulletins_sql_null_code, (f_date, d_type))
-                        bulletin_delete_count += cur.rowcount
-                        # Finally delete alerts
-                        cur.execute(delete_sql_null_code, (f_date, d_type))
-                    else:
-                        # Delete attachments first
-                        cur.execute(delete_attachments_sql_base, (muni_code, f_date, d_type))
-                        attachment_delete_count += cur.rowcount
-                        # Then delete bulletins
-                        cur.execute(delete_bulletins_sql_base, (muni_code, f_date, d_type))
-                        bulletin_delete_count += cur.rowcount
-                        # Finally delete alerts
-                        cur.execute(delete_sql_base, (muni_code, f_date, d_type))
-                    delete_count += cur.rowcount
-                print(f"Deleted {attachment_delete_count} image attachments, {bulletin_delete_count} bulletins, and {delete_count} alert records before insertion.")
-
-            # 3. Insert the new data and get the IDs
-            insert_sql = """
+                writer.writerow([COPY_NULL if value is None else value for value in alert_tuple])
+            buffer.seek(0)
+            cur.copy_expert(
+                f"COPY incoming_disease_alerts FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer,
+            )
+
+            # 3. Delete existing alerts for the incoming (municipality_code, forecast_date,
+            # disease_type) keys, with the bulletins and image attachments that reference them.
+            # IS NOT DISTINCT FROM matches alerts with a NULL municipality_code.
+            cur.execute("""
+            CREATE TEMP TABLE replaced_disease_alerts ON COMMIT DROP AS
+            SELECT a.id
+            FROM disease_forecast_alerts a
+            JOIN (
+                SELECT DISTINCT municipality_code, forecast_date, disease_type
+                FROM incoming_disease_alerts
+            ) i
+              ON a.municipality_code IS NOT DISTINCT FROM i.municipality_code
+             AND a.forecast_date = i.forecast_date
+             AND a.disease_type = i.disease_type;
+            """)
+            cur.execute("""
+            DELETE FROM bulletin_image_attachments
+            WHERE bulletin_id IN (
+                SELECT b.id FROM bulletins b
+                WHERE b.disease_forecast_alert_id IN (SELECT id FROM replaced_disease_alerts)
+            );
+            """)
+            attachment_delete_count = cur.rowcount
+            cur.execute("""
+            DELETE FROM bulletins
+            WHERE disease_forecast_alert_id IN (SELECT id FROM replaced_disease_alerts);
+            """)
+            bulletin_delete_count = cur.rowcount
+            cur.execute("""
+            DELETE FROM disease_forecast_alerts
+            WHERE id IN (SELECT id FROM replaced_disease_alerts);
+            """)
+            delete_count = cur.rowcount
+            print(f"Deleted {attachment_delete_count} image attachments, {bulletin_delete_count} bulletins, and {delete_count} alert records before insertion.")
+
+            # 4. Insert the new data and get the IDs
+            cur.execute("""
             INSERT INTO disease_forecast_alerts (
                 municipality_code, forecast_date, disease_type, alert_level, 
                 alert_title, alert_message, predicted_cases, municipality_name
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
-            """
-            
-            # Insert one by one to get IDs
-            for i, alert_tuple in enumerate(alerts_to_insert):
-                cur.execute(insert_sql, alert_tuple)
-                alert_id = cur.fetchone()[0]
-                
-                # Find the corresponding alert_key for this insert
-                for alert_key, mapping_data in alert_mapping.items():
-                    if mapping_data["insert_index"] == i:
-                        alert_id_mapping[alert_key] = alert_id
-                        break
+            )
+            SELECT
+                municipality_code, forecast_date, disease_type, alert_level,
+                alert_title, alert_message, predicted_cases, municipality_name
+            FROM incoming_disease_alerts
+            RETURNING id, municipality_code, forecast_date, disease_type, municipality_name;
+            """)
+            for alert_id, muni_code, f_date, d_type, muni_name in cur.fetchall():
+                alert_key = (muni_code, f_date.isoformat(), d_type, muni_name)
+                if alert_key in alert_keys:
+                    alert_id_mapping[alert_key] = alert_id
             
             conn.commit()
             print(f"Successfully inserted {len(alerts_to_insert)} rows into disease_forecast_alerts.")
@@ -602,6 +584,11 @@ def create_and_ingest_disease_forecast_alerts(list_of_alerts, db_params):
             conn.close()
 
 def create_and_ingest_bulletins(list_of_alerts, db_params, disease_threshold_data=DISEASE_THRESHOLDS_DATA, all_predictions_for_map=None, alert_id_mapping=None):
+    """See _create_and_ingest_bulletins, serialized across threads."""
+    with _bulletin_lock:
+        return _create_and_ingest_bulletins(list_of_alerts, db_params, disease_threshold_data, all_predictions_for_map, alert_id_mapping)
+
+def _create_and_ingest_bulletins(list_of_alerts, db_params, disease_threshold_data=DISEASE_THRESHOLDS_DATA, all_predictions_for_map=None, alert_id_mapping=None):
     """
     Creates bulletins from alerts, generates images, uploads them, and ingests all into the PostgreSQL database.
 
@@ -623,7 +610,7 @@ def create_and_ingest_bulletins(list_of_alerts, db_params, disease_threshold_dat
     try:
         conn = psycopg2.connect(**db_params)
         conn.autocommit = False # Use a transaction
-        with conn.cursor() as cur:
+        with conn.cursor() as cur, ImageUploadPool(upload_image_to_s3, S3_BUCKET_NAME) as upload_pool:
             # Ensure bulletin_image_attachments table exists
             cur.execute("""
             CREATE TABLE IF NOT EXISTS bulletin_image_attachments (
@@ -649,8 +636,16 @@ def create_and_ingest_bulletins(list_of_alerts, db_params, disease_threshold_dat
             ) VALUES (%s, %s, %s, %s, %s);
             """
 
+            # Render every map for the run up front, in parallel, instead of one figure per bulletin
+            map_images = {}
+            if S3_BUCKET_NAME and GEOJSON_FILE_PATH:
+                map_images = generate_disease_map_images(list_of_alerts, all_predictions_for_map)
+
+            # Attachments are inserted once their uploads finish: (bulletin_id, key future, caption, timestamp)
+            pending_attachments = []
+
             bulletins_created_count = 0
-            for alert_data in list_of_alerts:
+            for alert_index, alert_data in enumerate(list_of_alerts):
                 if not alert_data:
                     continue
 
@@ -722,32 +717,21 @@ def create_and_ingest_bulletins(list_of_alerts, db_params, disease_threshold_dat
                 except Exception as e:
                     logging.error(f"Error inserting bulletin for {disease_type} in {municipality_name}: {e}", exc_info=True)
                     conn.rollback() # Rollback this specific bulletin insertion attempt
+                    pending_attachments = [] # The rollback also discarded the bulletins they belong to
                     continue # Skip to next alert
 
                 if bulletin_id and S3_BUCKET_NAME and GEOJSON_FILE_PATH:
-                    bulletin_s3_image_keys = []
-                    map_image_buffer = None
                     table_image_buffer = None
-                    
-                    # Prepare data for map: list of all predictions for THIS disease type
-                    all_preds_for_map_type = []
-                    if all_predictions_for_map and disease_type in all_predictions_for_map:
-                        all_preds_for_map_type = all_predictions_for_map[disease_type]
-
-                    # 1. Disease Map Image
-                    map_image_buffer = generate_disease_map_image(
-                        disease_type, predicted_cases, alert_level, 
-                        municipality_name, municipality_code, week_start_for_alert, 
-                        GEOJSON_FILE_PATH, all_municipalities_predictions=all_preds_for_map_type
-                    )
-                    if map_image_buffer:
-                        map_s3_key = f"bulletin_charts/disease_map_{week_start_for_alert}_{disease_type.replace(' ', '_')}_{municipality_code}_{current_time.strftime('%Y%m%d%H%M%S%f')}.png"
-                        uploaded_map_key = upload_image_to_s3(map_image_buffer, map_s3_key, S3_BUCKET_NAME)
-                        if uploaded_map_key:
-                            bulletin_s3_image_keys.append({
-                                "key": uploaded_map_key,
-                                "caption": f"{disease_type} forecast map for {municipality_name}, week of {week_period_str}"
-                            })
+
+                    # 1. Disease Map Image, rendered above
+                    if alert_index in map_images:
+                        map_image_buffer = io.BytesIO(map_images[alert_index])
+                        pending_attachments.append((
+                            bulletin_id,
+                            upload_pool.submit(map_image_buffer, "bulletin_charts"),
+                            f"{disease_type} forecast map for {municipality_name}, week of {week_period_str}",
+                            current_time
+                        ))
                     
                     # 2. Disease Table Image
                     table_image_buffer = generate_disease_table_image(
@@ -755,30 +739,31 @@ def create_and_ingest_bulletins(list_of_alerts, db_params, disease_threshold_dat
                         # Add historical/next_week data here if available and function is extended
                     )
                     if table_image_buffer:
-                        table_s3_key = f"bulletin_charts/disease_table_{week_start_for_alert}_{disease_type.replace(' ', '_')}_{municipality_code}_{current_time.strftime('%Y%m%d%H%M%S%f')}.png"
-                        uploaded_table_key = upload_image_to_s3(table_image_buffer, table_s3_key, S3_BUCKET_NAME)
-                        if uploaded_table_key:
-                            bulletin_s3_image_keys.append({
-                                "key": uploaded_table_key,
-                                "caption": f"{disease_type} case forecast table for {municipality_name}, week of {week_period_str}"
-                            })
-
-                    # Insert image attachments
-                    if bulletin_s3_image_keys:
-                        for img_data in bulletin_s3_image_keys:
-                            try:
-                                cur.execute(attachment_insert_sql, (
-                                    bulletin_id, img_data["key"], img_data["caption"], current_time, current_time
-                                ))
-                                logging.info(f"  Attached image {img_data['key']} to bulletin {bulletin_id}")
-                            except Exception as e:
-                                logging.error(f"Error attaching image {img_data['key']} to bulletin {bulletin_id}: {e}", exc_info=True)
+                        pending_attachments.append((
+                            bulletin_id,
+                            upload_pool.submit(table_image_buffer, "bulletin_charts"),
+                            f"{disease_type} case forecast table for {municipality_name}, week of {week_period_str}",
+                            current_time
+                        ))
                     
                 elif not S3_BUCKET_NAME:
                     logging.warning(f"S3_BUCKET_NAME not set. Skipping image generation/upload for bulletin ID {bulletin_id}.")
                 elif not GEOJSON_FILE_PATH:
                     logging.warning(f"GEOJSON_FILE_PATH not set. Skipping map image generation for bulletin ID {bulletin_id}.")
             
+            # Insert image attachments once their uploads have finished
+            for bulletin_id, key_future, caption, created_time in pending_attachments:
+                uploaded_key = key_future.result()
+                if not uploaded_key:
+                    continue
+                try:
+                    cur.execute(attachment_insert_sql, (
+                        bulletin_id, uploaded_key, caption, created_time, created_time
+                    ))
+                    logging.info(f"  Attached image {uploaded_key} to bulletin {bulletin_id}")
+                except Exception as e:
+                    logging.error(f"Error attaching image {uploaded_key} to bulletin {bulletin_id}: {e}", exc_info=True)
+
             if bulletins_created_count > 0:
                 conn.commit()
                 logging.info(f"Successfully processed and inserted {bulletins_created_count} disease bulletins and their attachments.")
@@ -805,9 +790,13 @@ def record_disease_pipeline_run(
     details: str = "",
     municipalities_processed_count: int = 0,
     alerts_generated_count: int = 0,
-    bulletins_created_count: int = 0
+    bulletins_created_count: int = 0,
+    stage_metrics: list = None
 ):
-    """Records the outcome of a disease prediction pipeline run into the database."""
+    """
+    Records the outcome of a disease prediction pipeline run into the database.
+    stage_metrics is an optional list of per-stage status, duration and row counts, stored as JSON.
+    """
     conn = None
     try:
         conn = psycopg2.connect(**db_params)
@@ -832,27 +821,49 @@ def record_disease_pipeline_run(
                     details TEXT,
                     municipalities_processed_count INTEGER DEFAULT 0,
                     alerts_generated_count INTEGER DEFAULT 0,
-                    bulletins_created_count INTEGER DEFAULT 0
+                    bulletins_created_count INTEGER DEFAULT 0,
+                    stage_metrics TEXT
                 );
                 """)
                 conn.commit()
                 logging.info("Table disease_pipeline_run_history created successfully.")
+                has_stage_metrics = True
+            else:
+                # The stage_metrics column is added by Superset migration 9b4e6d2f1a73
+                cur.execute("""
+                SELECT EXISTS (
+                   SELECT FROM information_schema.columns
+                   WHERE table_name = 'disease_pipeline_run_history' AND column_name = 'stage_metrics'
+                );
+                """)
+                has_stage_metrics = cur.fetchone()[0]
+                if not has_stage_metrics:
+                    logging.warning(
+                        "disease_pipeline_run_history has no stage_metrics column, run `superset db upgrade`. "
+                        "Recording the run without stage metrics."
+                    )
             
             # Insert the run history record
-            sql = """
-            INSERT INTO disease_pipeline_run_history (
-                pipeline_name, status, details, 
-                municipalities_processed_count, alerts_generated_count, bulletins_created_count
-            ) VALUES (%s, %s, %s, %s, %s, %s);
-            """
-            cur.execute(sql, (
+            columns = [
+                "pipeline_name", "status", "details",
+                "municipalities_processed_count", "alerts_generated_count", "bulletins_created_count",
+            ]
+            values = [
                 pipeline_name,
                 status,
                 details,
                 municipalities_processed_count,
                 alerts_generated_count,
-                bulletins_created_count
-            ))
+                bulletins_created_count,
+            ]
+            if has_stage_metrics:
+                columns.append("stage_metrics")
+                values.append(json.dumps(stage_metrics) if stage_metrics is not None else None)
+            sql = f"""
+            INSERT INTO disease_pipeline_run_history ({', '.join(columns)})
+            VALUES ({', '.join(['%s'] * len(columns))});
+            """
+            cur.execute(sql, values)
             conn.commit()
             logging.info(f"Successfully recorded disease pipeline run: {pipeline_name} - {status}")
 
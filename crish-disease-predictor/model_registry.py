@@ -0,0 +1,124 @@
+"""
+Process wide registry of the per-municipality disease models.
+
+Models are deserialized on first use rather than at startup and kept in an
+LRU-bounded cache, so a long-lived prediction worker pays joblib.load once per
+model instead of once per run. Cache entries are keyed by
+(disease, municipality, model version, file mtime): retraining a model, or
+pointing a disease at another model version, loads the new file on the next
+lookup without restarting the worker.
+"""
+import logging
+import os
+from collections import OrderedDict
+from threading import Lock
+
+import joblib
+
+# Models kept in memory, enough for every municipality of the three diseases
+MODEL_CACHE_SIZE = int(os.getenv('MODEL_CACHE_SIZE', '64'))
+
+
+class ModelRegistry:
+    """Lazy, LRU-bounded cache of joblib models."""
+
+    def __init__(self, max_models=MODEL_CACHE_SIZE):
+        self.max_models = max_models
+        self.models_dirs = {}
+        self.cache = OrderedDict()
+        self.lock = Lock()
+        self.loads = 0
+
+    def register(self, disease, models_dir):
+        """Serve a disease's models from models_dir, named {municipality}_{disease}.joblib."""
+        with self.lock:
+            self.models_dirs[disease] = models_dir
+
+    def model_path(self, disease, municipality):
+        return os.path.join(self.models_dirs[disease], f'{municipality}_{disease}.joblib')
+
+    def model_version(self, disease):
+        """Version of a disease's models: the directory they are served from."""
+        return os.path.normpath(self.models_dirs[disease])
+
+    def has_model(self, disease, municipality):
+        return os.path.exists(self.model_path(disease, municipality))
+
+    def get(self, disease, municipality):
+        """Return the model for a municipality, loading it on a cache miss. None if there is no model."""
+        model_path = self.model_path(disease, municipality)
+        try:
+            mtime = os.path.getmtime(model_path)
+        except OSError:
+            return None
+        key = (disease, municipality, self.model_version(disease), mtime)
+
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        # Deserialize outside the lock so predictors running in parallel do not wait on each other
+        model = joblib.load(model_path)
+        logging.info(f"Loaded {disease} model for {municipality} from {model_path}")
+
+        with self.lock:
+            self.loads += 1
+            # Drop entries for older files of the same model
+            for stale_key in [k for k in self.cache if k[:2] == key[:2] and k != key]:
+                del self.cache[stale_key]
+            self.cache[key] = model
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_models:
+                evicted_key, _ = self.cache.popitem(last=False)
+                logging.info(f"Evicted {evicted_key[0]} model for {evicted_key[1]} from the model cache")
+            return model
+
+    def stats(self):
+        with self.lock:
+            return {'cached': len(self.cache), 'max_models': self.max_models, 'loads': self.loads}
+
+
+class RegisteredModels:
+    """
+    Read-only mapping of municipality to model for one disease, backed by the
+    registry. Predictors use it where they used to hold a dict of loaded models.
+    """
+
+    def __init__(self, registry, disease, municipalities):
+        self.registry = registry
+        self.disease = disease
+        self.municipalities = list(municipalities)
+
+    def __contains__(self, municipality):
+        return municipality in self.municipalities
+
+    def __getitem__(self, municipality):
+        if municipality not in self.municipalities:
+            raise KeyError(municipality)
+        model = self.registry.get(self.disease, municipality)
+        if model is None:
+            raise KeyError(municipality)
+        return model
+
+    def __iter__(self):
+        return iter(self.municipalities)
+
+    def __len__(self):
+        return len(self.municipalities)
+
+    def keys(self):
+        return list(self.municipalities)
+
+
+_registry = None
+_registry_lock = Lock()
+
+
+def get_registry():
+    """The registry shared by every predictor in this process."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
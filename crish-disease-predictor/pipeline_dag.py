@@ -0,0 +1,180 @@
+"""
+Small in-process DAG runner for the disease prediction pipeline.
+
+Stages run on a thread pool as soon as the stages they depend on have
+succeeded, receiving their outputs in memory. Every stage reports its status,
+duration and row count. A stage with a fingerprint is skipped when its inputs
+hash to the same value as in the last successful run and its previous output
+can still be loaded; fingerprints are kept in a small JSON state file.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+# Stage statuses recorded in the run metrics
+SUCCESS = 'Success'
+FAILED = 'Failed'
+SKIPPED = 'Skipped'  # Inputs unchanged since the last successful run
+BLOCKED = 'Blocked'  # A stage it depends on did not succeed
+
+
+def fingerprint(*parts):
+    """Stable hash of JSON serializable parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class Stage:
+    """
+    A pipeline stage.
+
+    Args:
+        name: Unique stage name.
+        run: Called with a dict of dependency name to output, returns (output, rows).
+            Raising, or returning None as output, fails the stage.
+        depends_on: Names of the stages whose outputs this stage needs.
+        fingerprint: Optional function of the inputs dict returning a hash of everything
+            the stage output depends on.
+        load_cached: Optional function of the inputs dict returning (output, rows) of the
+            last successful run, or None when it is no longer available.
+    """
+
+    def __init__(self, name, run, depends_on=(), fingerprint=None, load_cached=None):
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.fingerprint = fingerprint
+        self.load_cached = load_cached
+
+
+class PipelineDAG:
+    def __init__(self, stages, state_file=None, max_workers=None, skip_unchanged=True):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = [name for name in stage.depends_on if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {unknown}")
+        self.state_file = state_file
+        self.max_workers = max_workers or len(stages)
+        self.skip_unchanged = skip_unchanged
+        self.logger = logging.getLogger(__name__)
+
+    def load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable pipeline state {self.state_file}: {e}")
+            return {}
+
+    def save_state(self, state):
+        if not self.state_file:
+            return
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def _run_stage(self, stage, inputs, previous_fingerprint):
+        """Run or skip one stage, returning (status, output, rows, stage fingerprint)."""
+        stage_fingerprint = stage.fingerprint(inputs) if stage.fingerprint else None
+        if (self.skip_unchanged and stage_fingerprint is not None
+                and stage_fingerprint == previous_fingerprint and stage.load_cached):
+            cached = stage.load_cached(inputs)
+            if cached is not None:
+                output, rows = cached
+                return SKIPPED, output, rows, stage_fingerprint
+
+        output, rows = stage.run(inputs)
+        if output is None:
+            raise RuntimeError(f"Stage {stage.name} produced no output")
+        return SUCCESS, output, rows, stage_fingerprint
+
+    def run(self):
+        """
+        Run all stages. Returns (success, outputs, metrics) where metrics is a list of
+        {stage, status, started_at, seconds, rows, error} in the order stages finished.
+        """
+        state = self.load_state()
+        outputs = {}
+        statuses = {}
+        metrics = []
+        running = {}
+
+        def ready(stage):
+            return all(statuses.get(name) in (SUCCESS, SKIPPED) for name in stage.depends_on)
+
+        def blocked(stage):
+            return any(statuses.get(name) in (FAILED, BLOCKED) for name in stage.depends_on)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline-stage') as executor:
+            while len(statuses) < len(self.stages):
+                scheduled = True
+                while scheduled:
+                    # Repeat so blocked stages also block the stages depending on them
+                    scheduled = False
+                    for stage in self.stages.values():
+                        if stage.name in statuses or stage.name in running.values():
+                            continue
+                        if blocked(stage):
+                            statuses[stage.name] = BLOCKED
+                            metrics.append({'stage': stage.name, 'status': BLOCKED, 'started_at': None,
+                                            'seconds': 0.0, 'rows': 0, 'error': None})
+                            self.logger.warning(f"Stage {stage.name} blocked by a failed dependency")
+                            scheduled = True
+                        elif ready(stage):
+                            inputs = {name: outputs[name] for name in stage.depends_on}
+                            self.logger.info(f"Starting stage {stage.name}")
+                            future = executor.submit(self._timed, stage, inputs, state.get(stage.name))
+                            running[future] = stage.name
+                            scheduled = True
+                if not running:
+                    if len(statuses) < len(self.stages):
+                        raise ValueError(f"Dependency cycle between stages: {sorted(set(self.stages) - set(statuses))}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    status, output, rows, stage_fingerprint, metric = future.result()
+                    statuses[name] = status
+                    metrics.append(metric)
+                    if status in (SUCCESS, SKIPPED):
+                        outputs[name] = output
+                        if stage_fingerprint is not None:
+                            state[name] = stage_fingerprint
+                    else:
+                        state.pop(name, None)
+                    self.logger.info(f"Stage {name}: {status} in {metric['seconds']:.2f}s ({metric['rows']} rows)")
+
+        self.save_state(state)
+        success = all(status in (SUCCESS, SKIPPED) for status in statuses.values())
+        return success, outputs, metrics
+
+    def _timed(self, stage, inputs, previous_fingerprint):
+        started_at = datetime.now()
+        start = time.perf_counter()
+        try:
+            status, output, rows, stage_fingerprint = self._run_stage(stage, inputs, previous_fingerprint)
+            error = None
+        except Exception as e:
+            self.logger.error(f"Stage {stage.name} failed: {e}", exc_info=True)
+            status, output, rows, stage_fingerprint, error = FAILED, None, 0, None, str(e)
+        metric = {
+            'stage': stage.name,
+            'status': status,
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - start, 3),
+            'rows': int(rows or 0),
+            'error': error,
+        }
+        return status, output, rows, stage_fingerprint, metric
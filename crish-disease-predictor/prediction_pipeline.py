@@ -5,9 +5,10 @@ from dotenv import load_dotenv
 import schedule
 import time
 from datetime import datetime
-import subprocess
 import logging
 
+from prediction_worker import PredictionWorker
+
 # Load environment variables
 load_dotenv()
 
@@ -27,42 +28,23 @@ class PredictionPipeline:
         self.frequency = os.getenv('DISEASE_PREDICTION_PIPELINE_FREQUENCY', 'weekly')
         self.run_time = os.getenv('DISEASE_PREDICTION_PIPELINE_RUN_TIME', '01:00')
         self.run_immediate = os.getenv('DISEASE_PREDICTION_PIPELINE_RUN_IMMEDIATE', 'false').lower() == 'true'
-        self.scripts = [
-            'visual_crossing_puller.py',
-            'dengue_predictor.py',
-            'diarrhea_predictor.py',
-            'ispa_predictor.py',
-            'upload_predictions.py'
-        ]
-
-    def run_script(self, script_name):
-        """Run a Python script and log its output."""
-        try:
-            self.logger.info(f"Running {script_name}")
-            result = subprocess.run(
-                ['python3', script_name],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            self.logger.info(f"{script_name} output:\n{result.stdout}")
-            if result.stderr:
-                self.logger.warning(f"{script_name} warnings:\n{result.stderr}")
-            return True
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Error running {script_name}:\n{e.stderr}")
-            return False
+        # The pipeline stages run in this process, passing data in memory and
+        # keeping the predictor models cached between runs
+        self.worker = PredictionWorker()
 
     def run_pipeline(self):
         """Run the complete prediction pipeline."""
         self.logger.info("Starting disease prediction pipeline (current week + next week forecasts)")
         start_time = time.time()
 
-        for script in self.scripts:
-            if not self.run_script(script):
-                self.logger.error(f"Pipeline failed at {script}")
-                return False
-            time.sleep(1)  # Small delay between scripts
+        try:
+            success = self.worker.run()
+        except Exception as e:
+            self.logger.error(f"Error running disease prediction pipeline: {str(e)}", exc_info=True)
+            return False
+        if not success:
+            self.logger.error("Pipeline failed, see the stage results above")
+            return False
 
         end_time = time.time()
         duration = end_time - start_time
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Long-lived prediction worker running the disease prediction pipeline in one
+process, as a DAG of stages:
+
+    weather -> dengue, diarrhea, ISPA (in parallel) -> upload
+
+Stage outputs are passed in memory. The predictors borrow their connections
+from one pool and get their models from the process wide model registry, so a
+model is only deserialized again once its file changes or it was evicted from
+the cache. Predictor and upload stages whose inputs did not change since the
+last successful run are skipped, and every stage's status, duration and row
+count is recorded in disease_pipeline_run_history.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from psycopg2.pool import ThreadedConnectionPool
+
+import dengue_predictor
+import diarrhea_predictor
+import ispa_predictor
+import upload_predictions
+import visual_crossing_puller
+from disease_alert_generator import record_disease_pipeline_run
+from model_registry import get_registry
+from pipeline_dag import PipelineDAG, Stage, fingerprint
+
+load_dotenv()
+
+PIPELINE_NAME = "Disease Prediction Pipeline"
+
+# Disease predictors run by the worker: (disease, predictor main, predictions file prefix, models dir)
+PREDICTORS = [
+    ('Dengue', dengue_predictor.main, 'dengue', os.getenv('DENGUE_MODELS_DIR', 'new_models/Dengue')),
+    ('Diarrhea', diarrhea_predictor.main, 'diarrhea', os.getenv('DIARRHEA_MODELS_DIR', 'new_models/Diarrhea')),
+    ('ISPA', ispa_predictor.main, 'ISPA', os.getenv('ISPA_MODELS_DIR', 'new_models/ISPA')),
+]
+
+# Skip predictor and upload stages whose inputs did not change since the last successful run
+PIPELINE_SKIP_UNCHANGED = os.getenv('PIPELINE_SKIP_UNCHANGED', 'true').lower() == 'true'
+
+
+def models_fingerprint(models_dir):
+    """Names and modification times of a disease's model files."""
+    if not os.path.isdir(models_dir):
+        return []
+    return sorted(
+        (name, os.path.getmtime(os.path.join(models_dir, name)))
+        for name in os.listdir(models_dir) if name.endswith('.joblib')
+    )
+
+
+class PredictionWorker:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.registry = get_registry()
+        self.predictions_dir = os.getenv('PREDICTIONS_DIR', 'predictions')
+        self.db_params = {
+            'dbname': os.getenv('DATABASE_DB'),
+            'user': os.getenv('DATABASE_USER'),
+            'password': os.getenv('DATABASE_PASSWORD'),
+            'host': os.getenv('DATABASE_HOST'),
+            'port': os.getenv('DATABASE_PORT', '5432')
+        }
+
+    def predictions_file(self, file_prefix, date_suffix):
+        return f"{self.predictions_dir}/{file_prefix}_predictions_{date_suffix}.json"
+
+    def build_stages(self, date_suffix, db_pool):
+        """Stages of one pipeline run for the run date (YYYYMMDD)."""
+
+        def run_weather(inputs):
+            weather = visual_crossing_puller.main()
+            if not weather or not weather[0]:
+                return None, 0
+            weekly_data, forecast_data = weather
+            return (weekly_data, forecast_data or None), len(weekly_data)
+
+        stages = [Stage('weather', run_weather)]
+
+        for disease, run_predictor, file_prefix, models_dir in PREDICTORS:
+            def run_predictions(inputs, run_predictor=run_predictor):
+                predictions = run_predictor(weather=inputs['weather'], db_pool=db_pool)
+                return predictions, len(predictions or {})
+
+            def predictions_fingerprint(inputs, disease=disease, models_dir=models_dir):
+                # The date keeps reruns within a day from re-creating the same alerts and bulletins
+                return fingerprint(date_suffix, disease, inputs['weather'], models_fingerprint(models_dir))
+
+            def load_predictions(inputs, file_prefix=file_prefix):
+                try:
+                    with open(self.predictions_file(file_prefix, date_suffix), 'r') as f:
+                        predictions = json.load(f)
+                except (OSError, ValueError):
+                    return None
+                return predictions, len(predictions)
+
+            stages.append(Stage(
+                disease, run_predictions, depends_on=['weather'],
+                fingerprint=predictions_fingerprint, load_cached=load_predictions
+            ))
+
+        def predictions_by_disease(inputs):
+            return {file_prefix: inputs[disease] for disease, _, file_prefix, _ in PREDICTORS}
+
+        def run_upload(inputs):
+            uploaded_count = upload_predictions.main(predictions_by_disease(inputs))
+            return uploaded_count, uploaded_count
+
+        stages.append(Stage(
+            'upload', run_upload, depends_on=[disease for disease, _, _, _ in PREDICTORS],
+            fingerprint=lambda inputs: fingerprint(predictions_by_disease(inputs)),
+            # Nothing changed since these predictions were uploaded
+            load_cached=lambda inputs: (0, 0)
+        ))
+        return stages
+
+    def run(self, run_date=None):
+        """Run the pipeline for run_date (today by default). Returns whether every stage succeeded or was skipped."""
+        date_suffix = (run_date or datetime.now()).strftime('%Y%m%d')
+        db_pool = ThreadedConnectionPool(1, len(PREDICTORS), **self.db_params)
+        try:
+            dag = PipelineDAG(
+                self.build_stages(date_suffix, db_pool),
+                state_file=f"{self.predictions_dir}/pipeline_state.json",
+                skip_unchanged=PIPELINE_SKIP_UNCHANGED
+            )
+            success, outputs, metrics = dag.run()
+        finally:
+            db_pool.closeall()
+
+        self.logger.info(f"Model cache: {self.registry.stats()}")
+        municipalities = set()
+        for disease, _, _, _ in PREDICTORS:
+            municipalities.update(outputs.get(disease) or {})
+        summary = ", ".join(f"{m['stage']} {m['status']} ({m['seconds']:.1f}s, {m['rows']} rows)" for m in metrics)
+        record_disease_pipeline_run(
+            db_params=self.db_params,
+            pipeline_name=PIPELINE_NAME,
+            status="Success" if success else "Failed",
+            details=f"Stages: {summary}",
+            municipalities_processed_count=len(municipalities),
+            stage_metrics=metrics
+        )
+        return success
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    PredictionWorker().run()
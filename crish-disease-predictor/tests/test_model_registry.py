@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import tempfile
+
+import joblib
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_registry import ModelRegistry, RegisteredModels
+
+def write_models(models_dir, disease, municipalities):
+    """Write a small joblib 'model' per municipality."""
+    for municipality in municipalities:
+        joblib.dump({'municipality': municipality}, os.path.join(models_dir, f'{municipality}_{disease}.joblib'))
+
+def test_lazy_loading_and_cache():
+    """Models load on first use and are served from the cache afterwards."""
+    print("=" * 60)
+    print("Testing lazy loading and cache hits")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        write_models(models_dir, 'Dengue', ['Aileu', 'Dili'])
+        registry = ModelRegistry(max_models=8)
+        registry.register('Dengue', models_dir)
+
+        models = RegisteredModels(registry, 'Dengue', ['Aileu', 'Dili'])
+        assert registry.loads == 0, "Models should not load before they are used"
+        assert models['Aileu'] == {'municipality': 'Aileu'}
+        assert models['Aileu'] is models['Aileu']
+        assert registry.loads == 1, f"Expected 1 load, got {registry.loads}"
+        assert 'Dili' in models and 'Baucau' not in models
+        assert registry.get('Dengue', 'Baucau') is None
+
+        print("\n✓ Test passed: models load lazily and once")
+
+def test_reload_on_mtime_change():
+    """A retrained model file replaces the cached one."""
+    print("\n" + "=" * 60)
+    print("Testing reload on model file change")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        write_models(models_dir, 'ISPA', ['Dili'])
+        registry = ModelRegistry(max_models=8)
+        registry.register('ISPA', models_dir)
+        registry.get('ISPA', 'Dili')
+
+        model_path = registry.model_path('ISPA', 'Dili')
+        joblib.dump({'municipality': 'Dili', 'retrained': True}, model_path)
+        mtime = os.path.getmtime(model_path) + 60
+        os.utime(model_path, (mtime, mtime))
+
+        assert registry.get('ISPA', 'Dili')['retrained'] is True
+        assert registry.stats()['cached'] == 1, "The stale model should be dropped"
+
+        print("\n✓ Test passed: changed model files are reloaded")
+
+def test_lru_eviction():
+    """The least recently used model is evicted once the cache is full."""
+    print("\n" + "=" * 60)
+    print("Testing LRU eviction")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        write_models(models_dir, 'Diarrhea', ['Aileu', 'Baucau', 'Dili'])
+        registry = ModelRegistry(max_models=2)
+        registry.register('Diarrhea', models_dir)
+
+        registry.get('Diarrhea', 'Aileu')
+        registry.get('Diarrhea', 'Baucau')
+        registry.get('Diarrhea', 'Aileu')  # Aileu is now the most recently used
+        registry.get('Diarrhea', 'Dili')    # Evicts Baucau
+        assert registry.loads == 3
+
+        registry.get('Diarrhea', 'Aileu')
+        assert registry.loads == 3, "Aileu should still be cached"
+        registry.get('Diarrhea', 'Baucau')
+        assert registry.loads == 4, "Baucau should have been evicted"
+
+        print("\n✓ Test passed: least recently used models are evicted")
+
+def main():
+    """Run all tests."""
+    try:
+        test_lazy_loading_and_cache()
+        test_reload_on_mtime_change()
+        test_lru_eviction()
+
+        print("\n" + "=" * 60)
+        print("All tests passed! ✓")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
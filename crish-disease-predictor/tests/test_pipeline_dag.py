@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import tempfile
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline_dag import PipelineDAG, Stage, fingerprint, SUCCESS, FAILED, SKIPPED, BLOCKED
+
+def build_stages(calls, fail=()):
+    """weather -> a, b (in parallel) -> upload, recording which stages ran."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def stage_run(name, produce):
+        def run(inputs):
+            calls.append(name)
+            if name in fail:
+                raise RuntimeError(f"{name} failed")
+            if name in ('a', 'b'):
+                # Both predictors must be running at the same time to pass the barrier
+                barrier.wait()
+            return produce(inputs), 1
+        return run
+
+    def cached(inputs):
+        return 'cached', 1
+
+    return [
+        Stage('weather', stage_run('weather', lambda inputs: {'Dili': [1, 2]})),
+        Stage('a', stage_run('a', lambda inputs: len(inputs['weather'])), depends_on=['weather'],
+              fingerprint=lambda inputs: fingerprint(inputs['weather']), load_cached=cached),
+        Stage('b', stage_run('b', lambda inputs: 2), depends_on=['weather'],
+              fingerprint=lambda inputs: fingerprint(inputs['weather']), load_cached=cached),
+        Stage('upload', stage_run('upload', lambda inputs: inputs['a'] + inputs['b']), depends_on=['a', 'b']),
+    ]
+
+def test_parallel_run_and_outputs():
+    """Independent stages run in parallel and outputs are passed in memory."""
+    print("=" * 60)
+    print("Testing parallel stages and in-memory outputs")
+    print("=" * 60)
+
+    calls = []
+    success, outputs, metrics = PipelineDAG(build_stages(calls)).run()
+
+    assert success, f"Pipeline should succeed: {metrics}"
+    assert outputs['upload'] == 3, f"Unexpected upload output: {outputs['upload']}"
+    assert calls[0] == 'weather' and calls[-1] == 'upload'
+    assert {m['stage']: m['status'] for m in metrics} == {
+        'weather': SUCCESS, 'a': SUCCESS, 'b': SUCCESS, 'upload': SUCCESS
+    }
+    print("✓ Stages ran in dependency order with parallel predictors")
+
+def test_skip_unchanged():
+    """Stages whose inputs did not change are skipped on the next run."""
+    print("\n" + "=" * 60)
+    print("Testing skipping unchanged stages")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        state_file = os.path.join(temp_dir, 'pipeline_state.json')
+        PipelineDAG(build_stages([]), state_file=state_file).run()
+
+        calls = []
+        success, outputs, metrics = PipelineDAG(build_stages(calls), state_file=state_file).run()
+        statuses = {m['stage']: m['status'] for m in metrics}
+
+        assert success
+        assert statuses['a'] == SKIPPED and statuses['b'] == SKIPPED, f"Unexpected statuses: {statuses}"
+        assert calls == ['weather', 'upload'], f"Unexpected calls: {calls}"
+        assert outputs['a'] == 'cached'
+        print("✓ Unchanged stages were skipped")
+
+def test_failure_blocks_dependents():
+    """A failed stage blocks the stages depending on it."""
+    print("\n" + "=" * 60)
+    print("Testing failure handling")
+    print("=" * 60)
+
+    calls = []
+    success, outputs, metrics = PipelineDAG(build_stages(calls, fail=('weather',))).run()
+    statuses = {m['stage']: m['status'] for m in metrics}
+
+    assert not success
+    assert statuses == {'weather': FAILED, 'a': BLOCKED, 'b': BLOCKED, 'upload': BLOCKED}, statuses
+    assert calls == ['weather']
+    assert metrics[0]['error'] == 'weather failed'
+    print("✓ Dependents of a failed stage were blocked")
+
+def main():
+    """Run all tests."""
+    try:
+        test_parallel_run_and_outputs()
+        test_skip_unchanged()
+        test_failure_blocks_dependents()
+
+        print("\n" + "=" * 60)
+        print("All tests passed! ✓")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n✗ Test failed: {e}")
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -12,6 +12,7 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from visual_crossing_puller import VisualCrossingPuller
+from weather_store import WeatherStore
 
 def create_mock_weather_data():
     """Create mock weather data for testing."""
@@ -202,6 +203,58 @@ def test_date_ranges():
     assert forecast_start_dt.date() == tomorrow.date(), "Forecast should start tomorrow"
     print(f"✓ Forecast range: {forecast_start} to {forecast_end} ({forecast_days + 1} days total)")
 
+def test_weather_store_missing_windows():
+    """Test that only days missing from the weather store are fetched."""
+    print("\n" + "=" * 60)
+    print("Testing weather store missing windows")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = WeatherStore(os.path.join(temp_dir, 'weather_store.sqlite'))
+        today = datetime(2025, 2, 10).date()
+        days = [
+            {
+                'date': (datetime(2025, 1, 13) + timedelta(days=i)).strftime('%Y-%m-%d'),
+                'temperature': {'max': 30.0, 'min': 20.0, 'avg': 25.0},
+                'humidity': {'max': 80.0, 'min': 80.0, 'mean': 80.0},
+                'precipitation': 1.0
+            }
+            for i in range(24)  # 2025-01-13 to 2025-02-05
+        ]
+        
+        # Empty store: the whole range is fetched in one window
+        windows = store.missing_windows('Dili', '2025-01-13', '2025-02-17', today)
+        assert windows == [('2025-01-13', '2025-02-17')], f"Unexpected windows: {windows}"
+        
+        # Days fetched after they were over are final, the day fetched on is refetched
+        store.upsert('Dili', days, fetched_on=datetime(2025, 2, 5).date())
+        windows = store.missing_windows('Dili', '2025-01-13', '2025-02-17', today)
+        assert windows == [('2025-02-05', '2025-02-17')], f"Unexpected windows: {windows}"
+        assert len(store.get_days('Dili', '2025-01-13', '2025-02-17')) == 24
+        store.close()
+        print("✓ Only missing and stale days are fetched")
+
+def test_compute_weekly_averages():
+    """Test weekly averages are grouped by the monday of each week."""
+    print("\n" + "=" * 60)
+    print("Testing weekly averages")
+    print("=" * 60)
+    
+    puller = VisualCrossingPuller("test_api_key")
+    data = create_mock_weather_data()
+    weekly = puller.compute_weekly_averages(data)
+    
+    for week in weekly:
+        week_start = datetime.strptime(week['week_start'], '%Y-%m-%d')
+        assert week_start.weekday() == 0, f"Week should start on a monday: {week['week_start']}"
+        entries = [
+            e for e in data
+            if week['week_start'] <= e['date'] <= week['week_end']
+        ]
+        expected = sum(e['precipitation'] for e in entries) / len(entries)
+        assert abs(week['precipitation'] - expected) < 1e-9, "Wrong weekly precipitation average"
+    print(f"✓ Computed {len(weekly)} weekly averages")
+
 def main():
     """Run all tests."""
     print("Testing Optimized Visual Crossing Puller")
@@ -223,6 +276,12 @@ def main():
         # Test 5: Date ranges
         test_date_ranges()
         
+        # Test 6: Weather store
+        test_weather_store_missing_windows()
+        
+        # Test 7: Weekly averages
+        test_compute_weekly_averages()
+        
         print("\n" + "=" * 60)
         print("All tests passed! ✓")
         print("=" * 60)
@@ -3,6 +3,7 @@
 import os
 from dotenv import load_dotenv
 import psycopg2
+from psycopg2.extras import execute_values
 import json
 from datetime import datetime, timedelta
 import isoweek
@@ -10,6 +11,19 @@ import isoweek
 # Load environment variables
 load_dotenv()
 
+# The disease_forecast table is created by the Superset migrations
+UPSERT_SQL = """
+INSERT INTO disease_forecast
+(year, week_number, disease, municipality_code, municipality_name, predicted_cases, forecast_date, updated_at)
+VALUES %s
+ON CONFLICT (year, week_number, disease, municipality_code)
+DO UPDATE SET
+    municipality_name = EXCLUDED.municipality_name,
+    predicted_cases = EXCLUDED.predicted_cases,
+    forecast_date = EXCLUDED.forecast_date,
+    updated_at = CURRENT_TIMESTAMP;
+"""
+
 class PredictionUploader:
     def __init__(self):
         self.predictions_dir = os.getenv('PREDICTIONS_DIR', 'predictions')
@@ -61,50 +75,6 @@ class PredictionUploader:
             self.conn.close()
             print("Database connection closed")
 
-    def create_table_if_not_exists(self):
-        """Create the disease_forecast table if it doesn't exist."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS disease_forecast (
-            year INTEGER CHECK (year >= 2000),
-            week_number INTEGER CHECK (week_number BETWEEN 1 AND 53),
-            disease VARCHAR(50) NOT NULL,
-            municipality_code CHAR(5) NOT NULL,
-            municipality_name VARCHAR(50) NOT NULL,
-            predicted_cases INTEGER CHECK (predicted_cases >= 0),
-            forecast_date TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (year, week_number, disease, municipality_code)
-        );
-        
-        -- Add forecast_date column if it doesn't exist
-        DO $$
-        BEGIN
-            IF NOT EXISTS (
-                SELECT 1 FROM information_schema.columns 
-                WHERE table_name = 'disease_forecast' AND column_name = 'forecast_date'
-            ) THEN
-                ALTER TABLE disease_forecast ADD COLUMN forecast_date TIMESTAMP;
-            END IF;
-        END $$;
-        
-        -- Create index for faster queries
-        CREATE INDEX IF NOT EXISTS idx_disease_forecast_lookup 
-        ON disease_forecast(disease, year, week_number);
-        
-        -- Create index for forecast date
-        CREATE INDEX IF NOT EXISTS idx_disease_forecast_date 
-        ON disease_forecast(forecast_date);
-        """
-        try:
-            self.cursor.execute(create_table_sql)
-            self.conn.commit()
-            print("Table is ready")
-        except Exception as e:
-            print(f"Error creating table: {str(e)}")
-            self.conn.rollback()
-            raise
-
     def get_year_and_week(self, date_str):
         """Extract year and week number from a date string."""
         date = datetime.strptime(date_str, '%Y-%m-%d')
@@ -120,25 +90,14 @@ class PredictionUploader:
         monday = date - timedelta(days=days_to_subtract)
         return monday
 
-    def upload_prediction(self, municipality, prediction_data, disease, timeframe="current"):
-        """Upload a single prediction to the database."""
-        insert_sql = """
-        INSERT INTO disease_forecast 
-        (year, week_number, disease, municipality_code, municipality_name, predicted_cases, forecast_date, updated_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-        ON CONFLICT (year, week_number, disease, municipality_code)
-        DO UPDATE SET 
-            predicted_cases = EXCLUDED.predicted_cases,
-            forecast_date = EXCLUDED.forecast_date,
-            updated_at = CURRENT_TIMESTAMP;
-        """
-        
+    def prediction_row(self, municipality, prediction_data, disease, timeframe="current"):
+        """Build the disease_forecast row of a single prediction, or None when it can't be stored."""
         try:
             municipality_code = self.municipality_iso_codes.get(municipality)
             
             if not municipality_code:
                 print(f"Warning: No ISO code found for {municipality}, skipping")
-                return
+                return None
             
             # Get year and week based on the timeframe
             if timeframe == "current":
@@ -153,7 +112,7 @@ class PredictionUploader:
             # Calculate the Monday of the prediction week
             monday_date = self.get_monday_of_week(date_str)
             
-            self.cursor.execute(insert_sql, (
+            return (
                 year,
                 week,
                 disease,
@@ -161,43 +120,75 @@ class PredictionUploader:
                 municipality,
                 prediction_data['predicted_cases'],
                 monday_date,
-            ))
-            
-            print(f"Uploaded {timeframe} week prediction for {municipality} ({disease}, Week {week}/{year}, Monday: {monday_date.strftime('%Y-%m-%d')})")
-            return True
+            )
             
         except Exception as e:
-            print(f"Error uploading {timeframe} week prediction for {municipality}: {str(e)}")
-            self.conn.rollback()
-            return False
+            print(f"Error preparing {timeframe} week prediction for {municipality}: {str(e)}")
+            return None
 
-    def upload_predictions(self, predictions, disease):
-        """Upload current and next week predictions to the database."""
-        success_count = 0
+    def prediction_rows(self, predictions, disease):
+        """Build the rows of the current and next week predictions. Returns (rows, total predictions)."""
+        rows = []
         total_predictions = 0
         
         for municipality, data in predictions.items():
             total_predictions += 1
             
-            # Upload current week prediction
-            if 'current_week' in data:
-                if self.upload_prediction(municipality, data['current_week'], disease, "current"):
-                    success_count += 1
-            else:
-                # Handle legacy format for backward compatibility
-                if self.upload_prediction(municipality, data, disease, "current"):
-                    success_count += 1
+            # Current week prediction, or the legacy format for backward compatibility
+            current_week = data['current_week'] if 'current_week' in data else data
+            rows.append(self.prediction_row(municipality, current_week, disease, "current"))
             
-            # Upload next week prediction if available
+            # Next week prediction if available
             if 'next_week' in data:
                 total_predictions += 1
-                if self.upload_prediction(municipality, data['next_week'], disease, "next"):
-                    success_count += 1
+                rows.append(self.prediction_row(municipality, data['next_week'], disease, "next"))
         
-        self.conn.commit()
+        return [row for row in rows if row is not None], total_predictions
+
+    def upsert_rows(self, rows):
+        """
+        Upsert prediction rows in one statement and commit them as a single
+        transaction. The current and next week predictions land in different ISO
+        weeks, so (year, week_number, disease, municipality_code) also keys the timeframe.
+        Returns the number of upserted rows.
+        """
+        # A statement can't update the same row twice, the last prediction for a key wins
+        rows = list({row[:4]: row for row in rows}.values())
+        if not rows:
+            return 0
+        
+        try:
+            execute_values(
+                self.cursor,
+                UPSERT_SQL,
+                rows,
+                template="(%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)",
+                page_size=len(rows)
+            )
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error uploading predictions: {str(e)}")
+            self.conn.rollback()
+            raise
+        
+        return len(rows)
+
+    def upload_predictions(self, predictions, disease):
+        """Upload current and next week predictions to the database."""
+        rows, total_predictions = self.prediction_rows(predictions, disease)
+        success_count = self.upsert_rows(rows)
         print(f"Successfully uploaded {success_count} of {total_predictions} {disease} predictions")
+        return success_count
 
-def main():
+# Disease name stored in disease_forecast, and the predictions file name prefix
+DISEASES = ['dengue', 'diarrhea', 'ISPA']
+
+def main(predictions_by_disease=None):
+    """
+    Upload the predictions of every disease. predictions_by_disease is passed in
+    memory by the prediction pipeline; run standalone, today's prediction files are read.
+    Returns the number of uploaded predictions, or None on failure.
+    """
     uploader = PredictionUploader()
     current_date = datetime.now().strftime('%Y%m%d')
     
@@ -205,43 +196,31 @@ def main():
         # Connect to database
         uploader.connect()
         
-        # Create table if it doesn't exist
-        uploader.create_table_if_not_exists()
-        
-        print("Directory: ", uploader.predictions_dir)
-        print("Dengue file: ", f"{uploader.predictions_dir}/dengue_predictions_{current_date}.json")
-        print("Diarrhea file: ", f"{uploader.predictions_dir}/diarrhea_predictions_{current_date}.json")
-        print("ISPA file: ", f"{uploader.predictions_dir}/ISPA_predictions_{current_date}.json")
-        
-        # Process dengue predictions
-        dengue_file = f"{uploader.predictions_dir}/dengue_predictions_{current_date}.json"
-        if os.path.exists(dengue_file):
-            with open(dengue_file, 'r') as f:
-                dengue_predictions = json.load(f)
-            uploader.upload_predictions(dengue_predictions, 'dengue')
-        else:
-            print(f"No dengue predictions file found for {current_date}")
-        
-        # Process diarrhea predictions
-        diarrhea_file = f"{uploader.predictions_dir}/diarrhea_predictions_{current_date}.json"
-        if os.path.exists(diarrhea_file):
-            with open(diarrhea_file, 'r') as f:
-                diarrhea_predictions = json.load(f)
-            uploader.upload_predictions(diarrhea_predictions, 'diarrhea')
-        else:
-            print(f"No diarrhea predictions file found for {current_date}")
+        if predictions_by_disease is None:
+            print("Directory: ", uploader.predictions_dir)
+            predictions_by_disease = {}
+            for disease in DISEASES:
+                predictions_file = f"{uploader.predictions_dir}/{disease}_predictions_{current_date}.json"
+                print(f"{disease} file: ", predictions_file)
+                if os.path.exists(predictions_file):
+                    with open(predictions_file, 'r') as f:
+                        predictions_by_disease[disease] = json.load(f)
+                else:
+                    print(f"No {disease} predictions file found for {current_date}")
         
-        # Process ISPA predictions
-        ispa_file = f"{uploader.predictions_dir}/ISPA_predictions_{current_date}.json"
-        if os.path.exists(ispa_file):
-            with open(ispa_file, 'r') as f:
-                ispa_predictions = json.load(f)
-            uploader.upload_predictions(ispa_predictions, 'ISPA')
-        else:
-            print(f"No ISPA predictions file found for {current_date}")
+        # Upload the predictions of all diseases in one transaction
+        rows = []
+        for disease, predictions in predictions_by_disease.items():
+            disease_rows, total_predictions = uploader.prediction_rows(predictions, disease)
+            print(f"Prepared {len(disease_rows)} of {total_predictions} {disease} predictions")
+            rows.extend(disease_rows)
+        uploaded_count = uploader.upsert_rows(rows)
+        print(f"Successfully uploaded {uploaded_count} predictions")
+        return uploaded_count
             
     except Exception as e:
         print(f"Error: {str(e)}")
+        return None
     finally:
         uploader.disconnect()
 
@@ -1,12 +1,23 @@
 #!/usr/bin/env python3
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import json
 import os
 from typing import Dict, List, Optional
-import time
-from collections import defaultdict
+import pandas as pd
+
+from weather_store import WeatherStore
+
+# Concurrent Visual Crossing requests, also the size of the session's connection pool
+VISUAL_CROSSING_MAX_WORKERS = int(os.getenv('VISUAL_CROSSING_MAX_WORKERS', '4'))
+# Retries for rate limited (429) and server error responses, with exponential backoff
+VISUAL_CROSSING_MAX_RETRIES = int(os.getenv('VISUAL_CROSSING_MAX_RETRIES', '5'))
+VISUAL_CROSSING_BACKOFF_SECONDS = float(os.getenv('VISUAL_CROSSING_BACKOFF_SECONDS', '2'))
+VISUAL_CROSSING_TIMEOUT_SECONDS = int(os.getenv('VISUAL_CROSSING_TIMEOUT_SECONDS', '60'))
 
 class VisualCrossingPuller:
     def __init__(self, api_key: str):
@@ -30,6 +41,23 @@ class VisualCrossingPuller:
             'Raeoa': (-9.21, 124.37),
             'Viqueque': (-8.87, 126.37)
         }
+        self.session = self.create_session()
+
+    def create_session(self) -> requests.Session:
+        """Pooled session retrying rate limited and failed requests, honouring Retry-After."""
+        retry = Retry(
+            total=VISUAL_CROSSING_MAX_RETRIES,
+            backoff_factor=VISUAL_CROSSING_BACKOFF_SECONDS,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=VISUAL_CROSSING_MAX_WORKERS)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
 
     def get_date_range(self):
         end_date = datetime.now()
@@ -107,7 +135,7 @@ class VisualCrossingPuller:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=VISUAL_CROSSING_TIMEOUT_SECONDS)
             if response.status_code == 200:
                 raw_data = response.json()
                 processed_data = []
@@ -148,6 +176,35 @@ class VisualCrossingPuller:
         # Visual Crossing automatically returns forecast for future dates
         return self.get_historical_weather(municipality, start_date, end_date)
 
+    def update_store(self, store: WeatherStore, municipalities: List[str], start_date: str, end_date: str) -> int:
+        """
+        Fetch the date windows missing from the store for each municipality,
+        concurrently, and store them. Returns the number of requests made.
+        """
+        jobs = [
+            (municipality, window_start, window_end)
+            for municipality in municipalities
+            for window_start, window_end in store.missing_windows(municipality, start_date, end_date)
+        ]
+        if not jobs:
+            print("\n✓ Weather store is up to date, no API calls needed")
+            return 0
+
+        print(f"\nFetching {len(jobs)} missing date windows for {len({m for m, _, _ in jobs})} municipalities")
+        with ThreadPoolExecutor(max_workers=VISUAL_CROSSING_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(self.get_historical_weather, municipality, window_start, window_end): (municipality, window_start, window_end)
+                for municipality, window_start, window_end in jobs
+            }
+            for future in as_completed(futures):
+                municipality, window_start, window_end = futures[future]
+                days = future.result()
+                if days:
+                    # SQLite writes stay on this thread
+                    store.upsert(municipality, days)
+                    print(f"Stored {len(days)} days for {municipality} ({window_start} to {window_end})")
+        return len(jobs)
+
     def save_data(self, municipality: str, data: Dict, data_type="historical"):
         os.makedirs('weather_data', exist_ok=True)
         filename = f"weather_data/{municipality}_{data_type}_{datetime.now().strftime('%Y%m%d')}.json"
@@ -161,44 +218,39 @@ class VisualCrossingPuller:
         if not data:
             return []
 
-        # Convert dates to datetime objects and sort by date
-        for entry in data:
-            entry['datetime'] = datetime.strptime(entry['date'], '%Y-%m-%d')
-        
-        data.sort(key=lambda x: x['datetime'])
-        
-        # Group data by week
-        weekly_data = defaultdict(list)
-        for entry in data:
-            # Get the monday of the week
-            monday = entry['datetime'] - timedelta(days=entry['datetime'].weekday())
-            weekly_data[monday].append(entry)
+        df = pd.json_normalize(data)
+        dates = pd.to_datetime(df['date'], format='%Y-%m-%d')
+        # Group data by week, starting on the monday of the week
+        df['week_start'] = dates - pd.to_timedelta(dates.dt.weekday, unit='D')
+        columns = [
+            'temperature.max', 'temperature.min', 'temperature.avg',
+            'humidity.max', 'humidity.min', 'humidity.mean', 'precipitation'
+        ]
+        weekly = df.groupby('week_start', sort=True)[columns].mean()
+        week_ends = weekly.index + pd.Timedelta(days=6)
 
         # Compute averages for each week
-        weekly_averages = []
-        for week_start, entries in sorted(weekly_data.items()):
-            week_end = week_start + timedelta(days=6)
-            
-            avg_data = {
+        return [
+            {
                 'week_start': week_start.strftime('%Y-%m-%d'),
                 'week_end': week_end.strftime('%Y-%m-%d'),
                 'temperature': {
-                    'max': sum(e['temperature']['max'] for e in entries) / len(entries),
-                    'min': sum(e['temperature']['min'] for e in entries) / len(entries),
-                    'avg': sum(e['temperature']['avg'] for e in entries) / len(entries)
+                    'max': float(row['temperature.max']),
+                    'min': float(row['temperature.min']),
+                    'avg': float(row['temperature.avg'])
                 },
                 'humidity': {
-                    'max': sum(e['humidity']['max'] for e in entries) / len(entries),
-                    'min': sum(e['humidity']['min'] for e in entries) / len(entries),
-                    'mean': sum(e['humidity']['mean'] for e in entries) / len(entries)
+                    'max': float(row['humidity.max']),
+                    'min': float(row['humidity.min']),
+                    'mean': float(row['humidity.mean'])
                 },
-                'precipitation': sum(e['precipitation'] for e in entries) / len(entries)
+                'precipitation': float(row['precipitation'])
             }
-            weekly_averages.append(avg_data)
-        
-        return weekly_averages
+            for (week_start, row), week_end in zip(weekly.iterrows(), week_ends)
+        ]
 
 def main():
+    """Pull weather data for today, returning (weekly_averages, forecast) by municipality."""
     API_KEY = os.getenv("VISUAL_CROSSING_API_KEY")
     
     puller = VisualCrossingPuller(API_KEY)
@@ -219,7 +271,7 @@ def main():
         print(f"- Weekly averages available for {len(weekly_data)} municipalities")
         print(f"- Forecast data available for {len(forecast_data)} municipalities")
         
-        return
+        return weekly_data, forecast_data
     
     print(f"\nPulling historical data from {start_date} to {end_date}")
     
@@ -239,51 +291,35 @@ def main():
     
     if not municipalities_needing_data:
         print("\n✓ All municipalities have data for today!")
-        return
+        return all_weekly_averages, all_forecast_data
     
     print(f"\nNeed to pull data for {len(municipalities_needing_data)} municipalities: {', '.join(municipalities_needing_data)}")
     
-    # Process only municipalities that need data
-    for municipality in municipalities_needing_data:
-        print(f"\nProcessing {municipality}")
-        
-        # Check for existing individual files first
-        historical_data = puller.check_existing_data(municipality, "historical")
-        
-        # Get historical data if not already cached
-        if not historical_data:
-            historical_data = puller.get_historical_weather(municipality, start_date, end_date)
+    # Fetch only the days missing from the weather store. The historical window ends
+    # today and the forecast starts tomorrow, so both come from one window per municipality
+    forecast_start, forecast_end = puller.get_forecast_date_range()
+    store = WeatherStore()
+    try:
+        puller.update_store(store, municipalities_needing_data, start_date, forecast_end)
+
+        for municipality in municipalities_needing_data:
+            historical_data = store.get_days(municipality, start_date, end_date)
             if historical_data:
-                # Save raw data
-                puller.save_data(municipality, historical_data, "historical")
-        
-        if historical_data:
-            # Compute and store weekly averages
-            weekly_averages = puller.compute_weekly_averages(historical_data)
-            all_weekly_averages[municipality] = weekly_averages
-        
-        # Check for existing forecast data
-        forecast_data = puller.check_existing_data(municipality, "forecast")
-        
-        # Get forecast data if not already cached
-        if not forecast_data:
-            try:    
-                forecast_data = puller.get_forecast_weather(municipality)
-                if forecast_data:
-                    # Save raw forecast data
-                    puller.save_data(municipality, forecast_data, "forecast")
-            except Exception as e:
-                print(f"Error getting forecast data for {municipality}: {str(e)}")
-        
-        if forecast_data:
-            # Compute and store weekly forecast
-            forecast_weekly = puller.compute_weekly_averages(forecast_data)
-            all_forecast_data[municipality] = forecast_weekly
-            
-        # Respect API rate limits (only when making API calls)
-        if not historical_data or not forecast_data:
-            time.sleep(1)
+                # Compute and store weekly averages
+                all_weekly_averages[municipality] = puller.compute_weekly_averages(historical_data)
+            else:
+                print(f"No historical data available for {municipality}")
+
+            forecast_data = store.get_days(municipality, forecast_start, forecast_end)
+            if forecast_data:
+                # Compute and store weekly forecast
+                all_forecast_data[municipality] = puller.compute_weekly_averages(forecast_data)
+            else:
+                print(f"No forecast data available for {municipality}")
+    finally:
+        store.close()
     
+    os.makedirs('weather_data', exist_ok=True)
     # Save all weekly averages to a single file
     weekly_averages_file = f"weather_data/all_municipalities_weekly_averages_{datetime.now().strftime('%Y%m%d')}.json"
     with open(weekly_averages_file, 'w') as f:
@@ -295,6 +331,7 @@ def main():
     with open(forecast_file, 'w') as f:
         json.dump(all_forecast_data, f, indent=2)
     print(f"\nSaved forecast data for all municipalities to {forecast_file}")
+    return all_weekly_averages, all_forecast_data
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Loading of the weekly weather files written by visual_crossing_puller.py.
+"""
+import json
+
+
+def load_weather_data(weather_data_dir, date_suffix):
+    """
+    Load the weekly averages and forecast for a run date (YYYYMMDD).
+
+    Returns:
+        (weekly_data, forecast_data) with forecast_data None when there is no
+        forecast file, or None when the weekly averages file is missing.
+    """
+    weekly_averages_file = f"{weather_data_dir}/all_municipalities_weekly_averages_{date_suffix}.json"
+    forecast_file = f"{weather_data_dir}/all_municipalities_forecast_{date_suffix}.json"
+
+    try:
+        with open(weekly_averages_file, 'r') as f:
+            weekly_data = json.load(f)
+    except FileNotFoundError:
+        print(f"Weekly averages file not found: {weekly_averages_file}")
+        return None
+
+    try:
+        with open(forecast_file, 'r') as f:
+            forecast_data = json.load(f)
+        print("Forecast data loaded successfully")
+    except FileNotFoundError:
+        print(f"Forecast file not found: {forecast_file}")
+        forecast_data = None
+
+    return weekly_data, forecast_data
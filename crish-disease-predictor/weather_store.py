@@ -0,0 +1,136 @@
+"""
+Local store of daily Visual Crossing weather, keyed by (municipality, date).
+
+Each row remembers the day it was fetched on. A day fetched after it ended is
+final and never requested again; days fetched earlier (today's partial values
+and forecasts) are refetched once they are stale. The puller asks the store
+which date windows are missing, so API quota use and run time grow with new
+days instead of with the length of the history window.
+"""
+import os
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+WEATHER_STORE_PATH = os.getenv('WEATHER_STORE_PATH', 'weather_data/weather_store.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_weather (
+    municipality TEXT NOT NULL,
+    date TEXT NOT NULL,
+    temp_max REAL,
+    temp_min REAL,
+    temp_avg REAL,
+    humidity REAL,
+    precipitation REAL,
+    fetched_on TEXT NOT NULL,
+    PRIMARY KEY (municipality, date)
+)
+"""
+
+
+def _parse(date_str: str) -> date:
+    return datetime.strptime(date_str, '%Y-%m-%d').date()
+
+
+def date_windows(dates: List[date]) -> List[Tuple[str, str]]:
+    """Collapse dates into contiguous (start, end) windows."""
+    windows = []
+    for day in sorted(dates):
+        if windows and day - windows[-1][1] == timedelta(days=1):
+            windows[-1][1] = day
+        else:
+            windows.append([day, day])
+    return [(start.isoformat(), end.isoformat()) for start, end in windows]
+
+
+class WeatherStore:
+    def __init__(self, path: str = WEATHER_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _fetched_on(self, municipality: str, start_date: str, end_date: str) -> Dict[date, date]:
+        rows = self.conn.execute(
+            "SELECT date, fetched_on FROM daily_weather WHERE municipality = ? AND date BETWEEN ? AND ?",
+            (municipality, start_date, end_date)
+        )
+        return {_parse(day): _parse(fetched_on) for day, fetched_on in rows}
+
+    def missing_windows(self, municipality: str, start_date: str, end_date: str,
+                        today: Optional[date] = None) -> List[Tuple[str, str]]:
+        """
+        Date windows in [start_date, end_date] that have to be fetched: days not
+        stored yet, days fetched before they were over, and forecasts not fetched today.
+        """
+        today = today or date.today()
+        fetched_on = self._fetched_on(municipality, start_date, end_date)
+        start, end = _parse(start_date), _parse(end_date)
+        needed = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            fetched = fetched_on.get(day)
+            if fetched is None:
+                needed.append(day)
+            elif day >= today:
+                # Today's partial values and forecasts: keep them for the day they were fetched on
+                if fetched < today:
+                    needed.append(day)
+            elif fetched <= day:
+                # Fetched while the day was not over yet, replace with the final values
+                needed.append(day)
+        return date_windows(needed)
+
+    def upsert(self, municipality: str, days: List[Dict], fetched_on: Optional[date] = None):
+        """Store processed daily records (the puller's day format) for a municipality."""
+        fetched_on = (fetched_on or date.today()).isoformat()
+        self.conn.executemany(
+            """
+            INSERT INTO daily_weather
+                (municipality, date, temp_max, temp_min, temp_avg, humidity, precipitation, fetched_on)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (municipality, date) DO UPDATE SET
+                temp_max = excluded.temp_max,
+                temp_min = excluded.temp_min,
+                temp_avg = excluded.temp_avg,
+                humidity = excluded.humidity,
+                precipitation = excluded.precipitation,
+                fetched_on = excluded.fetched_on
+            """,
+            [
+                (
+                    municipality, day['date'],
+                    day['temperature']['max'], day['temperature']['min'], day['temperature']['avg'],
+                    day['humidity']['mean'], day['precipitation'], fetched_on
+                )
+                for day in days
+            ]
+        )
+        self.conn.commit()
+
+    def get_days(self, municipality: str, start_date: str, end_date: str) -> List[Dict]:
+        """Stored daily records for a municipality in the puller's day format, oldest first."""
+        rows = self.conn.execute(
+            """
+            SELECT date, temp_max, temp_min, temp_avg, humidity, precipitation
+            FROM daily_weather
+            WHERE municipality = ? AND date BETWEEN ? AND ?
+            ORDER BY date
+            """,
+            (municipality, start_date, end_date)
+        )
+        return [
+            {
+                'date': day,
+                'temperature': {'max': temp_max, 'min': temp_min, 'avg': temp_avg},
+                'humidity': {'max': humidity, 'min': humidity, 'mean': humidity},
+                'precipitation': precipitation
+            }
+            for day, temp_max, temp_min, temp_avg, humidity, precipitation in rows
+        ]
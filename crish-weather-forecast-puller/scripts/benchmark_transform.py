@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark the weather transform stages of the scheduled pull.
+
+Builds a synthetic multi-year hourly DataEx payload (r_data with one time and
+value array per municipality) for temperature and humidity, then times
+transform_weather_data and calculate_heat_index against the previous
+row-by-row implementations and checks that both produce the same values.
+The JSON parse and alert generation stages are timed alongside so the
+transform can be compared with the rest of the pipeline.
+
+Usage:
+    python scripts/benchmark_transform.py [--years 3] [--repeat 3]
+"""
+
+import argparse
+import json
+import math
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import polars as pl
+
+from transform_weather_data import (
+    MUNICIPALITY_CODES,
+    calculate_heat_index,
+    generate_weather_alerts,
+    transform_weather_data,
+)
+
+
+def build_payload(hours, low, high, seed):
+    """Create a DataEx region payload with hourly periods for every municipality."""
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1)
+    times = [
+        [(start + timedelta(hours=h)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+         (start + timedelta(hours=h + 1)).strftime('%Y-%m-%dT%H:%M:%SZ')]
+        for h in range(hours)
+    ]
+    return {
+        'r_data': {
+            name: {'time': times, 'value': [round(rng.uniform(low, high), 2) for _ in range(hours)]}
+            for name in MUNICIPALITY_CODES['municipality_name']
+        }
+    }
+
+
+def legacy_transform(input_file):
+    """Per-row transform as implemented before vectorization."""
+    with open(input_file, 'r') as f:
+        data = json.load(f)
+    municipality_codes = dict(zip(MUNICIPALITY_CODES['municipality_name'], MUNICIPALITY_CODES['municipality_code']))
+    rows = []
+    for municipality_name, data_obj in data['r_data'].items():
+        for time_period, value in zip(data_obj['time'], data_obj['value']):
+            forecast_date = time_period[0]
+            rows.append({
+                'forecast_date': forecast_date,
+                'day_name': datetime.fromisoformat(forecast_date.replace('Z', '+00:00')).strftime('%A'),
+                'value': value,
+                'municipality_code': municipality_codes.get(municipality_name, ''),
+                'municipality_name': municipality_name
+            })
+    df = pl.DataFrame(rows)
+    return df.with_columns([pl.col('forecast_date').str.slice(0, 10).alias('forecast_date')])
+
+
+def legacy_heat_index(tmax_df, rh_df):
+    """Per-row heat index through pandas as implemented before vectorization."""
+    pandas_df = tmax_df.join(rh_df, on=['forecast_date', 'municipality_code'], how='inner', suffix='_rh').to_pandas()
+
+    def calculate_hi_for_row(temp_c, rh):
+        temp_f = temp_c * 9 / 5 + 32
+        averaged_hi = (0.5 * (temp_f + 61.0 + ((temp_f - 68.0) * 1.2) + (rh * 0.094)) + temp_f) / 2
+        if averaged_hi < 80:
+            return averaged_hi
+        hi = (-42.379 + 2.04901523 * temp_f + 10.14333127 * rh - 0.22475541 * temp_f * rh -
+              0.00683783 * temp_f * temp_f - 0.05481717 * rh * rh + 0.00122874 * temp_f * temp_f * rh +
+              0.00085282 * temp_f * rh * rh - 0.00000199 * temp_f * temp_f * rh * rh)
+        if rh < 13 and 80 <= temp_f <= 112:
+            hi -= ((13 - rh) / 4) * math.sqrt((17 - abs(temp_f - 95)) / 17)
+        elif rh > 85 and 80 <= temp_f <= 87:
+            hi += ((rh - 85) / 10) * ((87 - temp_f) / 5)
+        return hi
+
+    pandas_df['heat_index_f'] = pandas_df.apply(lambda row: calculate_hi_for_row(row['value'], row['value_rh']), axis=1)
+    pandas_df['value'] = (pandas_df['heat_index_f'] - 32) * 5 / 9
+    return pl.from_pandas(pandas_df[['forecast_date', 'day_name', 'value', 'municipality_code', 'municipality_name']])
+
+
+def best_of(repeat, fn, *args):
+    """Run fn repeat times and return the fastest wall time and the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--years', type=int, default=3, help='Years of hourly periods per municipality')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage, the fastest is reported')
+    args = parser.parse_args()
+
+    hours = args.years * 365 * 24
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        for name, (low, high, seed) in {
+            'tmax_daily_tmax_region': (24, 38, 1),
+            'rh_daily_avg_region': (5, 100, 2),
+            'rainfall_daily_weighted_average': (0, 80, 3),
+            'ws_daily_avg_region': (0, 30, 4),
+        }.items():
+            files[name] = Path(tmp) / f'{name}_data.json'
+            files[name].write_text(json.dumps(build_payload(hours, low, high, seed)))
+        rows = hours * len(MUNICIPALITY_CODES)
+        print(f"Payload: {args.years} years hourly x {len(MUNICIPALITY_CODES)} municipalities = {rows:,} rows per parameter")
+
+        timings = {}
+        timings['json parse'], _ = best_of(args.repeat, lambda path: json.loads(path.read_text()), files['tmax_daily_tmax_region'])
+        timings['transform (legacy)'], legacy_tmax = best_of(args.repeat, legacy_transform, files['tmax_daily_tmax_region'])
+        timings['transform'], tmax_df = best_of(args.repeat, transform_weather_data, files['tmax_daily_tmax_region'])
+        dataframes = {name: transform_weather_data(path) for name, path in files.items()}
+
+    assert legacy_tmax.equals(tmax_df), "transform_weather_data output differs from the legacy transform"
+
+    # The heat index joins on (forecast_date, municipality_code), so benchmark it on daily rows
+    daily = {
+        name: df.unique(['forecast_date', 'municipality_code'], keep='first', maintain_order=True)
+        for name, df in dataframes.items()
+    }
+    timings['heat index (legacy)'], legacy_hi = best_of(args.repeat, legacy_heat_index, daily['tmax_daily_tmax_region'], daily['rh_daily_avg_region'])
+    timings['heat index'], heat_index_df = best_of(args.repeat, calculate_heat_index, daily['tmax_daily_tmax_region'], daily['rh_daily_avg_region'])
+    diff = (legacy_hi['value'] - heat_index_df['value']).abs().max()
+    assert diff < 1e-9, f"calculate_heat_index differs from the legacy calculation by {diff}"
+
+    daily['heat_index_daily_region'] = heat_index_df
+    timings['alert generation'], _ = best_of(1, generate_weather_alerts, daily)
+
+    print(f"\n{'stage':<22}{'seconds':>10}")
+    for stage, seconds in timings.items():
+        print(f"{stage:<22}{seconds:>10.3f}")
+    print(f"\ntransform speedup: {timings['transform (legacy)'] / timings['transform']:.1f}x")
+    print(f"heat index speedup: {timings['heat index (legacy)'] / timings['heat index']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
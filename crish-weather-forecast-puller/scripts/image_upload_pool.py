@@ -0,0 +1,63 @@
+"""
+Concurrent, content-addressed uploads for bulletin chart images.
+
+Images are keyed by the SHA-256 of their bytes, so identical maps and tables
+across alerts and reruns are stored once, and the same image submitted twice in
+a run shares one upload. A key already in the bucket is still PUT: that
+refreshes its LastModified, which keeps Superset's orphaned image sweep from
+deleting it before this run's attachment rows commit.
+Uploads run on a thread pool over the caller's shared boto3 client, so chart
+rendering and database work no longer wait on object store round trips.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from boto3.s3.transfer import TransferConfig
+
+# Concurrent uploads, also used to size the boto3 connection pool
+S3_UPLOAD_WORKERS = int(os.getenv('S3_UPLOAD_WORKERS', '8'))
+
+# Chart images are small, keep them to single PUTs on the pool's own threads
+TRANSFER_CONFIG = TransferConfig(use_threads=False)
+
+
+def content_key(prefix, image_bytes, extension='.png'):
+    """S3 key derived from the image content."""
+    return f"{prefix}/{hashlib.sha256(image_bytes).hexdigest()}{extension}"
+
+
+class ImageUploadPool:
+    """
+    Thread pool around an upload function with the signature of
+    upload_image_to_s3(image_buffer, s3_key, bucket_name) -> key or None.
+    """
+
+    def __init__(self, upload_fn, bucket_name, max_workers=S3_UPLOAD_WORKERS):
+        self.upload_fn = upload_fn
+        self.bucket_name = bucket_name
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='s3-upload')
+        self.futures = {}
+        self.lock = Lock()
+
+    def submit(self, image_buffer, prefix):
+        """Queue an image upload, returning a future of its S3 key (None if the upload failed)."""
+        image_bytes = image_buffer.getvalue()
+        s3_key = content_key(prefix, image_bytes)
+        with self.lock:
+            if s3_key not in self.futures:
+                self.futures[s3_key] = self.executor.submit(self.upload_fn, image_bytes, s3_key, self.bucket_name)
+            else:
+                logging.info(f"Reusing upload of identical image {s3_key}")
+            return self.futures[s3_key]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
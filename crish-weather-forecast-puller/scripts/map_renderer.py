@@ -0,0 +1,135 @@
+"""
+Municipality choropleth rendering shared by the bulletin chart generators.
+
+The GeoJSON is parsed once per process and drawn onto a single figure. Each
+render only recolors the municipality patches, moves the highlight outline and
+swaps the legend and title, so a run with many alerts no longer re-reads the
+file and rebuilds the figure for every image. render_maps spreads a run's
+images over a process pool, each worker holding its own renderer.
+
+The pool never forks the caller: render_maps runs on pipeline threads while
+others are in psycopg2 calls or hold locks, and a forked child would inherit
+those locks held. Workers come from a forkserver (spawn where unavailable).
+"""
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import geopandas
+
+# Worker processes used by render_maps, defaults to the CPU count
+MAP_RENDER_WORKERS = int(os.getenv('MAP_RENDER_WORKERS', '0')) or os.cpu_count() or 1
+
+# Start method of the worker processes, see the module docstring
+MAP_RENDER_START_METHOD = (
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+TRANSPARENT = (0, 0, 0, 0)
+HIGHLIGHT_COLOR = 'blue'
+
+
+class MunicipalityMapRenderer:
+    """Reusable Timor-Leste municipality map, keyed by the GeoJSON 'ISO' code."""
+
+    def __init__(self, geojson_path, missing_color):
+        self.missing_color = missing_color
+        # One row per polygon part, so patch i always belongs to iso_codes[i]
+        gdf = geopandas.read_file(geojson_path).explode(index_parts=False).reset_index(drop=True)
+        self.iso_codes = gdf['ISO'].astype(str).tolist()
+
+        self.fig, self.ax = plt.subplots(1, 1, figsize=(12, 10))
+        gdf.plot(ax=self.ax, color=missing_color, edgecolor='black', linewidth=0.5)
+        self.fill = self.ax.collections[-1]
+        gdf.plot(ax=self.ax, facecolor='none', edgecolor=HIGHLIGHT_COLOR, linewidth=2.5, linestyle='--')
+        self.outline = self.ax.collections[-1]
+        self.outline.set_edgecolor(TRANSPARENT)
+        self.ax.set_axis_off()
+
+    def render(self, colors, highlight_code, legend, legend_title, title, missing_label='Missing data'):
+        """
+        Render one map as PNG bytes.
+
+        Args:
+            colors: Mapping of municipality code to fill color, others get the missing color.
+            highlight_code: Municipality outlined with a dashed line, or None.
+            legend: List of (label, color) legend entries.
+            legend_title: Legend title.
+            title: Figure title.
+            missing_label: Legend entry added when a municipality has no color, or None.
+        """
+        facecolors = [colors.get(code, self.missing_color) for code in self.iso_codes]
+        self.fill.set_facecolor(facecolors)
+        self.outline.set_edgecolor([
+            HIGHLIGHT_COLOR if code == highlight_code else TRANSPARENT for code in self.iso_codes
+        ])
+        if highlight_code is not None and highlight_code not in self.iso_codes:
+            logging.warning(f"Municipality code {highlight_code} not found in GeoJSON for highlighting.")
+
+        if missing_label and self.missing_color in facecolors:
+            legend = legend + [(missing_label, self.missing_color)]
+        self.ax.legend(
+            handles=[plt.Rectangle((0, 0), 1, 1, color=color, label=label) for label, color in legend],
+            title=legend_title,
+            loc='lower right'
+        )
+        self.ax.set_title(title, fontsize=15)
+        self.fig.tight_layout()
+
+        img_buffer = io.BytesIO()
+        self.fig.savefig(img_buffer, format='png', dpi=100)
+        return img_buffer.getvalue()
+
+
+_renderer = None
+
+
+def _init_worker(geojson_path, missing_color):
+    global _renderer
+    _renderer = MunicipalityMapRenderer(geojson_path, missing_color)
+
+
+def _render_job(job):
+    try:
+        return _renderer.render(**job)
+    except Exception as e:
+        logging.error(f"Error rendering map '{job.get('title')}': {e}", exc_info=True)
+        return None
+
+
+def render_maps(geojson_path, missing_color, jobs, max_workers=None):
+    """
+    Render a batch of maps, returning PNG bytes (or None on failure) in job order.
+
+    Each job is a dict of MunicipalityMapRenderer.render keyword arguments.
+    Small batches are rendered in this process; larger ones in a process pool.
+    """
+    if not jobs:
+        return []
+    workers = min(max_workers or MAP_RENDER_WORKERS, len(jobs))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(MAP_RENDER_START_METHOD),
+                initializer=_init_worker,
+                initargs=(geojson_path, missing_color)
+            ) as executor:
+                return list(executor.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        except Exception as e:
+            logging.warning(f"Map render pool unavailable ({e}), rendering {len(jobs)} maps in process")
+
+    try:
+        _init_worker(geojson_path, missing_color)
+    except Exception as e:
+        logging.error(f"Error loading GeoJSON {geojson_path} for map rendering: {e}", exc_info=True)
+        return [None] * len(jobs)
+    try:
+        return [_render_job(job) for job in jobs]
+    finally:
+        plt.close(_renderer.fig)
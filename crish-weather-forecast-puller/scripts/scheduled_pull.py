@@ -7,10 +7,13 @@ import sys
 import signal
 import os
 import json
+import hashlib
+import random
 import psycopg2
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from transform_weather_data import process_weather_files, ingest_to_postgresql
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Setup logging
 logging.basicConfig(
@@ -21,7 +24,28 @@ logging.basicConfig(
     ]
 )
 
-def record_pull_history(parameters_pulled, status="Success", details=None):
+# Parameters to pull
+PARAMETERS = [
+    'tmax_daily_tmax_region',
+    'rainfall_daily_weighted_average',
+    'rh_daily_avg_region',
+    'ws_daily_avg_region',
+    'tmin_daily_tmin_region'
+]
+
+# Concurrent DataEx requests, attempts per parameter and the first retry delay (doubled each retry)
+PULL_MAX_WORKERS = int(os.getenv('PULL_MAX_WORKERS', '3'))
+PULL_MAX_ATTEMPTS = int(os.getenv('PULL_MAX_ATTEMPTS', '4'))
+PULL_BACKOFF_SECONDS = float(os.getenv('PULL_BACKOFF_SECONDS', '10'))
+PULL_TIMEOUT_SECONDS = int(os.getenv('PULL_TIMEOUT_SECONDS', '900'))
+
+# A parameter pulled successfully within this window is not pulled again, so a
+# rerun after a partial failure only fetches what is missing
+PULL_RESUME_HOURS = float(os.getenv('PULL_RESUME_HOURS', '6'))
+
+MANIFEST_FILENAME = 'pull_manifest.json'
+
+def record_pull_history(parameters_pulled, status="Success", details=None, parameter_timings=None):
     """Record a pull history directly to the database."""
     try:
         # Load environment variables
@@ -59,24 +83,50 @@ def record_pull_history(parameters_pulled, status="Success", details=None):
                         pulled_at TIMESTAMP NOT NULL DEFAULT NOW(),
                         parameters_pulled VARCHAR(255) NOT NULL,
                         pull_status VARCHAR(50) NOT NULL DEFAULT 'Success',
-                        details TEXT
+                        details TEXT,
+                        parameter_timings TEXT
                     );
                     """)
                     conn.commit()
                     logging.info("Table created successfully")
+                    has_parameter_timings = True
+                else:
+                    # The parameter_timings column is added by Superset migration 7d2a5e91c3f8
+                    cur.execute("""
+                    SELECT EXISTS (
+                       SELECT FROM information_schema.columns
+                       WHERE table_name = 'weather_data_pull_history' AND column_name = 'parameter_timings'
+                    );
+                    """)
+                    has_parameter_timings = cur.fetchone()[0]
+                    if not has_parameter_timings:
+                        logging.warning(
+                            "weather_data_pull_history has no parameter_timings column, run `superset db upgrade`. "
+                            "Recording the pull without parameter timings."
+                        )
                 
                 # Insert into weather_data_pull_history table
-                sql = """
-                INSERT INTO weather_data_pull_history 
-                (pulled_at, parameters_pulled, pull_status, details)
-                VALUES (%s, %s, %s, %s)
-                """
-                cur.execute(sql, (
-                    datetime.now(),
-                    parameters_pulled,
-                    status,
-                    details or ""
-                ))
+                if has_parameter_timings:
+                    sql = """
+                    INSERT INTO weather_data_pull_history 
+                    (pulled_at, parameters_pulled, pull_status, details, parameter_timings)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """
+                    values = (
+                        datetime.now(),
+                        parameters_pulled,
+                        status,
+                        details or "",
+                        json.dumps(parameter_timings) if parameter_timings is not None else None
+                    )
+                else:
+                    sql = """
+                    INSERT INTO weather_data_pull_history 
+                    (pulled_at, parameters_pulled, pull_status, details)
+                    VALUES (%s, %s, %s, %s)
+                    """
+                    values = (datetime.now(), parameters_pulled, status, details or "")
+                cur.execute(sql, values)
                 conn.commit()
                 
             logging.info(f"Successfully recorded pull history: {parameters_pulled}")
@@ -85,6 +135,121 @@ def record_pull_history(parameters_pulled, status="Success", details=None):
         logging.error(f"Failed to record pull history: {str(e)}")
         logging.exception("Full error traceback:")
 
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(data_dir):
+    """Load the per-parameter checksum manifest written by previous pulls."""
+    manifest_path = data_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable pull manifest {manifest_path}: {e}")
+        return {}
+
+def save_manifest(data_dir, manifest):
+    """Write the manifest atomically so an interrupted run never leaves it half written."""
+    manifest_path = data_dir / MANIFEST_FILENAME
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def is_resumable(entry, output_file):
+    """Whether a parameter was pulled recently enough, and is still intact on disk, to skip pulling."""
+    if not entry or not output_file.exists():
+        return False
+    try:
+        pulled_at = datetime.fromisoformat(entry['pulled_at'])
+    except (KeyError, ValueError):
+        return False
+    if datetime.now() - pulled_at > timedelta(hours=PULL_RESUME_HOURS):
+        return False
+    return file_sha256(output_file) == entry.get('sha256')
+
+def pull_parameter(param, data_dir, base_dir, previous_entry):
+    """
+    Pull one parameter from DataEx with exponential backoff retries.
+
+    The file is downloaded next to its final location and only moved into
+    place once complete. Returns a result dict with the status ("Success",
+    "Unchanged", "Resumed" or "Failed"), attempts, seconds and checksum.
+    """
+    output_file = data_dir / f'{param}_data.json'
+    started = time.monotonic()
+    result = {"parameter": param, "attempts": 0}
+
+    if is_resumable(previous_entry, output_file):
+        logging.info(f"{param}: pulled at {previous_entry['pulled_at']}, skipping")
+        result.update(status="Resumed", sha256=previous_entry['sha256'], seconds=0.0)
+        return result
+
+    partial_file = data_dir / f'{param}_data.json.part'
+    cmd = [
+        'dataex_region_data_analysis.py',
+        '-mt', 'ecmwf_hres',
+        '-r', param,
+        '-ai', '9b4f37e1-00f4-4296-8c3a-914ee19989a6',
+        '-uf', 'ADM1',
+        '-of', 'json',
+        '-o', str(partial_file.absolute()),
+    ]
+
+    error = None
+    for attempt in range(1, PULL_MAX_ATTEMPTS + 1):
+        result["attempts"] = attempt
+        if attempt > 1:
+            delay = PULL_BACKOFF_SECONDS * 2 ** (attempt - 2) * random.uniform(0.8, 1.2)
+            logging.info(f"{param}: retrying in {delay:.1f}s (attempt {attempt}/{PULL_MAX_ATTEMPTS})")
+            time.sleep(delay)
+
+        logging.info(f"{param}: running {' '.join(cmd)}")
+        try:
+            completed = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                cwd=base_dir,
+                timeout=PULL_TIMEOUT_SECONDS
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            error = str(e)
+            logging.warning(f"{param}: attempt {attempt} failed: {error}")
+            continue
+
+        if completed.stderr:
+            logging.warning(f"{param}: command stderr: {completed.stderr}")
+        if completed.returncode != 0:
+            error = f"Failed with code {completed.returncode}"
+        elif not partial_file.exists():
+            error = "File not created"
+        elif partial_file.stat().st_size == 0:
+            error = "File empty"
+        else:
+            error = None
+            break
+        logging.warning(f"{param}: attempt {attempt} failed: {error}")
+
+    result["seconds"] = round(time.monotonic() - started, 2)
+    if error:
+        partial_file.unlink(missing_ok=True)
+        result.update(status="Failed", error=error)
+        return result
+
+    sha256 = file_sha256(partial_file)
+    result.update(sha256=sha256, bytes=partial_file.stat().st_size)
+    os.replace(partial_file, output_file)
+    result["status"] = "Unchanged" if previous_entry and previous_entry.get('sha256') == sha256 else "Success"
+    return result
+
 def pull_data():
     try:
         # Load environment variables
@@ -94,9 +259,11 @@ def pull_data():
         if os.getenv('DOCKER_ENV'):
             # When running in Docker
             data_dir = Path('/app/data').resolve()
+            base_dir = '/app'
         else:
             # When running locally
             data_dir = Path('./data').resolve()
+            base_dir = os.getcwd()
             
         data_dir.mkdir(parents=True, exist_ok=True)
         logging.info(f"Using data directory: {data_dir}")
@@ -121,78 +288,57 @@ def pull_data():
             else:
                 logging.info(f"{key}: {value if value else 'NOT SET'}")
         
-        # Parameters to pull
-        parameters = [
-            'tmax_daily_tmax_region',
-            'rainfall_daily_weighted_average',
-            'rh_daily_avg_region',
-            'ws_daily_avg_region',
-            'tmin_daily_tmin_region'
-        ]
+        manifest = load_manifest(data_dir)
+        results = {}
         
-        pull_success = True  # Track if all pulls are successful
-        pull_details = []  # Store details about the pull
+        # Pull parameters concurrently; each retries on its own, so one transient
+        # failure no longer costs the other parameters
+        with ThreadPoolExecutor(max_workers=PULL_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(pull_parameter, param, data_dir, base_dir, manifest.get(param)): param
+                for param in PARAMETERS
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                param = result["parameter"]
+                results[param] = result
+                logging.info(f"{param}: {result['status']} after {result['attempts']} attempt(s) in {result['seconds']}s")
+                if result["status"] in ("Success", "Unchanged"):
+                    previous = manifest.get(param) or {}
+                    manifest[param] = {
+                        "sha256": result["sha256"],
+                        "bytes": result["bytes"],
+                        "pulled_at": datetime.now().isoformat(),
+                        # An unchanged file keeps its flag, so data pulled by a run
+                        # that skipped ingestion is still ingested later
+                        "ingested": result["status"] == "Unchanged" and previous.get("ingested", False),
+                    }
+        save_manifest(data_dir, manifest)
         
-        for param in parameters:
-            output_file = data_dir / f'{param}_data.json'
-            logging.info(f"Pulling data for parameter: {param}")
-            
-            # Construct command as a string
-            if os.getenv('DOCKER_ENV'):
-                base_dir = '/app'
-            else:
-                base_dir = os.getcwd()
-                
-            cmd = f"dataex_region_data_analysis.py -mt ecmwf_hres -r {param} -ai 9b4f37e1-00f4-4296-8c3a-914ee19989a6 -uf ADM1 -of json -o {output_file.absolute()}"
-            logging.info(f"Running command: {cmd}")
-            
-            # Run with shell=True and capture all output
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=base_dir  # Use appropriate working directory
-            )
-            
-            logging.info(f"Command exit code: {result.returncode}")
-            logging.info(f"Command stdout: {result.stdout}")
-            
-            if result.stderr:
-                logging.warning(f"Command stderr: {result.stderr}")
-            
-            if result.returncode == 0:
-                # Wait briefly and check if file exists
-                time.sleep(1)  # Give filesystem time to sync
-                if output_file.exists():
-                    file_size = output_file.stat().st_size
-                    logging.info(f"Output file size: {file_size} bytes")
-                    if file_size == 0:
-                        logging.warning(f"Output file exists but is empty: {output_file}")
-                        pull_success = False
-                        pull_details.append(f"{param}: File empty")
-                    else:
-                        pull_details.append(f"{param}: Success ({file_size} bytes)")
-                else:
-                    logging.error(f"Output file was not created: {output_file}")
-                    logging.error(f"Directory contents: {list(data_dir.glob('*'))}")
-                    pull_success = False
-                    pull_details.append(f"{param}: File not created")
-            else:
-                logging.error(f"Command failed with exit code {result.returncode}")
-                pull_success = False
-                pull_details.append(f"{param}: Failed with code {result.returncode}")
+        parameter_timings = [results[param] for param in PARAMETERS]
+        pull_details = [
+            f"{r['parameter']}: {r['status']}" + (f" ({r['error']})" if r.get('error') else f" ({r.get('bytes', 0)} bytes)" if r['status'] == "Success" else "")
+            for r in parameter_timings
+        ]
+        failed = [r['parameter'] for r in parameter_timings if r['status'] == "Failed"]
         
         # Record the pull attempt
-        pull_status = "Success" if pull_success else "Partial" if any("Success" in detail for detail in pull_details) else "Failed"
-        record_pull_history(','.join(parameters), pull_status, '; '.join(pull_details))
+        pull_status = "Success" if not failed else "Failed" if len(failed) == len(PARAMETERS) else "Partial"
+        record_pull_history(','.join(PARAMETERS), pull_status, '; '.join(pull_details), parameter_timings)
         
-        # If all data pulls were successful, process and ingest the data
-        if pull_success:
+        # If all data pulls were successful and something changed, process and ingest the data
+        if failed:
+            logging.warning(f"Skipping ingestion, parameters still failing after retries: {', '.join(failed)}. The next run resumes from them.")
+        elif all(manifest[param].get("ingested") for param in PARAMETERS):
+            logging.info("All parameter files are unchanged since the last ingestion, skipping ingestion")
+        else:
             logging.info("Starting data transformation and ingestion process...")
             try:
                 dataframes = process_weather_files()
                 ingest_to_postgresql(dataframes)
+                for param in PARAMETERS:
+                    manifest[param]["ingested"] = True
+                save_manifest(data_dir, manifest)
                 logging.info("Data transformation and ingestion completed successfully")
             except Exception as e:
                 logging.error(f"Error during data transformation/ingestion: {str(e)}")
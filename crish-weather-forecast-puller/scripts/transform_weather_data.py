@@ -3,14 +3,14 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import os
 import polars as pl
-import math
 from dotenv import load_dotenv
 import psycopg2
 from psycopg2.extras import execute_values
 import matplotlib.pyplot as plt
-import geopandas
 import io
 import boto3 # Uncommented boto3
+from map_renderer import render_maps
+from image_upload_pool import ImageUploadPool, S3_UPLOAD_WORKERS, TRANSFER_CONFIG
 
 # Load environment variables
 load_dotenv()
@@ -29,11 +29,11 @@ if S3_BUCKET_NAME and S3_ENDPOINT_URL and S3_ACCESS_KEY and S3_SECRET_KEY:
         endpoint_url=S3_ENDPOINT_URL,
         aws_access_key_id=S3_ACCESS_KEY,
         aws_secret_access_key=S3_SECRET_KEY,
-        config=boto3.session.Config(s3={'addressing_style': S3_ADDRESSING_STYLE})
+        config=boto3.session.Config(s3={'addressing_style': S3_ADDRESSING_STYLE}, max_pool_connections=S3_UPLOAD_WORKERS)
     )
     print(f"S3 client initialized for endpoint: {S3_ENDPOINT_URL}, bucket: {S3_BUCKET_NAME}")
 elif S3_BUCKET_NAME: # If only bucket is defined, assume standard AWS S3 with IAM role or env vars
-    s3_client = boto3.client('s3')
+    s3_client = boto3.client('s3', config=boto3.session.Config(max_pool_connections=S3_UPLOAD_WORKERS))
     print(f"S3 client initialized for AWS (standard, bucket: {S3_BUCKET_NAME})")
 else:
     print("S3 client not initialized. Missing S3_BUCKET or other S3 configuration variables.")
@@ -82,10 +82,28 @@ elif DEV_GEOJSON_PATH.exists():
 else:
     print(f"ERROR: GeoJSON file not found at container path ({CONTAINER_GEOJSON_PATH}) or development path ({DEV_GEOJSON_PATH}). Maps cannot be generated.")
 
-def get_day_name(date_str):
-    """Convert ISO date string to day name."""
-    dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-    return dt.strftime('%A')
+# Municipality codes mapping, joined onto the DataEx municipality names
+MUNICIPALITY_CODES = pl.DataFrame(
+    [
+        ('Atauro', 'TL-AT'),
+        ('Aileu', 'TL-AL'),
+        ('Ainaro', 'TL-AN'),
+        ('Baucau', 'TL-BA'),
+        ('Bobonaro', 'TL-BO'),
+        ('Covalima', 'TL-CO'),
+        ('Dili', 'TL-DI'),
+        ('Ermera', 'TL-ER'),
+        ('Lautém', 'TL-LA'),
+        ('Liquica', 'TL-LI'),
+        ('Liquiçá', 'TL-LI'),
+        ('Manatuto', 'TL-MT'),
+        ('Manufahi', 'TL-MF'),
+        ('Oecusse', 'TL-OE'),
+        ('Viqueque', 'TL-VI')
+    ],
+    schema=['municipality_name', 'municipality_code'],
+    orient='row'
+)
 
 def get_table_name(json_file):
     """Extract table name from JSON filename."""
@@ -104,74 +122,50 @@ def calculate_heat_index(tmax_df, rh_df):
     
     # Merge temperature and humidity data
     merged_df = tmax_df.join(
-        rh_df,
+        rh_df.select(['forecast_date', 'municipality_code', pl.col('value').alias('value_rh')]),
         on=['forecast_date', 'municipality_code'],
-        how='inner',
-        suffix='_rh'
+        how='inner'
     )
     
-    # Convert to pandas for complex calculations, then back to polars
-    pandas_df = merged_df.to_pandas()
+    # Convert Celsius to Fahrenheit
+    temp_f = pl.col('value') * 9 / 5 + 32
+    rh = pl.col('value_rh')
     
-    def calculate_hi_for_row(temp_c, rh):
-        """Calculate heat index for a single row using complete NWS algorithm."""
-        # Convert Celsius to Fahrenheit
-        temp_f = temp_c * 9 / 5 + 32
-        
-        # Step 1: Calculate simple formula first
-        simple_hi = 0.5 * (temp_f + 61.0 + ((temp_f - 68.0) * 1.2) + (rh * 0.094))
-        
-        # Step 2: Average with temperature
-        averaged_hi = (simple_hi + temp_f) / 2
-        
-        # Step 3: If averaged result is 80°F or higher, use full regression
-        if averaged_hi >= 80:
-            # Rothfusz regression equation
-            hi = (-42.379 + 
-                  2.04901523 * temp_f + 
-                  10.14333127 * rh - 
-                  0.22475541 * temp_f * rh - 
-                  0.00683783 * temp_f * temp_f - 
-                  0.05481717 * rh * rh + 
-                  0.00122874 * temp_f * temp_f * rh + 
-                  0.00085282 * temp_f * rh * rh - 
-                  0.00000199 * temp_f * temp_f * rh * rh)
-            
-            # Apply adjustments
-            # Low humidity adjustment (RH < 13% and T between 80-112°F)
-            if rh < 13 and 80 <= temp_f <= 112:
-                adjustment = ((13 - rh) / 4) * math.sqrt((17 - abs(temp_f - 95)) / 17)
-                hi = hi - adjustment
-            
-            # High humidity adjustment (RH > 85% and T between 80-87°F)
-            elif rh > 85 and 80 <= temp_f <= 87:
-                adjustment = ((rh - 85) / 10) * ((87 - temp_f) / 5)
-                hi = hi + adjustment
-            
-            return hi
-        else:
-            # Use the averaged simple formula result
-            return averaged_hi
+    # Step 1: Simple formula, averaged with temperature
+    averaged_hi = (0.5 * (temp_f + 61.0 + ((temp_f - 68.0) * 1.2) + (rh * 0.094)) + temp_f) / 2
+    
+    # Step 2: Rothfusz regression equation
+    rothfusz_hi = (-42.379 +
+                   2.04901523 * temp_f +
+                   10.14333127 * rh -
+                   0.22475541 * temp_f * rh -
+                   0.00683783 * temp_f * temp_f -
+                   0.05481717 * rh * rh +
+                   0.00122874 * temp_f * temp_f * rh +
+                   0.00085282 * temp_f * rh * rh -
+                   0.00000199 * temp_f * temp_f * rh * rh)
     
-    # Apply the calculation to each row
-    pandas_df['heat_index_f'] = pandas_df.apply(
-        lambda row: calculate_hi_for_row(row['value'], row['value_rh']), 
-        axis=1
+    # Low humidity adjustment (RH < 13% and T between 80-112°F)
+    low_rh_adjustment = ((13 - rh) / 4) * ((17 - (temp_f - 95).abs()) / 17).sqrt()
+    # High humidity adjustment (RH > 85% and T between 80-87°F)
+    high_rh_adjustment = ((rh - 85) / 10) * ((87 - temp_f) / 5)
+    
+    # Step 3: If the averaged result is 80°F or higher, use the adjusted regression
+    heat_index_f = (
+        pl.when(averaged_hi < 80).then(averaged_hi)
+          .when((rh < 13) & temp_f.is_between(80, 112)).then(rothfusz_hi - low_rh_adjustment)
+          .when((rh > 85) & temp_f.is_between(80, 87)).then(rothfusz_hi + high_rh_adjustment)
+          .otherwise(rothfusz_hi)
     )
     
     # Convert back to Celsius
-    pandas_df['heat_index_c'] = (pandas_df['heat_index_f'] - 32) * 5 / 9
-    
-    # Convert back to polars DataFrame
-    heat_index_df = pl.from_pandas(pandas_df).select([
+    return merged_df.select([
         'forecast_date',
-        'day_name', 
-        pl.col('heat_index_c').alias('value'),
+        'day_name',
+        ((heat_index_f - 32) * 5 / 9).alias('value'),
         'municipality_code',
         'municipality_name'
     ])
-    
-    return heat_index_df
 
 def get_alert_level_for_value(parameter_name, value):
     """Determines the alert level based on parameter name and value."""
@@ -195,47 +189,31 @@ def transform_weather_data(input_file):
     with open(input_file, 'r') as f:
         data = json.load(f)
     
-    # Municipality codes mapping
-    municipality_codes = {
-        'Atauro': 'TL-AT',
-        'Aileu': 'TL-AL',
-        'Ainaro': 'TL-AN',
-        'Baucau': 'TL-BA',
-        'Bobonaro': 'TL-BO',
-        'Covalima': 'TL-CO',
-        'Dili': 'TL-DI',
-        'Ermera': 'TL-ER',
-        'Lautém': 'TL-LA',
-        'Liquica': 'TL-LI',
-        'Liquiçá': 'TL-LI',
-        'Manatuto': 'TL-MT',
-        'Manufahi': 'TL-MF',
-        'Oecusse': 'TL-OE',
-        'Viqueque': 'TL-VI'
-    }
-
-    # Create lists to store the data
-    rows = []
+    # Build the columns straight from the time/value arrays, using the start
+    # date of each period without its time component
+    forecast_dates, values, names = [], [], []
     for municipality_name, data_obj in data['r_data'].items():
-        for time_period, value in zip(data_obj['time'], data_obj['value']):
-            forecast_date = time_period[0]  # Using start date of the period
-            rows.append({
-                'forecast_date': forecast_date,
-                'day_name': get_day_name(forecast_date),
-                'value': value,
-                'municipality_code': municipality_codes.get(municipality_name, ''),
-                'municipality_name': municipality_name
-            })
-    
-    # Create Polars DataFrame
-    df = pl.DataFrame(rows)
+        count = min(len(data_obj['time']), len(data_obj['value']))
+        forecast_dates.extend(time_period[0][:10] for time_period in data_obj['time'][:count])
+        values.extend(data_obj['value'][:count])
+        names.extend([municipality_name] * count)
     
-    # Transform the date format to remove time component
-    df = df.with_columns([
-        pl.col('forecast_date').str.slice(0, 10).alias('forecast_date')
-    ])
+    df = pl.DataFrame({
+        'forecast_date': pl.Series(forecast_dates, dtype=pl.String),
+        'value': pl.Series(values, dtype=pl.Float64, strict=False),
+        'municipality_name': pl.Series(names, dtype=pl.String),
+    })
     
-    return df
+    return (
+        df.join(MUNICIPALITY_CODES, on='municipality_name', how='left', maintain_order='left')
+        .select([
+            'forecast_date',
+            pl.col('forecast_date').str.to_date('%Y-%m-%d').dt.strftime('%A').alias('day_name'),
+            'value',
+            pl.col('municipality_code').fill_null(''),
+            'municipality_name'
+        ])
+    )
 
 def generate_weather_alerts(dataframes):
     """Generate weather alerts from weather parameter data."""
@@ -407,121 +385,129 @@ def process_weather_files():
     
     return dataframes
 
-def generate_forecast_map_image(forecast_df, parameter_name, forecast_date_str, municipality_name, municipality_code, geojson_path, alert_value, parameter_unit):
+PARAMETER_UNITS = {
+    'Heat Index': '°C',
+    'Rainfall': 'mm',
+    'Wind Speed': 'km/h'
+}
+
+PARAMETER_SOURCE_TABLES = {
+    'Heat Index': 'heat_index_daily_region',
+    'Rainfall': 'rainfall_daily_weighted_average',
+    'Wind Speed': 'ws_daily_avg_region'
+}
+
+def build_forecast_map_job(forecast_df, parameter_name, forecast_date_str, municipality_name, municipality_code, alert_value, parameter_unit):
     """
-    Generates a choropleth map image of the forecast for a specific parameter and date.
+    Builds the render_maps job for a choropleth map of the forecast for a specific parameter and date.
     Colors municipalities by alert level.
     """
-    try:
-        gdf = geopandas.read_file(geojson_path)
-        daily_forecast_df = forecast_df.filter(pl.col("forecast_date") == forecast_date_str).with_columns([
-            pl.col("value").round(0).alias("value")
-        ])
-        
-        if 'value' not in daily_forecast_df.columns:
-            print(f"Error: 'value' column not found in daily_forecast_df for map generation of {parameter_name}.")
-            return None
-        if 'weather_parameter' not in daily_forecast_df.columns:
-            print(f"Error: 'weather_parameter' column not found in daily_forecast_df for map generation of {parameter_name}.")
-            return None
+    daily_forecast_df = forecast_df.filter(pl.col("forecast_date") == forecast_date_str).with_columns([
+        pl.col("value").round(0).alias("value")
+    ])
+    
+    if 'value' not in daily_forecast_df.columns:
+        print(f"Error: 'value' column not found in daily_forecast_df for map generation of {parameter_name}.")
+        return None
+    if 'weather_parameter' not in daily_forecast_df.columns:
+        print(f"Error: 'weather_parameter' column not found in daily_forecast_df for map generation of {parameter_name}.")
+        return None
 
-        # Apply the get_alert_level_for_value function row-wise
-        # Ensure that the function is robust and handles potential errors if a row doesn't have expected fields.
-        alert_levels_calculated = []
-        for row in daily_forecast_df.iter_rows(named=True):
-            # iter_rows(named=True) requires Polars >= 0.19.3. If older, use .to_dicts() and iterate.
-            # Assuming 'weather_parameter' and 'value' are present as ensured by checks above.
-            alert_levels_calculated.append(get_alert_level_for_value(row['weather_parameter'], row['value']))
-        
-        daily_forecast_with_levels_df = daily_forecast_df.with_columns([
-            pl.Series("alert_level_calculated", alert_levels_calculated)
-        ])
+    colors = {
+        row['municipality_code']: ALERT_LEVEL_COLORS.get(
+            get_alert_level_for_value(row['weather_parameter'], row['value']),
+            ALERT_LEVEL_COLORS['Missing data']
+        )
+        for row in daily_forecast_df.iter_rows(named=True)
+        if row['value'] is not None
+    }
 
-        daily_forecast_pd_df = daily_forecast_with_levels_df.to_pandas()
-        merged_gdf = gdf.merge(daily_forecast_pd_df, left_on='ISO', right_on='municipality_code', how='left')
+    unit = ""
+    threshold_details = {} # To store {level: text_for_level}
 
-        merged_gdf['color'] = merged_gdf['alert_level_calculated'].map(lambda x: ALERT_LEVEL_COLORS.get(x, ALERT_LEVEL_COLORS['Missing data']))
+    if parameter_name == 'Heat Index':
+        unit = '°C'
+        threshold_details = {
+            'Extreme Danger': f'> {HEAT_INDEX_EXTREME_DANGER}',
+            'Danger': f'> {HEAT_INDEX_DANGER}',
+            'Extreme Caution': f'>= {HEAT_INDEX_EXTREME_CAUTION}',
+            'Normal': f'< {HEAT_INDEX_EXTREME_CAUTION}'
+        }
+    elif parameter_name == 'Rainfall':
+        unit = 'mm'
+        threshold_details = {
+            'Extreme Danger': f'> {RAINFALL_EXTREME_DANGER}',
+            'Danger': f'>= {RAINFALL_DANGER}',
+            'Extreme Caution': f'>= {RAINFALL_EXTREME_CAUTION}',
+            'Normal': f'< {RAINFALL_EXTREME_CAUTION}'
+        }
+    elif parameter_name == 'Wind Speed':
+        unit = 'km/h'
+        threshold_details = {
+            'Extreme Danger': f'> {WIND_SPEED_EXTREME_DANGER}',
+            'Danger': f'>= {WIND_SPEED_DANGER}',
+            'Extreme Caution': f'>= {WIND_SPEED_EXTREME_CAUTION}',
+            'Normal': f'< {WIND_SPEED_EXTREME_CAUTION}'
+        }
 
-        fig, ax = plt.subplots(1, 1, figsize=(12, 10))
-        merged_gdf.plot(color=merged_gdf['color'], ax=ax, edgecolor='black', linewidth=0.5)
+    legend = []
+    for level, color_val in ALERT_LEVEL_COLORS.items():
+        if level == 'Missing data':
+            continue # Handled separately
+
+        label_text = level
+        if level in threshold_details and unit: # Ensure unit is set
+            label_text = f"{level} ({threshold_details[level]} {unit})"
+        elif level in threshold_details: # Fallback if unit somehow not set but details exist
+             label_text = f"{level} ({threshold_details[level]})"
         
-        legend_handles = []
-        unit = ""
-        threshold_details = {} # To store {level: text_for_level}
-
-        if parameter_name == 'Heat Index':
-            unit = '°C'
-            threshold_details = {
-                'Extreme Danger': f'> {HEAT_INDEX_EXTREME_DANGER}',
-                'Danger': f'> {HEAT_INDEX_DANGER}',
-                'Extreme Caution': f'>= {HEAT_INDEX_EXTREME_CAUTION}',
-                'Normal': f'< {HEAT_INDEX_EXTREME_CAUTION}'
-            }
-        elif parameter_name == 'Rainfall':
-            unit = 'mm'
-            threshold_details = {
-                'Extreme Danger': f'> {RAINFALL_EXTREME_DANGER}',
-                'Danger': f'>= {RAINFALL_DANGER}',
-                'Extreme Caution': f'>= {RAINFALL_EXTREME_CAUTION}',
-                'Normal': f'< {RAINFALL_EXTREME_CAUTION}'
-            }
-        elif parameter_name == 'Wind Speed':
-            unit = 'km/h'
-            threshold_details = {
-                'Extreme Danger': f'> {WIND_SPEED_EXTREME_DANGER}',
-                'Danger': f'>= {WIND_SPEED_DANGER}',
-                'Extreme Caution': f'>= {WIND_SPEED_EXTREME_CAUTION}',
-                'Normal': f'< {WIND_SPEED_EXTREME_CAUTION}'
-            }
-
-        for level, color_val in ALERT_LEVEL_COLORS.items():
-            if level == 'Missing data':
-                continue # Handled separately
-
-            label_text = level
-            if level in threshold_details and unit: # Ensure unit is set
-                label_text = f"{level} ({threshold_details[level]} {unit})"
-            elif level in threshold_details: # Fallback if unit somehow not set but details exist
-                 label_text = f"{level} ({threshold_details[level]})"
-            
-            legend_handles.append(plt.Rectangle((0,0),1,1, color=color_val, label=label_text))
-
-        # Add 'Missing data' to legend if relevant (condition from original code)
-        missing_data_color = ALERT_LEVEL_COLORS.get('Missing data')
-        if missing_data_color and merged_gdf['value'].isnull().any():
-             legend_handles.append(
-                 plt.Rectangle((0,0),1,1, 
-                               color=missing_data_color, 
-                               label='Missing data')
-            )
+        legend.append((label_text, color_val))
 
-        ax.legend(handles=legend_handles, title=f"{parameter_name} Alert Levels & Thresholds", loc="lower right")
+    # Format the date for the title
+    try:
+        parsed_title_date = datetime.strptime(forecast_date_str, '%Y-%m-%d')
+        formatted_title_date = parsed_title_date.strftime('%d %B, %Y')
+    except ValueError:
+        formatted_title_date = forecast_date_str # Fallback to original if parsing fails
 
-        highlight_gdf = merged_gdf[merged_gdf['ISO'] == municipality_code]
-        if not highlight_gdf.empty:
-            highlight_gdf.plot(ax=ax, facecolor='none', edgecolor='blue', linewidth=2.5, linestyle='--')
+    return {
+        'colors': colors,
+        'highlight_code': municipality_code,
+        'legend': legend,
+        'legend_title': f"{parameter_name} Alert Levels & Thresholds",
+        'title': f'{parameter_name} Forecast for Timor-Leste - {formatted_title_date}\nAlert in {municipality_name} ({parameter_name}: {int(round(alert_value))} {parameter_unit})'
+    }
 
-        # Format the date for the title
+def generate_forecast_map_images(alerts_to_process, all_dataframes):
+    """
+    Renders the forecast map for every alert row in one batch.
+    Returns a dict of alert row index to PNG bytes for the maps that rendered.
+    """
+    job_indexes, jobs = [], []
+    for index, alert_row in alerts_to_process.iterrows():
+        source_table = PARAMETER_SOURCE_TABLES.get(alert_row['weather_parameter'])
+        if source_table not in all_dataframes:
+            continue
         try:
-            parsed_title_date = datetime.strptime(forecast_date_str, '%Y-%m-%d')
-            formatted_title_date = parsed_title_date.strftime('%d %B, %Y')
-        except ValueError:
-            formatted_title_date = forecast_date_str # Fallback to original if parsing fails
+            job = build_forecast_map_job(
+                all_dataframes[source_table].with_columns(pl.lit(alert_row['weather_parameter']).alias("weather_parameter")),
+                alert_row['weather_parameter'],
+                alert_row['forecast_date'],
+                alert_row['municipality_name'],
+                alert_row['municipality_code'],
+                alert_row['parameter_value'],
+                PARAMETER_UNITS.get(alert_row['weather_parameter'], "")
+            )
+        except Exception as e:
+            print(f"Error preparing forecast map for {alert_row['weather_parameter']} on {alert_row['forecast_date']}: {e}")
+            continue
+        if job:
+            job_indexes.append(index)
+            jobs.append(job)
 
-        ax.set_title(f'{parameter_name} Forecast for Timor-Leste - {formatted_title_date}\nAlert in {municipality_name} ({parameter_name}: {int(round(alert_value))} {parameter_unit})', fontsize=15)
-        ax.set_axis_off()
-        plt.tight_layout()
-
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=100)
-        plt.close(fig)
-        img_buffer.seek(0)
-        return img_buffer
-    except Exception as e:
-        print(f"Error generating forecast map image for {parameter_name} on {forecast_date_str}: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    print(f"Rendering {len(jobs)} forecast map images...")
+    images = render_maps(GEOJSON_FILE_PATH, ALERT_LEVEL_COLORS['Missing data'], jobs)
+    return {index: image for index, image in zip(job_indexes, images) if image}
 
 def generate_forecast_table_image(forecast_df, parameter_name, forecast_date_str, municipality_name):
     """
@@ -600,9 +586,10 @@ def generate_forecast_table_image(forecast_df, parameter_name, forecast_date_str
         traceback.print_exc()
         return None
 
-def upload_image_to_s3(image_buffer, s3_key, bucket_name):
+def upload_image_to_s3(image_bytes, s3_key, bucket_name):
     """
-    Uploads an image buffer to S3.
+    Uploads image bytes to S3 under their content-addressed key. An existing
+    object is written again to refresh its LastModified for the orphan sweep.
     Returns the S3 key if successful, None otherwise.
     """
     if not s3_client or not bucket_name:
@@ -613,7 +600,10 @@ def upload_image_to_s3(image_buffer, s3_key, bucket_name):
         return s3_key 
 
     try:
-        s3_client.put_object(Bucket=bucket_name, Key=s3_key, Body=image_buffer, ContentType='image/png')
+        s3_client.upload_fileobj(
+            io.BytesIO(image_bytes), bucket_name, s3_key,
+            ExtraArgs={'ContentType': 'image/png'}, Config=TRANSFER_CONFIG
+        )
         print(f"Successfully uploaded {s3_key} to S3 bucket {bucket_name}.")
         return s3_key
     except Exception as e:
@@ -622,8 +612,180 @@ def upload_image_to_s3(image_buffer, s3_key, bucket_name):
         traceback.print_exc()
         return None
 
+# Per-parameter tables folded into weather_forecasts_consolidated, in column order
+CONSOLIDATED_PARAMETER_TABLES = [
+    'ws_daily_avg_region',
+    'heat_index_daily_region',
+    'rainfall_daily_weighted_average',
+    'rh_daily_avg_region',
+    'tmax_daily_tmax_region',
+    'tmin_daily_tmin_region',
+]
+
+def refresh_consolidated_forecasts(conn):
+    """
+    Rebuild weather_forecasts_consolidated from the per-parameter tables.
+
+    Pivots every parameter into one row per (forecast_date, municipality_code)
+    with a single UNION ALL + GROUP BY, and swaps the contents in one
+    transaction so API readers never see a partially refreshed table.
+    Parameter tables that have not been ingested yet are left as NULL columns.
+    """
+    previous_autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cur:
+            available_tables = []
+            for table_name in CONSOLIDATED_PARAMETER_TABLES:
+                cur.execute("SELECT to_regclass(%s)", (table_name,))
+                if cur.fetchone()[0] is not None:
+                    available_tables.append(table_name)
+
+            if not available_tables:
+                print("No weather parameter tables found, skipping consolidated refresh")
+                conn.rollback()
+                return 0
+
+            parameter_rows = " UNION ALL ".join(
+                f"SELECT CAST(forecast_date AS DATE) AS forecast_date, municipality_code, "
+                f"day_name, municipality_name, '{table_name}' AS parameter, value FROM {table_name}"
+                for table_name in available_tables
+            )
+            value_columns = ", ".join(f"{table_name}_value" for table_name in CONSOLIDATED_PARAMETER_TABLES)
+            value_aggregates = ", ".join(
+                f"MAX(value) FILTER (WHERE parameter = '{table_name}')"
+                if table_name in available_tables else "NULL"
+                for table_name in CONSOLIDATED_PARAMETER_TABLES
+            )
+
+            cur.execute("DELETE FROM weather_forecasts_consolidated")
+            cur.execute(f"""
+                INSERT INTO weather_forecasts_consolidated (
+                    forecast_date, municipality_code, day_name, municipality_name, {value_columns}
+                )
+                SELECT forecast_date, municipality_code, MAX(day_name), MAX(municipality_name), {value_aggregates}
+                FROM ({parameter_rows}) AS parameter_rows
+                WHERE municipality_code <> ''
+                GROUP BY forecast_date, municipality_code
+            """)
+            rows_affected = cur.rowcount
+        conn.commit()
+        print(f"Refreshed weather_forecasts_consolidated with {rows_affected} rows from {len(available_tables)} parameter tables")
+        return rows_affected
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = previous_autocommit
+
+# Upsert keys per table. The unique index on the key doubles as the date range index.
+PARAMETER_TABLE_KEY = ['forecast_date', 'municipality_code']
+WEATHER_ALERTS_TABLE_KEY = ['municipality_code', 'forecast_date', 'weather_parameter', 'created_date']
+
+def ensure_upsert_key(cur, table_name, key_columns):
+    """
+    Make sure table_name has a unique index on exactly key_columns, which
+    INSERT ... ON CONFLICT needs. Tables created by the earlier replace-based
+    ingestion have no constraints, so duplicate keys are dropped before the
+    index is built.
+    """
+    cur.execute("""
+        SELECT 1 FROM pg_index i
+        WHERE i.indrelid = %s::regclass AND i.indisunique
+          AND (
+              SELECT array_agg(a.attname::text ORDER BY a.attname::text)
+              FROM pg_attribute a
+              WHERE a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+          ) = %s::text[]
+    """, (table_name, sorted(key_columns)))
+    if cur.fetchone():
+        return
+
+    key_match = " AND ".join(f"a.{column} IS NOT DISTINCT FROM b.{column}" for column in key_columns)
+    cur.execute(f"DELETE FROM {table_name} a USING {table_name} b WHERE a.ctid < b.ctid AND {key_match}")
+    if cur.rowcount:
+        print(f"Removed {cur.rowcount} duplicate rows from {table_name} before adding its upsert key")
+    cur.execute(
+        f"CREATE UNIQUE INDEX ux_{table_name}_upsert_key "
+        f"ON {table_name} ({', '.join(key_columns)})"
+    )
+
+def upsert_dataframe(conn, db_uri, df, table_name, key_columns, resync_columns=None):
+    """
+    Incrementally load df into table_name, keeping rows from earlier pulls.
+
+    The frame is bulk loaded with ADBC into a staging table, then merged with
+    INSERT ... ON CONFLICT DO UPDATE in one transaction, so readers keep seeing
+    the previous rows until the commit and never an empty table.
+
+    resync_columns: optional columns scoping rows that this pull fully
+    restates. Existing rows with the same values for these columns but no
+    longer present in df are deleted in the same transaction.
+    """
+    staging_table = f"{table_name}_staging"
+    df.write_database(
+        table_name=staging_table,
+        connection=db_uri,
+        if_table_exists='replace',  # Staging only, never read by Superset
+        engine='adbc'
+    )
+
+    previous_autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (table_name,))
+            if cur.fetchone()[0] is None:
+                cur.execute(f"CREATE TABLE {table_name} (LIKE {staging_table})")
+            ensure_upsert_key(cur, table_name, key_columns)
+
+            # Cast staged columns to the target types, e.g. text dates from older tables
+            cur.execute("""
+                SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+            """, (table_name,))
+            target_types = dict(cur.fetchall())
+            columns = [column for column in df.columns if column in target_types]
+            keys = ", ".join(key_columns)
+            staged_columns = ", ".join(f"CAST({column} AS {target_types[column]}) AS {column}" for column in columns)
+
+            if resync_columns:
+                scope = ", ".join(resync_columns)
+                staged_scope = ", ".join(f"CAST({column} AS {target_types[column]})" for column in resync_columns)
+                key_match = " AND ".join(f"s.{column} IS NOT DISTINCT FROM t.{column}" for column in key_columns)
+                cur.execute(f"""
+                    DELETE FROM {table_name} t
+                    WHERE ({scope}) IN (SELECT DISTINCT {staged_scope} FROM {staging_table})
+                      AND NOT EXISTS (
+                          SELECT 1 FROM (SELECT {staged_columns} FROM {staging_table}) s WHERE {key_match}
+                      )
+                """)
+                if cur.rowcount:
+                    print(f"Removed {cur.rowcount} rows from {table_name} no longer present in this pull")
+
+            updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column not in key_columns)
+            cur.execute(f"""
+                INSERT INTO {table_name} ({', '.join(columns)})
+                SELECT DISTINCT ON ({keys}) {staged_columns}
+                FROM {staging_table}
+                ORDER BY {keys}
+                ON CONFLICT ({keys}) DO {f'UPDATE SET {updates}' if updates else 'NOTHING'}
+            """)
+            rows_affected = cur.rowcount
+            cur.execute(f"DROP TABLE {staging_table}")
+        conn.commit()
+        return rows_affected
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = previous_autocommit
+
 def ingest_to_postgresql(dataframes):
-    """Ingest dataframes into PostgreSQL database using Polars write_database with ADBC."""
+    """
+    Ingest dataframes into PostgreSQL, upserting each pull into the existing
+    tables so forecast history is kept and readers never see an empty table.
+    """
     # Construct PostgreSQL connection URI from environment variables with fallbacks
     db_uri = (
         f"postgresql://{os.getenv('DATABASE_USER', 'superset')}:{os.getenv('DATABASE_PASSWORD', 'superset')}"
@@ -640,13 +802,11 @@ def ingest_to_postgresql(dataframes):
                 if table_name != 'weather_forecast_alerts':  # Handle alerts separately
                     print(f"Ingesting data to PostgreSQL for table: {table_name}")
                     
-                    # Write DataFrame to database using Polars native method with ADBC
-                    rows_affected = df.write_database(
-                        table_name=table_name,
-                        connection=db_uri,
-                        if_table_exists='replace',  # This will create new or replace existing table
-                        engine='adbc'  # Using ADBC engine instead of SQLAlchemy
-                    )
+                    # Store forecast_date as a native DATE so range filters can use the index
+                    df = df.with_columns(pl.col('forecast_date').str.to_date('%Y-%m-%d'))
+                    
+                    # Stage with ADBC and upsert on (forecast_date, municipality_code)
+                    rows_affected = upsert_dataframe(conn, db_uri, df, table_name, PARAMETER_TABLE_KEY)
                     
                     print(f"Successfully inserted/updated {rows_affected} rows into {table_name}")
             
@@ -671,12 +831,12 @@ def ingest_to_postgresql(dataframes):
                     pl.lit(datetime.now().strftime('%Y-%m-%d')).alias('created_date')
                 )
                 
-                # First, ingest the weather forecast alerts to the database
-                rows_affected = weather_alerts_df.write_database(
-                    table_name='weather_forecast_alerts',
-                    connection=db_uri,
-                    if_table_exists='replace',
-                    engine='adbc'
+                # First, ingest the weather forecast alerts to the database. Alerts issued
+                # today for the pulled forecast dates are restated by this pull, so ones
+                # that dropped back to Normal since an earlier pull today are removed.
+                rows_affected = upsert_dataframe(
+                    conn, db_uri, weather_alerts_df, 'weather_forecast_alerts',
+                    WEATHER_ALERTS_TABLE_KEY, resync_columns=['created_date', 'forecast_date']
                 )
                 print(f"Successfully inserted/updated {rows_affected} rows into weather_forecast_alerts")
                 
@@ -692,6 +852,9 @@ def ingest_to_postgresql(dataframes):
                         print(f"Creating bulletins for {high_severity_alerts.shape[0]} high severity weather alerts")
                         create_weather_bulletins_with_links(high_severity_alerts, dataframes, conn)
             
+            # Keep the combined forecast table in step with the parameter tables
+            refresh_consolidated_forecasts(conn)
+            
             print("All data successfully ingested to PostgreSQL")
             
     except Exception as e:
@@ -710,8 +873,19 @@ def create_weather_bulletins_with_links(high_severity_alerts_df, all_dataframes,
     """
     alerts_to_process = high_severity_alerts_df.to_pandas()
     
-    with db_connection.cursor() as cur:
-        for _, alert_row in alerts_to_process.iterrows():
+    actual_s3_bucket = os.getenv("S3_BUCKET")
+    if not actual_s3_bucket: print("ERROR: S3_BUCKET environment variable not set. Cannot upload chart images.")
+
+    # Render every map for the run up front, in parallel, instead of one figure per alert
+    map_images = {}
+    if GEOJSON_FILE_PATH and actual_s3_bucket:
+        map_images = generate_forecast_map_images(alerts_to_process, all_dataframes)
+
+    # Attachments are inserted once their uploads finish: (bulletin_id, key future, caption, timestamp)
+    pending_attachments = []
+
+    with db_connection.cursor() as cur, ImageUploadPool(upload_image_to_s3, actual_s3_bucket) as upload_pool:
+        for alert_index, alert_row in alerts_to_process.iterrows():
             # Create composite ID for linking bulletin to weather forecast alert
             composite_id = f"{alert_row['municipality_code']}_{alert_row['created_date']}_{alert_row['forecast_date']}_{alert_row['weather_parameter']}"
             
@@ -758,10 +932,7 @@ def create_weather_bulletins_with_links(high_severity_alerts_df, all_dataframes,
             
             parameter_value = round(alert_row['parameter_value'], 2)
 
-            parameter_unit = ""
-            if alert_row['weather_parameter'] == 'Heat Index': parameter_unit = "°C"
-            elif alert_row['weather_parameter'] == 'Rainfall': parameter_unit = "mm"
-            elif alert_row['weather_parameter'] == 'Wind Speed': parameter_unit = "km/h"
+            parameter_unit = PARAMETER_UNITS.get(alert_row['weather_parameter'], "")
 
             advisory = (
                 f"{alert_row['alert_title']} for {alert_row['municipality_name']} on {formatted_display_date}.\n\n"
@@ -798,11 +969,8 @@ def create_weather_bulletins_with_links(high_severity_alerts_df, all_dataframes,
             # Create hashtags
             hashtags = f"weather,alert,{alert_row['weather_parameter'].lower().replace(' ', '')},{alert_row['municipality_name'].lower()}"
             
-            bulletin_s3_image_keys = []
-            parameter_source_table = None
-            if alert_row['weather_parameter'] == 'Heat Index': parameter_source_table = 'heat_index_daily_region'
-            elif alert_row['weather_parameter'] == 'Rainfall': parameter_source_table = 'rainfall_daily_weighted_average'
-            elif alert_row['weather_parameter'] == 'Wind Speed': parameter_source_table = 'ws_daily_avg_region'
+            bulletin_image_uploads = []
+            parameter_source_table = PARAMETER_SOURCE_TABLES.get(alert_row['weather_parameter'])
             
             full_parameter_df_for_charts = None
             if parameter_source_table and parameter_source_table in all_dataframes:
@@ -810,30 +978,14 @@ def create_weather_bulletins_with_links(high_severity_alerts_df, all_dataframes,
                     pl.lit(alert_row['weather_parameter']).alias("weather_parameter")
                 )
 
-            actual_s3_bucket = os.getenv("S3_BUCKET")
-            if not actual_s3_bucket: print("ERROR: S3_BUCKET environment variable not set. Cannot upload chart images.")
-
             if full_parameter_df_for_charts is not None and GEOJSON_FILE_PATH and actual_s3_bucket:
-                # 1. Forecast Map Image
-                # Pass the original YYYY-MM-DD date string to chart functions
-                map_image_buffer = generate_forecast_map_image(
-                    full_parameter_df_for_charts, 
-                    alert_row['weather_parameter'], 
-                    original_forecast_date_str, # Use original string
-                    alert_row['municipality_name'],
-                    alert_row['municipality_code'],
-                    GEOJSON_FILE_PATH,
-                    alert_row['parameter_value'],
-                    parameter_unit
-                )
-                if map_image_buffer:
-                    map_s3_key = f"bulletin_charts/map_{original_forecast_date_str}_{alert_row['weather_parameter'].replace(' ', '_')}_{alert_row['municipality_code']}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}.png"
-                    uploaded_map_key = upload_image_to_s3(map_image_buffer, map_s3_key, bucket_name=actual_s3_bucket) 
-                    if uploaded_map_key:
-                        bulletin_s3_image_keys.append({
-                            "key": uploaded_map_key, 
-                            "caption": f"{alert_row['weather_parameter']} forecast map for {alert_row['municipality_name']} on {formatted_display_date}" # Use display date for caption
-                        })
+                # 1. Forecast Map Image, rendered above
+                if alert_index in map_images:
+                    map_image_buffer = io.BytesIO(map_images[alert_index])
+                    bulletin_image_uploads.append((
+                        upload_pool.submit(map_image_buffer, "bulletin_charts"),
+                        f"{alert_row['weather_parameter']} forecast map for {alert_row['municipality_name']} on {formatted_display_date}" # Use display date for caption
+                    ))
 
                 # 2. Forecast Table Image
                 table_image_buffer = generate_forecast_table_image(
@@ -843,13 +995,10 @@ def create_weather_bulletins_with_links(high_severity_alerts_df, all_dataframes,
                     alert_row['municipality_name']
                 )
                 if table_image_buffer:
-                    table_s3_key = f"bulletin_charts/table_{original_forecast_date_str}_{alert_row['weather_parameter'].replace(' ', '_')}_{alert_row['municipality_code']}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}.png"
-                    uploaded_table_key = upload_image_to_s3(table_image_buffer, table_s3_key, bucket_name=actual_s3_bucket)
-                    if uploaded_table_key:
-                        bulletin_s3_image_keys.append({
-                            "key": uploaded_table_key, 
-                            "caption": f"{alert_row['weather_parameter']} forecast table for {alert_row['municipality_name']}" # Display date is implicit in table content
-                        })
+                    bulletin_image_uploads.append((
+                        upload_pool.submit(table_image_buffer, "bulletin_charts"),
+                        f"{alert_row['weather_parameter']} forecast table for {alert_row['municipality_name']}" # Display date is implicit in table content
+                    ))
             else:
                 if not GEOJSON_FILE_PATH:
                     print("Skipping map generation as GeoJSON_FILE_PATH is not set or file not found.")
@@ -921,22 +1070,29 @@ def create_weather_bulletins_with_links(high_severity_alerts_df, all_dataframes,
                 bulletin_id = cur.fetchone()[0]
                 print(f"Created new bulletin: {title} with ID: {bulletin_id}, linked to weather alert: {composite_id}")
 
-            # --- Insert image attachments if any ---
-            if bulletin_id and bulletin_s3_image_keys:
-                attachment_insert_sql = """
-                INSERT INTO bulletin_image_attachments (
-                    bulletin_id, s3_key, caption, created_on, changed_on
-                ) VALUES (%s, %s, %s, %s, %s)
-                """
-                for img_data in bulletin_s3_image_keys:
-                    cur.execute(attachment_insert_sql, (
-                        bulletin_id,
-                        img_data["key"],
-                        img_data["caption"],
-                        current_time,
-                        current_time
-                    ))
-                    print(f"  Attached image: {img_data['key']} to bulletin {bulletin_id}")
+            if bulletin_id:
+                pending_attachments.extend(
+                    (bulletin_id, key_future, caption, current_time) for key_future, caption in bulletin_image_uploads
+                )
+
+        # --- Insert image attachments once their uploads have finished ---
+        attachment_insert_sql = """
+        INSERT INTO bulletin_image_attachments (
+            bulletin_id, s3_key, caption, created_on, changed_on
+        ) VALUES (%s, %s, %s, %s, %s)
+        """
+        for bulletin_id, key_future, caption, current_time in pending_attachments:
+            uploaded_key = key_future.result()
+            if not uploaded_key:
+                continue
+            cur.execute(attachment_insert_sql, (
+                bulletin_id,
+                uploaded_key,
+                caption,
+                current_time,
+                current_time
+            ))
+            print(f"  Attached image: {uploaded_key} to bulletin {bulletin_id}")
             
     print(f"Finished processing bulletins for high severity weather alerts.")
 
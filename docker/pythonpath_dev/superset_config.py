@@ -82,6 +82,15 @@ S3_PRESIGNED_URL_EXPIRATION = int(os.getenv('S3_PRESIGNED_URL_EXPIRATION', 3600)
 S3_ADDRESSING_STYLE = os.getenv('S3_ADDRESSING_STYLE', 'path') # 'path' or 'virtual'
 S3_PUBLIC_ENDPOINT_URL = os.getenv('S3_PUBLIC_ENDPOINT_URL', 'https://s3.dnmg.gov.tl') # For frontend access
 
+# Bulletin PDFs download attachment images concurrently and embed them resampled to this DPI
+BULLETIN_PDF_IMAGE_DPI = int(os.getenv('BULLETIN_PDF_IMAGE_DPI', 150))
+BULLETIN_PDF_IMAGE_JPEG_QUALITY = int(os.getenv('BULLETIN_PDF_IMAGE_JPEG_QUALITY', 85))
+BULLETIN_PDF_IMAGE_FETCH_WORKERS = int(os.getenv('BULLETIN_PDF_IMAGE_FETCH_WORKERS', 6))
+
+# Health facility lookups (/municipalities, /types, /locations, /counts) are served from an
+# in-memory snapshot; other workers' writes are picked up after at most this many seconds
+HEALTH_FACILITIES_SNAPSHOT_REVALIDATE_SECONDS = int(os.getenv('HEALTH_FACILITIES_SNAPSHOT_REVALIDATE_SECONDS', 30))
+
 # Facebook Dissemination Configuration
 FACEBOOK_APP_ID = os.getenv('FACEBOOK_APP_ID')
 FACEBOOK_APP_SECRET = os.getenv('FACEBOOK_APP_SECRET')
@@ -98,6 +107,10 @@ WHATSAPP_PHONE_NUMBER_ID = os.getenv("WHATSAPP_PHONE_NUMBER_ID") # Your Phone Nu
 WHATSAPP_BUSINESS_ACCOUNT_ID = os.getenv("WHATSAPP_BUSINESS_ACCOUNT_ID") # Your WhatsApp Business Account ID
 WHATSAPP_ACCESS_TOKEN = os.getenv("WHATSAPP_ACCESS_TOKEN") # IMPORTANT: Replace with your actual token
 WHATSAPP_DEFAULT_TEMPLATE_NAME = os.getenv("WHATSAPP_DEFAULT_TEMPLATE_NAME", "bulletin_alert") 
+# Dissemination jobs send WhatsApp messages concurrently, at most WHATSAPP_SEND_RATE_LIMIT per second
+WHATSAPP_SEND_MAX_WORKERS = int(os.getenv("WHATSAPP_SEND_MAX_WORKERS", 8))
+WHATSAPP_SEND_RATE_LIMIT = float(os.getenv("WHATSAPP_SEND_RATE_LIMIT", 20))
+WHATSAPP_SEND_MAX_RETRIES = int(os.getenv("WHATSAPP_SEND_MAX_RETRIES", 3)) # Retries of throttled (429) calls and connection errors, never of 5xx
 
 # Celery configuration disabled - no workers will be used
 # class CeleryConfig:
@@ -107,6 +120,9 @@ WHATSAPP_DEFAULT_TEMPLATE_NAME = os.getenv("WHATSAPP_DEFAULT_TEMPLATE_NAME", "bu
 #         "superset.tasks.scheduler",
 #         "superset.tasks.thumbnails",
 #         "superset.tasks.cache",
+#         "superset.tasks.dissemination",
+#         "superset.tasks.bulletin_pdf",
+#         "superset.tasks.bulletin_images",
 #     )
 #     result_backend = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_RESULTS_DB}"
 #     worker_prefetch_multiplier = 1
@@ -120,6 +136,10 @@ WHATSAPP_DEFAULT_TEMPLATE_NAME = os.getenv("WHATSAPP_DEFAULT_TEMPLATE_NAME", "bu
 #             "task": "reports.prune_log",
 #             "schedule": crontab(minute=10, hour=0),
 #         },
+#         "bulletins.sweep_orphaned_images": {
+#             "task": "bulletins.sweep_orphaned_images",
+#             "schedule": crontab(minute=30, hour=3),
+#         },
 #     }
 
 # Disable Celery completely
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark generate_bulletin_pdf on a bulletin with map and table attachments.
+
+Builds a synthetic bulletin with 6 large images (4 choropleth maps, 2 data
+tables) served by an in-memory S3 client that adds a fixed latency per GET,
+then renders it the previous way (serial downloads, images embedded at full
+resolution as PNG) and with the concurrent prefetch and downscaling, and
+reports time and PDF size for both.
+
+Usage:
+    SUPERSET_SECRET_KEY=... python scripts/benchmark_bulletin_pdf.py [--latency 0.15] [--runs 3]
+"""
+
+import argparse
+import io
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+def build_map(seed, size=(3000, 2400)):
+    """A choropleth-like map: smooth shaded relief under coloured regions and borders."""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    yy, xx = np.mgrid[0:height, 0:width]
+    relief = np.sin(xx / 97.0 + seed) * np.cos(yy / 131.0) * 40 + rng.normal(0, 6, (height, width))
+    base = np.clip(np.stack([200 + relief, 220 + relief, 190 + relief], axis=-1), 0, 255).astype(np.uint8)
+    img = Image.fromarray(base, "RGB").convert("RGBA")
+    overlay = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    palette = [(255, 255, 178, 140), (254, 204, 92, 140), (253, 141, 60, 140), (227, 26, 28, 140)]
+    for _ in range(40):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        points = [(x + rng.integers(-300, 300), y + rng.integers(-300, 300)) for _ in range(7)]
+        draw.polygon(points, fill=palette[rng.integers(0, len(palette))], outline=(60, 60, 60, 255))
+    return Image.alpha_composite(img, overlay)
+
+
+def build_table(seed, rows=40, size=(2400, 1800)):
+    """A rendered data table: text on white with grid lines."""
+    rng = np.random.default_rng(seed)
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    row_height = size[1] // (rows + 1)
+    for row in range(rows + 1):
+        y = row * row_height
+        draw.line([(0, y), (size[0], y)], fill=(180, 180, 180), width=2)
+        values = ["Municipality %02d" % row] + [str(v) for v in rng.integers(0, 500, 8)]
+        for col, value in enumerate(values):
+            draw.text((20 + col * 260, y + row_height // 3), value, fill=(0, 0, 0))
+    return img
+
+
+def png_bytes(img):
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class SlowS3Client:
+    """In-memory S3 client, each GET waits ``latency`` seconds like a remote MinIO."""
+
+    def __init__(self, objects, latency):
+        self.objects = objects
+        self.latency = latency
+        self.meta = SimpleNamespace(endpoint_url="http://benchmark")
+
+    def get_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        time.sleep(self.latency)
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+
+def legacy_process(data, max_width, max_height, dpi, quality):
+    """Image handling as implemented before the prefetch stage: full resolution PNG."""
+    from superset.utils.pdf import BulletinImage
+
+    img = Image.open(io.BytesIO(data))
+    if img.mode == "RGBA":
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, (0, 0), img.split()[3])
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return BulletinImage(output.getvalue(), *img.size)
+
+
+def render(generate_bulletin_pdf, bulletin, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pdf = generate_bulletin_pdf(bulletin).getvalue()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.15, help="Seconds per S3 GET")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from superset.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        from superset.utils import pdf as pdf_module
+
+        images = [build_map(seed) for seed in range(4)] + [build_table(seed) for seed in range(2)]
+        objects = {f"bulletin_images/benchmark-{i}.png": png_bytes(img) for i, img in enumerate(images)}
+        bulletin = SimpleNamespace(
+            id=0,
+            title="Benchmark bulletin",
+            advisory="Advisory text. " * 40,
+            risks="Risk text. " * 40,
+            safety_tips="Safety tips. " * 40,
+            created_on=datetime(2026, 10, 17, 6, 0),
+            changed_on=datetime(2026, 10, 17, 6, 0),
+            image_attachments=[
+                SimpleNamespace(id=i, s3_key=key, caption=f"Attachment {i}")
+                for i, key in enumerate(objects)
+            ],
+        )
+        print(f"Attachments: {len(objects)} images, {sum(map(len, objects.values())) / 1e6:.1f} MB, "
+              f"{args.latency * 1000:.0f} ms per GET")
+
+        config = {
+            "S3_BUCKET": "benchmark",
+            "S3_ENDPOINT_URL": "http://benchmark",
+            "S3_ACCESS_KEY": "benchmark",
+            "S3_SECRET_KEY": "benchmark",
+        }
+        client = SlowS3Client(objects, args.latency)
+        with mock.patch.dict(app.config, config), mock.patch(
+            "superset.utils.object_storage.get_s3_client", return_value=client
+        ):
+            with mock.patch.dict(app.config, {"BULLETIN_PDF_IMAGE_FETCH_WORKERS": 1}), mock.patch.object(
+                pdf_module, "process_bulletin_image", legacy_process
+            ), mock.patch.object(pdf_module, "IMAGE_CACHE_SIZE", 0):
+                legacy_seconds, legacy_size = render(pdf_module.generate_bulletin_pdf, bulletin, args.runs)
+
+            with mock.patch.object(pdf_module, "IMAGE_CACHE_SIZE", 0):
+                cold_seconds, cold_size = render(pdf_module.generate_bulletin_pdf, bulletin, args.runs)
+
+            pdf_module._image_cache.clear()
+            render(pdf_module.generate_bulletin_pdf, bulletin, 1)
+            warm_seconds, _ = render(pdf_module.generate_bulletin_pdf, bulletin, args.runs)
+
+        print(f"Serial, full resolution: {legacy_seconds:8.3f} s  {legacy_size / 1e6:7.2f} MB")
+        print(f"Prefetch, downscaled:    {cold_seconds:8.3f} s  {cold_size / 1e6:7.2f} MB")
+        print(f"Prefetch, cached images: {warm_seconds:8.3f} s")
+        print(f"Speedup (cold):          {legacy_seconds / cold_seconds:8.1f} x")
+        print(f"Size reduction:          {legacy_size / cold_size:8.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark the TLHIS case report transform used by /api/v1/update_case_reports/upload.
+
+Builds a synthetic 52-sheet workbook (one sheet per epidemiological week) in
+the >= 2025 layout, then times the vectorized
+UpdateCaseReportsRestApi._transform_data against the previous row-by-row
+implementation and checks that both produce the same values.
+
+Usage:
+    SUPERSET_SECRET_KEY=... python scripts/benchmark_case_reports_upload.py [--diseases 150] [--sheets 52]
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+AGE_GROUPS = ["<1", "1 - 4", "5 - 14", "15 - 24", "25 - 39", "40 - 59", "60+"]
+AGE_GROUP_CLEAN_NAMES = {
+    "<1": "LessThan1",
+    "1 - 4": "1to4",
+    "5 - 14": "5to14",
+    "15 - 24": "15to24",
+    "25 - 39": "25to39",
+    "40 - 59": "40to59",
+    "60+": "60Plus",
+}
+
+
+def build_workbook(sheet_count, disease_count, seed=42):
+    """Create an in-memory workbook matching the TLHIS weekly report layout."""
+    rng = np.random.default_rng(seed)
+    header_top = ["No", "Disease"] + [group for group in AGE_GROUPS for _ in range(4)]
+    header_bottom = ["", ""] + ["Case M", "Case F", "Death M", "Death F"] * len(AGE_GROUPS)
+
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for week in range(1, sheet_count + 1):
+            counts = rng.integers(0, 40, size=(disease_count, len(AGE_GROUPS) * 4)).astype(object)
+            # Sprinkle blanks the way real reports leave empty cells
+            counts[rng.random(counts.shape) < 0.1] = None
+            rows = [header_top, header_bottom]
+            for i in range(disease_count):
+                rows.append([i + 1, f"Disease {i:03d}"] + list(counts[i]))
+            pd.DataFrame(rows).to_excel(writer, sheet_name=f"Week {week}", header=False, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def legacy_transform(api, df):
+    """Row-by-row transform as implemented before vectorization."""
+    normalized_columns = api._create_normalized_columns(AGE_GROUPS, AGE_GROUP_CLEAN_NAMES)
+    normalized_data = []
+    total_columns_in_file = len(df.columns)
+    for _, row in df.iloc[2:].iterrows():
+        disease_name = row.iloc[1]
+        if pd.isna(disease_name) or not isinstance(disease_name, str):
+            continue
+        normalized_row = {col: 0 for col in normalized_columns}
+        normalized_row["disease"] = disease_name.strip()
+        totals = dict.fromkeys(["cm", "cf", "dm", "df"], 0)
+        col_idx = 2
+        for age_group in AGE_GROUPS:
+            age_clean = AGE_GROUP_CLEAN_NAMES[age_group]
+            if col_idx + 4 > total_columns_in_file:
+                break
+            cm, cf, dm, dfm = (
+                float(row.iloc[col_idx + i]) if pd.notna(row.iloc[col_idx + i]) else 0 for i in range(4)
+            )
+            normalized_row[f"{age_clean}CaseMale"] = cm
+            normalized_row[f"{age_clean}CaseFemale"] = cf
+            normalized_row[f"{age_clean}DeathMale"] = dm
+            normalized_row[f"{age_clean}DeathFemale"] = dfm
+            normalized_row[f"{age_clean}TotalCases"] = cm + cf
+            normalized_row[f"{age_clean}TotalCasesMale"] = cm
+            normalized_row[f"{age_clean}TotalCasesFemale"] = cf
+            normalized_row[f"{age_clean}TotalDeaths"] = dm + dfm
+            normalized_row[f"{age_clean}TotalDeathsMale"] = dm
+            normalized_row[f"{age_clean}TotalDeathsFemale"] = dfm
+            totals["cm"] += cm
+            totals["cf"] += cf
+            totals["dm"] += dm
+            totals["df"] += dfm
+            col_idx += 4
+        normalized_row["totalCases"] = totals["cm"] + totals["cf"]
+        normalized_row["totalCasesMale"] = totals["cm"]
+        normalized_row["totalCasesFemale"] = totals["cf"]
+        normalized_row["totalDeaths"] = totals["dm"] + totals["df"]
+        normalized_row["totalDeathsMale"] = totals["dm"]
+        normalized_row["totalDeathsFemale"] = totals["df"]
+        normalized_data.append(normalized_row)
+    return pd.DataFrame(normalized_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sheets", type=int, default=52)
+    parser.add_argument("--diseases", type=int, default=150)
+    args = parser.parse_args()
+
+    from superset.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        from superset.views.diseases.api import UpdateCaseReportsRestApi
+
+        # The transform helpers do not depend on the FAB registration state
+        api = UpdateCaseReportsRestApi.__new__(UpdateCaseReportsRestApi)
+
+        print(f"Building synthetic workbook: {args.sheets} sheets x {args.diseases} diseases")
+        workbook = build_workbook(args.sheets, args.diseases)
+
+        start = time.perf_counter()
+        excel_file = pd.ExcelFile(workbook)
+        sheets = {
+            name: pd.read_excel(excel_file, sheet_name=name, header=None).dropna(how="all").reset_index(drop=True)
+            for name in excel_file.sheet_names
+        }
+        read_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        legacy = {name: legacy_transform(api, df) for name, df in sheets.items()}
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = {name: api._transform_data(df, 2025) for name, df in sheets.items()}
+        vectorized_seconds = time.perf_counter() - start
+
+        for name in sheets:
+            pd.testing.assert_frame_equal(
+                legacy[name].astype({"disease": object}),
+                vectorized[name][legacy[name].columns],
+                check_dtype=False,
+            )
+
+        rows = sum(len(df) for df in vectorized.values())
+        print(f"Rows transformed:        {rows}")
+        print(f"Excel parse:             {read_seconds:8.3f} s")
+        print(f"Row-by-row transform:    {legacy_seconds:8.3f} s")
+        print(f"Vectorized transform:    {vectorized_seconds:8.3f} s")
+        print(f"Transform speedup:       {legacy_seconds / vectorized_seconds:8.1f} x")
+        print("Outputs match.")
+
+
+if __name__ == "__main__":
+    main()
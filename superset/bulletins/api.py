@@ -16,45 +16,74 @@ from superset.views.filters import BaseFilterRelatedUsers, FilterRelatedOwners
 import json
 from superset.views.base_api import requires_json, statsd_metrics
 from superset.commands.exceptions import DeleteFailedError
-from superset.utils.pdf import generate_bulletin_pdf
-from superset.extensions import cache_manager
+from superset.bulletins.pdf_store import get_bulletin_pdf
+from superset.tasks.bulletin_pdf import queue_bulletin_pdf
+from superset.utils.object_storage import (
+    content_key,
+    ensure_bucket,
+    get_s3_client,
+    PendingObject,
+    presigned_get_url,
+    upload_objects,
+)
 from io import BytesIO
 import os
-import uuid
-import boto3
 from botocore.exceptions import ClientError
 from werkzeug.utils import secure_filename
 from datetime import datetime, date, timedelta
 import logging
-from sqlalchemy import cast, asc, desc, or_, and_
+from sqlalchemy import cast, asc, desc, or_, and_, tuple_
 from sqlalchemy.types import Date as SQLDate, String
 
 logger = logging.getLogger(__name__)
 
 def _get_s3_client():
-    return boto3.client(
-        's3',
-        endpoint_url=current_app.config.get('S3_ENDPOINT_URL'),
-        aws_access_key_id=current_app.config.get('S3_ACCESS_KEY'),
-        aws_secret_access_key=current_app.config.get('S3_SECRET_KEY'),
-        config=boto3.session.Config(signature_version='s3v4', s3={'addressing_style': current_app.config.get('S3_ADDRESSING_STYLE', 'path')})
-    )
+    return get_s3_client()
 
 def _get_s3_client_for_presigning():
     public_endpoint = current_app.config.get('S3_PUBLIC_ENDPOINT_URL')
     if not public_endpoint:
         current_app.logger.error("S3_PUBLIC_ENDPOINT_URL is not configured for presigning client.")
         return None
-    return boto3.client(
-        's3',
-        endpoint_url=public_endpoint,
-        aws_access_key_id=current_app.config.get('S3_ACCESS_KEY'),
-        aws_secret_access_key=current_app.config.get('S3_SECRET_KEY'),
-        config=boto3.session.Config(
-            signature_version='s3v4', 
-            s3={'addressing_style': current_app.config.get('S3_ADDRESSING_STYLE', 'path')}
-        )
-    )
+    # Process wide client for the public endpoint, signing URLs makes no requests
+    return get_s3_client(public_endpoint)
+
+def _created_date_key(value):
+    """Comparable created_date of a weather alert or of the part of a composite ID"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+def _weather_alerts_by_composite_id(composite_ids) -> dict:
+    """
+    Resolve weather alert composite IDs (municipality_created_forecast_parameter)
+    to their WeatherForecastAlert with one primary key lookup.
+    """
+    keys = {}
+    for composite_id in set(composite_ids):
+        parts = composite_id.split('_', 3) if isinstance(composite_id, str) else []
+        if len(parts) == 4:
+            municipality_code, created_date, forecast_date, weather_parameter = parts
+            keys[composite_id] = (municipality_code, _created_date_key(created_date), forecast_date, weather_parameter)
+    if not keys:
+        return {}
+
+    alerts = db.session.query(WeatherForecastAlert).filter(
+        tuple_(
+            WeatherForecastAlert.municipality_code,
+            WeatherForecastAlert.created_date,
+            WeatherForecastAlert.forecast_date,
+            WeatherForecastAlert.weather_parameter
+        ).in_(list(keys.values()))
+    ).all()
+    alerts_by_key = {
+        (alert.municipality_code, _created_date_key(alert.created_date), alert.forecast_date, alert.weather_parameter): alert
+        for alert in alerts
+    }
+    return {composite_id: alerts_by_key.get(key) for composite_id, key in keys.items()}
 
 class BulletinsRestApi(BaseSupersetModelRestApi):
     datamodel = SQLAInterface(Bulletin)
@@ -104,10 +133,11 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
         "title",
     ]
 
-    # Eager load image_attachments and disease_forecast_alert to avoid N+1 queries and issues with dynamic loading
+    # Eager load image_attachments, disease_forecast_alert and created_by to avoid N+1 queries and issues with dynamic loading
     list_query_options = [
         db.joinedload(Bulletin.image_attachments),
-        db.joinedload(Bulletin.disease_forecast_alert)
+        db.joinedload(Bulletin.disease_forecast_alert),
+        db.joinedload(Bulletin.created_by)
     ]
     show_query_options = [
         db.joinedload(Bulletin.image_attachments),
@@ -141,18 +171,6 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
         # FAB handles changed_on by default.
         pass # Image handling moved to the PUT endpoint
 
-    def _delete_s3_object(self, object_key: str) -> None:
-        if not object_key:
-            return
-        try:
-            s3_client = _get_s3_client()
-            bucket_name = current_app.config.get('S3_BUCKET')
-            s3_client.delete_object(Bucket=bucket_name, Key=object_key)
-            current_app.logger.info(f"Deleted S3 object: {object_key}") # Use current_app.logger
-        except ClientError as e:
-            current_app.logger.error(f"Error deleting S3 object {object_key}: {e}")
-            # Depending on requirements, you might want to raise an exception or handle silently
-
     def _handle_image_attachment_upload(self, bulletin_item: Bulletin, is_update: bool = False) -> None:
         """
         Handles uploading multiple image attachments and their captions.
@@ -170,7 +188,6 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
         # --- Handling existing attachments (for updates) ---
         if is_update:
             current_attachment_ids_in_payload = set()
-            keys_to_delete_from_s3 = []
             attachments_to_delete_from_db = []
 
             # Collect IDs of attachments submitted in the form (implies they should be kept/updated)
@@ -198,12 +215,9 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
                 for existing_db_attachment in bulletin_item.image_attachments:
                     if existing_db_attachment.id not in current_attachment_ids_in_payload:
                         attachments_to_delete_from_db.append(existing_db_attachment)
-                        if existing_db_attachment.s3_key:
-                            keys_to_delete_from_s3.append(existing_db_attachment.s3_key)
             
-            # Perform deletions
-            for s3_key_to_delete in keys_to_delete_from_s3:
-                self._delete_s3_object(s3_key_to_delete)
+            # Perform deletions. Their S3 objects may be shared, or about to be by an
+            # upload that hasn't committed yet, so the orphan sweep removes them later
             for db_attachment_to_delete in attachments_to_delete_from_db:
                 db.session.delete(db_attachment_to_delete)
             
@@ -222,31 +236,13 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
                  raise ConnectionError("S3 client could not be initialized.")
 
             try:
-                current_app.logger.debug(f"Checking if S3 bucket '{s3_bucket}' exists.")
-                s3_client.head_bucket(Bucket=s3_bucket)
-                current_app.logger.info(f"S3 bucket '{s3_bucket}' already exists.")
+                # Checked once per process rather than on every request
+                ensure_bucket(s3_client, s3_bucket)
             except ClientError as e:
-                error_code = e.response.get('Error', {}).get('Code')
-                http_status_code = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
-                
-                # Check for NoSuchBucket (common in MinIO/older SDKs) or 404 (common in AWS S3 for head_bucket on non-existent bucket)
-                if error_code == 'NoSuchBucket' or http_status_code == 404:
-                    current_app.logger.info(f"S3 bucket '{s3_bucket}' does not exist. Attempting to create it...")
-                    try:
-                        # For MinIO, region is typically not needed for create_bucket.
-                        # For AWS S3, you might need to specify a region if not us-east-1 or if client isn't configured for a specific region:
-                        # e.g., s3_client.create_bucket(Bucket=s3_bucket, CreateBucketConfiguration={'LocationConstraint': 'your-aws-region'})
-                        s3_client.create_bucket(Bucket=s3_bucket)
-                        current_app.logger.info(f"S3 bucket '{s3_bucket}' created successfully.")
-                    except ClientError as ce:
-                        current_app.logger.error(f"Failed to create S3 bucket '{s3_bucket}': {ce}")
-                        # Propagate a clear error message to the client/logs
-                        raise Exception(f"S3 bucket '{s3_bucket}' could not be created. Please check S3 permissions and configuration. Original error: {str(ce)}") from ce
-                else:
-                    # Some other ClientError occurred when trying to check for the bucket.
-                    current_app.logger.error(f"Unexpected error when checking for S3 bucket '{s3_bucket}': {e}")
-                    raise # Re-raise the original unexpected S3 error
+                current_app.logger.error(f"Failed to check or create S3 bucket '{s3_bucket}': {e}")
+                raise Exception(f"S3 bucket '{s3_bucket}' could not be created. Please check S3 permissions and configuration. Original error: {str(e)}") from e
 
+        pending_uploads = []
         i = 0
         while True:
             image_file = request.files.get(f"image_attachment_file_{i}")
@@ -259,52 +255,40 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
                 break 
 
             filename = secure_filename(image_file.filename)
-            object_name = f"bulletin_images/{bulletin_item.id}/{uuid.uuid4().hex}_{filename}"
-            
-            current_app.logger.info(f"Attempting S3 upload. Bucket: '{s3_bucket}', Object Key: '{object_name}'")
-            try:
-                s3_client.upload_fileobj(
-                    image_file,
-                    s3_bucket,
-                    object_name,
-                    ExtraArgs={'ContentType': image_file.content_type or 'application/octet-stream'}
-                )
-                current_app.logger.info(f"Uploaded image {object_name} to S3 bucket {s3_bucket}.")
-                
-                # Create and add new BulletinImageAttachment
-                new_attachment = BulletinImageAttachment(
-                    bulletin_id=bulletin_item.id, # Ensure bulletin_item has an ID
-                    s3_key=object_name,
-                    caption=caption
-                )
-                db.session.add(new_attachment)
-                # bulletin_item.image_attachments.append(new_attachment) # If using backref and session.add is enough
+            body = image_file.read()
+            # Content addressed, identical images across bulletins are stored once
+            object_name = content_key("bulletin_images", body, filename)
+            pending_uploads.append(
+                PendingObject(object_name, body, image_file.content_type or 'application/octet-stream')
+            )
 
-            except ClientError as e:
-                current_app.logger.error(f"Error uploading image to S3: {e}")
-                # Decide on error handling: raise to rollback, or collect errors
-                raise Exception(f"S3 upload failed for {filename}: {str(e)}")
-            except Exception as e: # Catch other potential errors during attachment creation
-                current_app.logger.error(f"Error creating attachment for {filename}: {e}")
-                raise
+            # Create and add new BulletinImageAttachment
+            new_attachment = BulletinImageAttachment(
+                bulletin_id=bulletin_item.id, # Ensure bulletin_item has an ID
+                s3_key=object_name,
+                caption=caption
+            )
+            db.session.add(new_attachment)
             i += 1
 
+        if pending_uploads:
+            current_app.logger.info(f"Uploading {len(pending_uploads)} images to S3 bucket '{s3_bucket}'")
+            try:
+                upload_objects(s3_client, s3_bucket, pending_uploads)
+            except ClientError as e:
+                current_app.logger.error(f"Error uploading images to S3: {e}")
+                # Raise to roll back the bulletin and its attachment rows
+                raise Exception(f"S3 upload failed: {str(e)}")
+
     def pre_delete(self, item: Bulletin) -> None:
-        """Check permissions before deleting and delete S3 objects and related attachments."""
+        """Check permissions before deleting."""
         if item.created_by_fk != g.user.id and not self.appbuilder.sm.is_admin():
             raise DeleteFailedError("You can only delete bulletins that you created")
 
-        # Delete S3 objects and database entries for each attachment
-        if item.image_attachments: 
-            for attachment in item.image_attachments:
-                if attachment.s3_key:
-                    self._delete_s3_object(attachment.s3_key)
-                # The cascade delete on the relationship should handle deleting the attachment
-                # from the database when the bulletin is deleted, or delete them explicitly:
-                # db.session.delete(attachment) 
         # If cascade="all, delete-orphan" is set on the relationship, 
         # SQLAlchemy will handle deleting BulletinImageAttachment rows when a Bulletin is deleted.
-        # The S3 objects must be deleted manually as done above.
+        # Their S3 objects are left to the orphan sweep (superset/tasks/bulletin_images.py),
+        # content addressed keys may be shared with other bulletins or in-flight uploads.
 
     @expose("/", methods=["DELETE"])
     @protect()
@@ -384,17 +368,16 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
             return None
         try:
             s3_client_presigning = _get_s3_client_for_presigning()
-            bucket_name = current_app.config.get('S3_BUCKET')
-            
-            public_endpoint_check = current_app.config.get('S3_PUBLIC_ENDPOINT_URL')
-            if not public_endpoint_check:
+            if s3_client_presigning is None:
                 current_app.logger.error("S3_PUBLIC_ENDPOINT_URL is not configured. Cannot generate valid presigned URL for frontend.")
                 return None
 
-            url = s3_client_presigning.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': bucket_name, 'Key': object_key},
-                ExpiresIn=current_app.config.get('S3_PRESIGNED_URL_EXPIRATION', 3600)
+            # Cached, the URL stays valid for at least half of S3_PRESIGNED_URL_EXPIRATION
+            url = presigned_get_url(
+                s3_client_presigning,
+                current_app.config.get('S3_BUCKET'),
+                object_key,
+                current_app.config.get('S3_PRESIGNED_URL_EXPIRATION', 3600)
             )
             # No replacement needed anymore, URL is generated with public host
             # current_app.logger.debug(f"Generated presigned URL with public host: {url}")
@@ -423,8 +406,12 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
             # Ensure the key exists even if there are no attachments or it's not a list
             item_dict['image_attachments'] = []
 
-    def _augment_with_alert_info(self, item_dict: dict) -> None:
-        """Augment bulletin dictionary with alert type and weather alert information."""
+    def _augment_with_alert_info(self, item_dict: dict, weather_alerts: dict | None = None) -> None:
+        """
+        Add the alert type and weather alert details of a bulletin. weather_alerts maps
+        composite IDs to their alerts, see _weather_alerts_by_composite_id; lists pass
+        it for the whole page, otherwise the bulletin's alert is looked up.
+        """
         # Add alert_type field
         if item_dict.get('disease_forecast_alert'):
             item_dict['alert_type'] = 'disease'
@@ -433,67 +420,30 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
         else:
             item_dict['alert_type'] = None
             
-        # For weather alerts, add the parsed weather alert information
-        if item_dict.get('weather_forecast_alert_composite_id'):
-            try:
-                composite_id = item_dict['weather_forecast_alert_composite_id']
-                parts = composite_id.split('_', 3)
-                if len(parts) == 4:
-                    municipality_code, created_date, forecast_date, weather_parameter = parts
-                    
-                    logger.debug("Parsing weather composite ID: %s -> parts: %s", composite_id, parts)
-                    
-                    # Try to get the full weather alert details
-                    weather_alert = db.session.query(WeatherForecastAlert).filter_by(
-                        municipality_code=municipality_code,
-                        created_date=created_date,
-                        forecast_date=forecast_date,
-                        weather_parameter=weather_parameter
-                    ).first()
-                    
-                    if weather_alert:
-                        logger.debug("Found weather alert for composite ID: %s", composite_id)
-                        item_dict['weather_forecast_alert'] = {
-                            'municipality_code': weather_alert.municipality_code,
-                            'municipality_name': weather_alert.municipality_name,
-                            'created_date': weather_alert.created_date,
-                            'forecast_date': weather_alert.forecast_date,
-                            'weather_parameter': weather_alert.weather_parameter,
-                            'alert_level': weather_alert.alert_level,
-                            'parameter_value': weather_alert.parameter_value,
-                            'alert_title': weather_alert.alert_title,
-                            'alert_message': weather_alert.alert_message
-                        }
-                    else:
-                        logger.debug("No weather alert found for composite ID: %s", composite_id)
-                        # Fallback to parsed values
-                        # item_dict['weather_forecast_alert'] = {
-                        #     'municipality_code': municipality_code,
-                        #     'municipality_name': None,
-                        #     'created_date': created_date,
-                        #     'forecast_date': forecast_date,
-                        #     'weather_parameter': weather_parameter,
-                        #     'alert_level': None,
-                        #     'parameter_value': None,
-                        #     'alert_title': None,
-                        #     'alert_message': None
-                        # }
-                    # else:
-                    #     # Fallback to parsed values
-                    #     item_dict['weather_forecast_alert'] = {
-                    #         'municipality_code': municipality_code,
-                    #         'municipality_name': None,
-                    #         'created_date': None,
-                    #         'forecast_date': forecast_date,
-                    #         'weather_parameter': weather_parameter,
-                    #         'alert_level': None,
-                    #         'parameter_value': None,
-                    #         'alert_title': None,
-                    #         'alert_message': None
-                    #     }
-            except (ValueError, AttributeError) as e:
-                current_app.logger.warning(f"Error parsing weather alert composite ID {item_dict.get('weather_forecast_alert_composite_id')}: {e}")
+        # For weather alerts, add the weather alert information
+        composite_id = item_dict.get('weather_forecast_alert_composite_id')
+        if composite_id:
+            if not isinstance(composite_id, str):
+                current_app.logger.warning(f"Error parsing weather alert composite ID {composite_id}: not a string")
                 item_dict['weather_forecast_alert'] = None
+            else:
+                if weather_alerts is None:
+                    weather_alerts = _weather_alerts_by_composite_id([composite_id])
+                weather_alert = weather_alerts.get(composite_id)
+                if weather_alert:
+                    item_dict['weather_forecast_alert'] = {
+                        'municipality_code': weather_alert.municipality_code,
+                        'municipality_name': weather_alert.municipality_name,
+                        'created_date': weather_alert.created_date,
+                        'forecast_date': weather_alert.forecast_date,
+                        'weather_parameter': weather_alert.weather_parameter,
+                        'alert_level': weather_alert.alert_level,
+                        'parameter_value': weather_alert.parameter_value,
+                        'alert_title': weather_alert.alert_title,
+                        'alert_message': weather_alert.alert_message
+                    }
+                else:
+                    logger.debug("No weather alert found for composite ID: %s", composite_id)
         
         # Fallback mechanism for disease bulletins without disease_forecast_alert_id
         if item_dict['alert_type'] is None and not item_dict.get('weather_forecast_alert_composite_id'):
@@ -843,58 +793,6 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
                         start_date = date.fromisoformat(forecast_date_start_str)
                         logger.debug("Disease forecast start_date parsed: %s", start_date)
                         
-                        # Debug: Check what disease forecast alerts exist for this date
-                        debug_alerts = self.datamodel.session.query(DiseaseForecastAlert).filter(
-                            cast(DiseaseForecastAlert.forecast_date, SQLDate) == start_date
-                        ).all()
-                        logger.debug("Disease alerts found for date %s: %d", start_date, len(debug_alerts))
-                        for alert in debug_alerts[:3]:  # Log first 3 for debugging
-                            logger.debug("Alert ID %s: forecast_date=%s (raw), municipality=%s, disease=%s", 
-                                       alert.id, alert.forecast_date, alert.municipality_name, alert.disease_type)
-                        
-                        # Debug: Also check with >= comparison to see if there are alerts that should match
-                        debug_alerts_gte = self.datamodel.session.query(DiseaseForecastAlert).filter(
-                            cast(DiseaseForecastAlert.forecast_date, SQLDate) >= start_date
-                        ).all()
-                        logger.debug("Disease alerts found with >= %s: %d", start_date, len(debug_alerts_gte))
-                        
-                        # Debug: Check raw forecast_date values around this date
-                        debug_all_alerts = self.datamodel.session.query(DiseaseForecastAlert).limit(5).all()
-                        logger.debug("Sample disease alerts (first 5):")
-                        for alert in debug_all_alerts:
-                            logger.debug("Alert ID %s: forecast_date=%s (type: %s)", 
-                                       alert.id, alert.forecast_date, type(alert.forecast_date))
-                        
-                        # Debug: Check bulletins linked to disease forecast alerts for this date
-                        debug_bulletins = self.datamodel.session.query(Bulletin).join(
-                            DiseaseForecastAlert, Bulletin.disease_forecast_alert_id == DiseaseForecastAlert.id
-                        ).filter(
-                            cast(DiseaseForecastAlert.forecast_date, SQLDate) == start_date
-                        ).all()
-                        logger.debug("Bulletins with disease alerts for date %s: %d", start_date, len(debug_bulletins))
-                        for bulletin in debug_bulletins[:3]:  # Log first 3
-                            logger.debug("Bulletin ID %s: title=%s, alert_id=%s", 
-                                       bulletin.id, bulletin.title, bulletin.disease_forecast_alert_id)
-                        
-                        # Debug: Try with >= to see if the comparison logic works
-                        debug_bulletins_gte = self.datamodel.session.query(Bulletin).join(
-                            DiseaseForecastAlert, Bulletin.disease_forecast_alert_id == DiseaseForecastAlert.id
-                        ).filter(
-                            cast(DiseaseForecastAlert.forecast_date, SQLDate) >= start_date
-                        ).all()
-                        logger.debug("Bulletins with disease alerts >= date %s: %d", start_date, len(debug_bulletins_gte))
-                        
-                        # Debug: Check if the issue is with the outerjoin vs inner join
-                        debug_bulletins_outerjoin = self.datamodel.session.query(Bulletin).outerjoin(
-                            DiseaseForecastAlert, Bulletin.disease_forecast_alert_id == DiseaseForecastAlert.id
-                        ).filter(
-                            and_(
-                                Bulletin.disease_forecast_alert_id.isnot(None),
-                                cast(DiseaseForecastAlert.forecast_date, SQLDate) >= start_date
-                            )
-                        ).all()
-                        logger.debug("Bulletins with outerjoin and disease alerts >= date %s: %d", start_date, len(debug_bulletins_outerjoin))
-                        
                         disease_forecast_filter = and_(
                             disease_forecast_filter,
                             cast(DiseaseForecastAlert.forecast_date, SQLDate) >= start_date
@@ -958,12 +856,6 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
                             )
                         )
                         
-                        # Debug: Check how many bulletins this would match
-                        debug_weather_bulletins = self.datamodel.session.query(self.datamodel.obj).filter(weather_forecast_filter).all()
-                        logger.debug("Bulletins with weather alerts matching date criteria: %d", len(debug_weather_bulletins))
-                        for bulletin in debug_weather_bulletins[:3]:
-                            logger.debug("Weather Bulletin ID %s: composite_id=%s", bulletin.id, bulletin.weather_forecast_alert_composite_id)
-                        
                         forecast_filters.append(weather_forecast_filter)
                         
                 except ValueError as e:
@@ -976,15 +868,6 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
                 # Create a combined filter that ensures each bulletin type meets its own criteria
                 combined_filter = or_(*forecast_filters)
                 query = query.filter(combined_filter)
-                
-                # Debug: Check what the query returns after applying forecast date filter
-                debug_results_after_forecast_filter = query.all()
-                logger.debug("Results after forecast date filter: %d bulletins", len(debug_results_after_forecast_filter))
-                for bulletin in debug_results_after_forecast_filter[:3]:
-                    logger.debug("Bulletin ID %s: title=%s, alert_id=%s", 
-                               bulletin.id, bulletin.title, bulletin.disease_forecast_alert_id)
-                    if bulletin.disease_forecast_alert:
-                        logger.debug("  -> Alert forecast_date: %s", bulletin.disease_forecast_alert.forecast_date)
 
         logger.debug("[DEBUG] query %s", query)
 
@@ -1257,10 +1140,14 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
         # Use list_model_schema for serialization to match list columns
         response_data = self.list_model_schema.dump(result_objects, many=True)
 
-        # Augment with presigned URLs and alert information
+        # Augment with presigned URLs and alert information, resolving the page's weather alerts at once
+        weather_alerts = _weather_alerts_by_composite_id(
+            item_dict['weather_forecast_alert_composite_id'] for item_dict in response_data
+            if item_dict.get('weather_forecast_alert_composite_id')
+        )
         for item_dict in response_data:
             self._augment_with_presigned_url(item_dict)
-            self._augment_with_alert_info(item_dict)
+            self._augment_with_alert_info(item_dict, weather_alerts)
 
         final_response = {
             "ids": response_ids, 
@@ -1331,47 +1218,21 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
         if not bulletin:
             return self.response_404()
 
-        # Construct cache key
-        # Ensure changed_on is in a consistent string format for the key
-        changed_on_str = bulletin.changed_on.isoformat() if bulletin.changed_on else "no_changed_on"
-        cache_key = f"bulletin_pdf_{bulletin_id}_{changed_on_str}"
-
-        # Try to fetch from cache
-        cached_pdf_data = cache_manager.data_cache.get(cache_key)
-
-        if cached_pdf_data:
-            pdf_buffer = BytesIO(cached_pdf_data)
-            # pdf_buffer.seek(0) # BytesIO(data) is already at position 0
-            is_preview = request.args.get('preview') == 'true'
-            return send_file(
-                pdf_buffer,
-                mimetype="application/pdf",
-                as_attachment=not is_preview, # Set as_attachment to False if preview=true
-                download_name=f"bulletin_{bulletin.title.replace(' ', '_')}_{bulletin_id}.pdf"
-            )
-
-        # If not in cache, generate PDF
+        # Pre-rendered when the bulletin was saved, shared with email dissemination
         try:
-            pdf_buffer = generate_bulletin_pdf(bulletin)
-            pdf_data = pdf_buffer.getvalue() # Get bytes once
-
-            # Store in cache
-            # Using default timeout from DATA_CACHE_CONFIG
-            cache_manager.data_cache.set(cache_key, pdf_data)
-
-            pdf_buffer.seek(0)  # Reset original buffer for send_file
-            is_preview = request.args.get('preview') == 'true'
-            return send_file(
-                pdf_buffer, # Send the original buffer
-                mimetype="application/pdf",
-                as_attachment=not is_preview, # Set as_attachment to False if preview=true
-                download_name=f"bulletin_{bulletin.title.replace(' ', '_')}_{bulletin_id}.pdf"
-            )
+            pdf_data = get_bulletin_pdf(bulletin)
         except Exception as e:
-            # Consider logging the error more formally
-            print(f"Error generating PDF for bulletin {bulletin_id}: {e}")
+            logger.error(f"Error generating PDF for bulletin {bulletin_id}: {e}", exc_info=True)
             return self.response_500(message="Error generating PDF")
 
+        is_preview = request.args.get('preview') == 'true'
+        return send_file(
+            BytesIO(pdf_data),
+            mimetype="application/pdf",
+            as_attachment=not is_preview, # Set as_attachment to False if preview=true
+            download_name=f"bulletin_{bulletin.title.replace(' ', '_')}_{bulletin_id}.pdf"
+        )
+
     # --- Overriding POST to handle multipart/form-data --- 
     @expose("/", methods=["POST"])
     @protect()
@@ -1409,6 +1270,7 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
             self._handle_image_attachment_upload(new_item, is_update=False)
 
             db.session.commit() 
+            queue_bulletin_pdf(new_item.id)
             
             # Serialize the created item, including its new attachments
             # This requires a schema that can handle the relationship.
@@ -1457,6 +1319,7 @@ class BulletinsRestApi(BaseSupersetModelRestApi):
             # item.changed_on = datetime.utcnow() # Handled by FAB/model
             db.session.merge(item) # Merge the item with updated fields and attachments
             db.session.commit()
+            queue_bulletin_pdf(item.id)
             
             # Serialize the updated item
             # Similar to POST, fetch/augment for now.
@@ -0,0 +1,122 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Rendered bulletin PDFs in the object store.
+
+A PDF is stored under a hash of everything it is drawn from, so the download
+endpoint and email dissemination share one artifact per version of a bulletin,
+and an edited bulletin gets a new key. PDFs are rendered by the
+bulletins.render_pdf task when a bulletin is saved; a PDF that is not stored
+yet is rendered and stored on first use.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+
+from botocore.exceptions import ClientError
+from flask import current_app
+
+from superset.utils.object_storage import ensure_bucket, get_s3_client, object_exists
+from superset.utils.pdf import generate_bulletin_pdf
+
+logger = logging.getLogger(__name__)
+
+PDF_PREFIX = "bulletin_pdfs"
+# Bump when generate_bulletin_pdf draws differently, so stored PDFs are rendered again
+PDF_LAYOUT_VERSION = 3
+
+
+def bulletin_pdf_key(bulletin: Any) -> str:
+    """Object key of the bulletin's PDF, a hash of the fields and images it is drawn from"""
+    config = current_app.config
+    parts = {
+        "layout": PDF_LAYOUT_VERSION,
+        "app": [config.get("APP_NAME"), config.get("APP_ICON")],
+        "id": bulletin.id,
+        "title": bulletin.title,
+        "advisory": bulletin.advisory,
+        "risks": bulletin.risks,
+        "safety_tips": bulletin.safety_tips,
+        "hashtags": bulletin.hashtags,
+        "created_on": bulletin.created_on,
+        "changed_on": bulletin.changed_on,
+        "attachments": [
+            [attachment.s3_key, attachment.caption]
+            for attachment in bulletin.image_attachments or []
+        ],
+    }
+    digest = hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{PDF_PREFIX}/{digest}.pdf"
+
+
+def _render_and_store(bulletin: Any, s3_client: Any, bucket: str, key: str) -> bytes:
+    image_errors: list[str] = []
+    pdf_data = generate_bulletin_pdf(bulletin, image_errors=image_errors).getvalue()
+    if image_errors:
+        # Don't keep a PDF with missing images, the next use renders it again
+        logger.warning(
+            "Not storing the PDF of bulletin %s, images failed: %s",
+            bulletin.id,
+            "; ".join(image_errors),
+        )
+        return pdf_data
+    try:
+        ensure_bucket(s3_client, bucket)
+        s3_client.put_object(
+            Bucket=bucket, Key=key, Body=pdf_data, ContentType="application/pdf"
+        )
+    except ClientError as ex:
+        logger.error("Error storing the PDF of bulletin %s: %s", bulletin.id, ex)
+    return pdf_data
+
+
+def get_bulletin_pdf(bulletin: Any) -> bytes:
+    """The bulletin's PDF from the object store, rendered and stored if missing"""
+    bucket = current_app.config.get("S3_BUCKET")
+    if not bucket:
+        return generate_bulletin_pdf(bulletin).getvalue()
+
+    s3_client = get_s3_client()
+    key = bulletin_pdf_key(bulletin)
+    try:
+        return s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except ClientError as ex:
+        if ex.response.get("Error", {}).get("Code") not in (
+            "404",
+            "NoSuchKey",
+            "NotFound",
+        ):
+            logger.error("Error reading the PDF of bulletin %s: %s", bulletin.id, ex)
+    return _render_and_store(bulletin, s3_client, bucket, key)
+
+
+def store_bulletin_pdf(bulletin: Any) -> Optional[str]:
+    """Render and store the bulletin's PDF unless it is stored already, returns its key"""
+    bucket = current_app.config.get("S3_BUCKET")
+    if not bucket:
+        return None
+    s3_client = get_s3_client()
+    key = bulletin_pdf_key(bulletin)
+    if not object_exists(s3_client, bucket, key):
+        _render_and_store(bulletin, s3_client, bucket, key)
+    return key
@@ -1000,6 +1000,15 @@ CELERY_BEAT_SCHEDULER_EXPIRES = timedelta(weeks=1)
 # https://docs.celeryq.dev/en/stable/getting-started/backends-and-brokers/index.html
 
 
+# Send bulletin dissemination channels (email, Facebook, WhatsApp) from Celery tasks,
+# the form only queues them. Without CELERY_CONFIG the tasks run in the web request.
+DISSEMINATION_ASYNC = True
+
+# Bulletin images no attachment refers to are deleted by the daily
+# bulletins.sweep_orphaned_images task once they are unreferenced for this long.
+# It must exceed the longest transaction between an image upload and its attachment.
+BULLETIN_IMAGE_ORPHAN_GRACE_PERIOD = timedelta(days=1)
+
 class CeleryConfig:  # pylint: disable=too-few-public-methods
     broker_url = "sqla+sqlite:///celerydb.sqlite"
     imports = (
@@ -1007,6 +1016,9 @@ class CeleryConfig:  # pylint: disable=too-few-public-methods
         "superset.tasks.scheduler",
         "superset.tasks.thumbnails",
         "superset.tasks.cache",
+        "superset.tasks.dissemination",
+        "superset.tasks.bulletin_pdf",
+        "superset.tasks.bulletin_images",
     )
     result_backend = "db+sqlite:///celery_results.sqlite"
     worker_prefetch_multiplier = 1
@@ -1026,6 +1038,10 @@ class CeleryConfig:  # pylint: disable=too-few-public-methods
             "task": "reports.prune_log",
             "schedule": crontab(minute=0, hour=0),
         },
+        "bulletins.sweep_orphaned_images": {
+            "task": "bulletins.sweep_orphaned_images",
+            "schedule": crontab(minute=30, hour=3),
+        },
         # Uncomment to enable pruning of the query table
         # "prune_query": {
         #     "task": "prune_query",
@@ -18,7 +18,7 @@ import logging
 from datetime import date, timedelta # For parsing date string
 from typing import Any
 import json
-from sqlalchemy import asc, desc, and_, cast, Date as SQLDate
+from sqlalchemy import asc, desc, and_, or_, tuple_
 from flask_appbuilder.models.filters import Filters
 
 from flask import request, Response
@@ -29,6 +29,25 @@ from marshmallow import ValidationError
 from superset import db
 from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
 from superset.extensions import event_logger
+from superset.models.bulletins import Bulletin
+from superset.utils.keyset_pagination import (
+    apply_keyset,
+    count_rows,
+    COUNT_ARG,
+    COUNT_EXACT,
+    COUNT_NONE,
+    CURSOR_ARG,
+    decode_cursor,
+    fetch_keyset_page,
+    InvalidCursorError,
+    parse_count_mode,
+)
+from superset.utils.streaming_export import (
+    EXPORT_FORMAT_ARG,
+    parse_export_format,
+    schema_columns,
+    stream_query,
+)
 from superset.views.base_api import BaseSupersetModelRestApi, statsd_metrics
 
 from .models import DiseaseForecastAlert, DiseasePipelineRunHistory
@@ -222,6 +241,26 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
               type: integer
               default: 25
             description: "Number of results per page. Used if not specified in 'q'. Set to -1 to retrieve all results."
+          - name: cursor
+            in: query
+            required: false
+            schema:
+              type: string
+            description: "Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. Results are ordered by forecast_date descending and page/ordering are ignored."
+          - name: count
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [exact, estimate, none]
+            description: "How to compute count. Defaults to exact, or none in cursor mode."
+          - name: format
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [json, ndjson, csv]
+            description: "ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page."
           responses:
             200:
               description: A list of disease forecast alerts
@@ -257,6 +296,9 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
                       prev_page_url:
                         type: [string, "null"]
                         description: URL for the previous page, if any.
+                      next_cursor:
+                        type: [string, "null"]
+                        description: Cursor mode only. Pass as cursor to fetch the next page, null on the last page.
             400:
               $ref: '#/components/responses/400'
             401:
@@ -301,10 +343,10 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
 
         if start_date:
             logger.debug(f"Applying start_date filter: >= {start_date}")
-            query = query.filter(cast(self.datamodel.obj.forecast_date, SQLDate) >= start_date)
+            query = query.filter(self.datamodel.obj.forecast_date >= start_date)
         if end_date:
             logger.debug(f"Applying end_date filter: <= {end_date}")
-            query = query.filter(cast(self.datamodel.obj.forecast_date, SQLDate) <= end_date)
+            query = query.filter(self.datamodel.obj.forecast_date <= end_date)
 
         # 2. Apply direct URL parameter filters using SQLAlchemy
         direct_query_params_mapping = {
@@ -343,9 +385,34 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
         else:
             logger.debug("Disease Alerts - No Rison filters (from q param) to apply.")
 
+        # 3b. Streaming export: every matching row, no pagination or count
+        try:
+            export_format = parse_export_format(request.args.get(EXPORT_FORMAT_ARG))
+        except ValueError as e:
+            return self.response_400(message=str(e))
+        if export_format:
+            return stream_query(
+                apply_keyset(query, self._keyset_columns(), None, descending=True),
+                schema_columns(self.response_schema, self.datamodel.obj),
+                export_format,
+                self.resource_name,
+            )
+
         # 4. Get the count AFTER all filters are applied
+        cursor = request.args.get(CURSOR_ARG)
+        try:
+            count_mode = parse_count_mode(
+                request.args.get(COUNT_ARG), default=COUNT_NONE if cursor is not None else COUNT_EXACT
+            )
+        except ValueError as e:
+            return self.response_400(message=str(e))
+
+        # 4a. Cursor mode: keyset pagination, newest forecast first
+        if cursor is not None:
+            return self._get_list_keyset_page(query, cursor, count_mode)
+
         logger.debug("Disease Alerts - Executing count query on filtered SQLAlchemy query.")
-        item_count = query.count()
+        item_count = count_rows(query, count_mode)
 
         # 5. Apply pagination and ordering from Rison payload to the filtered query
         logger.debug(f"Disease Alerts - Applying Rison pagination/ordering to SQLAlchemy query: {rison_payload}")
@@ -385,18 +452,18 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
 
         if page_size > 0:
             logger.debug(f"Disease Alerts - Applying pagination: page {page}, page_size {page_size}")
-            total_pages = (item_count + page_size - 1) // page_size  # Ceiling division
+            # Without a count (count=none) the number of pages is unknown
+            total_pages = (item_count + page_size - 1) // page_size if item_count is not None else None  # Ceiling division
             offset = page * page_size
             query = query.limit(page_size).offset(offset)
             actual_page_size = page_size
         elif page_size == -1:  # Requesting all items
             logger.debug(f"Disease Alerts - Attempting to retrieve all items (page_size: -1)")
-            total_pages = 1 if item_count > 0 else 0
-            actual_page_size = item_count if item_count > 0 else 0
+            total_pages = None  # Set from the fetched rows below
             # No limit/offset needed when fetching all
         elif self.page_size and self.page_size > 0 and page_size is None: # Fallback to default
             logger.debug(f"Disease Alerts - Applying default API page_size: {self.page_size}")
-            total_pages = (item_count + self.page_size - 1) // self.page_size
+            total_pages = (item_count + self.page_size - 1) // self.page_size if item_count is not None else None
             offset = (page or 0) * self.page_size
             query = query.limit(self.page_size).offset(offset)
             actual_page_size = self.page_size
@@ -404,6 +471,9 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
         # 6. Execute the final query to get results
         logger.debug("Disease Alerts - Executing final data query on filtered, ordered, paginated SQLAlchemy query.")
         result_objects = query.all()
+        if page_size == -1:
+            total_pages = 1 if result_objects else 0
+            actual_page_size = len(result_objects)
 
         # 7. Prepare response
         # Get composite IDs for the "ids" field of the response
@@ -440,7 +510,7 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
         }
 
         # Generate prev/next URLs
-        if item_count > 0 and page_size > 0: # Only generate if paginating
+        if result_objects and page_size > 0: # Only generate if paginating
             base_url = request.base_url
             other_direct_params = { 
                 k: v for k, v in request.args.items() 
@@ -464,14 +534,52 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
                 return f"{base_url}?{temp_query_params.to_dict(flat=False)}"
 
             current_page_for_logic = page if page is not None else 0
-            if (current_page_for_logic + 1) < total_pages:
+            has_next_page = (
+                (current_page_for_logic + 1) < total_pages if total_pages is not None else len(result_objects) == page_size
+            )
+            if has_next_page:
                 final_response["next_page_url"] = build_url_with_params(current_page_for_logic + 1, actual_page_size)
             
-            if current_page_for_logic > 0 and total_pages > 0:
+            if current_page_for_logic > 0:
                 final_response["prev_page_url"] = build_url_with_params(current_page_for_logic - 1, actual_page_size)
         
         return self.response(200, **final_response)
 
+    # municipality_code is nullable, so the keyset is (forecast_date, id) rather
+    # than the composite id; id breaks ties and is never null.
+    def _keyset_columns(self) -> list:
+        model = self.datamodel.obj
+        return [model.forecast_date, model.id]
+
+    def _get_list_keyset_page(self, query, cursor: str, count_mode: str) -> Response:
+        key_columns = self._keyset_columns()
+        try:
+            cursor_values = decode_cursor(cursor, len(key_columns)) if cursor else None
+        except InvalidCursorError as e:
+            return self.response_400(message=str(e))
+
+        try:
+            page_size = int(request.args.get("page_size", self.page_size or 25))
+        except ValueError:
+            page_size = self.page_size or 25
+        if page_size <= 0:
+            page_size = self.page_size or 25
+
+        item_count = count_rows(query, count_mode)
+        result_objects, next_cursor = fetch_keyset_page(
+            apply_keyset(query, key_columns, cursor_values, descending=True),
+            page_size,
+            lambda obj: (obj.forecast_date, obj.id),
+        )
+        return self.response(
+            200,
+            ids=[obj.composite_id for obj in result_objects],
+            count=item_count,
+            result=self.response_schema.dump(result_objects, many=True),
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
+
     @expose("/", methods=["POST"])
     @protect()
     @safe # Typically for GET, but POST here is idempotent if trying to create existing based on unique constraint
@@ -607,49 +715,80 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
         log_to_statsd=False,
     )
     def bulk_delete(self, **kwargs: Any) -> Response:
+        """
+        Deletes multiple disease forecast alerts by composite IDs.
+
+        Keys are parsed up front and matched with one set-based SELECT, then the
+        alerts are deleted with one DELETE. Bulletins linked to a deleted alert
+        are unlinked in the same transaction.
+        """
         composite_ids = kwargs.get("rison")
         if not isinstance(composite_ids, list) or not composite_ids:
             return self.response_400(message="List of composite IDs is required.")
 
-        deleted_count = 0
-        not_found_ids = []
+        keys_by_id = {}
         error_ids = []
-
         for composite_id_str in composite_ids:
             key_parts = self._parse_composite_id(composite_id_str)
             if not key_parts:
                 error_ids.append(composite_id_str) # Invalid format
                 continue
-
-            query = db.session.query(DiseaseForecastAlert)
-            if key_parts["municipality_code"] is None:
-                query = query.filter(DiseaseForecastAlert.municipality_code.is_(None))
-            else:
-                query = query.filter_by(municipality_code=key_parts["municipality_code"])
-            
-            alert = query.filter_by(
-                forecast_date=key_parts["forecast_date"],
-                disease_type=key_parts["disease_type"]
-            ).first()
-
-            if alert:
-                try:
-                    db.session.delete(alert)
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Error processing deletion for {composite_id_str}: {e}", exc_info=True)
-                    error_ids.append(composite_id_str)
-            else:
-                not_found_ids.append(composite_id_str)
-        
-        if error_ids or not_found_ids or deleted_count > 0:
+            keys_by_id[composite_id_str] = (
+                key_parts["municipality_code"], key_parts["forecast_date"], key_parts["disease_type"]
+            )
+
+        # Row-value IN can't match a NULL municipality_code ('nocode' IDs),
+        # so those keys are matched on the remaining columns
+        coded_keys = {key for key in keys_by_id.values() if key[0] is not None}
+        uncoded_keys = {key[1:] for key in keys_by_id.values() if key[0] is None}
+        key_conditions = []
+        if coded_keys:
+            key_conditions.append(
+                tuple_(
+                    DiseaseForecastAlert.municipality_code,
+                    DiseaseForecastAlert.forecast_date,
+                    DiseaseForecastAlert.disease_type,
+                ).in_(coded_keys)
+            )
+        if uncoded_keys:
+            key_conditions.append(
+                and_(
+                    DiseaseForecastAlert.municipality_code.is_(None),
+                    tuple_(DiseaseForecastAlert.forecast_date, DiseaseForecastAlert.disease_type).in_(uncoded_keys),
+                )
+            )
+
+        found_keys = set()
+        deleted_count = 0
+        if key_conditions:
             try:
-                db.session.commit()
+                matches = db.session.query(
+                    DiseaseForecastAlert.id,
+                    DiseaseForecastAlert.municipality_code,
+                    DiseaseForecastAlert.forecast_date,
+                    DiseaseForecastAlert.disease_type,
+                ).filter(or_(*key_conditions)).all()
+                alert_ids = [match.id for match in matches]
+                found_keys = {tuple(match)[1:] for match in matches}
+                if alert_ids:
+                    db.session.query(Bulletin).filter(
+                        Bulletin.disease_forecast_alert_id.in_(alert_ids)
+                    ).update({Bulletin.disease_forecast_alert_id: None}, synchronize_session=False)
+                    deleted_count = (
+                        db.session.query(DiseaseForecastAlert)
+                        .filter(DiseaseForecastAlert.id.in_(alert_ids))
+                        .delete(synchronize_session=False)
+                    )
+                    db.session.commit()
             except Exception as e:
                 db.session.rollback()
-                logger.error(f"Error committing bulk delete transaction: {e}", exc_info=True)
+                logger.error(f"Error during disease alert bulk delete: {e}", exc_info=True)
                 return self.response_500(message="Error during bulk delete commit.")
-        
+
+        not_found_ids = [
+            composite_id_str for composite_id_str, key in keys_by_id.items() if key not in found_keys
+        ]
+
         response_messages = []
         if deleted_count > 0:
             response_messages.append(f"Successfully deleted {deleted_count} disease forecast alerts.")
@@ -670,7 +809,12 @@ class DiseaseForecastAlertRestApi(BaseSupersetModelRestApi):
             else:
                 status_code = 207 # Multi-Status if some operations succeeded and some failed
 
-        return self.response(status_code, message=" ".join(response_messages))
+        return self.response(
+            status_code,
+            message=" ".join(response_messages),
+            not_found=not_found_ids,
+            invalid=error_ids,
+        )
 
 # --- API for Disease Pipeline Run History --- #
 
@@ -694,6 +838,7 @@ class DiseasePipelineRunHistoryRestApi(BaseSupersetModelRestApi):
         "municipalities_processed_count",
         "alerts_generated_count",
         "bulletins_created_count",
+        "stage_metrics",
     ]
     show_columns = list_columns
     add_columns = [ # Fields settable on POST
@@ -702,7 +847,8 @@ class DiseasePipelineRunHistoryRestApi(BaseSupersetModelRestApi):
         "details", 
         "municipalities_processed_count", 
         "alerts_generated_count", 
-        "bulletins_created_count"
+        "bulletins_created_count",
+        "stage_metrics"
     ]
     edit_columns = add_columns # Fields updatable on PUT
 
@@ -68,6 +68,7 @@ class DiseasePipelineRunHistory(Model):
     municipalities_processed_count = Column(Integer, default=0)
     alerts_generated_count = Column(Integer, default=0)
     bulletins_created_count = Column(Integer, default=0)
+    stage_metrics = Column(Text, nullable=True) # JSON list of per-stage status, seconds and row counts
 
     def __repr__(self) -> str:
         return f"<DiseasePipelineRunHistory {self.pipeline_name} ({self.status}) at {self.ran_at}>" 
\ No newline at end of file
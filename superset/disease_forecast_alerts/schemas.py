@@ -15,6 +15,8 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import json
+
 from marshmallow import fields, Schema, validate
 from marshmallow.validate import Length
 
@@ -137,6 +139,10 @@ class DiseasePipelineRunHistoryResponseSchema(Schema):
     municipalities_processed_count = fields.Integer()
     alerts_generated_count = fields.Integer()
     bulletins_created_count = fields.Integer()
+    stage_metrics = fields.Method("get_stage_metrics")
+
+    def get_stage_metrics(self, obj):
+        return json.loads(obj.stage_metrics) if obj.stage_metrics else None
 
 class DiseasePipelineRunHistoryPostSchema(Schema):
     # ran_at is typically set by default in the model or DB
@@ -146,6 +152,7 @@ class DiseasePipelineRunHistoryPostSchema(Schema):
     municipalities_processed_count = fields.Integer(required=False, allow_none=True, validate=validate.Range(min=0))
     alerts_generated_count = fields.Integer(required=False, allow_none=True, validate=validate.Range(min=0))
     bulletins_created_count = fields.Integer(required=False, allow_none=True, validate=validate.Range(min=0))
+    stage_metrics = fields.String(required=False, allow_none=True)
 
 class DiseasePipelineRunHistoryPutSchema(Schema):
     # Allow updating status, details, and counts. pipeline_name and ran_at are usually not changed.
@@ -154,4 +161,5 @@ class DiseasePipelineRunHistoryPutSchema(Schema):
     details = fields.String(allow_none=True)
     municipalities_processed_count = fields.Integer(allow_none=True, validate=validate.Range(min=0))
     alerts_generated_count = fields.Integer(allow_none=True, validate=validate.Range(min=0))
-    bulletins_created_count = fields.Integer(allow_none=True, validate=validate.Range(min=0)) 
\ No newline at end of file
+    bulletins_created_count = fields.Integer(allow_none=True, validate=validate.Range(min=0))
+    stage_metrics = fields.String(allow_none=True) 
\ No newline at end of file
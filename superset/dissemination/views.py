@@ -15,18 +15,19 @@ from flask_appbuilder.security.decorators import protect, has_access # Ensure ha
 from superset import appbuilder, db
 from superset.models.dissemination import EmailGroup, DisseminatedBulletinLog, WhatsAppGroup
 from superset.models.bulletins import Bulletin # For dropdown in dissemination form
-from superset.utils.core import send_email_smtp # For sending emails
 from superset.views.base import SupersetModelView, DeleteMixin, BaseSupersetView # Import BaseSupersetView
 from flask_appbuilder.widgets import ListWidget
 # Import the new form
 from .forms import DisseminationForm
-from superset.utils.pdf import generate_bulletin_pdf
-# Import Facebook utils
-from .facebook_utils import get_facebook_graph_api, upload_single_photo_to_facebook, create_facebook_feed_post # New imports
-# Import WhatsApp utils
-from .whatsapp_utils import send_whatsapp_message # Added WhatsApp import
-import boto3 # For S3 interaction
-from botocore.exceptions import ClientError # For S3 error handling
+# Channel tasks of a dissemination job
+from superset.tasks.dissemination import (
+    disseminate_email,
+    disseminate_facebook,
+    disseminate_whatsapp,
+    new_job_id,
+    queue_dissemination,
+    recipient_statuses,
+)
 import os # For path joining if needed for temporary files
 import requests # Added for making HTTP requests for webhook
 
@@ -227,13 +228,15 @@ class DisseminatedBulletinLogModelView(SupersetModelView):
     show_fieldsets = [
         (
             _("Log Details"),
-            {"fields": ["bulletin", "associated_email_group_names", "associated_whatsapp_group_names", "sent_at", "status", "subject_sent", "message_body_sent", "details", "disseminated_by"]},
+            {"fields": ["bulletin", "job_id", "associated_email_group_names", "associated_whatsapp_group_names", "sent_at", "status", "recipient_status_summary", "subject_sent", "message_body_sent", "details", "disseminated_by"]},
         ),
     ]
-    search_columns = ["status", "subject_sent"] 
+    search_columns = ["status", "subject_sent", "job_id"] 
 
     label_columns = {
         "bulletin": _("Bulletin"),
+        "job_id": _("Job ID"),
+        "recipient_status_summary": _("Recipients"),
         "channel": _("Channel"),
         "associated_email_group_names": _("Email Groups"),
         "associated_whatsapp_group_names": _("WhatsApp Groups"),
@@ -245,6 +248,90 @@ class DisseminatedBulletinLogModelView(SupersetModelView):
         "disseminated_by": _("Sent By"),
     }
 
+def sanitize_whatsapp_text(text_content):
+    if not text_content: return "" 
+    processed_text = text_content.replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
+    processed_text = processed_text.replace('\t', ' ')
+    processed_text = ' '.join(processed_text.split())
+    return processed_text
+
+def whatsapp_template_params(wa_subject, wa_message):
+    """
+    Template parameters of the bulletin WhatsApp template from the form's subject and message.
+    Assumes template {{1}} for subject, {{2}} for advisory, {{3}} for risks, {{4}} for safety_tips.
+    """
+    # --- Parsing logic for wa_message ---
+    parsed_content = {
+        'advisory': '',
+        'risks': '',
+        'safety_tips': ''
+    }
+    if wa_message:
+        # Split and then find sections.
+        # This is less reliant on perfect regex and order, but assumes keywords exist.
+        # Convert message to uppercase for case-insensitive keyword matching
+        message_upper = wa_message.upper()
+        
+        advisory_keyword = "ADVISORY:"
+        risks_keyword = "RISKS:"
+        safety_tips_keyword = "SAFETY TIPS:"
+
+        advisory_start_idx = message_upper.find(advisory_keyword)
+        risks_start_idx = message_upper.find(risks_keyword)
+        safety_tips_start_idx = message_upper.find(safety_tips_keyword)
+
+        # Create a list of found keywords and their start indices
+        sections = []
+        if advisory_start_idx != -1:
+            sections.append((advisory_start_idx, advisory_keyword, 'advisory'))
+        if risks_start_idx != -1:
+            sections.append((risks_start_idx, risks_keyword, 'risks'))
+        if safety_tips_start_idx != -1:
+            sections.append((safety_tips_start_idx, safety_tips_keyword, 'safety_tips'))
+        
+        # Sort sections by their start index to process them in order
+        sections.sort()
+
+        for i, (start_idx, keyword, section_key) in enumerate(sections):
+            content_start = start_idx + len(keyword)
+            content_end = None
+            if i + 1 < len(sections): # If there's a next section
+                content_end = sections[i+1][0] # End before the next section starts
+            
+            section_text = wa_message[content_start:content_end].strip()
+            parsed_content[section_key] = section_text
+        
+        # If no keywords found, put the whole message into advisory as a fallback
+        if not sections and wa_message.strip():
+            parsed_content['advisory'] = wa_message.strip()
+            logger.info("WhatsApp message keywords (ADVISORY, RISKS, SAFETY TIPS) not found. Using entire message for advisory part.")
+
+    # --- End parsing logic ---
+
+    sanitized_subject = sanitize_whatsapp_text(wa_subject)
+    sanitized_advisory = sanitize_whatsapp_text(parsed_content['advisory'])
+    sanitized_risks = sanitize_whatsapp_text(parsed_content['risks'])
+    sanitized_safety_tips = sanitize_whatsapp_text(parsed_content['safety_tips'])
+    
+    MAX_HEADER_LENGTH = 60 
+    # Assume body parts also have a significant limit, e.g., 250-300 chars each, verify with your template!
+    # WhatsApp often quotes ~1024 for the whole body, but individual {{n}} can be less.
+    # For safety, let's use a moderate limit per section. ADJUST THESE!
+    MAX_BODY_PARAM_LENGTH = 300 
+
+    truncated_subject = (sanitized_subject[:MAX_HEADER_LENGTH-3] + '...') if len(sanitized_subject) > MAX_HEADER_LENGTH else sanitized_subject
+    truncated_advisory = (sanitized_advisory[:MAX_BODY_PARAM_LENGTH-3] + '...') if len(sanitized_advisory) > MAX_BODY_PARAM_LENGTH else sanitized_advisory
+    truncated_risks = (sanitized_risks[:MAX_BODY_PARAM_LENGTH-3] + '...') if len(sanitized_risks) > MAX_BODY_PARAM_LENGTH else sanitized_risks
+    truncated_safety_tips = (sanitized_safety_tips[:MAX_BODY_PARAM_LENGTH-3] + '...') if len(sanitized_safety_tips) > MAX_BODY_PARAM_LENGTH else sanitized_safety_tips
+
+    # It's often better if the template itself is designed to look okay with empty params.
+    return [
+        truncated_subject, 
+        truncated_advisory, 
+        truncated_risks, 
+        truncated_safety_tips
+    ]
+
 class DisseminateBulletinView(BaseView):
     route_base = "/disseminatebulletin"
     default_view = "form"
@@ -345,224 +432,87 @@ class DisseminateBulletinView(BaseView):
                 flash(_("Selected bulletin not found."), "danger")
                 return redirect(url_for("DisseminateBulletinView.form"))
 
-            email_success = False
-            facebook_success = False
-            whatsapp_success = False # Initialize WhatsApp success status
+            # Channels are sent by Celery tasks; here each channel is validated and gets a
+            # log entry, PENDING until its task has sent it, all under one job id
+            job_id = new_job_id()
+            disseminated_by_fk = g.user.id if g.user else None
             log_entries = []
-            processed_channels = []
+            queued = [] # (channel task, log entry, task arguments after the log id)
+            channel_errors = []
 
             # --- Email Dissemination ---
             if 'email' in dissemination_channels:
-                processed_channels.append('email')
                 email_group_ids = form.email_group_ids.data # Changed to email_group_ids
                 subject = form.subject.data
                 message_body = form.message.data # Renamed for clarity
 
                 selected_email_groups = db.session.query(EmailGroup).filter(EmailGroup.id.in_(email_group_ids)).all()
                 
+                recipient_list = []
+                for group in selected_email_groups:
+                    if group.emails:
+                        recipient_list.extend(e.strip() for e in group.emails.split(',') if e.strip())
+
                 if not selected_email_groups:
-                    flash(_("No valid email groups were selected or found for Email dissemination."), "danger")
-                    log_entries.append(DisseminatedBulletinLog(
-                        bulletin_id=bulletin.id,
-                        # No single email_group_id to log here directly, association table handles it
-                        subject_sent=subject if subject else "N/A for failed email",
-                        message_body_sent=message_body if message_body else "N/A for failed email",
-                        disseminated_by_fk=g.user.id if g.user else None,
-                        status="FAILED",
-                        details="No email groups selected or found.",
-                        channel="email"
-                    ))
+                    error_msg = "No email groups selected or found."
+                elif not recipient_list:
+                    error_msg = "Email Error: No recipients found in the selected email groups."
+                else:
+                    error_msg = None
+
+                log_entry = DisseminatedBulletinLog(
+                    bulletin_id=bulletin.id,
+                    subject_sent=subject if subject else "N/A for failed email",
+                    message_body_sent=message_body if message_body else "N/A for failed email",
+                    disseminated_by_fk=disseminated_by_fk,
+                    status="FAILED" if error_msg else "PENDING",
+                    details=error_msg,
+                    channel="email",
+                    job_id=job_id
+                )
+                # Associate with the selected groups, even on failure
+                log_entry.email_groups = selected_email_groups
+                log_entries.append(log_entry)
+                if error_msg:
+                    channel_errors.append(str(_("Email: Failed (%(error)s).", error=error_msg)))
                 else:
-                    try:
-                        pdf_buffer = generate_bulletin_pdf(bulletin)
-                        pdf_filename = f"{bulletin.title.replace(' ', '_')}.pdf"
-                        pdf_data = pdf_buffer.read()
-                        
-                        all_recipient_emails = set() # Use a set to ensure uniqueness
-                        for group in selected_email_groups:
-                            if group.emails:
-                                group_emails = [e.strip() for e in group.emails.split(',') if e.strip()]
-                                all_recipient_emails.update(group_emails)
-
-                        recipient_list = list(all_recipient_emails)
-
-                        if not recipient_list:
-                             raise ValueError("No recipients found in the selected email groups.")
-
-                        # Replace \n with <br> and append two new lines at the end of the html_email_body 
-                        html_email_body = message_body.replace('\n', '<br>') + "<br><br>"
-
-                        send_email_smtp(
-                            to=",".join(recipient_list),
-                            subject=subject,
-                            html_content=html_email_body,
-                            pdf={pdf_filename: pdf_data},
-                            config=current_app.config
-                        )
-                        log_entry = DisseminatedBulletinLog(
-                            bulletin_id=bulletin.id,
-                            # email_group_id=email_group.id, # Removed: will be handled by association
-                            subject_sent=subject,
-                            message_body_sent=message_body,
-                            disseminated_by_fk=g.user.id if g.user else None,
-                            status="SUCCESS",
-                            channel="email"
-                        )
-                        log_entry.email_groups = selected_email_groups # Assign selected groups to the relationship
-                        log_entries.append(log_entry)
-                        email_success = True
-                    except Exception as e:
-                        logging.error(f"Error disseminating bulletin via Email: {e}", exc_info=True)
-                        log_entry = DisseminatedBulletinLog(
-                            bulletin_id=bulletin.id,
-                            # No single email_group_id to log here directly
-                            subject_sent=subject if subject else "N/A for failed email",
-                            message_body_sent=message_body if message_body else "N/A for failed email",
-                            disseminated_by_fk=g.user.id if g.user else None,
-                            status="FAILED",
-                            details=f"Email Error: {str(e)}",
-                            channel="email"
-                        )
-                        # Even on failure, try to associate with initially intended groups if available
-                        if selected_email_groups:
-                            log_entry.email_groups = selected_email_groups
-                        log_entries.append(log_entry)
+                    log_entry.recipient_statuses = recipient_statuses(recipient_list)
+                    queued.append((disseminate_email, log_entry, (subject, message_body)))
             
             # --- Facebook Dissemination ---
             if 'facebook' in dissemination_channels:
-                processed_channels.append('facebook')
-                fb_access_token = current_app.config.get('FACEBOOK_ACCESS_TOKEN')
-                fb_page_id = current_app.config.get('FACEBOOK_PAGE_ID')
+                fb_subject_from_form = form.subject.data
+                fb_message_from_form = form.message.data
 
-                if not fb_access_token or not fb_page_id:
+                if not current_app.config.get('FACEBOOK_ACCESS_TOKEN') or not current_app.config.get('FACEBOOK_PAGE_ID'):
                     logging.error("Facebook Access Token or Page ID is not configured.")
-                    flash(_("Facebook dissemination is not configured correctly (missing Access Token or Page ID)."), "warning")
+                    error_msg = "Facebook configuration missing (Token or Page ID)."
+                    channel_errors.append(str(_("Facebook: Failed (%(error)s).", error=error_msg)))
                     log_entries.append(DisseminatedBulletinLog(
                         bulletin_id=bulletin.id,
-                        disseminated_by_fk=g.user.id if g.user else None,
+                        disseminated_by_fk=disseminated_by_fk,
                         status="FAILED",
-                        details="Facebook configuration missing (Token or Page ID).",
+                        details=error_msg,
                         channel="facebook",
-                        subject_sent=form.subject.data if form.subject.data else f"FB Post attempt for: {bulletin.title}",
-                        message_body_sent="Configuration Error"
+                        subject_sent=fb_subject_from_form if fb_subject_from_form else f"FB Post attempt for: {bulletin.title}",
+                        message_body_sent="Configuration Error",
+                        job_id=job_id
                     ))
                 else:
-                    # Content for Facebook post from form
-                    fb_subject_from_form = form.subject.data
-                    fb_message_from_form = form.message.data
-                    facebook_page_post_content = f"{fb_subject_from_form}\n\n{fb_message_from_form}"
-                    
-                    uploaded_fb_photo_ids = []
-                    image_upload_errors = []
-                    # The main_fb_post_message is now facebook_page_post_content
-                    # main_fb_post_message = bulletin.title
-                    # if bulletin.advisory:
-                    #     main_fb_post_message += "\n\n" + bulletin.advisory
-                    # main_fb_post_message = main_fb_post_message[:1500] # Truncate if too long for a main post
-
-                    try:
-                        graph = get_facebook_graph_api(fb_access_token)
-
-                        # Step 1: Upload all images as unpublished photos with their captions
-                        if bulletin.image_attachments and len(bulletin.image_attachments) > 0:
-                            s3_bucket_name = current_app.config.get('S3_BUCKET')
-                            s3_endpoint_url = current_app.config.get('S3_ENDPOINT_URL')
-                            s3_access_key = current_app.config.get('S3_ACCESS_KEY')
-                            s3_secret_key = current_app.config.get('S3_SECRET_KEY')
-                            s3_region = current_app.config.get('S3_REGION')
-
-                            if not s3_bucket_name:
-                                raise ValueError("S3_BUCKET is not configured for image attachments.")
-
-                            s3_client = boto3.client(
-                                's3',
-                                aws_access_key_id=s3_access_key,
-                                aws_secret_access_key=s3_secret_key,
-                                endpoint_url=s3_endpoint_url,
-                                region_name=s3_region
-                            )
-                            
-                            for attachment in bulletin.image_attachments:
-                                s3_image_url_for_download = None
-                                try:
-                                    s3_object_key = attachment.s3_key
-                                    if not s3_object_key:
-                                        logger.warning(f"Attachment ID {attachment.id} missing s3_key, skipping.")
-                                        image_upload_errors.append(f"Attachment ID {attachment.id}: missing s3_key.")
-                                        continue
-
-                                    s3_image_url_for_download = s3_client.generate_presigned_url(
-                                        'get_object',
-                                        Params={'Bucket': s3_bucket_name, 'Key': s3_object_key},
-                                        ExpiresIn=300 
-                                    )
-                                    logger.info(f"Generated S3 presigned URL for attachment {s3_object_key}: {s3_image_url_for_download}")
-                                    
-                                    photo_caption = attachment.caption or bulletin.title # Use attachment caption or fallback
-                                    
-                                    fb_photo_id = upload_single_photo_to_facebook(
-                                        graph=graph,
-                                        page_id=fb_page_id,
-                                        image_caption=photo_caption,
-                                        image_url=s3_image_url_for_download,
-                                        published=False # Upload as unpublished first
-                                    )
-                                    uploaded_fb_photo_ids.append(fb_photo_id)
-                                    logger.info(f"Uploaded attachment {s3_object_key} to FB, photo ID: {fb_photo_id}")
-                                except Exception as e_img:
-                                    attachment_identifier = getattr(attachment, 's3_key', 'N/A') # Get identifier safely
-                                    logger.error(f"Error processing/uploading attachment {attachment_identifier} to Facebook: {e_img}", exc_info=True)
-                                    image_upload_errors.append(f"Img '{attachment_identifier}': {str(e_img)[:100]}")
-                        
-                        # Step 2: Create the main feed post, attaching the unpublished photos
-                        post_id = create_facebook_feed_post(
-                            graph=graph,
-                            page_id=fb_page_id,
-                            message=facebook_page_post_content, # Use combined content from form
-                            attached_media_ids=uploaded_fb_photo_ids if uploaded_fb_photo_ids else None
-                        )
-                        
-                        log_details = f"Facebook Post ID: {post_id}."
-                        if uploaded_fb_photo_ids:
-                            photo_ids_str = ', '.join(map(str, uploaded_fb_photo_ids))
-                            log_details += f" Attached Photo IDs: {photo_ids_str}."
-                        if image_upload_errors:
-                            image_errors_str = '; '.join(image_upload_errors)
-                            log_details += f" Image Upload Errors: {image_errors_str}."
-                            # If there were image errors but the main post succeeded, consider it partial success or flag warning.
-                            # For now, main post success dictates overall FB success for this log entry.
-
-                        log_entries.append(DisseminatedBulletinLog(
-                            bulletin_id=bulletin.id,
-                            disseminated_by_fk=g.user.id if g.user else None,
-                            status="SUCCESS" if not image_upload_errors else "PARTIAL_SUCCESS", # Mark as partial if some images failed
-                            details=log_details,
-                            channel="facebook",
-                            subject_sent=fb_subject_from_form,
-                            message_body_sent=fb_message_from_form[:1000] 
-                        ))
-                        facebook_success = True
-
-                    except Exception as e:
-                        logging.error(f"Error disseminating bulletin via Facebook: {e}", exc_info=True)
-                        # Ensure fb_caption is defined or use a fallback for the log
-                        # current_fb_message_for_log = main_fb_post_message if 'main_fb_post_message' in locals() else "N/A for failed Facebook post"
-                        # Correctly join image errors in the exception log details
-                        image_errors_details_str = '; '.join(image_upload_errors) if image_upload_errors else 'None'
-                        log_entries.append(DisseminatedBulletinLog(
-                            bulletin_id=bulletin.id,
-                            disseminated_by_fk=g.user.id if g.user else None,
-                            status="FAILED",
-                            details=f"Facebook Error: {str(e)}. Image Errors: {image_errors_details_str}",
-                            channel="facebook",
-                            subject_sent=fb_subject_from_form if 'fb_subject_from_form' in locals() else "N/A",
-                            message_body_sent=fb_message_from_form[:1000] if 'fb_message_from_form' in locals() else "N/A"
-                        ))
-                        # facebook_success remains False
+                    log_entry = DisseminatedBulletinLog(
+                        bulletin_id=bulletin.id,
+                        disseminated_by_fk=disseminated_by_fk,
+                        status="PENDING",
+                        channel="facebook",
+                        subject_sent=fb_subject_from_form,
+                        message_body_sent=fb_message_from_form[:1000],
+                        job_id=job_id
+                    )
+                    log_entries.append(log_entry)
+                    queued.append((disseminate_facebook, log_entry, (fb_subject_from_form, fb_message_from_form)))
 
             # --- WhatsApp Dissemination ---
             if 'whatsapp' in dissemination_channels:
-                processed_channels.append('whatsapp')
                 logger.info("Processing WhatsApp dissemination channel.")
 
                 wa_phone_id_config = current_app.config.get('WHATSAPP_PHONE_NUMBER_ID') # Renamed to avoid clash
@@ -572,22 +522,16 @@ class DisseminateBulletinView(BaseView):
                 whatsapp_group_ids_form = form.whatsapp_group_id.data # Changed to whatsapp_group_ids
                 selected_whatsapp_groups = db.session.query(WhatsAppGroup).filter(WhatsAppGroup.id.in_(whatsapp_group_ids_form)).all()
 
+                wa_recipients_list = []
+                for group in selected_whatsapp_groups:
+                    if group.phone_numbers:
+                        wa_recipients_list.extend(p.strip() for p in group.phone_numbers.split(',') if p.strip())
+
+                error_msg = None
+                message_body_sent = None
                 if not selected_whatsapp_groups:
                     error_msg = "No WhatsApp groups selected or found."
-                    logger.error(error_msg)
-                    flash(_(error_msg), "danger")
-                    log_entry = DisseminatedBulletinLog(
-                        bulletin_id=bulletin.id,
-                        # whatsapp_group_id=whatsapp_group_id_form if whatsapp_group_id_form else None, # Removed
-                        disseminated_by_fk=g.user.id if g.user else None,
-                        status="FAILED",
-                        details=error_msg,
-                        channel="whatsapp",
-                        subject_sent=f"WhatsApp attempt for: {bulletin.title} (Template: {wa_template_name_config})",
-                        message_body_sent="WhatsApp Group Error"
-                    )
-                    log_entry.whatsapp_groups = [] # Ensure association is empty
-                    log_entries.append(log_entry)
+                    message_body_sent = "WhatsApp Group Error"
                 # Check essential configs like token and phone ID, template name
                 elif not wa_phone_id_config or not wa_token_config or wa_token_config == "YOUR_PERMANENT_SYSTEM_USER_ACCESS_TOKEN_PLEASE_REPLACE" or not wa_template_name_config:
                     missing_configs = []
@@ -597,188 +541,45 @@ class DisseminateBulletinView(BaseView):
                     if not wa_template_name_config: missing_configs.append("WHATSAPP_DEFAULT_TEMPLATE_NAME from config")
                     
                     error_msg = f"WhatsApp dissemination is not configured correctly in system settings. Missing: {', '.join(missing_configs)}."
+                    message_body_sent = "System Configuration Error"
+                elif not wa_recipients_list:
+                    selected_group_names = ", ".join([g.name for g in selected_whatsapp_groups])
+                    error_msg = f"No valid phone numbers found in the selected WhatsApp group(s): '{selected_group_names}'."
+                    message_body_sent = "Empty Group Recipient List"
+
+                if error_msg:
                     logger.error(error_msg)
-                    flash(_(error_msg), "warning")
+                    channel_errors.append(str(_("WhatsApp: Failed (%(error)s).", error=error_msg)))
                     log_entry = DisseminatedBulletinLog(
                         bulletin_id=bulletin.id,
-                        # whatsapp_group_id=whatsapp_group_id_form, # Removed
-                        disseminated_by_fk=g.user.id if g.user else None,
+                        disseminated_by_fk=disseminated_by_fk,
                         status="FAILED",
                         details=error_msg,
                         channel="whatsapp",
                         subject_sent=f"WhatsApp attempt for: {bulletin.title} (Template: {wa_template_name_config})",
-                        message_body_sent="System Configuration Error"
+                        message_body_sent=message_body_sent,
+                        job_id=job_id
                     )
-                    if selected_whatsapp_groups: # Try to associate even on config failure
-                        log_entry.whatsapp_groups = selected_whatsapp_groups
+                    log_entry.whatsapp_groups = selected_whatsapp_groups # Try to associate even on failure
                     log_entries.append(log_entry)
                 else:
-                    all_wa_recipients_set = set() # Use a set to ensure uniqueness across groups
-                    for group in selected_whatsapp_groups:
-                        if group.phone_numbers:
-                            group_numbers = [p.strip() for p in group.phone_numbers.split(',') if p.strip()]
-                            all_wa_recipients_set.update(group_numbers)
-                    
-                    wa_recipients_list = list(all_wa_recipients_set)
-
-                    if not wa_recipients_list:
-                        selected_group_names = ", ".join([g.name for g in selected_whatsapp_groups])
-                        error_msg = f"No valid phone numbers found in the selected WhatsApp group(s): '{selected_group_names}'."
-                        logger.error(error_msg)
-                        flash(_(error_msg), "danger")
-                        log_entry = DisseminatedBulletinLog(
-                            bulletin_id=bulletin.id,
-                            # whatsapp_group_id=whatsapp_group_id_form, # Removed
-                            disseminated_by_fk=g.user.id if g.user else None,
-                            status="FAILED",
-                            details=error_msg,
-                            channel="whatsapp",
-                            subject_sent=f"WhatsApp attempt for: {bulletin.title} (Template: {wa_template_name_config})",
-                            message_body_sent="Empty Group Recipient List"
-                        )
-                        log_entry.whatsapp_groups = selected_whatsapp_groups # Associate with the selected (but empty) groups
-                        log_entries.append(log_entry)
-                    else:
-                        success_count = 0
-                        failure_count = 0
-                        whatsapp_log_details = []
-
-                        wa_subject = form.subject.data
-                        wa_message = form.message.data
-
-                        # --- Parsing logic for wa_message ---
-                        parsed_content = {
-                            'advisory': '',
-                            'risks': '',
-                            'safety_tips': ''
-                        }
-                        if wa_message:
-                            # Use regex to split the message by known headers, keeping the headers for context if needed
-                            # This pattern looks for the headers and captures the text until the next header or end of string
-                            # It assumes headers are uppercase and followed by a colon, possibly newlines/spaces.
-                            
-                            # Simpler approach: Split and then find sections.
-                            # This is less reliant on perfect regex and order, but assumes keywords exist.
-                            # Convert message to uppercase for case-insensitive keyword matching
-                            message_upper = wa_message.upper()
-                            
-                            advisory_keyword = "ADVISORY:"
-                            risks_keyword = "RISKS:"
-                            safety_tips_keyword = "SAFETY TIPS:"
-
-                            advisory_start_idx = message_upper.find(advisory_keyword)
-                            risks_start_idx = message_upper.find(risks_keyword)
-                            safety_tips_start_idx = message_upper.find(safety_tips_keyword)
-
-                            # Create a list of found keywords and their start indices
-                            sections = []
-                            if advisory_start_idx != -1:
-                                sections.append((advisory_start_idx, advisory_keyword, 'advisory'))
-                            if risks_start_idx != -1:
-                                sections.append((risks_start_idx, risks_keyword, 'risks'))
-                            if safety_tips_start_idx != -1:
-                                sections.append((safety_tips_start_idx, safety_tips_keyword, 'safety_tips'))
-                            
-                            # Sort sections by their start index to process them in order
-                            sections.sort()
-
-                            for i, (start_idx, keyword, section_key) in enumerate(sections):
-                                content_start = start_idx + len(keyword)
-                                content_end = None
-                                if i + 1 < len(sections): # If there's a next section
-                                    content_end = sections[i+1][0] # End before the next section starts
-                                
-                                section_text = wa_message[content_start:content_end].strip()
-                                parsed_content[section_key] = section_text
-                            
-                            # If no keywords found, put the whole message into advisory as a fallback
-                            if not sections and wa_message.strip():
-                                parsed_content['advisory'] = wa_message.strip()
-                                logger.info("WhatsApp message keywords (ADVISORY, RISKS, SAFETY TIPS) not found. Using entire message for advisory part.")
-
-                        # --- End parsing logic ---
-
-                        def sanitize_whatsapp_text(text_content):
-                            if not text_content: return "" 
-                            processed_text = text_content.replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
-                            processed_text = processed_text.replace('\t', ' ')
-                            processed_text = ' '.join(processed_text.split())
-                            return processed_text
-
-                        sanitized_subject = sanitize_whatsapp_text(wa_subject)
-                        sanitized_advisory = sanitize_whatsapp_text(parsed_content['advisory'])
-                        sanitized_risks = sanitize_whatsapp_text(parsed_content['risks'])
-                        sanitized_safety_tips = sanitize_whatsapp_text(parsed_content['safety_tips'])
-                        
-                        MAX_HEADER_LENGTH = 60 
-                        # Assume body parts also have a significant limit, e.g., 250-300 chars each, verify with your template!
-                        # WhatsApp often quotes ~1024 for the whole body, but individual {{n}} can be less.
-                        # For safety, let's use a moderate limit per section. ADJUST THESE!
-                        MAX_BODY_PARAM_LENGTH = 300 
-
-                        truncated_subject = (sanitized_subject[:MAX_HEADER_LENGTH-3] + '...') if len(sanitized_subject) > MAX_HEADER_LENGTH else sanitized_subject
-                        truncated_advisory = (sanitized_advisory[:MAX_BODY_PARAM_LENGTH-3] + '...') if len(sanitized_advisory) > MAX_BODY_PARAM_LENGTH else sanitized_advisory
-                        truncated_risks = (sanitized_risks[:MAX_BODY_PARAM_LENGTH-3] + '...') if len(sanitized_risks) > MAX_BODY_PARAM_LENGTH else sanitized_risks
-                        truncated_safety_tips = (sanitized_safety_tips[:MAX_BODY_PARAM_LENGTH-3] + '...') if len(sanitized_safety_tips) > MAX_BODY_PARAM_LENGTH else sanitized_safety_tips
-
-                        # Assumes template {{1}} for subject, {{2}} for advisory, {{3}} for risks, {{4}} for safety_tips
-                        template_params = [
-                            truncated_subject, 
-                            truncated_advisory, 
-                            truncated_risks, 
-                            truncated_safety_tips
-                        ]
-                        # Filter out empty strings if a section was not present and your template can't handle empty params
-                        # However, it's often better if the template itself is designed to look okay with empty params.
-                        # template_params = [p for p in template_params if p] # Optional: if empty strings cause issues
-
-                        for recipient_phone in wa_recipients_list:
-                            try:
-                                logger.info(f"Sending WhatsApp to {recipient_phone} using template {wa_template_name_config} with params: {template_params}")
-                                sent, response = send_whatsapp_message(
-                                    recipient_phone_number=recipient_phone,
-                                    message_template_name=wa_template_name_config,
-                                    template_params=template_params, 
-                                    access_token=wa_token_config,
-                                    phone_number_id=wa_phone_id_config
-                                )
-                                if sent:
-                                    success_count += 1
-                                    whatsapp_log_details.append(f"Sent to {recipient_phone}: Success (MsgID: {response.get('messages', [{}])[0].get('id', 'N/A')}).")
-                                    logger.info(f"WhatsApp message sent to {recipient_phone}. Response: {response}")
-                                else:
-                                    failure_count += 1
-                                    error_detail = response if isinstance(response, dict) else {"error": str(response)}
-                                    whatsapp_log_details.append(f"Sent to {recipient_phone}: Failed ({error_detail.get('error', {}).get('message', 'Unknown API error')}).")
-                                    logger.error(f"Failed to send WhatsApp message to {recipient_phone}. Response: {response}")
-                            except Exception as e_wa:
-                                failure_count += 1
-                                logger.error(f"Exception sending WhatsApp to {recipient_phone}: {e_wa}", exc_info=True)
-                                whatsapp_log_details.append(f"Sent to {recipient_phone}: Failed (Exception: {str(e_wa)}).")
-
-                        final_status = "FAILED"
-                        if success_count > 0 and failure_count == 0:
-                            final_status = "SUCCESS"
-                            whatsapp_success = True
-                        elif success_count > 0 and failure_count > 0:
-                            final_status = "PARTIAL_SUCCESS"
-                            whatsapp_success = True # Still mark as overall success for the channel if at least one went through
-                        
-                        log_entry = DisseminatedBulletinLog(
-                            bulletin_id=bulletin.id,
-                            # whatsapp_group_id=selected_whatsapp_group.id, # Removed: will be handled by association
-                            disseminated_by_fk=g.user.id if g.user else None,
-                            status=final_status,
-                            details="; ".join(whatsapp_log_details),
-                            channel="whatsapp",
-                            # For WhatsApp, subject/message_body are less direct. Log template info.
-                            subject_sent=f"WhatsApp Template: {wa_template_name_config} (Subject: {sanitized_subject[:100]}...)", 
-                            message_body_sent=f"Recipients: {len(wa_recipients_list)}. Advisory: {truncated_advisory[:50]}... Risks: {truncated_risks[:50]}... Tips: {truncated_safety_tips[:50]}... Success: {success_count}, Failed: {failure_count}."
-                        )
-                        log_entry.whatsapp_groups = selected_whatsapp_groups # Assign selected groups to the relationship
-                        log_entries.append(log_entry)
-                        if final_status == "SUCCESS":
-                            logger.info("All WhatsApp messages disseminated successfully.")
+                    template_params = whatsapp_template_params(form.subject.data, form.message.data)
+                    truncated_subject, truncated_advisory, truncated_risks, truncated_safety_tips = template_params
+                    recipients = recipient_statuses(wa_recipients_list)
+                    log_entry = DisseminatedBulletinLog(
+                        bulletin_id=bulletin.id,
+                        disseminated_by_fk=disseminated_by_fk,
+                        status="PENDING",
+                        channel="whatsapp",
+                        # For WhatsApp, subject/message_body are less direct. Log template info.
+                        subject_sent=f"WhatsApp Template: {wa_template_name_config} (Subject: {truncated_subject[:100]}...)",
+                        message_body_sent=f"Recipients: {len(recipients)}. Advisory: {truncated_advisory[:50]}... Risks: {truncated_risks[:50]}... Tips: {truncated_safety_tips[:50]}...",
+                        job_id=job_id
+                    )
+                    log_entry.whatsapp_groups = selected_whatsapp_groups # Assign selected groups to the relationship
+                    log_entry.recipient_statuses = recipients
+                    log_entries.append(log_entry)
+                    queued.append((disseminate_whatsapp, log_entry, (wa_template_name_config, template_params)))
 
             # --- Save all log entries ---
             if log_entries:
@@ -789,60 +590,37 @@ class DisseminateBulletinView(BaseView):
                     db.session.rollback()
                     logging.error(f"Error saving dissemination logs: {e}", exc_info=True)
                     flash(_("Critical error: Failed to save dissemination log(s). Please check system logs."), "danger")
+                    return redirect(url_for("DisseminatedBulletinLogModelView.list"))
 
+            # --- Queue the channel tasks ---
+            if queued:
+                try:
+                    queue_dissemination([(task, (log_entry.id, *args)) for task, log_entry, args in queued])
+                except Exception as e:
+                    db.session.rollback()
+                    logging.error(f"Error queueing dissemination job {job_id}: {e}", exc_info=True)
+                    for _task, log_entry, _args in queued:
+                        if log_entry.status == "PENDING":
+                            log_entry.status = "FAILED"
+                            log_entry.details = f"Could not queue dissemination: {str(e)}"
+                    db.session.commit()
+                    channel_errors.append(str(_("Could not queue the dissemination job (%(error)s).", error=str(e))))
+                    queued = []
 
             # --- Flash overall status message ---
-            final_log_channel = ",".join(sorted(list(set(processed_channels)))) # e.g. "email,facebook"
-            
-            if dissemination_channels: # Only flash messages if channels were selected
-                # Determine overall success for each processed channel for consolidated messaging
-                email_channel_processed = 'email' in processed_channels
-                facebook_channel_processed = 'facebook' in processed_channels
-                whatsapp_channel_processed = 'whatsapp' in processed_channels
-
-                # Consolidate success/failure messages
-                results_summary = []
-                any_failures = False
-
-                if email_channel_processed:
-                    if email_success:
-                        results_summary.append(str(_("Email: Success.")))
-                    else:
-                        error_detail = next((log.details for log in log_entries if log.channel == 'email' and log.status == 'FAILED'), 'Unknown error')
-                        results_summary.append(str(_("Email: Failed (%(error)s).", error=error_detail)))
-                        any_failures = True
-                
-                if facebook_channel_processed:
-                    # For Facebook, check if log status is SUCCESS or PARTIAL_SUCCESS for overall success
-                    fb_log_entry = next((log for log in log_entries if log.channel == 'facebook'), None)
-                    fb_final_status = fb_log_entry.status if fb_log_entry else "FAILED"
-
-                    if fb_final_status == "SUCCESS" or fb_final_status == "PARTIAL_SUCCESS":
-                        results_summary.append(str(_("Facebook: Success (%(status)s).", status=fb_final_status)))
-                    else:
-                        error_detail = fb_log_entry.details if fb_log_entry else 'Unknown error'
-                        results_summary.append(str(_("Facebook: Failed (%(error)s).", error=error_detail)))
-                        any_failures = True
-
-                if whatsapp_channel_processed:
-                    wa_log_entry = next((log for log in log_entries if log.channel == 'whatsapp'), None)
-                    wa_final_status = wa_log_entry.status if wa_log_entry else "FAILED"
-                    
-                    if whatsapp_success: # Relies on whatsapp_success being True for SUCCESS or PARTIAL_SUCCESS
-                        results_summary.append(str(_("WhatsApp: Success (%(status)s).", status=wa_final_status)))
-                    else:
-                        error_detail = wa_log_entry.details if wa_log_entry else 'Unknown error'
-                        results_summary.append(str(_("WhatsApp: Failed (%(error)s).", error=error_detail)))
-                        any_failures = True
-
-                if results_summary:
-                    final_message = str(_("Dissemination Result: ")) + " ".join(results_summary)
-                    if any_failures:
-                        flash(final_message, "warning")
-                    else:
-                        flash(final_message, "success")
-                elif not processed_channels: # Should not happen if form validates, but as a fallback
-                     flash(_("No channels were processed."), "info")
+            results_summary = []
+            if queued:
+                channels = ", ".join(log_entry.channel for _task, log_entry, _args in queued)
+                results_summary.append(str(_(
+                    "Dissemination job %(job_id)s started for: %(channels)s. Delivery status is updated in the logs as messages are sent.",
+                    job_id=job_id, channels=channels
+                )))
+            results_summary.extend(channel_errors)
+            if results_summary:
+                final_message = str(_("Dissemination Result: ")) + " ".join(results_summary)
+                flash(final_message, "warning" if channel_errors else "success")
+            elif not dissemination_channels: # Should not happen if form validates, but as a fallback
+                flash(_("No channels were processed."), "info")
 
             return redirect(url_for("DisseminatedBulletinLogModelView.list"))
         
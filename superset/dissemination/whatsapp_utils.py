@@ -1,12 +1,79 @@
 import requests
 import logging
+import threading
+import time
 from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
-def send_whatsapp_message(recipient_phone_number, message_template_name, template_params, access_token, phone_number_id):
+# Concurrent sends per dissemination job, also the size of the session's connection pool
+DEFAULT_WHATSAPP_SEND_MAX_WORKERS = 8
+# Messages per second sent by one dissemination job
+DEFAULT_WHATSAPP_SEND_RATE_LIMIT = 20
+# Retries of throttled (429), unavailable (5xx) or unreachable API calls
+DEFAULT_WHATSAPP_SEND_MAX_RETRIES = 3
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_whatsapp_session():
+    """
+    Process wide requests session for the Cloud API. Connections are reused across
+    messages. Only calls that never reached the API (connect errors) or were
+    throttled (429) are retried, with backoff honouring Retry-After. Read errors
+    and 5xx responses are not: a proxy's 502/504 can follow an accepted message,
+    so they are recorded as failures and only resent by a deliberate rerun.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            config = current_app.config
+            max_retries = config.get("WHATSAPP_SEND_MAX_RETRIES", DEFAULT_WHATSAPP_SEND_MAX_RETRIES)
+            retry = Retry(
+                total=max_retries,
+                connect=max_retries,
+                read=0,
+                other=0,
+                status=max_retries,
+                status_forcelist=(429,),
+                allowed_methods=frozenset({"POST"}),
+                backoff_factor=1,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            pool_size = config.get("WHATSAPP_SEND_MAX_WORKERS", DEFAULT_WHATSAPP_SEND_MAX_WORKERS)
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+            _session = session
+        return _session
+
+
+class RateLimiter:
+    """Spaces out calls from any number of threads to at most ``rate`` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_call = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            call_at = max(now, self._next_call)
+            self._next_call = call_at + self.interval
+        if call_at > now:
+            time.sleep(call_at - now)
+
+
+def send_whatsapp_message(recipient_phone_number, message_template_name, template_params, access_token, phone_number_id, session=None):
     """
     Sends a WhatsApp message using the Meta Cloud API.
+    Pass ``session`` (see get_whatsapp_session) to reuse connections across messages.
     """
     config = current_app.config
     api_version = config.get("WHATSAPP_CLOUD_API_VERSION", "v17.0") # Default to v17.0 if not set
@@ -83,7 +150,7 @@ def send_whatsapp_message(recipient_phone_number, message_template_name, templat
         logger.warning("template_params were provided but not in the expected format (list of strings). Sending template without dynamic components.")
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = (session or requests).post(url, headers=headers, json=payload, timeout=30)
         response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
         logger.info(f"WhatsApp message sent successfully to {recipient_phone_number}. Response: {response.json()}")
         return True, response.json()
@@ -91,7 +158,10 @@ def send_whatsapp_message(recipient_phone_number, message_template_name, templat
         logger.error(f"Error sending WhatsApp message to {recipient_phone_number}: {e}")
         if e.response is not None:
             logger.error(f"Response content: {e.response.text}")
-            return False, e.response.json()
+            try:
+                return False, e.response.json()
+            except ValueError:
+                return False, e.response.text
         return False, str(e)
 
 # Placeholder for other functions to be implemented
@@ -8,6 +8,7 @@ from superset.views.base_api import BaseSupersetApi, BaseSupersetModelRestApi, r
 from superset.extensions import event_logger, db
 from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
 from typing import Any, Dict, List, Optional, Type, Union
+import numpy as np
 import pandas as pd
 from werkzeug.wrappers import Response as WerkzeugResponse
 from werkzeug.utils import secure_filename
@@ -17,11 +18,11 @@ import traceback
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Point
 from superset.models.health_facilities import HealthFacility
+from superset.health_facilities.snapshot import facility_snapshot
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from sqlalchemy import inspect, func
 from sqlalchemy.types import String
 from marshmallow import Schema, fields
-from math import radians, cos, sin, asin, sqrt
 from superset.utils.core import get_user_id
 
 logger = logging.getLogger(__name__)
@@ -69,6 +70,67 @@ bounds_facility_rison_schema = {
     "required": ["min_latitude", "min_longitude", "max_latitude", "max_longitude"]
 }
 
+EARTH_RADIUS_KM = 6371.0
+# Great-circle length of one degree of latitude
+KM_PER_DEGREE = 2 * np.pi * EARTH_RADIUS_KM / 360
+
+# Columns returned by HealthFacility.to_dict, selected directly by the map
+# endpoints so that no ORM objects are built
+FACILITY_DICT_COLUMNS = [
+    'id', 'name', 'facility_type', 'code', 'municipality', 'location', 'suco',
+    'aldeia', 'latitude', 'longitude', 'elevation', 'property_type', 'address',
+    'phone', 'email', 'services', 'operating_days', 'operating_hours',
+    'total_beds', 'maternity_beds', 'has_ambulance', 'has_emergency', 'created_on',
+]
+
+_facilities_table_exists = False
+
+
+def facilities_table_exists() -> bool:
+    """Check once per process that the health_facilities table exists"""
+    global _facilities_table_exists
+    if not _facilities_table_exists:
+        _facilities_table_exists = inspect(db.engine).has_table(HealthFacility.__tablename__)
+    return _facilities_table_exists
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float):
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of radius_km.
+    The longitude bounds are None when the circle reaches a pole or crosses the
+    antimeridian, in which case only latitude can be used to prefilter.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = latitude - delta_lat, latitude + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    delta_lon = delta_lat / np.cos(np.radians(max(abs(min_lat), abs(max_lat))))
+    min_lon, max_lon = longitude - delta_lon, longitude + delta_lon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def haversine_distances(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great circle distances in kilometers from one point to arrays of points"""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def facility_rows_to_dicts(rows) -> List[Dict[str, Any]]:
+    """Build HealthFacility.to_dict()-shaped dicts from FACILITY_DICT_COLUMNS rows"""
+    facilities = []
+    for row in rows:
+        facility = row._asdict()
+        created_on = facility['created_on']
+        facility['created_on'] = created_on.isoformat() if created_on else None
+        facilities.append(facility)
+    return facilities
+
+
 class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
     resource_name = "health_facilities"
     openapi_spec_tag = "CRISH Health Facilities"
@@ -92,19 +154,53 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
     order_columns = ["name", "facility_type", "location", "municipality", "created_on"]
     # base_filters = [["id", HealthFacility.id, ">", 0]]
     
-    # Helper function for haversine distance calculation
-    def haversine_distance(self, lat1, lon1, lat2, lon2):
-        """Calculate the great circle distance between two points on the earth"""
-        # Convert decimal degrees to radians
-        lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-        
-        # Haversine formula
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-        return c * r
+    @staticmethod
+    def _apply_facility_filters(query, args: Dict[str, Any]):
+        """Apply the optional attribute filters shared by /nearby and /bounds"""
+        filter_facility_type = args.get("facility_type")
+        filter_name = args.get("name")
+        filter_services = args.get("services")
+        filter_has_ambulance = args.get("has_ambulance")
+        filter_has_emergency = args.get("has_emergency")
+
+        if filter_facility_type:
+            # Use 'in_' if it's a list with items
+            if isinstance(filter_facility_type, list) and filter_facility_type:
+                query = query.filter(HealthFacility.facility_type.in_(filter_facility_type))
+            # Handle potential single string if needed, though schema expects array
+            elif isinstance(filter_facility_type, str):
+                 query = query.filter(HealthFacility.facility_type == filter_facility_type)
+        if filter_name:
+            # Use case-insensitive search for name
+            query = query.filter(HealthFacility.name.ilike(f"%{filter_name}%"))
+        if filter_services:
+            # Use case-insensitive search for services
+            query = query.filter(HealthFacility.services.ilike(f"%{filter_services}%"))
+        if filter_has_ambulance is not None:
+            query = query.filter(HealthFacility.has_ambulance == filter_has_ambulance)
+        if filter_has_emergency is not None:
+            query = query.filter(HealthFacility.has_emergency == filter_has_emergency)
+        return query
+
+    @staticmethod
+    def _facility_columns_query():
+        """Query selecting only the columns exposed by HealthFacility.to_dict"""
+        return db.session.query(
+            *[getattr(HealthFacility, column) for column in FACILITY_DICT_COLUMNS]
+        )
+
+    def _snapshot_response(self, key: str) -> Response:
+        """
+        Serve one entry of the in-memory registry snapshot, answering
+        If-None-Match revalidations with 304 Not Modified.
+        """
+        snapshot, etag = facility_snapshot.get()
+        value = snapshot[key]
+        data = value if key == 'counts' else {key: value}
+        response = self.response(200, data=data)
+        response.set_etag(f"{etag}-{key}")
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
     @expose_api("/municipalities", methods=["GET"])
     @safe
@@ -121,15 +217,10 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
               description: Server error
         """
         try:
-            # Check if the table exists
-            inspector = inspect(db.engine)
-            if not inspector.has_table(HealthFacility.__tablename__):
+            if not facilities_table_exists():
                 return self.response(200, data={'municipalities': []})
-                
-            municipalities = db.session.query(HealthFacility.municipality).distinct().all()
-            return self.response(200, data={
-                'municipalities': [m[0] for m in municipalities]
-            })
+
+            return self._snapshot_response('municipalities')
         except Exception as e:
             logger.error(f"Error listing facility municipalities: {str(e)}")
             logger.error(traceback.format_exc())
@@ -165,67 +256,39 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
             longitude = args.get("longitude")
             radius = args.get("radius", 10.0)
 
-            # Extract filter arguments
-            filter_facility_type = args.get("facility_type")
-            filter_name = args.get("name")
-            filter_services = args.get("services")
-            filter_has_ambulance = args.get("has_ambulance")
-            filter_has_emergency = args.get("has_emergency")
-
             if not latitude or not longitude:
                 return self.response(400, message="Latitude and longitude are required")
 
-            # Check if the table exists
-            inspector = inspect(db.engine)
-            if not inspector.has_table(HealthFacility.__tablename__):
+            if not facilities_table_exists():
+                return self.response(200, data={'facilities': []})
+
+            # Prefilter on the (latitude, longitude) index with the box enclosing the radius
+            min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius)
+            query = self._facility_columns_query().filter(
+                HealthFacility.latitude.between(min_lat, max_lat)
+            )
+            if min_lon is not None:
+                query = query.filter(HealthFacility.longitude.between(min_lon, max_lon))
+            query = self._apply_facility_filters(query, args)
+
+            rows = query.all()
+            logger.debug(f"Found {len(rows)} candidate facilities in bounding box.")
+            if not rows:
                 return self.response(200, data={'facilities': []})
 
-            # Build the base query
-            query = db.session.query(HealthFacility)
-
-            # Apply filters to the query
-            if filter_facility_type:
-                # Use 'in_' if it's a list with items
-                if isinstance(filter_facility_type, list) and filter_facility_type:
-                    query = query.filter(HealthFacility.facility_type.in_(filter_facility_type))
-                # Handle potential single string if needed, though schema expects array
-                elif isinstance(filter_facility_type, str):
-                     query = query.filter(HealthFacility.facility_type == filter_facility_type)
-            if filter_name:
-                # Use case-insensitive search for name
-                query = query.filter(HealthFacility.name.ilike(f"%{filter_name}%"))
-            if filter_services:
-                # Use case-insensitive search for services
-                query = query.filter(HealthFacility.services.ilike(f"%{filter_services}%"))
-            if filter_has_ambulance is not None:
-                query = query.filter(HealthFacility.has_ambulance == filter_has_ambulance)
-            if filter_has_emergency is not None:
-                query = query.filter(HealthFacility.has_emergency == filter_has_emergency)
-
-            # Fetch potential facilities based on filters
-            logger.info(f"Executing filtered query: {str(query)}")
-            potential_facilities = query.all()
-            logger.info(f"Found {len(potential_facilities)} potential facilities after filtering.")
-
-            # Filter by distance using Haversine
-            nearby = []
-            for facility in potential_facilities:
-                # Ensure latitude and longitude are not None before calculating distance
-                if facility.latitude is not None and facility.longitude is not None:
-                    distance = self.haversine_distance(
-                        latitude, longitude,
-                        facility.latitude, facility.longitude
-                    )
-                    if distance <= radius:
-                        facility_dict = facility.to_dict()
-                        facility_dict['distance'] = round(distance, 2)
-                        nearby.append(facility_dict)
-                else:
-                     logger.warning(f"Facility ID {facility.id} has missing coordinates.")
-
-
-            # Sort by distance
-            nearby.sort(key=lambda x: x.get('distance', float('inf'))) # Use inf for missing distances
+            # Exact distance filter and sort in one vectorized pass
+            distances = haversine_distances(
+                latitude,
+                longitude,
+                np.array([row.latitude for row in rows], dtype=float),
+                np.array([row.longitude for row in rows], dtype=float),
+            )
+            within_radius = np.flatnonzero(distances <= radius)
+            ordered = within_radius[np.argsort(distances[within_radius], kind="stable")]
+
+            nearby = facility_rows_to_dicts(rows[i] for i in ordered)
+            for facility, distance in zip(nearby, np.round(distances[ordered], 2)):
+                facility['distance'] = float(distance)
 
             return self.response(200, data={
                 'facilities': nearby
@@ -250,15 +313,10 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
               description: Server error
         """
         try:
-            # Check if the table exists
-            inspector = inspect(db.engine)
-            if not inspector.has_table(HealthFacility.__tablename__):
+            if not facilities_table_exists():
                 return self.response(200, data={'types': []})
-                
-            types = db.session.query(HealthFacility.facility_type).distinct().all()
-            return self.response(200, data={
-                'types': [t[0] for t in types]
-            })
+
+            return self._snapshot_response('types')
         except Exception as e:
             logger.error(f"Error listing facility types: {str(e)}")
             logger.error(traceback.format_exc())
@@ -279,15 +337,10 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
               description: Server error
         """
         try:
-            # Check if the table exists
-            inspector = inspect(db.engine)
-            if not inspector.has_table(HealthFacility.__tablename__):
+            if not facilities_table_exists():
                 return self.response(200, data={'locations': []})
-                
-            locations = db.session.query(HealthFacility.location).distinct().all()
-            return self.response(200, data={
-                'locations': [l[0] for l in locations]
-            })
+
+            return self._snapshot_response('locations')
         except Exception as e:
             logger.error(f"Error listing facility locations: {str(e)}")
             logger.error(traceback.format_exc())
@@ -308,9 +361,7 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
               description: Server error
         """
         try:
-            # Check if the table exists
-            inspector = inspect(db.engine)
-            if not inspector.has_table(HealthFacility.__tablename__):
+            if not facilities_table_exists():
                 return self.response(200, data={
                     'total': 0,
                     'by_type': {},
@@ -318,33 +369,7 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
                     'by_municipality': {}
                 })
             
-            # Count by type
-            type_counts = db.session.query(
-                HealthFacility.facility_type,
-                func.count(HealthFacility.id)
-            ).group_by(HealthFacility.facility_type).all()
-            
-            # Count by location/administrative post
-            location_counts = db.session.query(
-                HealthFacility.location,
-                func.count(HealthFacility.id)
-            ).group_by(HealthFacility.location).all()
-            
-            # Count by municipality
-            municipality_counts = db.session.query(
-                HealthFacility.municipality,
-                func.count(HealthFacility.id)
-            ).group_by(HealthFacility.municipality).all()
-            
-            # Total facilities
-            total_count = db.session.query(func.count(HealthFacility.id)).scalar()
-            
-            return self.response(200, data={
-                'total': total_count,
-                'by_type': {t[0]: t[1] for t in type_counts},
-                'by_location': {l[0]: l[1] for l in location_counts},
-                'by_municipality': {m[0]: m[1] for m in municipality_counts}
-            })
+            return self._snapshot_response('counts')
         except Exception as e:
             logger.error(f"Error calculating facility counts: {str(e)}")
             logger.error(traceback.format_exc())
@@ -381,53 +406,21 @@ class HealthFacilitiesRestApi(BaseSupersetModelRestApi):
             max_latitude = args.get("max_latitude")
             max_longitude = args.get("max_longitude")
 
-            # Extract filter arguments (same as nearby)
-            filter_facility_type = args.get("facility_type")
-            filter_name = args.get("name")
-            filter_services = args.get("services")
-            filter_has_ambulance = args.get("has_ambulance")
-            filter_has_emergency = args.get("has_emergency")
-
             # Basic validation for bounds
             if None in [min_latitude, min_longitude, max_latitude, max_longitude]:
                 return self.response(400, message="Bounding box coordinates (min/max latitude/longitude) are required")
 
-            # Check if the table exists
-            inspector = inspect(db.engine)
-            if not inspector.has_table(HealthFacility.__tablename__):
+            if not facilities_table_exists():
                 return self.response(200, data={'facilities': []})
 
-            # Build the base query
-            query = db.session.query(HealthFacility)
-
-            # Apply bounding box filter
+            # Bounding box filter served by the (latitude, longitude) index
+            query = self._facility_columns_query()
             query = query.filter(HealthFacility.latitude.between(min_latitude, max_latitude))
             query = query.filter(HealthFacility.longitude.between(min_longitude, max_longitude))
+            query = self._apply_facility_filters(query, args)
 
-            # Apply optional filters (reuse logic from nearby)
-            if filter_facility_type:
-                # Use 'in_' if it's a list with items
-                if isinstance(filter_facility_type, list) and filter_facility_type:
-                    query = query.filter(HealthFacility.facility_type.in_(filter_facility_type))
-                # Handle potential single string if needed
-                elif isinstance(filter_facility_type, str):
-                     query = query.filter(HealthFacility.facility_type == filter_facility_type)
-            if filter_name:
-                query = query.filter(HealthFacility.name.ilike(f"%{filter_name}%"))
-            if filter_services:
-                query = query.filter(HealthFacility.services.ilike(f"%{filter_services}%"))
-            if filter_has_ambulance is not None:
-                query = query.filter(HealthFacility.has_ambulance == filter_has_ambulance)
-            if filter_has_emergency is not None:
-                query = query.filter(HealthFacility.has_emergency == filter_has_emergency)
-
-            # Fetch facilities based on bounds and filters
-            logger.info(f"Executing bounds query: {str(query)}")
-            facilities_in_bounds = query.all()
-            logger.info(f"Found {len(facilities_in_bounds)} facilities within bounds after filtering.")
-
-            # Convert results to dictionary format (optional, depends on how frontend uses it)
-            result_list = [facility.to_dict() for facility in facilities_in_bounds]
+            result_list = facility_rows_to_dicts(query.all())
+            logger.debug(f"Found {len(result_list)} facilities within bounds after filtering.")
 
             return self.response(200, data={
                 'facilities': result_list
@@ -0,0 +1,142 @@
+"""
+In-process snapshot of the health facility registry lookups.
+
+The facilities map requests the municipality, type and location lists and the
+facility counts on every page load. They only change when the registry is
+updated, so they are computed from a single GROUP BY and kept in memory.
+
+A snapshot is invalidated immediately when a session in this process commits
+a HealthFacility change, and revalidated against a (row count, max changed_on)
+watermark at most every HEALTH_FACILITIES_SNAPSHOT_REVALIDATE_SECONDS to pick
+up writes made by other workers.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from superset.extensions import db
+from superset.models.health_facilities import HealthFacility
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REVALIDATE_SECONDS = 30
+_SESSION_DIRTY_KEY = "health_facilities_changed"
+
+
+class FacilityRegistrySnapshot:
+    """Versioned, thread-safe cache of the facility lookup lists and counts"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._etag: Optional[str] = None
+        self._watermark: Optional[Tuple[Any, Any]] = None
+        self._checked_at = 0.0
+        self._stale = True
+
+    def invalidate(self) -> None:
+        """Force the next read to rebuild the snapshot"""
+        self._stale = True
+
+    def get(self) -> Tuple[Dict[str, Any], str]:
+        """Return the current snapshot data and its ETag"""
+        revalidate_seconds = current_app.config.get(
+            "HEALTH_FACILITIES_SNAPSHOT_REVALIDATE_SECONDS", DEFAULT_REVALIDATE_SECONDS
+        )
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not self._stale
+                and self._data is not None
+                and now - self._checked_at < revalidate_seconds
+            ):
+                return self._data, self._etag
+
+            watermark = self._read_watermark()
+            if self._stale or self._data is None or watermark != self._watermark:
+                self._data = self._build()
+                self._watermark = watermark
+                self._etag = hashlib.sha1(repr(watermark).encode()).hexdigest()
+                logger.debug(
+                    "Rebuilt health facility snapshot at watermark %s", watermark
+                )
+
+            self._stale = False
+            self._checked_at = now
+            return self._data, self._etag
+
+    @staticmethod
+    def _read_watermark() -> Tuple[Any, Any]:
+        count, last_changed = db.session.query(
+            func.count(HealthFacility.id), func.max(HealthFacility.changed_on)
+        ).one()
+        return count, last_changed.isoformat() if last_changed else None
+
+    @staticmethod
+    def _build() -> Dict[str, Any]:
+        rows = (
+            db.session.query(
+                HealthFacility.municipality,
+                HealthFacility.location,
+                HealthFacility.facility_type,
+                func.count(HealthFacility.id),
+            )
+            .group_by(
+                HealthFacility.municipality,
+                HealthFacility.location,
+                HealthFacility.facility_type,
+            )
+            .all()
+        )
+
+        by_municipality: Counter = Counter()
+        by_location: Counter = Counter()
+        by_type: Counter = Counter()
+        for municipality, location, facility_type, count in rows:
+            by_municipality[municipality] += count
+            by_location[location] += count
+            by_type[facility_type] += count
+
+        return {
+            "municipalities": sorted(by_municipality),
+            "locations": sorted(by_location),
+            "types": sorted(by_type),
+            "counts": {
+                "total": sum(by_type.values()),
+                "by_type": dict(by_type),
+                "by_location": dict(by_location),
+                "by_municipality": dict(by_municipality),
+            },
+        }
+
+
+facility_snapshot = FacilityRegistrySnapshot()
+
+
+def _mark_session_dirty(mapper: Any, connection: Any, target: HealthFacility) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        session.info[_SESSION_DIRTY_KEY] = True
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(HealthFacility, _event_name, _mark_session_dirty)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(_SESSION_DIRTY_KEY, False):
+        facility_snapshot.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_DIRTY_KEY, None)
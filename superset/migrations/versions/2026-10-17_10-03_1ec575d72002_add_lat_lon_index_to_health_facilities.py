@@ -0,0 +1,41 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Add latitude/longitude index to health_facilities
+
+Revision ID: 1ec575d72002
+Revises: 6eb9a8b8b50f
+Create Date: 2026-10-17 10:03:27.915840
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '1ec575d72002'
+down_revision = '6eb9a8b8b50f'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index(
+        'ix_health_facilities_latitude_longitude',
+        'health_facilities',
+        ['latitude', 'longitude'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_health_facilities_latitude_longitude', table_name='health_facilities')
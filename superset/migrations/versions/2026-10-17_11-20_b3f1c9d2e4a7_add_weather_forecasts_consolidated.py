@@ -0,0 +1,65 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Add consolidated weather forecasts table
+
+Revision ID: b3f1c9d2e4a7
+Revises: 1ec575d72002
+Create Date: 2026-10-17 11:20:37.502914
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'b3f1c9d2e4a7'
+down_revision = '1ec575d72002'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    # Populated by the weather forecast puller after each ingest, one row per
+    # (forecast_date, municipality_code) with every parameter as a column.
+    # A plain table rather than a materialized view because the puller
+    # replaces the per-parameter tables, which a dependent view would block.
+    if table_exists('weather_forecasts_consolidated'):
+        return
+
+    op.create_table('weather_forecasts_consolidated',
+        sa.Column('forecast_date', sa.Date(), nullable=False),
+        sa.Column('municipality_code', sa.String(length=50), nullable=False),
+        sa.Column('day_name', sa.String(length=50), nullable=True),
+        sa.Column('municipality_name', sa.String(length=255), nullable=True),
+        sa.Column('ws_daily_avg_region_value', sa.Float(), nullable=True),
+        sa.Column('heat_index_daily_region_value', sa.Float(), nullable=True),
+        sa.Column('rainfall_daily_weighted_average_value', sa.Float(), nullable=True),
+        sa.Column('rh_daily_avg_region_value', sa.Float(), nullable=True),
+        sa.Column('tmax_daily_tmax_region_value', sa.Float(), nullable=True),
+        sa.Column('tmin_daily_tmin_region_value', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('forecast_date', 'municipality_code', name='pk_weather_forecasts_municipality_date'),
+    )
+
+
+def downgrade():
+    if table_exists('weather_forecasts_consolidated'):
+        op.drop_table('weather_forecasts_consolidated')
@@ -0,0 +1,86 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Store weather parameter forecast_date as DATE and index it
+
+Revision ID: 4c2e8f7a9b10
+Revises: b3f1c9d2e4a7
+Create Date: 2026-10-17 12:05:19.846203
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4c2e8f7a9b10'
+down_revision = 'b3f1c9d2e4a7'
+
+from alembic import op
+import sqlalchemy as sa
+
+# Created and replaced by the weather forecast puller, so they may not exist yet
+WEATHER_PARAMETER_TABLES = [
+    'ws_daily_avg_region',
+    'heat_index_daily_region',
+    'rainfall_daily_weighted_average',
+    'rh_daily_avg_region',
+    'tmax_daily_tmax_region',
+    'tmin_daily_tmin_region',
+]
+
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return table_name in inspector.get_table_names()
+
+
+def index_name(table_name):
+    return f'ix_{table_name}_forecast_date_municipality_code'
+
+
+def upgrade():
+    conn = op.get_bind()
+    for table_name in WEATHER_PARAMETER_TABLES:
+        if not table_exists(table_name):
+            continue
+
+        inspector = sa.inspect(conn)
+        columns = {col['name']: col['type'] for col in inspector.get_columns(table_name)}
+        if conn.dialect.name == 'postgresql' and not isinstance(columns.get('forecast_date'), sa.Date):
+            op.execute(
+                f'ALTER TABLE {table_name} '
+                f'ALTER COLUMN forecast_date TYPE DATE USING CAST(forecast_date AS DATE)'
+            )
+
+        if not any(ix['name'] == index_name(table_name) for ix in inspector.get_indexes(table_name)):
+            op.create_index(index_name(table_name), table_name, ['forecast_date', 'municipality_code'])
+
+
+def downgrade():
+    conn = op.get_bind()
+    for table_name in WEATHER_PARAMETER_TABLES:
+        if not table_exists(table_name):
+            continue
+
+        inspector = sa.inspect(conn)
+        if any(ix['name'] == index_name(table_name) for ix in inspector.get_indexes(table_name)):
+            op.drop_index(index_name(table_name), table_name=table_name)
+
+        if conn.dialect.name == 'postgresql':
+            op.execute(
+                f'ALTER TABLE {table_name} '
+                f'ALTER COLUMN forecast_date TYPE TEXT USING CAST(forecast_date AS TEXT)'
+            )
@@ -0,0 +1,56 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Add parameter_timings to weather_data_pull_history
+
+Revision ID: 7d2a5e91c3f8
+Revises: 4c2e8f7a9b10
+Create Date: 2026-10-17 13:10:42.318765
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '7d2a5e91c3f8'
+down_revision = '4c2e8f7a9b10'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return table_name in inspector.get_table_names()
+
+
+def column_exists(table_name, column_name):
+    """Check if a column exists in a table"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return any(col['name'] == column_name for col in inspector.get_columns(table_name))
+
+
+def upgrade():
+    # The table is created by the weather forecast puller, which also adds this
+    # column itself when it runs before this migration
+    if table_exists('weather_data_pull_history') and not column_exists('weather_data_pull_history', 'parameter_timings'):
+        op.add_column('weather_data_pull_history', sa.Column('parameter_timings', sa.Text(), nullable=True))
+
+
+def downgrade():
+    if table_exists('weather_data_pull_history') and column_exists('weather_data_pull_history', 'parameter_timings'):
+        op.drop_column('weather_data_pull_history', 'parameter_timings')
@@ -0,0 +1,87 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Create disease_forecast table
+
+Revision ID: e5c8a1f4b209
+Revises: 9b4e6d2f1a73
+Create Date: 2026-10-17 16:25:51.207634
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'e5c8a1f4b209'
+down_revision = '9b4e6d2f1a73'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return table_name in inspector.get_table_names()
+
+
+def column_exists(table_name, column_name):
+    """Check if a column exists in a table"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return any(col['name'] == column_name for col in inspector.get_columns(table_name))
+
+
+def index_exists(table_name, index_name):
+    """Check if an index exists on a table"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return any(ix['name'] == index_name for ix in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    # Predictions upserted by crish-disease-predictor/upload_predictions.py, one row
+    # per (year, week_number, disease, municipality_code). The uploader used to
+    # create this table itself on every run; existing tables are brought up to date.
+    if not table_exists('disease_forecast'):
+        op.create_table('disease_forecast',
+            sa.Column('year', sa.Integer(), nullable=False),
+            sa.Column('week_number', sa.Integer(), nullable=False),
+            sa.Column('disease', sa.String(length=50), nullable=False),
+            sa.Column('municipality_code', sa.CHAR(length=5), nullable=False),
+            sa.Column('municipality_name', sa.String(length=50), nullable=False),
+            sa.Column('predicted_cases', sa.Integer(), nullable=True),
+            sa.Column('forecast_date', sa.TIMESTAMP(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+            sa.CheckConstraint('year >= 2000', name='disease_forecast_year_check'),
+            sa.CheckConstraint('week_number BETWEEN 1 AND 53', name='disease_forecast_week_number_check'),
+            sa.CheckConstraint('predicted_cases >= 0', name='disease_forecast_predicted_cases_check'),
+            sa.PrimaryKeyConstraint('year', 'week_number', 'disease', 'municipality_code', name='disease_forecast_pkey'),
+        )
+    elif not column_exists('disease_forecast', 'forecast_date'):
+        op.add_column('disease_forecast', sa.Column('forecast_date', sa.TIMESTAMP(), nullable=True))
+
+    if not index_exists('disease_forecast', 'idx_disease_forecast_lookup'):
+        op.create_index('idx_disease_forecast_lookup', 'disease_forecast', ['disease', 'year', 'week_number'])
+    if not index_exists('disease_forecast', 'idx_disease_forecast_date'):
+        op.create_index('idx_disease_forecast_date', 'disease_forecast', ['forecast_date'])
+
+
+def downgrade():
+    # Nothing to undo: the table, its forecast_date column and both indexes may
+    # predate this revision (the uploader created them all before it), and they
+    # hold every stored prediction. The previous uploader recreates them anyway.
+    pass
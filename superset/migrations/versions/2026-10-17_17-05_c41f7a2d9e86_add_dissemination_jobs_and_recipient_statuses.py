@@ -0,0 +1,76 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Add dissemination job ids and recipient statuses
+
+Revision ID: c41f7a2d9e86
+Revises: e5c8a1f4b209
+Create Date: 2026-10-17 17:05:12.734518
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7a2d9e86'
+down_revision = 'e5c8a1f4b209'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def table_exists(table_name):
+    """Check if a table exists"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return table_name in inspector.get_table_names()
+
+
+def column_exists(table_name, column_name):
+    """Check if a column exists in a table"""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    return any(col['name'] == column_name for col in inspector.get_columns(table_name))
+
+
+def upgrade():
+    if not column_exists('disseminated_bulletin_logs', 'job_id'):
+        op.add_column('disseminated_bulletin_logs', sa.Column('job_id', sa.String(length=36), nullable=True))
+        op.create_index('ix_disseminated_bulletin_logs_job_id', 'disseminated_bulletin_logs', ['job_id'])
+
+    if not table_exists('dissemination_recipient_statuses'):
+        op.create_table('dissemination_recipient_statuses',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('log_id', sa.Integer(), nullable=False),
+            sa.Column('recipient', sa.String(length=255), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('message_id', sa.String(length=255), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['log_id'], ['disseminated_bulletin_logs.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id', name='dissemination_recipient_statuses_pkey'),
+            sa.UniqueConstraint('log_id', 'recipient', name='uq_dissemination_recipient_statuses_log_recipient'),
+        )
+        op.create_index('ix_dissemination_recipient_statuses_log_id', 'dissemination_recipient_statuses', ['log_id'])
+
+
+def downgrade():
+    if table_exists('dissemination_recipient_statuses'):
+        op.drop_index('ix_dissemination_recipient_statuses_log_id', table_name='dissemination_recipient_statuses')
+        op.drop_table('dissemination_recipient_statuses')
+
+    if column_exists('disseminated_bulletin_logs', 'job_id'):
+        op.drop_index('ix_disseminated_bulletin_logs_job_id', table_name='disseminated_bulletin_logs')
+        op.drop_column('disseminated_bulletin_logs', 'job_id')
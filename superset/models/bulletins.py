@@ -56,7 +56,8 @@ class Bulletin(Model):
         "BulletinImageAttachment",
         backref="bulletin", # Allows BulletinImageAttachment.bulletin
         cascade="all, delete-orphan", # Deletes attachments if bulletin is deleted
-        lazy="select" # Changed from "dynamic"
+        lazy="select", # Changed from "dynamic"
+        order_by="BulletinImageAttachment.id" # Upload order, stable for PDFs and their keys
     )
 
     @property
@@ -1,5 +1,5 @@
 from flask_appbuilder import Model
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Table
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Table, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from flask_appbuilder.security.sqla.models import User
@@ -87,11 +87,24 @@ class DisseminatedBulletinLog(Model):
     # New field to store the channel of dissemination
     channel = Column(String(50), nullable=True) # e.g., 'email', 'facebook', 'email_and_facebook'
 
+    # Dissemination job this log belongs to, one log per channel of a job
+    job_id = Column(String(36), nullable=True, index=True)
+
     # Relationships
     bulletin = relationship('Bulletin', foreign_keys=[bulletin_id])
     email_groups = relationship('EmailGroup', secondary=dissemination_email_group_association, backref='disseminated_bulletin_logs', lazy='selectin')
     whatsapp_groups = relationship('WhatsAppGroup', secondary=dissemination_whatsapp_group_association, backref='disseminated_bulletin_logs', lazy='selectin')
     disseminated_by = relationship('User', foreign_keys=[disseminated_by_fk])
+    recipient_statuses = relationship('DisseminationRecipientStatus', back_populates='log', cascade='all, delete-orphan')
+
+    @property
+    def recipient_status_summary(self):
+        if not self.recipient_statuses:
+            return "-"
+        counts = {}
+        for recipient_status in self.recipient_statuses:
+            counts[recipient_status.status] = counts.get(recipient_status.status, 0) + 1
+        return ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
 
     @property
     def associated_email_group_names(self):
@@ -122,5 +135,27 @@ class DisseminatedBulletinLog(Model):
 
         return f"Log for Bulletin ID: {self.bulletin_id} to {group_info} at {self.sent_at}"
 
+class DisseminationRecipientStatus(Model):
+    """Delivery status of one recipient of a dissemination log, so retries only resend what was not sent"""
+    __tablename__ = 'dissemination_recipient_statuses'
+    __table_args__ = (
+        UniqueConstraint('log_id', 'recipient', name='uq_dissemination_recipient_statuses_log_recipient'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    log_id = Column(Integer, ForeignKey('disseminated_bulletin_logs.id', ondelete='CASCADE'), nullable=False, index=True)
+    recipient = Column(String(255), nullable=False) # Email address or phone number
+    # Status: "PENDING", "SENDING" (committed before the send, so a crash can't cause a resend), "SENT" or "FAILED"
+    status = Column(String(50), nullable=False, default="PENDING")
+    attempts = Column(Integer, nullable=False, default=0)
+    message_id = Column(String(255), nullable=True) # Provider message ID, e.g. the WhatsApp message ID
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    log = relationship('DisseminatedBulletinLog', back_populates='recipient_statuses')
+
+    def __repr__(self):
+        return f"{self.recipient}: {self.status}"
+
 # You might need to add these models to Superset's models/__init__.py
 # so they are recognized by Flask-AppBuilder / Alembic for migrations. 
\ No newline at end of file
@@ -1,6 +1,6 @@
 import os
 from flask_appbuilder import Model
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from flask import current_app
@@ -10,6 +10,10 @@ import geoalchemy2.functions as geofunc
 class HealthFacility(Model):
     """A model for health facilities"""
     __tablename__ = "health_facilities"
+    __table_args__ = (
+        # Bounding box prefilter of the /nearby and /bounds map endpoints
+        Index("ix_health_facilities_latitude_longitude", "latitude", "longitude"),
+    )
 
     id = Column(Integer, primary_key=True)
     key = Column(String(255), nullable=False)
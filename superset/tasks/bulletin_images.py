@@ -0,0 +1,110 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Periodic removal of bulletin images no attachment refers to.
+
+Image keys are content addressed and shared between bulletins, and uploaders
+(the web API and both pipelines) PUT an object before their attachment row
+commits. Deleting in the request that drops the last reference would race with
+them, so objects are only deleted here, once their LastModified is older than
+BULLETIN_IMAGE_ORPHAN_GRACE_PERIOD. Every upload PUTs, even an existing key,
+which restarts that period.
+
+The grace period must exceed the longest transaction that uploads an image and
+then inserts its attachment (the pipelines hold one across a whole run). What
+remains is the gap between an object's final HEAD and its DELETE below.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from botocore.exceptions import ClientError
+from flask import current_app
+
+from superset import db
+from superset.extensions import celery_app
+from superset.models.bulletins import BulletinImageAttachment
+from superset.utils.object_storage import get_s3_client
+
+logger = logging.getLogger(__name__)
+
+# Prefixes of the web API's attachments and the pipelines' charts
+IMAGE_PREFIXES = ("bulletin_images/", "bulletin_charts/")
+DEFAULT_GRACE_PERIOD = timedelta(days=1)
+# Keys checked against bulletin_image_attachments per query
+REFERENCE_BATCH_SIZE = 500
+
+
+def _stale_objects(s3_client: Any, bucket: str, cutoff: datetime) -> list[str]:
+    keys = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for prefix in IMAGE_PREFIXES:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys.extend(
+                obj["Key"]
+                for obj in page.get("Contents", [])
+                if obj["LastModified"] < cutoff
+            )
+    return keys
+
+
+def _unreferenced(keys: list[str]) -> list[str]:
+    unreferenced = []
+    for start in range(0, len(keys), REFERENCE_BATCH_SIZE):
+        batch = keys[start : start + REFERENCE_BATCH_SIZE]
+        referenced = {
+            key
+            for (key,) in db.session.query(BulletinImageAttachment.s3_key)
+            .filter(BulletinImageAttachment.s3_key.in_(batch))
+            .distinct()
+        }
+        unreferenced.extend(key for key in batch if key not in referenced)
+    return unreferenced
+
+
+def sweep_orphaned_images() -> int:
+    """Delete bulletin images unreferenced past the grace period, returns how many."""
+    config = current_app.config
+    bucket = config.get("S3_BUCKET")
+    if not bucket:
+        logger.warning("S3_BUCKET is not configured, skipping the bulletin image sweep")
+        return 0
+    s3_client = get_s3_client()
+    grace_period = config.get(
+        "BULLETIN_IMAGE_ORPHAN_GRACE_PERIOD", DEFAULT_GRACE_PERIOD
+    )
+    cutoff = datetime.now(timezone.utc) - grace_period
+
+    deleted = 0
+    for key in _unreferenced(_stale_objects(s3_client, bucket, cutoff)):
+        try:
+            # Skip objects an uploader wrote again since they were listed
+            head = s3_client.head_object(Bucket=bucket, Key=key)
+            if head["LastModified"] >= cutoff:
+                continue
+            s3_client.delete_object(Bucket=bucket, Key=key)
+            deleted += 1
+        except ClientError as ex:
+            logger.warning("Could not delete orphaned bulletin image %s: %s", key, ex)
+    logger.info("Deleted %s orphaned bulletin images", deleted)
+    return deleted
+
+
+@celery_app.task(name="bulletins.sweep_orphaned_images", soft_time_limit=3600)
+def sweep_orphaned_images_task() -> None:
+    sweep_orphaned_images()
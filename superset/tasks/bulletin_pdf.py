@@ -0,0 +1,49 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import logging
+
+from flask import current_app
+
+from superset import db
+from superset.bulletins.pdf_store import store_bulletin_pdf
+from superset.extensions import celery_app
+from superset.models.bulletins import Bulletin
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="bulletins.render_pdf", soft_time_limit=300)
+def render_bulletin_pdf(bulletin_id: int) -> None:
+    bulletin = db.session.query(Bulletin).get(bulletin_id)
+    if bulletin is None:
+        logger.warning("Bulletin %s not found, skipping PDF rendering", bulletin_id)
+        return
+    key = store_bulletin_pdf(bulletin)
+    logger.info("PDF of bulletin %s stored as %s", bulletin_id, key)
+
+
+def queue_bulletin_pdf(bulletin_id: int) -> None:
+    """
+    Render the bulletin's PDF ahead of its first download or email. Without
+    Celery workers it is rendered on first use instead.
+    """
+    if not current_app.config.get("CELERY_CONFIG"):
+        return
+    try:
+        render_bulletin_pdf.delay(bulletin_id)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.warning("Could not queue the PDF of bulletin %s: %s", bulletin_id, ex)
@@ -0,0 +1,407 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Bulletin dissemination, one Celery task per channel of a dissemination job.
+
+The form creates a PENDING DisseminatedBulletinLog per channel, with a
+DisseminationRecipientStatus row per email address or phone number, and
+queues the channel tasks. A recipient is marked SENDING and committed before
+its message goes out, and its outcome is committed as soon as it is known.
+Tasks only send to PENDING and FAILED recipients, so running a task again
+after a crash or for a retry does not message anyone twice: a recipient left
+SENDING may or may not have been messaged, and is reported rather than resent.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from concurrent.futures import (
+    as_completed,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Optional
+
+from celery import group
+from celery.exceptions import SoftTimeLimitExceeded
+from flask import current_app
+
+from superset import db
+from superset.bulletins.pdf_store import get_bulletin_pdf
+from superset.dissemination.facebook_utils import (
+    create_facebook_feed_post,
+    get_facebook_graph_api,
+    upload_single_photo_to_facebook,
+)
+from superset.dissemination.whatsapp_utils import (
+    DEFAULT_WHATSAPP_SEND_MAX_WORKERS,
+    DEFAULT_WHATSAPP_SEND_RATE_LIMIT,
+    get_whatsapp_session,
+    RateLimiter,
+    send_whatsapp_message,
+)
+from superset.extensions import celery_app
+from superset.models.dissemination import (
+    DisseminatedBulletinLog,
+    DisseminationRecipientStatus,
+)
+from superset.utils.core import send_email_smtp
+from superset.utils.object_storage import get_s3_client
+
+logger = logging.getLogger(__name__)
+
+# Recipient statuses
+PENDING = "PENDING"
+SENDING = "SENDING"
+SENT = "SENT"
+FAILED = "FAILED"
+
+# Failed recipients listed in a log's details
+MAX_LOGGED_FAILURES = 20
+# Bulletin images uploaded to Facebook at the same time
+FACEBOOK_PHOTO_UPLOAD_MAX_WORKERS = 4
+
+
+def new_job_id() -> str:
+    return str(uuid.uuid4())
+
+
+def recipient_statuses(recipients: list[str]) -> list[DisseminationRecipientStatus]:
+    """PENDING status rows for the unique ``recipients``, in their original order"""
+    return [
+        DisseminationRecipientStatus(recipient=recipient, status=PENDING, attempts=0)
+        for recipient in dict.fromkeys(recipients)
+    ]
+
+
+def queue_dissemination(channel_tasks: list[tuple[Any, tuple[Any, ...]]]) -> None:
+    """
+    Run the (task, args) of a job on the Celery workers, fanned out as a group.
+    Without Celery workers the tasks run one after the other in this process.
+    """
+    config = current_app.config
+    if config.get("DISSEMINATION_ASYNC", True) and config.get("CELERY_CONFIG"):
+        group(task.s(*args) for task, args in channel_tasks).apply_async()
+        return
+    for task, args in channel_tasks:
+        task(*args)
+
+
+def _get_log(log_id: int) -> Optional[DisseminatedBulletinLog]:
+    log = db.session.query(DisseminatedBulletinLog).get(log_id)
+    if log is None:
+        logger.warning("Dissemination log %s not found, skipping", log_id)
+    return log
+
+
+def _pending_recipients(
+    log: DisseminatedBulletinLog,
+) -> list[DisseminationRecipientStatus]:
+    """Recipients to send to, SENDING ones may already have the message"""
+    return [
+        status
+        for status in log.recipient_statuses
+        if status.status in (PENDING, FAILED)
+    ]
+
+
+def _describe_unknown(log: DisseminatedBulletinLog) -> None:
+    for status in log.recipient_statuses:
+        if status.status == SENDING and not status.error:
+            status.error = "Interrupted while sending, delivery unknown, not resent"
+
+
+def _finish_log(log: DisseminatedBulletinLog, error: Optional[str] = None) -> None:
+    """Derive the log's status and details from its recipients' statuses"""
+    _describe_unknown(log)
+    failures = [status for status in log.recipient_statuses if status.status != SENT]
+    sent_count = len(log.recipient_statuses) - len(failures)
+    if not failures:
+        log.status = "SUCCESS"
+    elif sent_count:
+        log.status = "PARTIAL_SUCCESS"
+    else:
+        log.status = "FAILED"
+
+    details = [f"Sent: {sent_count}, Failed: {len(failures)}."]
+    if error:
+        details.append(error)
+    if failures:
+        listed = "; ".join(
+            f"{status.recipient}: {status.error or status.status}"
+            for status in failures[:MAX_LOGGED_FAILURES]
+        )
+        if len(failures) > MAX_LOGGED_FAILURES:
+            listed += f"; and {len(failures) - MAX_LOGGED_FAILURES} more"
+        details.append(f"Failed recipients: {listed}.")
+    log.details = " ".join(details)
+
+
+@celery_app.task(name="dissemination.email", soft_time_limit=600)
+def disseminate_email(log_id: int, subject: str, message: str) -> None:
+    log = _get_log(log_id)
+    if log is None:
+        return
+    pending = _pending_recipients(log)
+    if not pending:
+        return
+
+    for status in pending:
+        status.status = SENDING
+        status.attempts += 1
+    db.session.commit()
+
+    error = None
+    try:
+        bulletin = log.bulletin
+        # The same stored PDF the download endpoint serves
+        pdf_data = get_bulletin_pdf(bulletin)
+        pdf_filename = f"{bulletin.title.replace(' ', '_')}.pdf"
+        # Replace \n with <br> and append two new lines at the end of the html_email_body
+        html_email_body = message.replace("\n", "<br>") + "<br><br>"
+        send_email_smtp(
+            to=",".join(status.recipient for status in pending),
+            subject=subject,
+            html_content=html_email_body,
+            pdf={pdf_filename: pdf_data},
+            config=current_app.config,
+        )
+        outcome, error_detail = SENT, None
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.error("Error disseminating bulletin via Email: %s", ex, exc_info=True)
+        outcome, error_detail = FAILED, str(ex)
+        error = f"Email Error: {ex}"
+
+    for status in pending:
+        status.status = outcome
+        status.error = error_detail
+    _finish_log(log, error)
+    db.session.commit()
+
+
+def _upload_facebook_photos(
+    graph: Any, page_id: str, bulletin: Any
+) -> tuple[list[str], list[str]]:
+    """Upload the bulletin's images as unpublished photos, returns (photo ids, errors)"""
+    s3_bucket_name = current_app.config.get("S3_BUCKET")
+    if not s3_bucket_name:
+        raise ValueError("S3_BUCKET is not configured for image attachments.")
+    s3_client = get_s3_client()
+
+    photos = []
+    errors = []
+    for attachment in bulletin.image_attachments:
+        if not attachment.s3_key:
+            logger.warning("Attachment ID %s missing s3_key, skipping.", attachment.id)
+            errors.append(f"Attachment ID {attachment.id}: missing s3_key.")
+            continue
+        image_url = s3_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": s3_bucket_name, "Key": attachment.s3_key},
+            ExpiresIn=300,
+        )
+        # Use attachment caption or fallback
+        photos.append(
+            (attachment.s3_key, attachment.caption or bulletin.title, image_url)
+        )
+
+    photo_ids = []
+    with ThreadPoolExecutor(
+        max_workers=FACEBOOK_PHOTO_UPLOAD_MAX_WORKERS,
+        thread_name_prefix="facebook-photo",
+    ) as executor:
+        futures = [
+            (
+                s3_key,
+                executor.submit(
+                    upload_single_photo_to_facebook,
+                    graph=graph,
+                    page_id=page_id,
+                    image_caption=caption,
+                    image_url=image_url,
+                    published=False,  # Upload as unpublished first
+                ),
+            )
+            for s3_key, caption, image_url in photos
+        ]
+        # Keep the bulletin's image order in the post
+        for s3_key, future in futures:
+            try:
+                photo_ids.append(future.result())
+                logger.info("Uploaded attachment %s to Facebook", s3_key)
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.error(
+                    "Error uploading attachment %s to Facebook: %s",
+                    s3_key,
+                    ex,
+                    exc_info=True,
+                )
+                errors.append(f"Img '{s3_key}': {str(ex)[:100]}")
+    return photo_ids, errors
+
+
+@celery_app.task(name="dissemination.facebook", soft_time_limit=600)
+def disseminate_facebook(log_id: int, subject: str, message: str) -> None:
+    log = _get_log(log_id)
+    # A post is not idempotent, never post a job twice
+    if log is None or log.status != "PENDING":
+        return
+
+    config = current_app.config
+    page_id = config.get("FACEBOOK_PAGE_ID")
+    image_errors: list[str] = []
+    try:
+        graph = get_facebook_graph_api(config.get("FACEBOOK_ACCESS_TOKEN"))
+        photo_ids: list[str] = []
+        if log.bulletin.image_attachments:
+            photo_ids, image_errors = _upload_facebook_photos(
+                graph, page_id, log.bulletin
+            )
+
+        post_id = create_facebook_feed_post(
+            graph=graph,
+            page_id=page_id,
+            message=f"{subject}\n\n{message}",
+            attached_media_ids=photo_ids or None,
+        )
+        details = f"Facebook Post ID: {post_id}."
+        if photo_ids:
+            details += f" Attached Photo IDs: {', '.join(map(str, photo_ids))}."
+        if image_errors:
+            details += f" Image Upload Errors: {'; '.join(image_errors)}."
+        # Mark as partial if some images failed
+        log.status = "PARTIAL_SUCCESS" if image_errors else "SUCCESS"
+        log.details = details
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.error("Error disseminating bulletin via Facebook: %s", ex, exc_info=True)
+        log.status = "FAILED"
+        log.details = (
+            f"Facebook Error: {ex}. Image Errors: {'; '.join(image_errors) or 'None'}"
+        )
+    db.session.commit()
+
+
+def _whatsapp_error(response: Any) -> str:
+    if isinstance(response, dict):
+        return str(response.get("error", {}).get("message", "Unknown API error"))
+    return str(response)
+
+
+@celery_app.task(
+    name="dissemination.whatsapp",
+    soft_time_limit=3600,
+    # Redelivered if the worker dies mid job, SENT and SENDING recipients are skipped
+    acks_late=True,
+)
+def disseminate_whatsapp(
+    log_id: int, template_name: str, template_params: list[str]
+) -> None:
+    log = _get_log(log_id)
+    if log is None:
+        return
+    pending = _pending_recipients(log)
+    if not pending:
+        return
+
+    config = current_app.config
+    access_token = config.get("WHATSAPP_ACCESS_TOKEN")
+    phone_number_id = config.get("WHATSAPP_PHONE_NUMBER_ID")
+    session = get_whatsapp_session()
+    rate_limiter = RateLimiter(
+        config.get("WHATSAPP_SEND_RATE_LIMIT", DEFAULT_WHATSAPP_SEND_RATE_LIMIT)
+    )
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+
+    def send(recipient: str) -> tuple[bool, Any]:
+        rate_limiter.wait()
+        with app.app_context():
+            return send_whatsapp_message(
+                recipient_phone_number=recipient,
+                message_template_name=template_name,
+                template_params=template_params,
+                access_token=access_token,
+                phone_number_id=phone_number_id,
+                session=session,
+            )
+
+    def record(status: DisseminationRecipientStatus, future: Future) -> None:
+        try:
+            sent, response = future.result()
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.error(
+                "Exception sending WhatsApp to %s: %s",
+                status.recipient,
+                ex,
+                exc_info=True,
+            )
+            sent, response = False, str(ex)
+        if sent:
+            status.status = SENT
+            status.message_id = response.get("messages", [{}])[0].get("id")
+            status.error = None
+        else:
+            status.status = FAILED
+            status.error = _whatsapp_error(response)
+
+    logger.info(
+        "Sending WhatsApp template %s to %s recipients", template_name, len(pending)
+    )
+    max_workers = config.get(
+        "WHATSAPP_SEND_MAX_WORKERS", DEFAULT_WHATSAPP_SEND_MAX_WORKERS
+    )
+    error = None
+    queued = iter(pending)
+    in_flight: dict[Future, DisseminationRecipientStatus] = {}
+    # Statuses are only touched on this thread, it owns the session
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="whatsapp-send"
+    ) as executor:
+        try:
+            while True:
+                starting = []
+                while len(in_flight) + len(starting) < max_workers:
+                    status = next(queued, None)
+                    if status is None:
+                        break
+                    status.status = SENDING
+                    status.attempts += 1
+                    starting.append(status)
+                # Outcomes recorded so far and the SENDING marks go in before any POST
+                db.session.commit()
+                for status in starting:
+                    in_flight[executor.submit(send, status.recipient)] = status
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(in_flight.pop(future), future)
+        except SoftTimeLimitExceeded:
+            logger.warning(
+                "WhatsApp dissemination of log %s hit its time limit, stopping", log_id
+            )
+            # Back to the last commit, recipients not marked SENDING stay PENDING
+            db.session.rollback()
+            error = "Stopped at the time limit, pending recipients were not sent."
+        # Messages already posted still get their outcome
+        for future in as_completed(in_flight):
+            record(in_flight[future], future)
+
+    _finish_log(log, error)
+    db.session.commit()
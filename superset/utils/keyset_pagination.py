@@ -0,0 +1,168 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Keyset (cursor) pagination and count modes for list endpoints.
+
+Instead of LIMIT/OFFSET, a cursor page filters on the sort key of the last row
+returned, ``(k1, k2, ...) > (v1, v2, ...)``, which the database serves as an
+index range scan regardless of how deep the page is. The cursor handed to
+clients is an opaque, URL safe encoding of those key values.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+logger = logging.getLogger(__name__)
+
+CURSOR_ARG = "cursor"
+COUNT_ARG = "count"
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor cannot be decoded for the requested endpoint"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key values of the last row of a page as an opaque cursor"""
+    payload = json.dumps(
+        [_encode_value(value) for value in values], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, width: int) -> list[Any]:
+    """Decode a cursor produced by encode_cursor for a key of ``width`` columns"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(value) for value in values]
+    except (ValueError, TypeError) as ex:
+        raise InvalidCursorError("Malformed cursor") from ex
+    if not isinstance(values, list) or len(values) != width:
+        raise InvalidCursorError("Cursor does not match this endpoint")
+    return values
+
+
+def parse_count_mode(value: Optional[str], default: str = COUNT_EXACT) -> str:
+    """Validate the ``count`` request argument"""
+    if value is None or value == "":
+        return default
+    if value not in COUNT_MODES:
+        raise ValueError(f"count must be one of: {', '.join(COUNT_MODES)}")
+    return value
+
+
+def count_rows(query: Query, mode: str) -> Optional[int]:
+    """
+    Count the rows a query returns according to ``mode``.
+
+    ``estimate`` reads the planner row estimate on PostgreSQL, which costs no
+    scan, and falls back to an exact count on other databases.
+    """
+    if mode == COUNT_NONE:
+        return None
+    if mode == COUNT_ESTIMATE:
+        estimate = estimate_rows(query)
+        if estimate is not None:
+            return estimate
+    return query.count()
+
+
+def estimate_rows(query: Query) -> Optional[int]:
+    """Planner row estimate for a query, or None if the database can't provide one"""
+    connection = query.session.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    try:
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Could not estimate row count", exc_info=True)
+        return None
+
+
+def apply_keyset(
+    query: Query,
+    key_columns: Sequence[Any],
+    cursor_values: Optional[Sequence[Any]],
+    descending: bool = False,
+) -> Query:
+    """
+    Order ``query`` by ``key_columns`` and, when resuming from a cursor, keep
+    only the rows that sort after it. ``key_columns`` must be unique per row
+    and not nullable, otherwise rows can be skipped or repeated between pages.
+    """
+    if cursor_values is not None:
+        key = tuple_(*key_columns)
+        resume_after = tuple_(*cursor_values)
+        query = query.filter(key < resume_after if descending else key > resume_after)
+    return query.order_by(
+        *[column.desc() if descending else column.asc() for column in key_columns]
+    )
+
+
+def fetch_keyset_page(
+    query: Query, page_size: int, key_of: Any
+) -> tuple[list[Any], Optional[str]]:
+    """
+    Fetch one page from a query prepared with apply_keyset. Returns the rows
+    and the cursor for the next page, or None on the last page.
+
+    ``key_of`` maps a result row to its key values, in key_columns order.
+    """
+    rows = query.limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(key_of(rows[-1]))
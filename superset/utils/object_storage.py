@@ -0,0 +1,199 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Shared S3 client, concurrent content-addressed uploads and cached presigned URLs.
+
+Objects are keyed by the SHA-256 of their content, so the same image uploaded
+for several bulletins, or uploaded again, is stored once. Because a key can be
+shared, requests never delete objects: the bulletins.sweep_orphaned_images task
+removes those no attachment has referenced for a grace period.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from flask import current_app
+
+# Concurrent uploads per process, also the size of the client connection pool
+DEFAULT_UPLOAD_MAX_WORKERS = 8
+# Presigned URLs kept per process
+PRESIGNED_URL_CACHE_SIZE = 10000
+
+_clients: dict[tuple[Any, ...], Any] = {}
+_checked_buckets: set[tuple[Optional[str], str]] = set()
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+# (endpoint, bucket, key, expires in) -> (expiry window, url)
+_presigned_urls: OrderedDict[tuple[Any, ...], tuple[int, str]] = OrderedDict()
+
+# Attachments are small, keep them to single PUTs on the upload pool's threads
+_transfer_config = TransferConfig(use_threads=False)
+
+
+class PendingObject(NamedTuple):
+    key: str
+    body: bytes
+    content_type: str
+
+
+def _max_workers() -> int:
+    return current_app.config.get("S3_UPLOAD_MAX_WORKERS", DEFAULT_UPLOAD_MAX_WORKERS)
+
+
+def get_s3_client(endpoint_url: Optional[str] = None) -> Any:
+    """
+    Return the process wide S3 client for ``endpoint_url`` (the configured
+    S3_ENDPOINT_URL by default). boto3 clients are thread safe, so one client
+    and its connection pool are shared by all requests and upload threads.
+    """
+    config = current_app.config
+    endpoint_url = endpoint_url or config.get("S3_ENDPOINT_URL")
+    addressing_style = config.get("S3_ADDRESSING_STYLE", "path")
+    cache_key = (
+        endpoint_url,
+        config.get("S3_ACCESS_KEY"),
+        config.get("S3_SECRET_KEY"),
+        addressing_style,
+    )
+    with _lock:
+        if cache_key not in _clients:
+            _clients[cache_key] = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                aws_access_key_id=config.get("S3_ACCESS_KEY"),
+                aws_secret_access_key=config.get("S3_SECRET_KEY"),
+                config=boto3.session.Config(
+                    signature_version="s3v4",
+                    s3={"addressing_style": addressing_style},
+                    max_pool_connections=_max_workers(),
+                ),
+            )
+        return _clients[cache_key]
+
+
+def presigned_get_url(s3_client: Any, bucket: str, key: str, expires_in: int) -> str:
+    """
+    Presigned GET URL for ``key``. URLs are signed for ``expires_in`` seconds and
+    reused within windows of half that, so a returned URL is always valid for at
+    least ``expires_in / 2`` more seconds and most calls don't sign at all.
+    """
+    window = max(expires_in // 2, 1)
+    expiry_window = int(time.time()) // window
+    cache_key = (s3_client.meta.endpoint_url, bucket, key, expires_in)
+    with _lock:
+        cached = _presigned_urls.get(cache_key)
+        if cached is not None and cached[0] == expiry_window:
+            _presigned_urls.move_to_end(cache_key)
+            return cached[1]
+
+    url = s3_client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket, "Key": key},
+        ExpiresIn=expires_in,
+    )
+    with _lock:
+        _presigned_urls[cache_key] = (expiry_window, url)
+        _presigned_urls.move_to_end(cache_key)
+        while len(_presigned_urls) > PRESIGNED_URL_CACHE_SIZE:
+            _presigned_urls.popitem(last=False)
+    return url
+
+
+def ensure_bucket(s3_client: Any, bucket: str) -> None:
+    """Create ``bucket`` if it does not exist, checked once per process"""
+    checked_key = (s3_client.meta.endpoint_url, bucket)
+    if checked_key in _checked_buckets:
+        return
+    try:
+        s3_client.head_bucket(Bucket=bucket)
+    except ClientError as ex:
+        error_code = ex.response.get("Error", {}).get("Code")
+        http_status_code = ex.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        # NoSuchBucket (MinIO) or a bare 404 (AWS) for a missing bucket
+        if error_code != "NoSuchBucket" and http_status_code != 404:
+            raise
+        current_app.logger.info("S3 bucket '%s' does not exist, creating it", bucket)
+        s3_client.create_bucket(Bucket=bucket)
+    _checked_buckets.add(checked_key)
+
+
+def content_key(prefix: str, body: bytes, filename: str = "") -> str:
+    """S3 key derived from the content, keeping the file extension"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{prefix}/{hashlib.sha256(body).hexdigest()}{extension}"
+
+
+def object_exists(s3_client: Any, bucket: str, key: str) -> bool:
+    try:
+        s3_client.head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as ex:
+        if ex.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def _upload_object(s3_client: Any, bucket: str, pending: PendingObject) -> None:
+    # Always PUT, even when the key exists: it refreshes LastModified, which keeps
+    # the orphan sweep off an object a new attachment is about to reference
+    s3_client.upload_fileobj(
+        io.BytesIO(pending.body),
+        bucket,
+        pending.key,
+        ExtraArgs={"ContentType": pending.content_type},
+        Config=_transfer_config,
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers(), thread_name_prefix="s3-upload"
+            )
+        return _executor
+
+
+def upload_objects(s3_client: Any, bucket: str, objects: list[PendingObject]) -> None:
+    """
+    Upload ``objects`` concurrently, each key once.
+    Waits for all uploads and raises the first error, if any.
+    """
+    unique = list({pending.key: pending for pending in objects}.values())
+    if len(unique) == 1:
+        _upload_object(s3_client, bucket, unique[0])
+        return
+    futures = [
+        _get_executor().submit(_upload_object, s3_client, bucket, pending)
+        for pending in unique
+    ]
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
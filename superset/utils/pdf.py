@@ -16,7 +16,11 @@
 # under the License.
 
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from typing import Any, NamedTuple, Union
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
@@ -24,7 +28,6 @@ import os
 from PIL import Image as PILImage
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-import boto3
 from botocore.exceptions import ClientError
 
 from superset.commands.report.exceptions import ReportSchedulePdfFailedError
@@ -35,6 +38,27 @@ try:
 except ModuleNotFoundError:
     logger.info("No PIL installation found")
 
+# Attachment images are resampled to this resolution at their printed size
+DEFAULT_IMAGE_DPI = 150
+DEFAULT_IMAGE_JPEG_QUALITY = 85
+# Concurrent attachment downloads per PDF
+DEFAULT_IMAGE_FETCH_WORKERS = 6
+# Processed attachment images kept per process. Attachment keys are content
+# addressed, so a cached variant never goes stale.
+IMAGE_CACHE_SIZE = 64
+
+SUPPORTED_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp')
+
+# (bucket, key, max width, max height, dpi, quality) -> processed image
+_image_cache: OrderedDict[tuple[Any, ...], "BulletinImage"] = OrderedDict()
+_image_cache_lock = threading.Lock()
+
+
+class BulletinImage(NamedTuple):
+    data: bytes  # JPEG, or PNG for images with few colours
+    width: int  # Original pixel size, the basis of the PDF layout
+    height: int
+
 
 class BulletinCanvas(canvas.Canvas):
     def __init__(self, *args, **kwargs):
@@ -97,37 +121,115 @@ def build_pdf_from_screenshots(snapshots: list[bytes]) -> bytes:
     return new_pdf.read()
 
 
-def generate_bulletin_pdf(bulletin):
+def fit_image(width, height, max_width, max_height):
+    """Scale factor that fits ``width`` x ``height`` in the box without upscaling."""
+    if width <= 0 or height <= 0:
+        return 1.0
+    return min(max_width / width, max_height / height, 1.0)
+
+
+def process_bulletin_image(data, max_width, max_height, dpi, quality):
+    """
+    Flatten an attachment onto white and resample it to ``dpi`` at the size it is
+    drawn in the PDF (at most ``max_width`` x ``max_height`` points). Images with
+    at most 256 colours, e.g. tables and classified maps, are kept as palette
+    PNGs, everything else is recompressed as JPEG.
+    """
+    img = PILImage.open(BytesIO(data))
+    img.load()
+    width, height = img.size
+    if width == 0 or height == 0:
+        return BulletinImage(b"", width, height)
+
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = PILImage.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, (0, 0), img.split()[3])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    scale = fit_image(width, height, max_width, max_height) * dpi / 72
+    if scale < 1:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        img = img.resize(size, PILImage.LANCZOS)
+
+    output = BytesIO()
+    if img.getcolors(256) is not None:
+        img.quantize(colors=256).save(output, format='PNG', optimize=True)
+    else:
+        img.save(output, format='JPEG', quality=quality, optimize=True)
+    return BulletinImage(output.getvalue(), width, height)
+
+
+def prefetch_bulletin_images(s3_client, bucket, s3_keys, max_width, max_height):
+    """
+    Download and process the attachment images of a bulletin concurrently.
+    Returns ``{s3_key: BulletinImage or the exception raised for it}``.
+    Processed images are cached per process.
+    """
+    from superset import app
+
+    dpi = app.config.get('BULLETIN_PDF_IMAGE_DPI', DEFAULT_IMAGE_DPI)
+    quality = app.config.get('BULLETIN_PDF_IMAGE_JPEG_QUALITY', DEFAULT_IMAGE_JPEG_QUALITY)
+    workers = app.config.get('BULLETIN_PDF_IMAGE_FETCH_WORKERS', DEFAULT_IMAGE_FETCH_WORKERS)
+
+    def cache_key(s3_key):
+        return (bucket, s3_key, max_width, max_height, dpi, quality)
+
+    results: dict[str, Union[BulletinImage, Exception]] = {}
+    with _image_cache_lock:
+        for s3_key in s3_keys:
+            cached = _image_cache.get(cache_key(s3_key))
+            if cached is not None:
+                _image_cache.move_to_end(cache_key(s3_key))
+                results[s3_key] = cached
+    missing = [key for key in dict.fromkeys(s3_keys) if key not in results]
+
+    def fetch(s3_key):
+        try:
+            data = s3_client.get_object(Bucket=bucket, Key=s3_key)['Body'].read()
+            if not data:
+                raise ValueError("S3 object has no data")
+            return s3_key, process_bulletin_image(data, max_width, max_height, dpi, quality)
+        except Exception as e:  # pylint: disable=broad-except
+            return s3_key, e
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as executor:
+            for s3_key, result in executor.map(fetch, missing):
+                results[s3_key] = result
+                if isinstance(result, BulletinImage):
+                    with _image_cache_lock:
+                        _image_cache[cache_key(s3_key)] = result
+                        while len(_image_cache) > IMAGE_CACHE_SIZE:
+                            _image_cache.popitem(last=False)
+    logger.info(f"Prefetched {len(s3_keys)} bulletin images, {len(missing)} downloaded")
+    return results
+
+
+def generate_bulletin_pdf(bulletin, image_errors=None):
     """
     Generates a PDF file in memory from a Bulletin object.
-    Returns a BytesIO object containing the PDF data.
+    Returns a BytesIO object containing the PDF data. Images that could not be
+    drawn are appended to ``image_errors``, when given.
     """
     # Import here to avoid circular imports
     from superset import app
+    from superset.utils.object_storage import get_s3_client
     
     logger.info(f"Generating PDF for bulletin ID: {getattr(bulletin, 'id', 'N/A')}, Title: {getattr(bulletin, 'title', 'N/A')}")
+    if image_errors is None:
+        image_errors = []
 
-    # --- S3/MinIO Client Initialization ---
+    # --- S3/MinIO Client ---
     s3_client = None
     s3_bucket_name = app.config.get('S3_BUCKET')
-    s3_endpoint_url = app.config.get('S3_ENDPOINT_URL')
-    s3_access_key = app.config.get('S3_ACCESS_KEY')
-    s3_secret_key = app.config.get('S3_SECRET_KEY')
-    # boto3 might also need region_name, use_ssl, verify, and addressing_style (e.g., 'path' for MinIO)
-    # For MinIO, endpoint_url is crucial.
-    # s3_addressing_style = app.config.get('S3_ADDRESSING_STYLE', 'path') # common for MinIO
-
-    if s3_bucket_name and s3_endpoint_url and s3_access_key and s3_secret_key:
+
+    if s3_bucket_name and app.config.get('S3_ENDPOINT_URL') and app.config.get('S3_ACCESS_KEY') and app.config.get('S3_SECRET_KEY'):
         try:
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=s3_access_key,
-                aws_secret_access_key=s3_secret_key,
-                endpoint_url=s3_endpoint_url,
-                # region_name can be omitted if not relevant for MinIO setup or if endpoint_url includes it implicitly
-                # config=boto3.session.Config(signature_version='s3v4', s3={'addressing_style': s3_addressing_style}) # More specific config if needed
-            )
-            logger.info("S3 client initialized successfully.")
+            # Process wide client, shared with the attachment uploads
+            s3_client = get_s3_client()
         except Exception as e:
             logger.error(f"Failed to initialize S3 client: {e}", exc_info=True)
             s3_client = None # Ensure client is None if init fails
@@ -360,80 +462,39 @@ def generate_bulletin_pdf(bulletin):
              logger.info(f"No image attachment objects to process for bulletin ID: {bulletin.id}")
         else:
             logger.info(f"Processing {len(attachments_to_process)} image attachment objects for bulletin ID: {bulletin.id}")
+            max_render_width = content_width
+            max_render_height = height * 0.5 # Image takes max 50% of page height
+            images = prefetch_bulletin_images(
+                s3_client,
+                s3_bucket_name,
+                [a.s3_key for a in attachments_to_process if a.s3_key.lower().endswith(SUPPORTED_IMAGE_EXTENSIONS)],
+                max_render_width,
+                max_render_height,
+            )
+
             for attachment_idx, attachment in enumerate(attachments_to_process):
-                img_data = None
                 object_key = attachment.s3_key
                 image_caption = attachment.caption # Get caption from the attachment object
                 
                 filename_for_fallback_caption = os.path.basename(object_key) # Fallback if caption is empty
 
                 try:
-                    logger.info(f"Attempting to fetch S3 object: Bucket='{s3_bucket_name}', Key='{object_key}' for attachment ID {attachment.id}")
-                    s3_response = s3_client.get_object(Bucket=s3_bucket_name, Key=object_key)
-                    img_data = s3_response['Body'].read()
-                    logger.info(f"Successfully fetched S3 object '{object_key}'. Data length: {len(img_data)}")
-
-                    if not img_data:
-                        logger.warning(f"S3 object '{object_key}' has no data.")
-                        continue
-                        
-                    logger.info(f"Processing S3 attachment #{attachment_idx} (ID: {attachment.id}): Key: {object_key}, Caption: '{image_caption}', Fallback Filename: {filename_for_fallback_caption}")
-
-                    supported_extensions = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp')
-                    if not object_key.lower().endswith(supported_extensions):
+                    if object_key not in images:
                         logger.warning(f"Skipping S3 object with unsupported extension: {object_key} (Attachment ID: {attachment.id}, Attachment #{attachment_idx})")
                         continue
-                    
-                    # Initial BytesIO from attachment data
-                    img_bytes_io_source = BytesIO(img_data)
-                    pil_img = PILImage.open(img_bytes_io_source)
-                    logger.info(f"S3 Attachment #{attachment_idx}, Key: {object_key}: Opened with PIL. Original mode: {pil_img.mode}, Size: {pil_img.size}")
-                    
-                    # Prepare a BytesIO buffer that will hold the final image data for ReportLab
-                    final_img_data_for_reportlab_io = BytesIO()
-
-                    if pil_img.mode == 'RGBA':
-                        # Create an RGB image with a white background
-                        background = PILImage.new('RGB', pil_img.size, (255, 255, 255))
-                        # Paste the RGBA image onto the white background using the alpha channel as a mask
-                        alpha_channel = pil_img.split()[3] if len(pil_img.split()) == 4 else None
-                        if alpha_channel:
-                            background.paste(pil_img, (0, 0), alpha_channel)
-                        else: # Fallback if no alpha channel (e.g. misidentified RGBA)
-                            background.paste(pil_img, (0,0))
-                        pil_img = background # pil_img is now the RGB image
-                        pil_img.save(final_img_data_for_reportlab_io, format='PNG')
-                        logger.info(f"S3 Attachment #{attachment_idx}, Key: {object_key}: Converted RGBA to RGB and saved to PNG buffer.")
-                    elif pil_img.mode != 'RGB':
-                        pil_img = pil_img.convert('RGB') # pil_img is now the RGB image
-                        pil_img.save(final_img_data_for_reportlab_io, format='PNG')
-                        logger.info(f"S3 Attachment #{attachment_idx}, Key: {object_key}: Converted from mode {pil_img.mode} to RGB and saved to PNG buffer.")
-                    else: # Already RGB
-                        pil_img.save(final_img_data_for_reportlab_io, format='PNG') # Save to ensure it's in a common format like PNG
-                        logger.info(f"S3 Attachment #{attachment_idx}, Key: {object_key}: Already RGB. Saved to PNG buffer.")
-
-                    final_img_data_for_reportlab_io.seek(0)
-                    # Now pil_img is an RGB PIL.Image object, and final_img_data_for_reportlab_io contains its data as PNG.
-                    img_original_width, img_original_height = pil_img.size
-
-                    if img_original_width == 0 or img_original_height == 0:
-                        logger.warning(f"Skipping S3 attachment with zero dimensions after processing: {object_key} (Attachment ID: {attachment.id}, Attachment #{attachment_idx})")
+                    image = images[object_key]
+                    if isinstance(image, Exception):
+                        raise image
+
+                    if image.width == 0 or image.height == 0:
+                        logger.warning(f"Skipping S3 attachment with zero dimensions: {object_key} (Attachment ID: {attachment.id}, Attachment #{attachment_idx})")
                         continue
-                    
-                    # The logger line for Original WxH etc. was removed in a previous step, let's ensure it's correct
-                    logger.info(f"S3 Attachment #{attachment_idx} (ID: {attachment.id}), Key: {object_key}: Original WxH: {img_original_width}x{img_original_height}, Scaled WxH: {img_original_width}x{img_original_height}, Scale Factor: {1.0}")
 
-                    max_render_width = content_width
-                    max_render_height = height * 0.5 # Image takes max 50% of page height
-                    
-                    scale_factor = 1.0
-                    if img_original_width > 0 and img_original_height > 0 : # Avoid division by zero
-                        width_ratio = max_render_width / img_original_width
-                        height_ratio = max_render_height / img_original_height
-                        scale_factor = min(width_ratio, height_ratio, 1.0) # Don't scale up if image is small
-                    
-                    scaled_width = img_original_width * scale_factor
-                    scaled_height = img_original_height * scale_factor
+                    # Lay out by the original pixel size, the embedded image is already resampled to that box
+                    scale_factor = fit_image(image.width, image.height, max_render_width, max_render_height)
+                    scaled_width = image.width * scale_factor
+                    scaled_height = image.height * scale_factor
+                    logger.info(f"S3 Attachment #{attachment_idx} (ID: {attachment.id}), Key: {object_key}: Original WxH: {image.width}x{image.height}, Scaled WxH: {scaled_width:.0f}x{scaled_height:.0f}, Embedded bytes: {len(image.data)}")
                     
                     caption_height = 0
                     current_caption_text = image_caption if image_caption and image_caption.strip() else filename_for_fallback_caption
@@ -451,7 +512,7 @@ def generate_bulletin_pdf(bulletin):
                     
                     img_x_centered = margin_left + (content_width - scaled_width) / 2
                     
-                    reportlab_img = ImageReader(final_img_data_for_reportlab_io)
+                    reportlab_img = ImageReader(BytesIO(image.data))
 
                     logger.info(f"S3 Attachment #{attachment_idx}, Key: {object_key}: Attempting to drawImage at y={y}, scaled_height={scaled_height}")
                     p.drawImage(reportlab_img, img_x_centered, y - scaled_height, 
@@ -480,6 +541,7 @@ def generate_bulletin_pdf(bulletin):
                     
                 except ClientError as e:
                     logger.error(f"S3 ClientError processing object key '{object_key}' (Attachment ID: {attachment.id}) for PDF: {e}", exc_info=True)
+                    image_errors.append(f"{object_key}: {e}")
                     error_message_text = f"[Error loading image: {filename_for_fallback_caption}]"
                     error_font_size = 8
                     error_leading = error_font_size * 1.2
@@ -491,6 +553,7 @@ def generate_bulletin_pdf(bulletin):
                     y -= (error_leading + (0.05 * inch)) # Space after error message
                 except Exception as e: # Catch other general exceptions during PIL processing etc.
                     logger.error(f"Error processing S3 attachment (ID: {attachment.id}, Key: {object_key}, Caption: '{image_caption}') for PDF: {e}", exc_info=True)
+                    image_errors.append(f"{object_key}: {e}")
                     # Draw an error message in the PDF for this specific image
                     error_message_text = f"[Error processing image: {filename_for_fallback_caption}]"
                     error_font_size = 8
@@ -505,6 +568,8 @@ def generate_bulletin_pdf(bulletin):
         y -= 0.1 * inch # Final padding after all attachments, before next section (e.g., Hashtags)
     elif not s3_client:
         logger.warning(f"S3 client not initialized. Cannot process image_attachments for bulletin ID: {getattr(bulletin, 'id', 'N/A')}")
+        if getattr(bulletin, 'image_attachments', None):
+            image_errors.append("S3 client not initialized")
     else: # bulletin.image_attachments is None or empty (or now an empty list)
         logger.info(f"No image attachments found or bulletin.image_attachments is empty for bulletin ID: {getattr(bulletin, 'id', 'N/A')}")
     
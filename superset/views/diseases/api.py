@@ -4,8 +4,9 @@ from flask_appbuilder.security.decorators import has_access_api
 from superset.views.base_api import BaseSupersetApi
 from superset.extensions import event_logger, db
 from superset import app
-from sqlalchemy import Table, Column, Integer, String, Float, MetaData, PrimaryKeyConstraint, DateTime
+from sqlalchemy import Table, Column, Integer, String, Float, MetaData, PrimaryKeyConstraint, DateTime, Index
 import pandas as pd
+import io
 import logging
 from typing import Dict, List, Tuple
 import numpy as np
@@ -17,10 +18,28 @@ import os
 from flask_appbuilder.api import expose, protect, safe
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.models.sqla.filters import FilterEqual, FilterStartsWith, FilterInFunction
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, case, func
 from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
 from superset.views.diseases.models import DiseaseData
 from superset.views.diseases.schemas import DiseaseDataSchema
+from superset.utils.keyset_pagination import (
+    apply_keyset,
+    count_rows,
+    COUNT_ARG,
+    COUNT_EXACT,
+    COUNT_NONE,
+    CURSOR_ARG,
+    decode_cursor,
+    fetch_keyset_page,
+    InvalidCursorError,
+    parse_count_mode,
+)
+from superset.utils.streaming_export import (
+    EXPORT_FORMAT_ARG,
+    parse_export_format,
+    schema_columns,
+    stream_query,
+)
 from superset.views.base_api import BaseSupersetModelRestApi, statsd_metrics
 
 logger = logging.getLogger(__name__)
@@ -45,6 +64,8 @@ class UpdateCaseReportsRestApi(BaseSupersetApi):
             Column('week_start_date', DateTime, nullable=False),
             # Add composite primary key
             PrimaryKeyConstraint('year', 'week_number', 'disease', 'municipality_code', name='pk_tlhis_diseases'),
+            # Grouping keys of the disease-group aggregation in DiseaseDataRestApi.get_list
+            Index('ix_tlhis_diseases_year_week_municipality', 'year', 'week_number', 'municipality_code'),
             extend_existing=True
         )
         
@@ -152,117 +173,70 @@ class UpdateCaseReportsRestApi(BaseSupersetApi):
             
             # Create normalized column names
             normalized_columns = self._create_normalized_columns(age_groups, age_group_clean_names)
-            logger.info(f"Normalized columns: {normalized_columns}")
             
-            # Initialize the normalized dataframe
-            normalized_data = []
-            
-            # Process data rows (start from row 4, which contains the actual data)
-            data_rows = df.iloc[2:]  # Start from row 4 (index 3)
+            # Data rows start after the two header rows
+            data_rows = df.iloc[2:]
             total_columns_in_file = len(df.columns)
             logger.info(f"Total columns in source DataFrame: {total_columns_in_file}")
             
-            expected_columns_per_age_group = 4 # Case M, Case F, Death M, Death F
+            # Keep rows with a textual disease name in the second column
+            disease_names = data_rows.iloc[:, 1] if total_columns_in_file > 1 else pd.Series(dtype=object)
+            valid_rows = disease_names.map(lambda value: isinstance(value, str))
+            skipped_rows = int((~valid_rows).sum())
+            if skipped_rows:
+                logger.warning(f"Skipping {skipped_rows} rows with an empty or non-text disease name.")
+            data_rows = data_rows[valid_rows]
             
-            for idx, row in data_rows.iterrows():
-                # logger.info(f"Processing row {idx+4} of {len(data_rows)}")
-                # logger.info(f"Row: {row}")
-                if pd.isna(row.iloc[1]):  # Skip if disease name is empty
-                    logger.warning(f"Row {idx+4}: Disease name is empty. Skipping.")
-                    continue
-                    
-                normalized_row = {col: 0 for col in normalized_columns}  # Initialize with zeros
-                disease_name = row.iloc[1]
-                logger.info(f"Disease name: {disease_name}")
-                if pd.isna(disease_name) or not isinstance(disease_name, str):
-                    logger.warning(f"Row {idx+4} ({disease_name}): Disease name is not a string. Skipping.")
+            normalized_df = pd.DataFrame(0.0, index=range(len(data_rows)), columns=normalized_columns)
+            if data_rows.empty:
+                return normalized_df
+            normalized_df['disease'] = disease_names[valid_rows].str.strip().to_numpy()
+            
+            # Each age group is a contiguous block of 4 columns starting at the
+            # third column: Case M, Case F, Death M, Death F. Age groups whose
+            # block is missing from the sheet are left at 0.
+            expected_columns_per_age_group = 4
+            available_groups = max(0, (total_columns_in_file - 2) // expected_columns_per_age_group)
+            group_count = min(len(age_groups), available_groups)
+            if group_count < len(age_groups):
+                logger.warning(
+                    f"Not enough columns for age groups {age_groups[group_count:]}. "
+                    f"Expected {2 + len(age_groups) * expected_columns_per_age_group} columns but only have {total_columns_in_file}."
+                )
+            
+            block = data_rows.iloc[:, 2:2 + group_count * expected_columns_per_age_group]
+            values = (
+                block.apply(pd.to_numeric, errors='coerce')
+                .fillna(0)
+                .to_numpy(dtype=float)
+                .reshape(len(data_rows), group_count, expected_columns_per_age_group)
+            )
+            case_male, case_female, death_male, death_female = (
+                values[:, :, i] for i in range(expected_columns_per_age_group)
+            )
+            
+            for group_idx, age_group in enumerate(age_groups[:group_count]):
+                age_clean = age_group_clean_names.get(age_group)
+                if not age_clean:
                     continue
-                    
-                normalized_row['disease'] = disease_name.strip()
-                
-                # Initialize overall totals
-                total_cases = 0
-                total_cases_male = 0
-                total_cases_female = 0
-                total_deaths = 0
-                total_deaths_male = 0
-                total_deaths_female = 0
-                
-                # Process each age group starting from column 3 (index 2)
-                col_idx = 2  # Start from third column in the source file
-                for age_group in age_groups:
-                    age_clean = age_group_clean_names.get(age_group)
-                    if not age_clean: continue # Should not happen based on creation logic
-                    
-                    # Check if we have enough columns for this age group's data
-                    if col_idx + expected_columns_per_age_group > total_columns_in_file:
-                        logger.warning(
-                            f"Row {idx+4} ({disease_name}): Not enough columns for age group '{age_group}'. "
-                            f"Expected columns up to index {col_idx + expected_columns_per_age_group - 1} but only have {total_columns_in_file-1}."
-                        )
-                        # Fill remaining age groups with 0 and break for this row
-                        # This assumes data is contiguous and missing columns means no more data for subsequent age groups
-                        break 
-                    
-                    try:
-                        # Get case/death values (Male, Female)
-                        # Indices: col_idx = Case M, col_idx+1 = Case F, col_idx+2 = Death M, col_idx+3 = Death F
-                        case_male = float(row.iloc[col_idx]) if pd.notna(row.iloc[col_idx]) else 0
-                        case_female = float(row.iloc[col_idx + 1]) if pd.notna(row.iloc[col_idx + 1]) else 0
-                        death_male = float(row.iloc[col_idx + 2]) if pd.notna(row.iloc[col_idx + 2]) else 0
-                        death_female = float(row.iloc[col_idx + 3]) if pd.notna(row.iloc[col_idx + 3]) else 0
-                        
-                        # Store raw values
-                        normalized_row[f"{age_clean}CaseMale"] = case_male
-                        normalized_row[f"{age_clean}CaseFemale"] = case_female
-                        normalized_row[f"{age_clean}DeathMale"] = death_male
-                        normalized_row[f"{age_clean}DeathFemale"] = death_female
-                        
-                        # Calculate totals for this age group
-                        age_group_total_cases = case_male + case_female
-                        age_group_total_deaths = death_male + death_female
-                        
-                        # Store age group totals
-                        normalized_row[f"{age_clean}TotalCases"] = age_group_total_cases
-                        normalized_row[f"{age_clean}TotalCasesMale"] = case_male
-                        normalized_row[f"{age_clean}TotalCasesFemale"] = case_female
-                        normalized_row[f"{age_clean}TotalDeaths"] = age_group_total_deaths
-                        normalized_row[f"{age_clean}TotalDeathsMale"] = death_male
-                        normalized_row[f"{age_clean}TotalDeathsFemale"] = death_female
-                        
-                        # Add to overall totals
-                        total_cases += age_group_total_cases
-                        total_cases_male += case_male
-                        total_cases_female += case_female
-                        total_deaths += age_group_total_deaths
-                        total_deaths_male += death_male
-                        total_deaths_female += death_female
-                        
-                    except IndexError:
-                         logger.error(f"Row {idx+4} ({disease_name}): IndexError accessing columns for age group {age_group} at base index {col_idx}. Total columns: {total_columns_in_file}")
-                         break # Stop processing age groups for this row
-                    except ValueError as ve:
-                        logger.warning(f"Row {idx+4} ({disease_name}): ValueError processing age group '{age_group}' at column index {col_idx}: {str(ve)}. Values: {row.iloc[col_idx:col_idx+expected_columns_per_age_group].tolist()}. Treating as 0.")
-                        # Attempt to continue with 0s for this group might be risky, better to skip group or row?
-                        # For now, let's just log and let the 0s from initialization stand for this group's totals.
-                    except Exception as e:
-                        logger.warning(f"Row {idx+4} ({disease_name}): Unexpected error processing age group '{age_group}' at column index {col_idx}: {str(e)}")
-                        # Log and let the 0s from initialization stand for this group's totals.
-                    
-                    col_idx += expected_columns_per_age_group # Move to next age group
-                
-                # Add all calculated totals to the row
-                normalized_row['totalCases'] = total_cases
-                normalized_row['totalCasesMale'] = total_cases_male
-                normalized_row['totalCasesFemale'] = total_cases_female
-                normalized_row['totalDeaths'] = total_deaths
-                normalized_row['totalDeathsMale'] = total_deaths_male
-                normalized_row['totalDeathsFemale'] = total_deaths_female
-                
-                normalized_data.append(normalized_row)
+                normalized_df[f"{age_clean}CaseMale"] = case_male[:, group_idx]
+                normalized_df[f"{age_clean}CaseFemale"] = case_female[:, group_idx]
+                normalized_df[f"{age_clean}DeathMale"] = death_male[:, group_idx]
+                normalized_df[f"{age_clean}DeathFemale"] = death_female[:, group_idx]
+                normalized_df[f"{age_clean}TotalCases"] = case_male[:, group_idx] + case_female[:, group_idx]
+                normalized_df[f"{age_clean}TotalCasesMale"] = case_male[:, group_idx]
+                normalized_df[f"{age_clean}TotalCasesFemale"] = case_female[:, group_idx]
+                normalized_df[f"{age_clean}TotalDeaths"] = death_male[:, group_idx] + death_female[:, group_idx]
+                normalized_df[f"{age_clean}TotalDeathsMale"] = death_male[:, group_idx]
+                normalized_df[f"{age_clean}TotalDeathsFemale"] = death_female[:, group_idx]
             
-            # Create normalized DataFrame
-            normalized_df = pd.DataFrame(normalized_data)
+            # Overall totals across age groups
+            normalized_df['totalCasesMale'] = case_male.sum(axis=1)
+            normalized_df['totalCasesFemale'] = case_female.sum(axis=1)
+            normalized_df['totalCases'] = normalized_df['totalCasesMale'] + normalized_df['totalCasesFemale']
+            normalized_df['totalDeathsMale'] = death_male.sum(axis=1)
+            normalized_df['totalDeathsFemale'] = death_female.sum(axis=1)
+            normalized_df['totalDeaths'] = normalized_df['totalDeathsMale'] + normalized_df['totalDeathsFemale']
             
             return normalized_df
             
@@ -308,6 +282,47 @@ class UpdateCaseReportsRestApi(BaseSupersetApi):
             logger.error(f"Error extracting week number from {sheet_name}: {str(e)}")
             return 0
 
+    def _copy_dataframe(self, connection, table_name: str, df: pd.DataFrame) -> None:
+        """Bulk load a DataFrame into a table with PostgreSQL COPY"""
+        buffer = io.StringIO()
+        # %.15g keeps integral counts free of a decimal point for INTEGER columns
+        df.to_csv(buffer, index=False, header=False, float_format="%.15g")
+        buffer.seek(0)
+        columns = ", ".join(f'"{col}"' for col in df.columns)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _upsert_disease_rows(self, connection, df: pd.DataFrame, pk_cols: List[str]) -> int:
+        """
+        Write rows to tlhis_diseases with a single INSERT ... ON CONFLICT,
+        staging them through COPY into a transaction-scoped temp table.
+        """
+        staging_table = "tlhis_diseases_staging"
+        connection.execute(db.text(
+            f"CREATE TEMP TABLE {staging_table} (LIKE tlhis_diseases INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        self._copy_dataframe(connection, staging_table, df)
+
+        columns = ", ".join(f'"{col}"' for col in df.columns)
+        conflict_columns = ", ".join(f'"{col}"' for col in pk_cols)
+        update_columns = [col for col in df.columns if col not in pk_cols]
+        if update_columns:
+            on_conflict = "DO UPDATE SET " + ", ".join(
+                f'"{col}" = EXCLUDED."{col}"' for col in update_columns
+            )
+        else:
+            on_conflict = "DO NOTHING"
+
+        result = connection.execute(db.text(f"""
+            INSERT INTO tlhis_diseases ({columns})
+            SELECT {columns} FROM {staging_table}
+            ON CONFLICT ({conflict_columns}) {on_conflict}
+        """))
+        return result.rowcount
+
     def _save_to_database(self, dfs: Dict[str, pd.DataFrame], municipality_code: str = None, year: int = None, week: int = None) -> None:
         """Save the processed data to PostgreSQL"""
         try:
@@ -404,71 +419,23 @@ class UpdateCaseReportsRestApi(BaseSupersetApi):
                             # If adding column fails, we might need to stop or handle differently
                             raise
 
-                # Prepare data for deletion criteria (handle potential None values)
-                unique_diseases = tuple(combined_df['disease'].dropna().unique())
-                if not unique_diseases:
+                if combined_df['disease'].dropna().empty:
                     logger.warning("No unique diseases found in the data to process. Skipping database operations.")
                     return
 
-                # Delete existing records that match the composite key components
-                # Ensure parameters are not None before executing delete
-                if year is not None and week is not None and municipality_code is not None:
-                    delete_stmt = db.text("""
-                        DELETE FROM tlhis_diseases 
-                        WHERE year = :year 
-                        AND week_number = :week 
-                        AND municipality_code = :municipality_code
-                        AND disease IN :diseases
-                    """)
-                    connection.execute(delete_stmt, {
-                        'year': year,
-                        'week': week,
-                        'municipality_code': municipality_code,
-                        'diseases': unique_diseases
-                    })
-                    logger.info(f"Executed delete for Year: {year}, Week: {week}, MunCode: {municipality_code}, Diseases: {len(unique_diseases)} types")
-                else:
-                     logger.warning("Skipping delete operation due to missing year, week, or municipality code.")
-
-                # Prepare DataFrame for insertion: Ensure column order matches table? Not strictly necessary with to_sql
                 # Ensure data types are compatible (e.g., handle potential NaNs in numeric columns)
                 for col in combined_df.columns:
                      if combined_df[col].dtype in (np.float64, np.float32, np.int64, np.int32):
                            combined_df[col] = combined_df[col].fillna(0) # Or appropriate default
 
-                # Select only columns that exist in the table to avoid errors with to_sql
-                final_columns_to_insert = list(set(combined_df.columns) & existing_columns)
-                # Ensure primary key columns are always included if present in dataframe
+                # Every DataFrame column now exists in the table (missing ones were added above)
                 pk_cols = ['year', 'week_number', 'disease', 'municipality_code']
-                for pkc in pk_cols:
-                    if pkc in combined_df.columns and pkc not in final_columns_to_insert:
-                        final_columns_to_insert.append(pkc)
-                
-                # Add newly added columns to the list
-                for col in combined_df.columns:
-                    if col not in existing_columns and col not in final_columns_to_insert:
-                         # We just added this column, so include it
-                         final_columns_to_insert.append(col)
+                combined_df_to_insert = combined_df.dropna(subset=pk_cols)
+                # A key may only be written once per upsert statement, the last sheet wins
+                combined_df_to_insert = combined_df_to_insert.drop_duplicates(subset=pk_cols, keep='last')
 
-                if not final_columns_to_insert:
-                     logger.error("No columns identified for database insertion. Aborting.")
-                     return
-                
-                logger.info(f"Columns selected for insertion: {final_columns_to_insert}")
-
-                # Insert the new data using only the selected columns
-                combined_df_to_insert = combined_df[final_columns_to_insert]
-
-                combined_df_to_insert.to_sql(
-                    'tlhis_diseases',
-                    connection,
-                    if_exists='append',
-                    index=False,
-                    method='multi',
-                    chunksize=1000,
-                    # dtype={'week_start_date': DateTime} # Explicitly set type if needed
-                )
-                logger.info(f"Attempted to save {len(combined_df_to_insert)} rows to database.")
+                upserted = self._upsert_disease_rows(connection, combined_df_to_insert, pk_cols)
+                logger.info(f"Upserted {upserted} rows into tlhis_diseases.")
             
             # Save the uploaded file as the new template (outside transaction)
             upload_file = request.files.get("file")
@@ -811,96 +778,116 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
                 
         return None  # Disease doesn't match any group
 
-    def _aggregate_disease_results(self, results: List, is_disease_filtered: bool = False) -> List:
-        """Aggregate results by disease group, summing totalCases for each group."""
-        if not is_disease_filtered or not results:
-            return results
-            
-        # Dictionary to store aggregated results
-        # Key: (year, week_number, municipality_code, disease_group)
-        aggregated = {}
-        
-        for record in results:
-            # Classify the disease into a group
-            disease_group = self._classify_disease_group(record.disease)
-            if not disease_group:
-                # If disease doesn't match any group, keep original record
-                continue
-                
-            # Create aggregation key
-            key = (record.year, record.week_number, record.municipality_code, disease_group)
-            
-            if key not in aggregated:
-                # First occurrence - create a copy of the record
-                # We'll update the disease name and accumulate totalCases
-                aggregated[key] = {
-                    'record': record,
-                    'original_disease': disease_group,  # Store the group name
-                    'totalCases': record.totalCases or 0,
-                    'totalCasesMale': record.totalCasesMale or 0,
-                    'totalCasesFemale': record.totalCasesFemale or 0,
-                    'totalDeaths': record.totalDeaths or 0,
-                    'totalDeathsMale': record.totalDeathsMale or 0,
-                    'totalDeathsFemale': record.totalDeathsFemale or 0,
-                    # Also aggregate age group totals
-                    'LessThan1TotalCases': getattr(record, 'LessThan1TotalCases', 0) or 0,
-                    'OneToFourTotalCases': getattr(record, 'OneToFourTotalCases', 0) or 0,
-                    'FiveToFourteenTotalCases': getattr(record, 'FiveToFourteenTotalCases', 0) or 0,
-                    'FifteenPlusTotalCases': getattr(record, 'FifteenPlusTotalCases', 0) or 0,
-                    # New format age groups
-                    'FifteenToTwentyFourTotalCases': getattr(record, 'FifteenToTwentyFourTotalCases', 0) or 0,
-                    'TwentyFiveToThirtyNineTotalCases': getattr(record, 'TwentyFiveToThirtyNineTotalCases', 0) or 0,
-                    'FortyToFiftyNineTotalCases': getattr(record, 'FortyToFiftyNineTotalCases', 0) or 0,
-                    'SixtyPlusTotalCases': getattr(record, 'SixtyPlusTotalCases', 0) or 0,
-                }
-            else:
-                # Aggregate the values
-                agg = aggregated[key]
-                agg['totalCases'] += record.totalCases or 0
-                agg['totalCasesMale'] += record.totalCasesMale or 0
-                agg['totalCasesFemale'] += record.totalCasesFemale or 0
-                agg['totalDeaths'] += record.totalDeaths or 0
-                agg['totalDeathsMale'] += record.totalDeathsMale or 0
-                agg['totalDeathsFemale'] += record.totalDeathsFemale or 0
-                # Aggregate age groups
-                agg['LessThan1TotalCases'] += getattr(record, 'LessThan1TotalCases', 0) or 0
-                agg['OneToFourTotalCases'] += getattr(record, 'OneToFourTotalCases', 0) or 0
-                agg['FiveToFourteenTotalCases'] += getattr(record, 'FiveToFourteenTotalCases', 0) or 0
-                agg['FifteenPlusTotalCases'] += getattr(record, 'FifteenPlusTotalCases', 0) or 0
-                agg['FifteenToTwentyFourTotalCases'] += getattr(record, 'FifteenToTwentyFourTotalCases', 0) or 0
-                agg['TwentyFiveToThirtyNineTotalCases'] += getattr(record, 'TwentyFiveToThirtyNineTotalCases', 0) or 0
-                agg['FortyToFiftyNineTotalCases'] += getattr(record, 'FortyToFiftyNineTotalCases', 0) or 0
-                agg['SixtyPlusTotalCases'] += getattr(record, 'SixtyPlusTotalCases', 0) or 0
-        
-        # Convert aggregated dictionary back to list of records
-        final_results = []
-        for key, agg_data in aggregated.items():
-            record = agg_data['record']
-            # Update the record with aggregated values
-            record.disease = agg_data['original_disease']  # Use the disease group name
-            record.totalCases = agg_data['totalCases']
-            record.totalCasesMale = agg_data['totalCasesMale']
-            record.totalCasesFemale = agg_data['totalCasesFemale']
-            record.totalDeaths = agg_data['totalDeaths']
-            record.totalDeathsMale = agg_data['totalDeathsMale']
-            record.totalDeathsFemale = agg_data['totalDeathsFemale']
-            # Update age group totals
-            record.LessThan1TotalCases = agg_data['LessThan1TotalCases']
-            record.OneToFourTotalCases = agg_data['OneToFourTotalCases']
-            record.FiveToFourteenTotalCases = agg_data['FiveToFourteenTotalCases']
-            record.FifteenPlusTotalCases = agg_data['FifteenPlusTotalCases']
-            if hasattr(record, 'FifteenToTwentyFourTotalCases'):
-                record.FifteenToTwentyFourTotalCases = agg_data['FifteenToTwentyFourTotalCases']
-            if hasattr(record, 'TwentyFiveToThirtyNineTotalCases'):
-                record.TwentyFiveToThirtyNineTotalCases = agg_data['TwentyFiveToThirtyNineTotalCases']
-            if hasattr(record, 'FortyToFiftyNineTotalCases'):
-                record.FortyToFiftyNineTotalCases = agg_data['FortyToFiftyNineTotalCases']
-            if hasattr(record, 'SixtyPlusTotalCases'):
-                record.SixtyPlusTotalCases = agg_data['SixtyPlusTotalCases']
-                
-            final_results.append(record)
-            
-        return final_results
+    # Columns summed per (year, week_number, municipality_code, disease group)
+    # when a disease group filter is active
+    disease_group_sum_columns = [
+        "totalCases", "totalCasesMale", "totalCasesFemale",
+        "totalDeaths", "totalDeathsMale", "totalDeathsFemale",
+        "LessThan1TotalCases", "OneToFourTotalCases", "FiveToFourteenTotalCases", "FifteenPlusTotalCases",
+        "FifteenToTwentyFourTotalCases", "TwentyFiveToThirtyNineTotalCases",
+        "FortyToFiftyNineTotalCases", "SixtyPlusTotalCases",
+    ]
+
+    # PostgreSQL (ARE) equivalents of the patterns in _classify_disease_group,
+    # evaluated in the same order
+    disease_group_sql_patterns = {
+        "Dengue": r'\ydengue\y',
+        "Diarrhea": r'\ydiarr?h(o)?ea\y',
+        "ISPA/ARI": r'\y(ispa\s*/\s*ari|ispa|ari)\y',
+    }
+
+    def _disease_group_expression(self):
+        """SQL CASE expression mapping a disease name to its disease group (NULL if none)."""
+        disease_column = self.datamodel.obj.disease
+        return case(
+            *[
+                (disease_column.op('~*')(pattern), group_name)
+                for group_name, pattern in self.disease_group_sql_patterns.items()
+            ],
+            else_=None,
+        )
+
+    def _build_disease_group_query(self, query):
+        """
+        Turn the filtered row query into one aggregated row per
+        (year, week_number, municipality_code, disease group).
+
+        Returns the grouped query and a mapping of output column name to SQL
+        expression, used to resolve ordering against the aggregated columns.
+        """
+        model = self.datamodel.obj
+        group_expr = self._disease_group_expression()
+
+        columns = {
+            "year": model.year,
+            "week_number": model.week_number,
+            "municipality_code": model.municipality_code,
+            "disease": group_expr,
+            "municipality": func.max(model.municipality),
+            "week_start_date": func.min(model.week_start_date),
+        }
+        for column_name in self.disease_group_sum_columns:
+            columns[column_name] = func.coalesce(func.sum(getattr(model, column_name)), 0)
+
+        grouped_query = (
+            query.with_entities(*[expr.label(name) for name, expr in columns.items()])
+            .filter(group_expr.isnot(None))
+            .group_by(model.year, model.week_number, model.municipality_code, group_expr)
+        )
+        return grouped_query, columns
+
+    def _disease_group_rows_to_records(self, rows: List) -> List[DiseaseData]:
+        """Wrap aggregated rows in transient DiseaseData objects for serialization."""
+        return [DiseaseData(**row._asdict()) for row in rows]
+
+    keyset_names = ("year", "week_number", "municipality_code", "disease")
+
+    def _keyset_columns(self, group_columns) -> List:
+        """Primary key columns, or the grouping key when aggregating by disease group."""
+        if group_columns is not None:
+            return [group_columns[name] for name in self.keyset_names]
+        return [getattr(self.datamodel.obj, name) for name in self.keyset_names]
+
+    def _get_list_keyset_page(self, query, group_columns, cursor: str, count_mode: str) -> Response:
+        """
+        Cursor mode of get_list: keyset pagination on _keyset_columns, newest year first.
+        """
+        key_names = self.keyset_names
+        key_columns = self._keyset_columns(group_columns)
+        try:
+            cursor_values = decode_cursor(cursor, len(key_columns)) if cursor else None
+        except InvalidCursorError as e:
+            return self.response_400(message=str(e))
+
+        try:
+            page_size = int(request.args.get("page_size", self.page_size or 25))
+        except ValueError:
+            page_size = self.page_size or 25
+        if page_size <= 0:
+            page_size = self.page_size or 25
+
+        try:
+            item_count = count_rows(query, count_mode)
+            result, next_cursor = fetch_keyset_page(
+                apply_keyset(query, key_columns, cursor_values, descending=True),
+                page_size,
+                lambda row: tuple(getattr(row, name) for name in key_names),
+            )
+        except Exception as e:
+            logger.error(f"Error executing keyset page query: {e}")
+            return self.response_500(message=f"Database error during data retrieval: {e}")
+
+        if group_columns is not None:
+            result = self._disease_group_rows_to_records(result)
+
+        return self.response(
+            200,
+            ids=[self.datamodel.get_pk_value(item) for item in result],
+            count=item_count,
+            result=self.response_schema.dump(result, many=True),
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
 
 
     @expose("/", methods=["GET"])
@@ -922,6 +909,8 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
             and/or the 'q' rison parameter for complex queries (filters, ordering, pagination).
             Pagination can be controlled using `page` and `page_size` either directly as query
             parameters or within the 'q' rison payload. Set `page_size` to -1 to retrieve all matching entries.
+            When filtering by disease group, rows are summed per year, week and municipality in the
+            database and `count` refers to the aggregated rows.
           parameters:
             - name: q
               in: query
@@ -979,6 +968,18 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
               in: query
               schema: { type: integer, default: 25 } # Actual default might be self.page_size or 25
               description: Number of results per page. Set to -1 to retrieve all results. Used if 'page_size' is not in 'q'.
+            - name: cursor
+              in: query
+              schema: { type: string }
+              description: Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. Results are ordered by year descending and page/ordering are ignored.
+            - name: count
+              in: query
+              schema: { type: string, enum: [exact, estimate, none] }
+              description: How to compute count. Defaults to exact, or none in cursor mode.
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, ndjson, csv] }
+              description: ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page.
           responses:
             200:
               description: A list of disease data entries.
@@ -1017,6 +1018,10 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
                         type: string
                         nullable: true
                         description: URL for the previous page of results, if available.
+                      next_cursor:
+                        type: string
+                        nullable: true
+                        description: Cursor mode only. Pass as cursor to fetch the next page, null on the last page.
             400:
               description: Bad Request (e.g., invalid parameter format, malformed Rison, invalid disease parameter value).
             401:
@@ -1135,10 +1140,47 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
         else:
             logger.debug("No Rison filters (from q param) to apply.")
 
+        # 3b. Aggregate by disease group in SQL, so that count, ordering and
+        # pagination apply to the aggregated groups rather than to raw rows
+        group_columns = None
+        if is_disease_filtered:
+            logger.debug("Aggregating disease group results in SQL")
+            query, group_columns = self._build_disease_group_query(query)
+
+        def get_order_column(column_name):
+            if group_columns is not None:
+                return group_columns.get(column_name)
+            return getattr(self.datamodel.obj, column_name, None)
+
+        # 3c. Streaming export: every matching row (or group), no pagination or count
+        try:
+            export_format = parse_export_format(request.args.get(EXPORT_FORMAT_ARG))
+        except ValueError as e:
+            return self.response_400(message=str(e))
+        if export_format:
+            return stream_query(
+                apply_keyset(query, self._keyset_columns(group_columns), None, descending=True),
+                schema_columns(self.response_schema, group_columns if group_columns is not None else self.datamodel.obj),
+                export_format,
+                self.resource_name,
+            )
+
         # 4. Get the count AFTER all filters are applied
+        cursor = request.args.get(CURSOR_ARG)
+        try:
+            count_mode = parse_count_mode(
+                request.args.get(COUNT_ARG), default=COUNT_NONE if cursor is not None else COUNT_EXACT
+            )
+        except ValueError as e:
+            return self.response_400(message=str(e))
+
+        # 4a. Cursor mode replaces ordering and offset pagination below
+        if cursor is not None:
+            return self._get_list_keyset_page(query, group_columns, cursor, count_mode)
+
         logger.debug("Executing count query on filtered SQLAlchemy query.")
         try:
-            item_count = query.count()
+            item_count = count_rows(query, count_mode)
         except Exception as e:
             logger.error(f"Error executing count query: {e}")
             return self.response_500(message=f"Database error during count: {e}")
@@ -1147,16 +1189,16 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
         order_column_name = rison_payload.get("order_column")
         order_direction = rison_payload.get("order_direction", "asc").lower() # Default to asc
 
-        if order_column_name and hasattr(self.datamodel.obj, order_column_name):
-            column_attr = getattr(self.datamodel.obj, order_column_name)
+        if order_column_name and get_order_column(order_column_name) is not None:
+            column_attr = get_order_column(order_column_name)
             logger.debug(f"Applying Rison ordering: {order_column_name} {order_direction}")
             if order_direction == "desc":
                 query = query.order_by(desc(column_attr))
             else:
                 query = query.order_by(asc(column_attr))
         elif self.base_order: # Apply default base_order if no order_column in Rison
-            if hasattr(self.datamodel.obj, self.base_order[0]):
-                column_attr = getattr(self.datamodel.obj, self.base_order[0])
+            if get_order_column(self.base_order[0]) is not None:
+                column_attr = get_order_column(self.base_order[0])
                 logger.debug(f"Applying default base_order: {self.base_order[0]} {self.base_order[1]}")
                 if self.base_order[1].lower() == "desc":
                     query = query.order_by(desc(column_attr))
@@ -1180,6 +1222,10 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
             else:
                 logger.warning("Could not determine primary keys for default ordering.")
 
+        if group_columns is not None:
+            # Tie-break on the grouping keys so aggregated pages are stable
+            for group_key in ("year", "week_number", "municipality_code", "disease"):
+                query = query.order_by(asc(group_columns[group_key]))
 
         # 6. Apply pagination
         page = rison_payload.get("page")
@@ -1210,14 +1256,14 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
 
         if page_size > 0:
             logger.debug(f"Applying pagination: page {page}, page_size {page_size}")
-            total_pages = (item_count + page_size - 1) // page_size if item_count > 0 else 0 # Ceiling division
+            # Without a count (count=none) the number of pages is unknown
+            total_pages = (item_count + page_size - 1) // page_size if item_count is not None else None # Ceiling division
             offset = page * page_size
             query = query.limit(page_size).offset(offset)
             actual_page_size = page_size
         elif page_size == -1: # Requesting all items
             logger.debug(f"Attempting to retrieve all items (page_size: -1)")
-            total_pages = 1 if item_count > 0 else 0
-            actual_page_size = item_count if item_count > 0 else 0 
+            total_pages = None # Set from the fetched rows below
             # No limit/offset applied if page_size is -1
         # else: page_size is 0 or invalid (e.g. negative not -1), no pagination applied
         # This means FAB default might kick in or all results might be returned if no other limit.
@@ -1225,7 +1271,7 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
         elif page_size <= 0 and page_size != -1 : # page_size is 0 or invalid negative
              logger.warning(f"Invalid page_size {page_size}, defaulting to API's page_size or 25.")
              default_ps = self.page_size or 25
-             total_pages = (item_count + default_ps -1) // default_ps if item_count > 0 else 0
+             total_pages = (item_count + default_ps -1) // default_ps if item_count is not None else None
              offset = page * default_ps
              query = query.limit(default_ps).offset(offset)
              actual_page_size = default_ps
@@ -1239,11 +1285,13 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
             logger.error(f"Error executing final data query: {e}")
             return self.response_500(message=f"Database error during data retrieval: {e}")
 
-        # 7a. Apply aggregation if disease filtering is active
-        if is_disease_filtered:
-            logger.debug(f"Applying disease group aggregation to {len(result)} results")
-            result = self._aggregate_disease_results(result, is_disease_filtered=True)
-            logger.debug(f"After aggregation: {len(result)} results")
+        # 7a. Aggregated rows are plain tuples, wrap them for serialization
+        if group_columns is not None:
+            result = self._disease_group_rows_to_records(result)
+
+        if page_size == -1:
+            total_pages = 1 if result else 0
+            actual_page_size = len(result)
 
         # 8. Prepare response
         # Get primary key values. Model should have a get_pk_value method for composite keys.
@@ -1265,7 +1313,10 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
         }
 
         # 9. Generate prev/next URLs (simplified, might need full Rison reconstruction for complex cases)
-        if item_count > 0 and actual_page_size > 0 and total_pages > 1: 
+        has_next_page = (
+            (page + 1) < total_pages if total_pages is not None else len(result) == actual_page_size
+        )
+        if result and actual_page_size > 0 and (has_next_page or page > 0): 
             base_url = request.base_url
             
             def build_url_with_params(target_page):
@@ -1313,10 +1364,10 @@ class DiseaseDataRestApi(BaseSupersetModelRestApi):
                     return f"{base_url}?{query_string}"
 
             current_page_for_logic = page
-            if (current_page_for_logic + 1) < total_pages:
+            if has_next_page:
                 final_response["next_page_url"] = build_url_with_params(current_page_for_logic + 1)
             
-            if current_page_for_logic > 0 and total_pages > 0:
+            if current_page_for_logic > 0:
                 final_response["prev_page_url"] = build_url_with_params(current_page_for_logic - 1)
         
         return self.response(200, **final_response)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
 from flask_appbuilder import Model
 from superset.models.helpers import AuditMixinNullable # Standard Superset mixins
 
 class DiseaseData(Model):
     __tablename__ = "tlhis_diseases" # You can change this if your table name is different
+    __table_args__ = (
+        # Grouping keys of the disease-group aggregation in DiseaseDataRestApi.get_list
+        Index("ix_tlhis_diseases_year_week_municipality", "year", "week_number", "municipality_code"),
+    )
 
     # Composite Primary Key
     year = Column(Integer, primary_key=True, nullable=False)
@@ -26,11 +26,30 @@ from flask_appbuilder.models.filters import Filters
 from marshmallow import ValidationError, Schema, fields
 import json
 from flask_appbuilder.models.sqla.filters import FilterEqual
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, tuple_
 
 from superset import db
 from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
 from superset.extensions import event_logger
+from superset.models.bulletins import Bulletin
+from superset.utils.keyset_pagination import (
+    apply_keyset,
+    count_rows,
+    COUNT_ARG,
+    COUNT_EXACT,
+    COUNT_NONE,
+    CURSOR_ARG,
+    decode_cursor,
+    fetch_keyset_page,
+    InvalidCursorError,
+    parse_count_mode,
+)
+from superset.utils.streaming_export import (
+    EXPORT_FORMAT_ARG,
+    parse_export_format,
+    schema_columns,
+    stream_query,
+)
 from superset.views.base_api import BaseSupersetModelRestApi, statsd_metrics
 from flask_appbuilder.api import get_list_schema
 from superset.weather_forecast_alerts.models import WeatherForecastAlert, WeatherDataPullHistory
@@ -210,6 +229,26 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
               type: integer
               default: 25 # Default page size used by FAB/this API if not in q
             description: "Number of results per page. Used if not specified in 'q'. Set to -1 to attempt to retrieve all results (may be capped by server)."
+          - name: cursor
+            in: query
+            required: false
+            schema:
+              type: string
+            description: "Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. Results are ordered by forecast_date descending and page/ordering are ignored."
+          - name: count
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [exact, estimate, none]
+            description: "How to compute count. Defaults to exact, or none in cursor mode."
+          - name: format
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [json, ndjson, csv]
+            description: "ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page."
           responses:
             200:
               description: A list of weather forecast alerts
@@ -245,6 +284,9 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
                       prev_page_url:
                         type: [string, "null"]
                         description: URL for the previous page, if any.
+                      next_cursor:
+                        type: [string, "null"]
+                        description: Cursor mode only. Pass as cursor to fetch the next page, null on the last page.
             400:
               $ref: '#/components/responses/400'
             401:
@@ -292,9 +334,34 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
         else:
             logger.debug("No Rison filters (from q param) to apply.")
 
+        # 3b. Streaming export: every matching row, no pagination or count
+        try:
+            export_format = parse_export_format(request.args.get(EXPORT_FORMAT_ARG))
+        except ValueError as e:
+            return self.response_400(message=str(e))
+        if export_format:
+            return stream_query(
+                apply_keyset(query, self._keyset_columns(), None, descending=True),
+                schema_columns(self.response_schema, self.datamodel.obj),
+                export_format,
+                self.resource_name,
+            )
+
         # 4. Get the count AFTER all filters are applied
+        cursor = request.args.get(CURSOR_ARG)
+        try:
+            count_mode = parse_count_mode(
+                request.args.get(COUNT_ARG), default=COUNT_NONE if cursor is not None else COUNT_EXACT
+            )
+        except ValueError as e:
+            return self.response_400(message=str(e))
+
+        # 4a. Cursor mode: keyset pagination on the alert key, newest forecast first
+        if cursor is not None:
+            return self._get_list_keyset_page(query, cursor, count_mode)
+
         logger.debug("Executing count query on filtered SQLAlchemy query.")
-        item_count = query.count()
+        item_count = count_rows(query, count_mode)
 
         # 5. Apply pagination and ordering from Rison payload to the filtered query
         logger.debug(f"Applying Rison pagination/ordering to SQLAlchemy query: {rison_payload}")
@@ -339,18 +406,18 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
 
         if page_size > 0:
             logger.debug(f"Applying pagination: page {page}, page_size {page_size}")
-            total_pages = (item_count + page_size - 1) // page_size # Ceiling division
+            # Without a count (count=none) the number of pages is unknown
+            total_pages = (item_count + page_size - 1) // page_size if item_count is not None else None # Ceiling division
             offset = page * page_size
             query = query.limit(page_size).offset(offset)
             actual_page_size = page_size
         elif page_size == -1: # Requesting all items
             logger.debug(f"Attempting to retrieve all items (page_size: -1)")
-            total_pages = 1 if item_count > 0 else 0
-            actual_page_size = item_count if item_count > 0 else 0 
+            total_pages = None # Set from the fetched rows below
             # No limit/offset applied if page_size is -1, assuming all items are fetched
         elif self.page_size and self.page_size > 0 and page_size is None: # Fallback to default if not specified and valid
             logger.debug(f"Applying default API page_size: {self.page_size}")
-            total_pages = (item_count + self.page_size - 1) // self.page_size
+            total_pages = (item_count + self.page_size - 1) // self.page_size if item_count is not None else None
             offset = (page or 0) * self.page_size # page might be None if not from Rison or direct
             query = query.limit(self.page_size).offset(offset)
             actual_page_size = self.page_size
@@ -359,22 +426,12 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
         # 6. Execute the final query to get results
         logger.debug("Executing final data query on filtered, ordered, paginated SQLAlchemy query.")
         result = query.all()
+        if page_size == -1:
+            total_pages = 1 if result else 0
+            actual_page_size = len(result)
 
         # 7. Prepare response
-        pks = [self.datamodel.get_pk_value(item) for item in result] # Should handle composite PKs
-        response_data = self.response_schema.dump(result, many=True)
-
-        # Add synthetic 'id' to each result item for frontend compatibility
-        for i, item_dict in enumerate(response_data):
-            original_item = result[i]
-            if isinstance(original_item, self.datamodel.obj) and 'id' not in item_dict:
-                try:
-                    mc = getattr(original_item, 'municipality_code')
-                    fd = getattr(original_item, 'forecast_date')
-                    wp = getattr(original_item, 'weather_parameter')
-                    item_dict['id'] = f"{mc}_{fd}_{wp}"
-                except AttributeError as e_attr:
-                    logger.warning(f"Could not generate composite ID for item due to AttributeError {e_attr}: {item_dict}")
+        pks, response_data = self._serialize_alerts(result)
 
         final_response = {
             "ids": pks, 
@@ -388,7 +445,7 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
         }
 
         # Generate prev/next URLs
-        if item_count > 0 and page_size > 0: # Only generate if paginating
+        if result and page_size > 0: # Only generate if paginating
             base_url = request.base_url
             # Preserve existing Rison params if any, or build from scratch
             current_rison_params = rison_payload.copy() if rison_payload else {}
@@ -447,13 +504,69 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
                     return f"{base_url}?{temp_query_params.to_dict(flat=False)}"
 
             current_page_for_logic = page if page is not None else 0
-            if (current_page_for_logic + 1) < total_pages:
+            has_next_page = (
+                (current_page_for_logic + 1) < total_pages if total_pages is not None else len(result) == page_size
+            )
+            if has_next_page:
                 final_response["next_page_url"] = build_url_with_params(current_page_for_logic + 1)
             
-            if current_page_for_logic > 0 and total_pages > 0:
+            if current_page_for_logic > 0:
                 final_response["prev_page_url"] = build_url_with_params(current_page_for_logic - 1)
         
         return self.response(200, **final_response)
+
+    # Keyset for cursor pagination. created_date is part of the primary key, so it
+    # keeps the key unique when a forecast is re-issued on another day.
+    def _keyset_columns(self) -> list:
+        model = self.datamodel.obj
+        return [model.forecast_date, model.municipality_code, model.weather_parameter, model.created_date]
+
+    def _get_list_keyset_page(self, query, cursor: str, count_mode: str) -> Response:
+        key_columns = self._keyset_columns()
+        try:
+            cursor_values = decode_cursor(cursor, len(key_columns)) if cursor else None
+        except InvalidCursorError as e:
+            return self.response_400(message=str(e))
+
+        try:
+            page_size = int(request.args.get("page_size", self.page_size or 25))
+        except ValueError:
+            page_size = self.page_size or 25
+        if page_size <= 0:
+            page_size = self.page_size or 25
+
+        item_count = count_rows(query, count_mode)
+        result, next_cursor = fetch_keyset_page(
+            apply_keyset(query, key_columns, cursor_values, descending=True),
+            page_size,
+            lambda item: (item.forecast_date, item.municipality_code, item.weather_parameter, item.created_date),
+        )
+        pks, response_data = self._serialize_alerts(result)
+        return self.response(
+            200,
+            ids=pks,
+            count=item_count,
+            result=response_data,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
+
+    def _serialize_alerts(self, result: list) -> tuple[list, list]:
+        pks = [self.datamodel.get_pk_value(item) for item in result] # Should handle composite PKs
+        response_data = self.response_schema.dump(result, many=True)
+
+        # Add synthetic 'id' to each result item for frontend compatibility
+        for i, item_dict in enumerate(response_data):
+            original_item = result[i]
+            if isinstance(original_item, self.datamodel.obj) and 'id' not in item_dict:
+                try:
+                    mc = getattr(original_item, 'municipality_code')
+                    fd = getattr(original_item, 'forecast_date')
+                    wp = getattr(original_item, 'weather_parameter')
+                    item_dict['id'] = f"{mc}_{fd}_{wp}"
+                except AttributeError as e_attr:
+                    logger.warning(f"Could not generate composite ID for item due to AttributeError {e_attr}: {item_dict}")
+        return pks, response_data
     
     @expose("/", methods=["POST"])
     @protect()
@@ -574,35 +687,95 @@ class WeatherForecastAlertRestApi(BaseSupersetModelRestApi):
         log_to_statsd=False,
     )
     def bulk_delete(self, **kwargs: Any) -> Response:
-        """Deletes multiple weather forecast alerts by composite IDs."""
+        """
+        Deletes multiple weather forecast alerts by composite IDs.
+
+        Keys are parsed up front and deleted with one set-based DELETE. Bulletins
+        linked to a deleted alert are unlinked in the same transaction.
+        """
         composite_ids = kwargs["rison"]
         if not composite_ids:
             return self.response_400(message="No composite IDs provided for bulk deletion")
-        
-        deleted_count = 0
+
+        keys_by_id = {}
+        invalid_ids = []
         for composite_id in composite_ids:
-            try:
-                # Parse composite ID
-                municipality_code, forecast_date_part, weather_parameter = composite_id.split('_', 2)
-                
-                # Find and delete the alert
-                alert = db.session.query(WeatherForecastAlert).filter_by(
-                    municipality_code=municipality_code,
-                    forecast_date=forecast_date_part, 
-                    weather_parameter=weather_parameter
-                ).first()
-                
-                if alert:
-                    db.session.delete(alert)
-                    deleted_count += 1
-            except Exception as e:
-                logger.error(f"Error processing deletion for {composite_id}: {e}")
-                
-        if deleted_count == 0:
-            return self.response_404()
-            
-        db.session.commit()
-        return self.response(200, message=f"Deleted {deleted_count} weather forecast alerts")
+            parts = composite_id.split('_', 2)
+            if len(parts) != 3:
+                invalid_ids.append(composite_id)
+                continue
+            keys_by_id[composite_id] = tuple(parts)
+
+        if not keys_by_id:
+            return self.response_400(message=f"Invalid composite IDs: {', '.join(invalid_ids)}")
+
+        key_columns = tuple_(
+            WeatherForecastAlert.municipality_code,
+            WeatherForecastAlert.forecast_date,
+            WeatherForecastAlert.weather_parameter,
+        )
+        requested_keys = set(keys_by_id.values())
+        try:
+            found_alerts = (
+                db.session.query(
+                    WeatherForecastAlert.municipality_code,
+                    WeatherForecastAlert.created_date,
+                    WeatherForecastAlert.forecast_date,
+                    WeatherForecastAlert.weather_parameter,
+                )
+                .filter(key_columns.in_(requested_keys))
+                .all()
+            )
+            found_keys = {
+                (municipality_code, forecast_date, weather_parameter)
+                for municipality_code, _, forecast_date, weather_parameter in found_alerts
+            }
+            if found_keys:
+                # Bulletins reference weather alerts by composite ID string, formatted as the
+                # weather pipeline writes it: municipality_created_forecast_parameter
+                db.session.query(Bulletin).filter(
+                    Bulletin.weather_forecast_alert_composite_id.in_(
+                        [
+                            f"{municipality_code}_{created_date}_{forecast_date}_{weather_parameter}"
+                            for municipality_code, created_date, forecast_date, weather_parameter in found_alerts
+                        ]
+                    )
+                ).update(
+                    {Bulletin.weather_forecast_alert_composite_id: None},
+                    synchronize_session=False,
+                )
+                deleted_count = (
+                    db.session.query(WeatherForecastAlert)
+                    .filter(key_columns.in_(found_keys))
+                    .delete(synchronize_session=False)
+                )
+                db.session.commit()
+            else:
+                deleted_count = 0
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error during weather alert bulk delete: {e}", exc_info=True)
+            return self.response_500(message="Error during bulk delete.")
+
+        not_found_ids = [
+            composite_id for composite_id, key in keys_by_id.items() if key not in found_keys
+        ]
+        response_messages = [f"Deleted {deleted_count} weather forecast alerts."]
+        if not_found_ids:
+            response_messages.append(f"Alerts not found for composite IDs: {', '.join(not_found_ids)}.")
+        if invalid_ids:
+            response_messages.append(f"Invalid composite IDs: {', '.join(invalid_ids)}.")
+
+        status_code = 200
+        if not_found_ids or invalid_ids:
+            # Nothing deleted is a 404, a partial delete is Multi-Status
+            status_code = 404 if deleted_count == 0 else 207
+        return self.response(
+            status_code,
+            message=" ".join(response_messages),
+            not_found=not_found_ids,
+            invalid=invalid_ids,
+        )
 
     @expose("/<composite_id>", methods=["GET"])
     @safe
@@ -646,6 +819,7 @@ class WeatherDataPullSchema(Schema):
     parameters_pulled = fields.String(required=True)
     pull_status = fields.String(required=True)
     details = fields.String(required=False, allow_none=True)
+    parameter_timings = fields.String(required=False, allow_none=True)
 
 
 class WeatherDataPullRestApi(BaseSupersetModelRestApi):
@@ -664,6 +838,7 @@ class WeatherDataPullRestApi(BaseSupersetModelRestApi):
         "parameters_pulled",
         "pull_status",
         "details",
+        "parameter_timings",
     ]
     
     show_columns = list_columns
@@ -672,6 +847,7 @@ class WeatherDataPullRestApi(BaseSupersetModelRestApi):
         "parameters_pulled",
         "pull_status",
         "details",
+        "parameter_timings",
     ]
     
     edit_columns = add_columns
@@ -708,7 +884,8 @@ class WeatherDataPullRestApi(BaseSupersetModelRestApi):
             pulled_at=datetime.now(),
             parameters_pulled=item["parameters_pulled"],
             pull_status=item["pull_status"],
-            details=item.get("details")
+            details=item.get("details"),
+            parameter_timings=item.get("parameter_timings"),
         )
             
         db.session.add(new_history)
@@ -742,7 +919,10 @@ class WeatherDataPullRestApi(BaseSupersetModelRestApi):
                 "pulled_at": latest_pull.pulled_at.isoformat(),
                 "parameters_pulled": latest_pull.parameters_pulled,
                 "pull_status": latest_pull.pull_status,
-                "details": latest_pull.details
+                "details": latest_pull.details,
+                "parameter_timings": (
+                    json.loads(latest_pull.parameter_timings) if latest_pull.parameter_timings else None
+                ),
             }
                 
             return self.response(200, result=result)
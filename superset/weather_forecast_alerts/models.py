@@ -81,6 +81,7 @@ class WeatherDataPullHistory(Model):
     parameters_pulled = Column(String(255), nullable=False)  # Comma-separated list of parameters
     pull_status = Column(String(50), nullable=False, default="Success")
     details = Column(Text, nullable=True)  # Optional details about the pull
+    parameter_timings = Column(Text, nullable=True)  # JSON list of per-parameter status, attempts and seconds
     
     def __repr__(self):
         return f"WeatherDataPullHistory(pulled_at={self.pulled_at}, status={self.pull_status})" 
\ No newline at end of file
@@ -2,15 +2,35 @@ import logging
 from datetime import datetime, date, timedelta
 from typing import Any, Dict, List, Optional, Type
 
+import prison
+import pyarrow as pa
 from flask import request, Response, g
 from flask_appbuilder.api import expose, protect, rison, safe
+from flask_appbuilder.exceptions import FABException
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.models.filters import Filters
 from flask_appbuilder.models.sqla.filters import FilterEqual
 from marshmallow import ValidationError
-from sqlalchemy import and_, or_, func, cast, Date as SQLDate
 
 from superset.extensions import db
+from superset.utils.keyset_pagination import (
+    apply_keyset,
+    count_rows,
+    COUNT_ARG,
+    COUNT_EXACT,
+    COUNT_NONE,
+    CURSOR_ARG,
+    decode_cursor,
+    fetch_keyset_page,
+    InvalidCursorError,
+    parse_count_mode,
+)
+from superset.utils.streaming_export import (
+    EXPORT_FORMAT_ARG,
+    parse_export_format,
+    schema_columns,
+    stream_query,
+)
 from superset.constants import MODEL_API_RW_METHOD_PERMISSION_MAP, RouteMethod
 from superset.extensions import event_logger
 from superset.views.base_api import BaseSupersetModelRestApi, statsd_metrics
@@ -41,6 +61,7 @@ from superset.weather_forecasts.schemas import (
     TminDailyTminRegionSchema,
     TminDailyTminRegionPostSchema,
     WeatherParameterListResponseSchema,
+    CombinedWeatherForecastResponseSchema,
     GetListRisonSchema,
     BaseWeatherParameterSchema
 )
@@ -69,6 +90,8 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
     add_columns = list_columns
     edit_columns = list_columns
     search_columns = list_columns # Basic search on the same columns
+    # Columns the per-parameter list endpoints accept Rison filters on
+    parameter_search_columns = ["forecast_date", "municipality_code", "municipality_name", "day_name", "value"]
 
     # No datamodel at class level as it changes per endpoint
     # Schemas are also resolved per endpoint
@@ -80,6 +103,32 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
             forecast_date=forecast_dt
         ).first()
 
+    # Rison filter operators accepted on the weather parameter list endpoints,
+    # mapped to the Flask-AppBuilder filter arg_name they are applied with
+    rison_filter_operators = {
+        "eq": "eq",
+        "neq": "neq",
+        "gt": "gt",
+        "lt": "lt",
+        "ct": "ct",
+        "sw": "sw",
+        "date_eq": "eq",
+        "date_gt": "gt",
+        "date_lt": "lt",
+    }
+
+    def _apply_rison_filters(self, query, model_class: Type[BaseWeatherParameterModel], rison_filters: List[Dict[str, Any]]):
+        """
+        Apply Rison filters through the FAB filter classes. Values are converted to the
+        column type first, so forecast_date filters compare DATE to DATE and stay sargable.
+        """
+        filters = SQLAInterface(model_class).get_filters(search_columns=self.parameter_search_columns)
+        filters.rest_add_filters([
+            {**rison_filter, "opr": self.rison_filter_operators.get(rison_filter.get("opr"), rison_filter.get("opr"))}
+            for rison_filter in rison_filters
+        ])
+        return filters.apply_all(query)
+
     def _handle_get_list(self, model_class: Type[BaseWeatherParameterModel], schema_class: Type[BaseWeatherParameterSchema]):
         query = db.session.query(model_class)
 
@@ -93,44 +142,79 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
             if param_value:
                 query = query.filter(getattr(model_class, model_col) == param_value)
         
-        # Apply date filters (forecast_date and days_range)
+        # Apply date filters (forecast_date and days_range) as a half-open range on the
+        # native DATE column so the (forecast_date, municipality_code) index is used
         forecast_date_str = request.args.get("forecast_date")
         days_range_str = request.args.get("days_range", "1")
         start_date = _parse_date_string(forecast_date_str) if forecast_date_str else None
 
         if start_date:
             days_range = int(days_range_str) if days_range_str.isdigit() and int(days_range_str) > 0 else 1
-            end_date = start_date + timedelta(days=days_range - 1)
             query = query.filter(
-                and_(
-                    cast(getattr(model_class, "forecast_date"), SQLDate) >= start_date,
-                    cast(getattr(model_class, "forecast_date"), SQLDate) <= end_date
-                )
+                model_class.forecast_date >= start_date,
+                model_class.forecast_date < start_date + timedelta(days=days_range),
             )
         
-        # Process Rison 'q' payload (filters, pagination, ordering)
+        # Process Rison 'q' payload filters
         rison_args = request.args.get("q")
         if rison_args:
             try:
-                # For FAB/Marshmallow to process Rison, it usually expects it in kwargs via @rison decorator
-                # Here we manually parse and apply if needed, or adjust to use FAB's Rison handling more directly.
-                # This part might need refinement based on direct Rison usage vs. FAB's built-in handling.
-                # For now, let's assume simple Rison filter application:
-                # This is a simplified placeholder. Proper Rison handling involves more.
-                # It's often better to define a generic datamodel interface for SQLAInterface and use its methods.
-                # However, without a class-level datamodel, this becomes tricky.
-                # For full Rison support, we might need a different structure or pass it to a SQLAInterface instance.
-                # For simplicity, focusing on direct params first, Rison can be enhanced.
-                # Let's assume self.datamodel is temporarily set for Rison filter processing if FAB's utils are used.
-                _sqla_interface = SQLAInterface(model_class)
-                _filters = _sqla_interface.get_filters_from_rison(rison_args)
-                query = _filters.apply_all(query)
-
-            except Exception as e:
+                rison_data = prison.loads(rison_args)
+            except Exception as e:  # prison raises more than ParserException on malformed input
                 logger.warning(f"Could not parse Rison query: {e}")
-                # Potentially return 400 if Rison is malformed
+                return self.response_400(message="Invalid q parameter: malformed Rison")
+            try:
+                query = self._apply_rison_filters(query, model_class, rison_data.get("filters", []))
+            except (AttributeError, FABException) as e:
+                return self.response_400(message=f"Invalid q parameter: {e}")
+
+        try:
+            export_format = parse_export_format(request.args.get(EXPORT_FORMAT_ARG))
+        except ValueError as e:
+            return self.response_400(message=str(e))
+        if export_format:
+            return stream_query(
+                query.order_by(model_class.forecast_date.asc(), model_class.municipality_code.asc()),
+                schema_columns(schema_class(), model_class),
+                export_format,
+                model_class.__tablename__,
+            )
+
+        cursor = request.args.get(CURSOR_ARG)
+        try:
+            count_mode = parse_count_mode(
+                request.args.get(COUNT_ARG), default=COUNT_NONE if cursor is not None else COUNT_EXACT
+            )
+        except ValueError as e:
+            return self.response_400(message=str(e))
+
+        page_size_str = request.args.get("page_size", "25")
+        page_size = int(page_size_str) if page_size_str.lstrip('-').isdigit() else 25 # handles potential negative for 'all'
+        schema = schema_class()
+        list_response_schema = WeatherParameterListResponseSchema()
 
-        item_count = query.count()
+        # Cursor mode: keyset pagination on the (forecast_date, municipality_code) primary key
+        if cursor is not None:
+            key_columns = [model_class.forecast_date, model_class.municipality_code]
+            try:
+                cursor_values = decode_cursor(cursor, len(key_columns)) if cursor else None
+            except InvalidCursorError as e:
+                return self.response_400(message=str(e))
+            page_size = page_size if page_size > 0 else 25
+            item_count = count_rows(query, count_mode)
+            results, next_cursor = fetch_keyset_page(
+                apply_keyset(query, key_columns, cursor_values),
+                page_size,
+                lambda item: (item.forecast_date, item.municipality_code),
+            )
+            return self.response(200, **list_response_schema.dump({
+                "count": item_count,
+                "result": schema.dump(results, many=True),
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+            }))
+
+        item_count = count_rows(query, count_mode)
         
         # Ordering (simplified, enhance with Rison payload if needed)
         # For now, default ordering or simple param; Rison should handle this ideally.
@@ -138,25 +222,24 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
 
         # Pagination (simplified, enhance with Rison payload)
         page = int(request.args.get("page", 0))
-        page_size_str = request.args.get("page_size", "25")
-        page_size = int(page_size_str) if page_size_str.lstrip('-').isdigit() else 25 # handles potential negative for 'all'
         
         total_pages = 0
         actual_page_size = page_size
 
         if page_size > 0:
-            total_pages = (item_count + page_size - 1) // page_size  # Ceiling division
+            # Without a count the number of pages is unknown
+            total_pages = (item_count + page_size - 1) // page_size if item_count is not None else None  # Ceiling division
             offset = page * page_size
             query = query.limit(page_size).offset(offset)
             actual_page_size = page_size
         elif page_size == -1: # Requesting all items
-            total_pages = 1 if item_count > 0 else 0
-            actual_page_size = item_count if item_count > 0 else 0 # Or some large number if item_count is 0?
+            total_pages = None
         # else page_size is 0 or invalid, effectively no pagination or default by DB if not handled by limit/offset
 
         results = query.all()
-        schema = schema_class()
-        list_response_schema = WeatherParameterListResponseSchema()
+        if page_size == -1:
+            total_pages = 1 if results else 0
+            actual_page_size = len(results)
 
         response_data = {
             "count": item_count,
@@ -171,16 +254,115 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
         base_url = request.base_url
         query_params = request.args.copy()
 
-        if (page + 1) < total_pages and page_size > 0:
+        has_next_page = (page + 1) < total_pages if total_pages is not None else len(results) == page_size
+        if has_next_page and page_size > 0:
             query_params["page"] = page + 1
             response_data["next_page_url"] = f"{base_url}?{query_params.to_dict(flat=False)}"
         
-        if page > 0 and total_pages > 0 and page_size > 0:
+        if page > 0 and total_pages != 0 and page_size > 0:
             query_params["page"] = page - 1
             response_data["prev_page_url"] = f"{base_url}?{query_params.to_dict(flat=False)}"
 
         return self.response(200, **list_response_schema.dump(response_data))
 
+    # Response column name -> WeatherForecast attribute for /combined
+    combined_columns = {
+        "forecast_date": WeatherForecast.forecast_date,
+        "day_name": WeatherForecast.day_name,
+        "municipality_code": WeatherForecast.municipality_code,
+        "municipality_name": WeatherForecast.municipality_name,
+        "wind_speed": WeatherForecast.wind_speed_avg,
+        "heat_index": WeatherForecast.heat_index,
+        "rainfall": WeatherForecast.rainfall_avg,
+        "humidity": WeatherForecast.humidity_avg,
+        "temp_max": WeatherForecast.temp_max,
+        "temp_min": WeatherForecast.temp_min,
+    }
+
+    # --- Combined (all parameters) Endpoint ---
+    @expose("/combined", methods=["GET"])
+    @safe
+    @statsd_metrics
+    @event_logger.log_this_with_context(action=lambda self, *args, **kwargs: f"{self.__class__.__name__}.get_combined")
+    def get_combined(self) -> Response:
+        """
+        ---
+        get:
+          summary: Get all weather parameters for a date range in one response
+          description: >-
+            Reads the consolidated forecast table, which holds one row per municipality
+            and day with every parameter as a column. The result is columnar: one array
+            per column. Pass format=arrow for an Arrow IPC stream instead of JSON.
+          parameters:
+            - name: municipality_code
+              in: query
+              schema: { type: array, items: { type: string } }
+              style: form
+              explode: true
+              description: Filter by one or more municipality codes (eg TL-DI)
+            - name: forecast_date
+              in: query
+              schema: { type: string, format: date }
+              description: First forecast date to return (eg 2025-05-26)
+            - name: days_range
+              in: query
+              schema: { type: integer, default: 1, minimum: 1 }
+              description: Number of days to return starting at forecast_date
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, arrow], default: json }
+              description: Response encoding
+          responses:
+            200:
+              description: All weather parameters for the requested range
+              content:
+                application/json:
+                  schema:
+                    $ref: '#/components/schemas/CombinedWeatherForecastResponseSchema'
+                application/vnd.apache.arrow.stream: {}
+            400: { $ref: '#/components/responses/400' }
+            500: { $ref: '#/components/responses/500' }
+        """
+        output_format = request.args.get("format", "json")
+        if output_format not in ("json", "arrow"):
+            return self.response_400(message="format must be one of: json, arrow")
+
+        query = db.session.query(*self.combined_columns.values())
+
+        municipality_codes = request.args.getlist("municipality_code")
+        if municipality_codes:
+            query = query.filter(WeatherForecast.municipality_code.in_(municipality_codes))
+
+        forecast_date_str = request.args.get("forecast_date")
+        if forecast_date_str:
+            start_date = _parse_date_string(forecast_date_str)
+            if not start_date:
+                return self.response_400(message="Invalid date format. Use YYYY-MM-DD.")
+            days_range_str = request.args.get("days_range", "1")
+            days_range = int(days_range_str) if days_range_str.isdigit() and int(days_range_str) > 0 else 1
+            query = query.filter(
+                WeatherForecast.forecast_date >= start_date,
+                WeatherForecast.forecast_date < start_date + timedelta(days=days_range),
+            )
+
+        rows = query.order_by(WeatherForecast.forecast_date, WeatherForecast.municipality_code).all()
+        column_names = list(self.combined_columns)
+        columns = list(zip(*rows)) if rows else [()] * len(column_names)
+
+        if output_format == "arrow":
+            table = pa.table({name: pa.array(values) for name, values in zip(column_names, columns)})
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return Response(sink.getvalue().to_pybytes(), status=200, mimetype="application/vnd.apache.arrow.stream")
+
+        data = {
+            name: [value.isoformat() if isinstance(value, date) else value for value in values]
+            if name == "forecast_date" else list(values)
+            for name, values in zip(column_names, columns)
+        }
+        return self.response(200, count=len(rows), columns=column_names, data=data)
+
     # --- Wind Speed Endpoints ---
     @expose("/wind_speed", methods=["GET"])
     @safe
@@ -223,6 +405,18 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
               in: query
               schema: { type: integer, default: 25 }
               description: Number of results per page. Set to -1 to retrieve all results.
+            - name: cursor
+              in: query
+              schema: { type: string }
+              description: Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. page is ignored.
+            - name: count
+              in: query
+              schema: { type: string, enum: [exact, estimate, none] }
+              description: How to compute count. Defaults to exact, or none in cursor mode.
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, ndjson, csv] }
+              description: ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page.
           responses:
             200:
               description: List of wind speed forecasts
@@ -466,6 +660,18 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
               in: query
               schema: { type: integer, default: 25 }
               description: Number of results per page. Set to -1 to retrieve all results.
+            - name: cursor
+              in: query
+              schema: { type: string }
+              description: Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. page is ignored.
+            - name: count
+              in: query
+              schema: { type: string, enum: [exact, estimate, none] }
+              description: How to compute count. Defaults to exact, or none in cursor mode.
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, ndjson, csv] }
+              description: ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page.
           responses:
             200:
               description: List of heat index forecasts
@@ -646,6 +852,18 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
               in: query
               schema: { type: integer, default: 25 }
               description: Number of results per page. Set to -1 to retrieve all results.
+            - name: cursor
+              in: query
+              schema: { type: string }
+              description: Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. page is ignored.
+            - name: count
+              in: query
+              schema: { type: string, enum: [exact, estimate, none] }
+              description: How to compute count. Defaults to exact, or none in cursor mode.
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, ndjson, csv] }
+              description: ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page.
           responses:
             200:
               description: List of rainfall forecasts
@@ -826,6 +1044,18 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
               in: query
               schema: { type: integer, default: 25 }
               description: Number of results per page. Set to -1 to retrieve all results.
+            - name: cursor
+              in: query
+              schema: { type: string }
+              description: Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. page is ignored.
+            - name: count
+              in: query
+              schema: { type: string, enum: [exact, estimate, none] }
+              description: How to compute count. Defaults to exact, or none in cursor mode.
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, ndjson, csv] }
+              description: ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page.
           responses:
             200:
               description: List of relative humidity forecasts
@@ -1006,6 +1236,18 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
               in: query
               schema: { type: integer, default: 25 }
               description: Number of results per page. Set to -1 to retrieve all results.
+            - name: cursor
+              in: query
+              schema: { type: string }
+              description: Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. page is ignored.
+            - name: count
+              in: query
+              schema: { type: string, enum: [exact, estimate, none] }
+              description: How to compute count. Defaults to exact, or none in cursor mode.
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, ndjson, csv] }
+              description: ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page.
           responses:
             200:
               description: List of max temperature forecasts
@@ -1186,6 +1428,18 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
               in: query
               schema: { type: integer, default: 25 }
               description: Number of results per page. Set to -1 to retrieve all results.
+            - name: cursor
+              in: query
+              schema: { type: string }
+              description: Keyset pagination. Pass an empty value for the first page, then the returned next_cursor. page is ignored.
+            - name: count
+              in: query
+              schema: { type: string, enum: [exact, estimate, none] }
+              description: How to compute count. Defaults to exact, or none in cursor mode.
+            - name: format
+              in: query
+              schema: { type: string, enum: [json, ndjson, csv] }
+              description: ndjson or csv streams every matching row as a file download, ignoring pagination. Defaults to a JSON page.
           responses:
             200:
               description: List of min temperature forecasts
@@ -1333,6 +1587,7 @@ class WeatherForecastsApi(BaseSupersetModelRestApi):
         TmaxDailyTmaxRegionSchema, TmaxDailyTmaxRegionPostSchema,
         TminDailyTminRegionSchema, TminDailyTminRegionPostSchema,
         WeatherParameterListResponseSchema,
+        CombinedWeatherForecastResponseSchema,
         GetListRisonSchema,
     )
 
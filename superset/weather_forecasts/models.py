@@ -1,30 +1,12 @@
-from sqlalchemy import Column, String, Date, Float, Integer, PrimaryKeyConstraint, TypeDecorator
+from sqlalchemy import Column, String, Date, Float, PrimaryKeyConstraint
 from flask_appbuilder import Model
-from datetime import date as py_date # Alias to avoid conflict with sqlalchemy.Date
-
-# Custom TypeDecorator to store Python date objects as ISO formatted TEXT in SQLite
-class DateAsText(TypeDecorator):
-    impl = String  # Store as a string in the database
-    cache_ok = True
-
-    def process_bind_param(self, value, dialect):
-        if value is None:
-            return None
-        if isinstance(value, py_date):
-            return value.isoformat()
-        raise ValueError("DateAsText expects a Python datetime.date object or None")
-
-    def process_result_value(self, value, dialect):
-        if value is None:
-            return None
-        return py_date.fromisoformat(value)
 
 class BaseWeatherParameterModel(Model):
     """Base model for common weather parameter fields and composite primary key."""
     __abstract__ = True # Ensure this base class doesn't create its own table
 
     # Composite Primary Key definition will be in subclasses using __table_args__
-    forecast_date = Column(DateAsText, nullable=False, primary_key=True)
+    forecast_date = Column(Date, nullable=False, primary_key=True)
     day_name = Column(String(20)) # e.g., Monday
     value = Column(Float, nullable=False)
     municipality_code = Column(String(15), nullable=False, primary_key=True) # e.g., TL-DI
@@ -81,48 +63,22 @@ class TminDailyTminRegion(BaseWeatherParameterModel):
         PrimaryKeyConstraint('forecast_date', 'municipality_code', name='pk_tmin_daily_tmin_region'),
     )
 
-# A consolidated/denormalized view or table might be more efficient for the API
-# For now, we'll assume the API will query these individual tables.
-# If a unified table/view 'weather_forecasts' exists or is preferred, 
-# the model structure would need to change.
-
-# Example for a consolidated model (if you had a single table for all forecasts)
-# class WeatherForecast(Base):
-#     __tablename__ = "weather_forecasts" # Assuming a consolidated table
-#     id = Column(Integer, primary_key=True)
-#     forecast_date = Column(Date, nullable=False, index=True)
-#     day_name = Column(String(10))
-#     municipality_code = Column(String(10), nullable=False, index=True)
-#     municipality_name = Column(String(100))
-#     weather_parameter = Column(String(50), nullable=False, index=True) # e.g., 'ws_daily_avg_region', 'heat_index'
-#     value = Column(Float)
-#
-#     __table_args__ = (
-#         UniqueConstraint('municipality_code', 'forecast_date', 'weather_parameter', name='_municipality_forecast_parameter_uc'),
-#     )
-#
-#     def __repr__(self):
-#         return f"<WeatherForecast {self.municipality_name} {self.forecast_date} - {self.weather_parameter}: {self.value}>"
-
-# For the API, it's often better to have a single, queryable "weather forecast" entity.
-# The provided table names suggest separate tables for each parameter.
-# We will need a strategy in the API to query across these or assume a unified source.
-# For now, let's define a generic WeatherForecast model that the API can use,
-# and the data retrieval logic will need to adapt based on the actual database structure.
-
 class WeatherForecast(Model):
-    __tablename__ = "weather_forecasts_consolidated" # This is a placeholder name. 
-                                                 # The actual source might be a view or union of the above tables.
-    
-    id = Column(Integer, autoincrement=True)
-    forecast_date = Column(Date, nullable=False, index=True)
+    """
+    One row per municipality and day with every weather parameter as a column.
+
+    Rebuilt from the per-parameter tables by the weather forecast puller after
+    each ingest (see refresh_consolidated_forecasts in transform_weather_data.py),
+    so multi-parameter reads need a single primary key range scan.
+    """
+    __tablename__ = "weather_forecasts_consolidated"
+
+    forecast_date = Column(Date, nullable=False)
     day_name = Column(String(50))
-    municipality_code = Column(String(50), nullable=False, index=True)
+    municipality_code = Column(String(50), nullable=False)
     municipality_name = Column(String(255))
-    
-    # These fields will store the actual weather parameter values.
-    # Using individual columns for each parameter for simplicity in the model.
-    # The API will need to handle how these are populated/queried if they come from different tables.
+
+    # Column names follow the per-parameter source tables
     wind_speed_avg = Column(Float, name="ws_daily_avg_region_value")
     heat_index = Column(Float, name="heat_index_daily_region_value")
     rainfall_avg = Column(Float, name="rainfall_daily_weighted_average_value")
@@ -130,10 +86,6 @@ class WeatherForecast(Model):
     temp_max = Column(Float, name="tmax_daily_tmax_region_value")
     temp_min = Column(Float, name="tmin_daily_tmin_region_value")
 
-    # If you want to query by a generic "weather_parameter" name and its value,
-    # you might need a different structure or advanced querying in the API.
-    # For now, this model assumes a somewhat denormalized or joined source.
-
     __table_args__ = (
         PrimaryKeyConstraint('forecast_date', 'municipality_code', name='pk_weather_forecasts_municipality_date'),
     )
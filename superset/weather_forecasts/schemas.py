@@ -113,7 +113,7 @@ class TminDailyTminRegionPostSchema(TminDailyTminRegionSchema):
 
 # --- Schema for List Responses (common structure) ---
 class WeatherParameterListResponseSchema(FABSchema):
-    count = fields.Integer(description="Total number of records found.")
+    count = fields.Integer(description="Total number of records found, estimated with count=estimate, null with count=none.", allow_none=True)
     # `ids` might not be needed if `id` is part of each result item.
     # ids = fields.List(fields.String(), description="List of composite record IDs.")
     # `result` will be a list of one of the specific parameter schemas, handled in API method.
@@ -121,9 +121,20 @@ class WeatherParameterListResponseSchema(FABSchema):
     result = fields.List(fields.Dict(), description="List of weather parameter records.")
     page = fields.Integer(description="Current page number.", dump_only=True)
     page_size = fields.Integer(description="Number of items per page.", dump_only=True)
-    total_pages = fields.Integer(description="Total number of pages.", dump_only=True)
+    total_pages = fields.Integer(description="Total number of pages, null when not counted.", dump_only=True, allow_none=True)
     next_page_url = fields.String(description="URL for the next page, if any.", dump_only=True, allow_none=True)
     prev_page_url = fields.String(description="URL for the previous page, if any.", dump_only=True, allow_none=True)
+    next_cursor = fields.String(description="Cursor mode only: pass as `cursor` to fetch the next page, null on the last page.", dump_only=True, allow_none=True)
+
+# --- Schema for the combined (all parameters) columnar response ---
+class CombinedWeatherForecastResponseSchema(FABSchema):
+    count = fields.Integer(description="Number of (forecast_date, municipality_code) rows.")
+    columns = fields.List(fields.String(), description="Column names, in the order of the arrays in `data`.")
+    data = fields.Dict(
+        keys=fields.String(),
+        values=fields.List(fields.Raw(allow_none=True)),
+        description="One array per column, all of length `count`.",
+    )
 
 # --- Rison schema for `q` parameter in GET list requests ---
 # This can be common for all parameter types if filtering fields are the same.
@@ -0,0 +1,78 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm.session import Session
+
+
+def test_weather_alerts_by_composite_id(session: Session) -> None:
+    """
+    All composite IDs of a page are resolved with one query
+    """
+    from superset.bulletins.api import _weather_alerts_by_composite_id
+    from superset.weather_forecast_alerts.models import WeatherForecastAlert
+
+    engine = session.get_bind()
+    WeatherForecastAlert.metadata.create_all(
+        engine, tables=[WeatherForecastAlert.__table__]
+    )
+    for municipality_code, weather_parameter in [
+        ("TL-DI", "rainfall"),
+        ("TL-DI", "heat_index"),
+        ("TL-BA", "rainfall"),
+    ]:
+        session.add(
+            WeatherForecastAlert(
+                municipality_code=municipality_code,
+                created_date=datetime(2026, 10, 12, 6, 0),
+                forecast_date="2026-10-14",
+                weather_parameter=weather_parameter,
+                alert_level="Warning",
+                alert_title="Alert",
+                alert_message="Message",
+                parameter_value=1.0,
+            )
+        )
+    session.commit()
+
+    statements = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    alerts = _weather_alerts_by_composite_id(
+        [
+            "TL-DI_2026-10-12 06:00:00_2026-10-14_rainfall",
+            "TL-DI_2026-10-12 06:00:00_2026-10-14_heat_index",
+            "TL-DI_2026-10-12 06:00:00_2026-10-14_rainfall",
+            "TL-BA_2026-10-12 06:00:00_2026-10-15_rainfall",
+            "not-a-composite-id",
+        ]
+    )
+
+    assert len(statements) == 1
+    assert alerts[
+        "TL-DI_2026-10-12 06:00:00_2026-10-14_heat_index"
+    ].weather_parameter == ("heat_index")
+    assert alerts[
+        "TL-DI_2026-10-12 06:00:00_2026-10-14_rainfall"
+    ].municipality_code == ("TL-DI")
+    assert alerts["TL-BA_2026-10-12 06:00:00_2026-10-15_rainfall"] is None
+    assert "not-a-composite-id" not in alerts
+    assert _weather_alerts_by_composite_id([]) == {}
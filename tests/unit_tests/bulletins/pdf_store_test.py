@@ -0,0 +1,122 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from datetime import datetime
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
+
+from superset.bulletins.pdf_store import (
+    bulletin_pdf_key,
+    get_bulletin_pdf,
+    store_bulletin_pdf,
+)
+
+
+def _bulletin(**kwargs):
+    fields = {
+        "id": 1,
+        "title": "Dengue alert",
+        "advisory": "Advisory",
+        "risks": "Risks",
+        "safety_tips": "Tips",
+        "hashtags": "dengue,health",
+        "created_on": datetime(2026, 10, 12, 6, 0),
+        "changed_on": datetime(2026, 10, 12, 6, 0),
+        "image_attachments": [
+            SimpleNamespace(s3_key="bulletin_images/a.png", caption="Map")
+        ],
+    }
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
+def _missing(*args, **kwargs):
+    raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+
+
+def _s3_client(mocker: MockerFixture) -> MagicMock:
+    client = MagicMock()
+    client.meta.endpoint_url = f"http://minio-{id(client)}"
+    mocker.patch("superset.bulletins.pdf_store.get_s3_client", return_value=client)
+    return client
+
+
+def test_bulletin_pdf_key(app_context: None) -> None:
+    key = bulletin_pdf_key(_bulletin())
+    assert key.startswith("bulletin_pdfs/") and key.endswith(".pdf")
+    assert bulletin_pdf_key(_bulletin()) == key
+    assert bulletin_pdf_key(_bulletin(advisory="Updated")) != key
+    assert bulletin_pdf_key(_bulletin(hashtags="dengue")) != key
+    assert bulletin_pdf_key(_bulletin(image_attachments=[])) != key
+    assert (
+        bulletin_pdf_key(
+            _bulletin(
+                image_attachments=[
+                    SimpleNamespace(s3_key="bulletin_images/a.png", caption="Map 2")
+                ]
+            )
+        )
+        != key
+    )
+
+
+def test_get_bulletin_pdf_renders_and_stores_once(
+    mocker: MockerFixture, app_context: None
+) -> None:
+    mocker.patch.dict("flask.current_app.config", {"S3_BUCKET": "bucket"})
+    client = _s3_client(mocker)
+    mocker.patch("superset.bulletins.pdf_store.ensure_bucket")
+    render = mocker.patch(
+        "superset.bulletins.pdf_store.generate_bulletin_pdf",
+        return_value=BytesIO(b"%PDF"),
+    )
+    bulletin = _bulletin()
+    key = bulletin_pdf_key(bulletin)
+
+    client.get_object.side_effect = _missing
+    assert get_bulletin_pdf(bulletin) == b"%PDF"
+    client.put_object.assert_called_once_with(
+        Bucket="bucket", Key=key, Body=b"%PDF", ContentType="application/pdf"
+    )
+
+    client.get_object.side_effect = None
+    client.get_object.return_value = {"Body": BytesIO(b"%PDF stored")}
+    assert get_bulletin_pdf(bulletin) == b"%PDF stored"
+    assert render.call_count == 1
+
+
+def test_pdf_with_missing_images_is_not_stored(
+    mocker: MockerFixture, app_context: None
+) -> None:
+    mocker.patch.dict("flask.current_app.config", {"S3_BUCKET": "bucket"})
+    client = _s3_client(mocker)
+    mocker.patch("superset.bulletins.pdf_store.object_exists", return_value=False)
+
+    def generate_bulletin_pdf(bulletin, image_errors=None):
+        image_errors.append("bulletin_images/a.png: timeout")
+        return BytesIO(b"%PDF")
+
+    mocker.patch(
+        "superset.bulletins.pdf_store.generate_bulletin_pdf",
+        side_effect=generate_bulletin_pdf,
+    )
+
+    assert store_bulletin_pdf(_bulletin()) == bulletin_pdf_key(_bulletin())
+    client.put_object.assert_not_called()
@@ -0,0 +1,74 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+from sqlalchemy.orm.session import Session
+
+
+def test_sweep_orphaned_images(
+    mocker: MockerFixture, session: Session, app_context: None
+) -> None:
+    """
+    Only unreferenced objects older than the grace period are deleted, also
+    when an uploader wrote one again after it was listed
+    """
+    from superset.models.bulletins import BulletinImageAttachment
+    from superset.tasks.bulletin_images import sweep_orphaned_images
+
+    BulletinImageAttachment.metadata.create_all(
+        session.get_bind(), tables=[BulletinImageAttachment.__table__]
+    )
+    session.add(
+        BulletinImageAttachment(bulletin_id=1, s3_key="bulletin_images/used.png")
+    )
+    session.commit()
+
+    now = datetime.now(timezone.utc)
+    old, recent = now - timedelta(days=2), now - timedelta(hours=1)
+    listed = {
+        "bulletin_images/used.png": old,
+        "bulletin_images/orphan.png": old,
+        "bulletin_images/new.png": recent,
+        "bulletin_charts/orphan.png": old,
+        "bulletin_charts/reuploaded.png": old,
+    }
+    # PUT again by a pipeline between the listing and the delete
+    current = {**listed, "bulletin_charts/reuploaded.png": now}
+
+    s3_client = MagicMock()
+    s3_client.get_paginator.return_value.paginate.side_effect = lambda Bucket, Prefix: [
+        {
+            "Contents": [
+                {"Key": key, "LastModified": modified}
+                for key, modified in listed.items()
+                if key.startswith(Prefix)
+            ]
+        }
+    ]
+    s3_client.head_object.side_effect = lambda Bucket, Key: {
+        "LastModified": current[Key]
+    }
+    mocker.patch("superset.tasks.bulletin_images.get_s3_client", return_value=s3_client)
+    mocker.patch.dict("flask.current_app.config", {"S3_BUCKET": "bucket"})
+
+    assert sweep_orphaned_images() == 2
+    deleted = sorted(
+        call.kwargs["Key"] for call in s3_client.delete_object.call_args_list
+    )
+    assert deleted == ["bulletin_charts/orphan.png", "bulletin_images/orphan.png"]
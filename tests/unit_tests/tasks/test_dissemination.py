@@ -0,0 +1,236 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import time
+
+from pytest_mock import MockerFixture
+from sqlalchemy.orm.session import Session
+
+
+def _create_log(session: Session, statuses: dict[str, str]):
+    from superset.models.dissemination import (
+        DisseminatedBulletinLog,
+        dissemination_email_group_association,
+        dissemination_whatsapp_group_association,
+        DisseminationRecipientStatus,
+        EmailGroup,
+        WhatsAppGroup,
+    )
+
+    engine = session.get_bind()
+    DisseminatedBulletinLog.metadata.create_all(
+        engine,
+        tables=[
+            EmailGroup.__table__,
+            WhatsAppGroup.__table__,
+            DisseminatedBulletinLog.__table__,
+            DisseminationRecipientStatus.__table__,
+            dissemination_email_group_association,
+            dissemination_whatsapp_group_association,
+        ],
+    )
+    log = DisseminatedBulletinLog(
+        bulletin_id=1,
+        disseminated_by_fk=1,
+        status="PENDING",
+        channel="whatsapp",
+        subject_sent="WhatsApp Template: bulletin_alert",
+        message_body_sent="Recipients: 3.",
+        job_id="job",
+    )
+    log.recipient_statuses = [
+        DisseminationRecipientStatus(recipient=recipient, status=status, attempts=0)
+        for recipient, status in statuses.items()
+    ]
+    session.add(log)
+    session.commit()
+    return log
+
+
+def test_disseminate_whatsapp_sends_pending_recipients(
+    mocker: MockerFixture, session: Session, app_context: None
+) -> None:
+    """
+    Only recipients not sent yet are messaged, and their statuses feed the log
+    """
+    from superset.tasks.dissemination import disseminate_whatsapp
+
+    log = _create_log(session, {"+6701": "SENT", "+6702": "PENDING", "+6703": "FAILED"})
+
+    def send_whatsapp_message(recipient_phone_number, **kwargs):
+        if recipient_phone_number == "+6703":
+            return False, {"error": {"message": "Invalid number"}}
+        return True, {"messages": [{"id": f"wamid.{recipient_phone_number}"}]}
+
+    send = mocker.patch(
+        "superset.tasks.dissemination.send_whatsapp_message",
+        side_effect=send_whatsapp_message,
+    )
+
+    disseminate_whatsapp(log.id, "bulletin_alert", ["Subject", "Advisory", "", ""])
+
+    sent_to = sorted(
+        call.kwargs["recipient_phone_number"] for call in send.call_args_list
+    )
+    assert sent_to == ["+6702", "+6703"]
+    statuses = {status.recipient: status for status in log.recipient_statuses}
+    assert statuses["+6701"].attempts == 0
+    assert statuses["+6702"].status == "SENT"
+    assert statuses["+6702"].message_id == "wamid.+6702"
+    assert statuses["+6703"].status == "FAILED"
+    assert statuses["+6703"].error == "Invalid number"
+    assert log.status == "PARTIAL_SUCCESS"
+    assert log.details.startswith("Sent: 2, Failed: 1.")
+
+    # Running the task again only retries the failed recipient
+    send.reset_mock()
+    disseminate_whatsapp(log.id, "bulletin_alert", ["Subject", "Advisory", "", ""])
+    assert [call.kwargs["recipient_phone_number"] for call in send.call_args_list] == [
+        "+6703"
+    ]
+    assert statuses["+6703"].attempts == 2
+
+
+def test_whatsapp_session_only_retries_throttled_posts(
+    mocker: MockerFixture, app_context: None
+) -> None:
+    from superset.dissemination import whatsapp_utils
+
+    mocker.patch.object(whatsapp_utils, "_session", None)
+    retry = (
+        whatsapp_utils.get_whatsapp_session()
+        .get_adapter("https://graph.facebook.com")
+        .max_retries
+    )
+    assert retry.is_retry("POST", 429)
+    # A 5xx may follow an accepted message, resending it could message twice
+    for status_code in (500, 502, 503, 504):
+        assert not retry.is_retry("POST", status_code)
+    assert retry.read == 0
+
+
+def test_rate_limiter_spaces_calls() -> None:
+    from superset.dissemination.whatsapp_utils import RateLimiter
+
+    rate_limiter = RateLimiter(100)
+    start = time.monotonic()
+    for _ in range(6):
+        rate_limiter.wait()
+    # The first call goes through immediately, the next five wait 10ms each
+    assert time.monotonic() - start >= 0.05
+
+
+class WorkerLost(BaseException):
+    """Stands in for the worker process dying"""
+
+
+def test_disseminate_whatsapp_redelivery_does_not_resend(
+    mocker: MockerFixture, session: Session, app_context: None
+) -> None:
+    """
+    A redelivered task skips recipients sent, or possibly sent, before the crash
+    """
+    from superset.tasks.dissemination import disseminate_whatsapp
+
+    recipients = ["+6701", "+6702", "+6703", "+6704", "+6705"]
+    log = _create_log(session, dict.fromkeys(recipients, "PENDING"))
+    # Run in the test's app context, calling the task pushes the global app's
+    mocker.patch.dict(
+        "flask.current_app.config",
+        {"WHATSAPP_SEND_MAX_WORKERS": 1, "WHATSAPP_SEND_RATE_LIMIT": 1000},
+    )
+    sent_to = []
+
+    def send_whatsapp_message(recipient_phone_number, **kwargs):
+        sent_to.append(recipient_phone_number)
+        if recipient_phone_number == "+6703" and sent_to.count("+6703") == 1:
+            # Posted, then the worker dies before the outcome is stored
+            raise WorkerLost()
+        return True, {"messages": [{"id": f"wamid.{recipient_phone_number}"}]}
+
+    mocker.patch(
+        "superset.tasks.dissemination.send_whatsapp_message",
+        side_effect=send_whatsapp_message,
+    )
+
+    try:
+        disseminate_whatsapp.run(log.id, "bulletin_alert", [])
+    except WorkerLost:
+        # Whatever was not committed dies with the worker
+        session.rollback()
+    assert sent_to == ["+6701", "+6702", "+6703"]
+
+    disseminate_whatsapp.run(log.id, "bulletin_alert", [])
+    assert sorted(sent_to) == recipients
+    statuses = {status.recipient: status for status in log.recipient_statuses}
+    assert statuses["+6703"].status == "SENDING"
+    assert "delivery unknown" in statuses["+6703"].error
+    assert all(statuses[r].status == "SENT" for r in recipients if r != "+6703")
+    assert log.status == "PARTIAL_SUCCESS"
+    assert log.details.startswith("Sent: 4, Failed: 1.")
+
+
+def test_disseminate_whatsapp_finishes_log_at_time_limit(
+    mocker: MockerFixture, session: Session, app_context: None
+) -> None:
+    """
+    At the soft time limit started sends are recorded and the log is finished
+    """
+    from celery.exceptions import SoftTimeLimitExceeded
+
+    from superset.tasks import dissemination
+
+    recipients = ["+6701", "+6702", "+6703", "+6704"]
+    log = _create_log(session, dict.fromkeys(recipients, "PENDING"))
+    # Run in the test's app context, calling the task pushes the global app's
+    mocker.patch.dict(
+        "flask.current_app.config",
+        {"WHATSAPP_SEND_MAX_WORKERS": 1, "WHATSAPP_SEND_RATE_LIMIT": 1000},
+    )
+    send = mocker.patch(
+        "superset.tasks.dissemination.send_whatsapp_message",
+        side_effect=lambda recipient_phone_number, **kwargs: (
+            True,
+            {"messages": [{"id": f"wamid.{recipient_phone_number}"}]},
+        ),
+    )
+    wait = dissemination.wait
+
+    def wait_until_time_limit(*args, **kwargs):
+        # The limit fires while the second message is in flight
+        if wait_mock.call_count == 2:
+            raise SoftTimeLimitExceeded()
+        return wait(*args, **kwargs)
+
+    wait_mock = mocker.patch(
+        "superset.tasks.dissemination.wait", side_effect=wait_until_time_limit
+    )
+
+    dissemination.disseminate_whatsapp.run(log.id, "bulletin_alert", [])
+
+    assert [call.kwargs["recipient_phone_number"] for call in send.call_args_list] == [
+        "+6701",
+        "+6702",
+    ]
+    statuses = {status.recipient: status.status for status in log.recipient_statuses}
+    assert statuses == {
+        "+6701": "SENT",
+        "+6702": "SENT",
+        "+6703": "PENDING",
+        "+6704": "PENDING",
+    }
+    assert log.status == "PARTIAL_SUCCESS"
+    assert "time limit" in log.details
@@ -0,0 +1,117 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import datetime
+
+import pytest
+from sqlalchemy import Column, create_engine, Date, String
+from sqlalchemy.orm import declarative_base, Session
+
+from superset.utils.keyset_pagination import (
+    apply_keyset,
+    COUNT_ESTIMATE,
+    COUNT_EXACT,
+    COUNT_NONE,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    fetch_keyset_page,
+    InvalidCursorError,
+    parse_count_mode,
+)
+
+Base = declarative_base()
+
+
+class Forecast(Base):
+    __tablename__ = "forecast"
+    forecast_date = Column(Date, primary_key=True)
+    municipality_code = Column(String, primary_key=True)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Forecast(
+                    forecast_date=datetime.date(2025, 5, 26)
+                    + datetime.timedelta(days=day),
+                    municipality_code=code,
+                )
+                for day in range(4)
+                for code in ("TL-AL", "TL-BA", "TL-DI")
+            ]
+        )
+        session.commit()
+        yield session
+
+
+def test_cursor_round_trip():
+    values = [
+        datetime.date(2025, 5, 26),
+        datetime.datetime(2025, 5, 26, 8, 30),
+        "TL-DI",
+        7,
+    ]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 4) == values
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", encode_cursor([1, 2])])
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 3)
+
+
+def test_parse_count_mode():
+    assert parse_count_mode(None) == COUNT_EXACT
+    assert parse_count_mode("", default=COUNT_NONE) == COUNT_NONE
+    assert parse_count_mode("estimate") == COUNT_ESTIMATE
+    with pytest.raises(ValueError):
+        parse_count_mode("fast")
+
+
+def test_count_rows(session):
+    query = session.query(Forecast)
+    assert count_rows(query, COUNT_EXACT) == 12
+    assert count_rows(query, COUNT_NONE) is None
+    # No planner estimate outside PostgreSQL, falls back to an exact count
+    assert count_rows(query, COUNT_ESTIMATE) == 12
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_cover_all_rows(session, descending):
+    key_columns = [Forecast.forecast_date, Forecast.municipality_code]
+    seen = []
+    cursor_values = None
+    while True:
+        query = apply_keyset(
+            session.query(Forecast), key_columns, cursor_values, descending=descending
+        )
+        rows, next_cursor = fetch_keyset_page(
+            query, 5, lambda row: (row.forecast_date, row.municipality_code)
+        )
+        seen += [(row.forecast_date, row.municipality_code) for row in rows]
+        if next_cursor is None:
+            break
+        cursor_values = decode_cursor(next_cursor, len(key_columns))
+
+    assert len(seen) == 12
+    assert seen == sorted(seen, reverse=descending)
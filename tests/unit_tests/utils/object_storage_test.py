@@ -0,0 +1,129 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import hashlib
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+
+from superset.utils.object_storage import (
+    content_key,
+    ensure_bucket,
+    get_s3_client,
+    PendingObject,
+    presigned_get_url,
+    upload_objects,
+)
+
+
+def _client_error(code: str, status: int) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        "HeadObject",
+    )
+
+
+def _fake_client(existing_keys=()) -> MagicMock:
+    client = MagicMock()
+    client.meta.endpoint_url = f"http://minio-{id(client)}"
+
+    def head_object(Bucket, Key):  # noqa: N803
+        if Key not in existing_keys:
+            raise _client_error("404", 404)
+
+    client.head_object.side_effect = head_object
+    return client
+
+
+def test_content_key():
+    body = b"\x89PNG..."
+    assert content_key("bulletin_images", body, "Map.PNG") == (
+        f"bulletin_images/{hashlib.sha256(body).hexdigest()}.png"
+    )
+    assert content_key("bulletin_images", body, "other.png") == content_key(
+        "bulletin_images", body, "map.png"
+    )
+
+
+def test_get_s3_client_is_shared():
+    assert get_s3_client("http://minio:9000") is get_s3_client("http://minio:9000")
+
+
+def test_upload_objects_puts_existing_and_skips_duplicates():
+    client = _fake_client(existing_keys={"img/a.png"})
+    upload_objects(
+        client,
+        "bucket",
+        [
+            PendingObject("img/a.png", b"a", "image/png"),
+            PendingObject("img/b.png", b"b", "image/png"),
+            PendingObject("img/b.png", b"b", "image/png"),
+            PendingObject("img/c.png", b"c", "image/png"),
+        ],
+    )
+    uploaded = sorted(call.args[2] for call in client.upload_fileobj.call_args_list)
+    # Existing keys are written again to refresh their LastModified
+    assert uploaded == ["img/a.png", "img/b.png", "img/c.png"]
+
+
+def test_upload_objects_raises_errors():
+    client = _fake_client()
+    client.upload_fileobj.side_effect = _client_error("AccessDenied", 403)
+    with pytest.raises(ClientError):
+        upload_objects(
+            client,
+            "bucket",
+            [
+                PendingObject("img/a.png", b"a", "image/png"),
+                PendingObject("img/b.png", b"b", "image/png"),
+            ],
+        )
+
+
+def test_ensure_bucket_checks_once():
+    client = _fake_client()
+    client.head_bucket.side_effect = _client_error("NoSuchBucket", 404)
+    ensure_bucket(client, "bucket")
+    ensure_bucket(client, "bucket")
+    assert client.head_bucket.call_count == 1
+    client.create_bucket.assert_called_once_with(Bucket="bucket")
+
+
+def test_presigned_get_url_is_cached_for_half_its_ttl(mocker):
+    client = _fake_client()
+    client.generate_presigned_url.side_effect = lambda *args, **kwargs: (
+        f"url-{client.generate_presigned_url.call_count}"
+    )
+    now = mocker.patch("superset.utils.object_storage.time.time", return_value=3600)
+
+    first = presigned_get_url(client, "bucket", "img/a.png", 3600)
+    now.return_value = 3600 + 1799
+    assert presigned_get_url(client, "bucket", "img/a.png", 3600) == first
+    assert client.generate_presigned_url.call_count == 1
+    client.generate_presigned_url.assert_called_once_with(
+        "get_object",
+        Params={"Bucket": "bucket", "Key": "img/a.png"},
+        ExpiresIn=3600,
+    )
+
+    # Other keys are signed separately
+    assert presigned_get_url(client, "bucket", "img/b.png", 3600) != first
+
+    # Half the TTL after the window started, the URL is signed again
+    now.return_value = 3600 + 1800
+    assert presigned_get_url(client, "bucket", "img/a.png", 3600) != first
+    assert client.generate_presigned_url.call_count == 3
@@ -0,0 +1,69 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from io import BytesIO
+from unittest.mock import MagicMock
+
+from PIL import Image
+from pytest_mock import MockerFixture
+
+from superset.utils import pdf
+from superset.utils.pdf import prefetch_bulletin_images, process_bulletin_image
+
+
+def _png(size, mode="RGBA", color=(255, 0, 0, 0)) -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_process_bulletin_image_downscales_to_print_size() -> None:
+    image = process_bulletin_image(_png((3000, 1500)), 500, 400, dpi=144, quality=85)
+
+    assert (image.width, image.height) == (3000, 1500)
+    embedded = Image.open(BytesIO(image.data))
+    # 500pt wide at 144 dpi, transparent pixels flattened onto white
+    assert embedded.size == (1000, 500)
+    assert embedded.convert("RGB").getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_process_bulletin_image_does_not_upscale() -> None:
+    image = process_bulletin_image(
+        _png((100, 50), "RGB", (0, 0, 255)), 500, 400, dpi=150, quality=85
+    )
+
+    assert Image.open(BytesIO(image.data)).size == (100, 50)
+
+
+def test_prefetch_bulletin_images_caches_by_key(mocker: MockerFixture) -> None:
+    mocker.patch.object(pdf, "_image_cache", pdf.OrderedDict())
+    objects = {"a.png": _png((200, 100)), "b.png": b"not an image"}
+    s3_client = MagicMock()
+    s3_client.get_object.side_effect = lambda Bucket, Key: {
+        "Body": BytesIO(objects[Key])
+    }
+
+    first = prefetch_bulletin_images(
+        s3_client, "bucket", ["a.png", "b.png", "a.png"], 500, 400
+    )
+    assert (first["a.png"].width, first["a.png"].height) == (200, 100)
+    assert isinstance(first["b.png"], Exception)
+    assert s3_client.get_object.call_count == 2
+
+    second = prefetch_bulletin_images(s3_client, "bucket", ["a.png", "b.png"], 500, 400)
+    assert second["a.png"] == first["a.png"]
+    # Failures are not cached
+    assert s3_client.get_object.call_count == 3
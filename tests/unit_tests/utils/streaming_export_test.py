@@ -0,0 +1,118 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import datetime
+
+import pytest
+from flask import Flask
+from marshmallow import fields, Schema
+from sqlalchemy import Column, create_engine, Date, Integer, String
+from sqlalchemy.orm import declarative_base, Session
+
+from superset.utils import json
+from superset.utils.streaming_export import (
+    FORMAT_CSV,
+    FORMAT_NDJSON,
+    parse_export_format,
+    schema_columns,
+    stream_query,
+)
+
+Base = declarative_base()
+
+
+class Alert(Base):
+    __tablename__ = "alert"
+    id = Column(Integer, primary_key=True)
+    forecast_date = Column(Date)
+    alert_title = Column(String)
+
+
+class AlertSchema(Schema):
+    id = fields.Method("get_id")
+    forecast_date = fields.Date()
+    title = fields.String(attribute="alert_title")
+    not_a_column = fields.String()
+
+    def get_id(self, obj):
+        return f"alert_{obj.id}"
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Alert(
+                    id=1,
+                    forecast_date=datetime.date(2025, 5, 26),
+                    alert_title="Heavy rain",
+                ),
+                Alert(
+                    id=2, forecast_date=datetime.date(2025, 5, 27), alert_title="=cmd"
+                ),
+            ]
+        )
+        session.commit()
+        yield session
+
+
+def test_parse_export_format():
+    assert parse_export_format(None) is None
+    assert parse_export_format("json") is None
+    assert parse_export_format("csv") == FORMAT_CSV
+    with pytest.raises(ValueError):
+        parse_export_format("xlsx")
+
+
+def test_schema_columns():
+    columns = schema_columns(AlertSchema(), Alert)
+    assert list(columns) == ["forecast_date", "title"]
+    assert columns["title"] is Alert.alert_title
+
+
+def _stream(session, export_format):
+    with Flask(__name__).test_request_context():
+        response = stream_query(
+            session.query(Alert).order_by(Alert.id),
+            schema_columns(AlertSchema(), Alert),
+            export_format,
+            "alerts",
+        )
+        return response, response.get_data(as_text=True)
+
+
+def test_stream_query_ndjson(session):
+    response, body = _stream(session, FORMAT_NDJSON)
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"forecast_date": "2025-05-26", "title": "Heavy rain"},
+        {"forecast_date": "2025-05-27", "title": "=cmd"},
+    ]
+
+
+def test_stream_query_csv(session):
+    response, body = _stream(session, FORMAT_CSV)
+    assert (
+        response.headers["Content-Disposition"] == 'attachment; filename="alerts.csv"'
+    )
+    assert body.splitlines() == [
+        "forecast_date,title",
+        "2025-05-26,Heavy rain",
+        "2025-05-27,'=cmd",
+    ]
@@ -0,0 +1,81 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from datetime import datetime
+from typing import Any
+
+import prison
+from sqlalchemy.orm.session import Session
+
+from superset import db
+
+
+def test_bulk_delete_unlinks_bulletins(
+    session: Session,
+    client: Any,
+    full_api_access: None,
+) -> None:
+    """
+    Bulletins linked to a deleted alert lose their composite ID, others keep it
+    """
+    from superset.models.bulletins import Bulletin
+    from superset.weather_forecast_alerts.models import WeatherForecastAlert
+
+    WeatherForecastAlert.metadata.create_all(db.session.get_bind())
+    for weather_parameter in ("rainfall", "heat_index"):
+        db.session.add(
+            WeatherForecastAlert(
+                municipality_code="TL-DI",
+                created_date=datetime(2026, 10, 12, 6, 0),
+                forecast_date="2026-10-14",
+                weather_parameter=weather_parameter,
+                alert_level="Warning",
+                alert_title="Alert",
+                alert_message="Message",
+                parameter_value=1.0,
+            )
+        )
+    # Composite IDs as the weather pipeline writes them
+    linked = Bulletin(
+        title="Rainfall",
+        advisory="Advisory",
+        risks="Risks",
+        safety_tips="Tips",
+        created_by_fk=1,
+        weather_forecast_alert_composite_id="TL-DI_2026-10-12 06:00:00_2026-10-14_rainfall",
+    )
+    other = Bulletin(
+        title="Heat",
+        advisory="Advisory",
+        risks="Risks",
+        safety_tips="Tips",
+        created_by_fk=1,
+        weather_forecast_alert_composite_id="TL-DI_2026-10-12 06:00:00_2026-10-14_heat_index",
+    )
+    db.session.add_all([linked, other])
+    db.session.commit()
+
+    response = client.delete(
+        f"/api/v1/weather_forecast_alert/?q={prison.dumps(['TL-DI_2026-10-14_rainfall'])}"
+    )
+
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert linked.weather_forecast_alert_composite_id is None
+    assert other.weather_forecast_alert_composite_id == (
+        "TL-DI_2026-10-12 06:00:00_2026-10-14_heat_index"
+    )
+    assert db.session.query(WeatherForecastAlert).count() == 1